@@ -0,0 +1,427 @@
+import asyncio
+import json
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+@dataclass
+class LatencyModel:
+    mean: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    # Share of requests that take `tail` seconds instead, e.g. a slow replica
+    tail_rate: float = 0.0
+    tail: float = 0.0
+    rng: random.Random = field(default_factory=random.Random)
+    
+    async def delay(self) -> None:
+        seconds = max(0.0, self.rng.gauss(self.mean, self.jitter)) if self.jitter else self.mean
+        
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            seconds = self.tail
+        
+        if seconds:
+            await asyncio.sleep(seconds)
+    
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+
+@dataclass
+class FloodLimits:
+    # Telegram's documented limits: ~30 messages/s per bot, ~1/s per chat
+    global_rate: float = 30.0
+    global_burst: int = 30
+    chat_rate: float = 1.0
+    chat_burst: int = 3
+    _buckets: Dict[Any, Tuple[float, float]] = field(default_factory=dict, repr=False)
+    
+    def _take(
+        self,
+        key: Any,
+        rate: float,
+        burst: int,
+        now: float
+    ) -> float:
+        tokens, updated_at = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        
+        if tokens >= 1.0:
+            self._buckets[key] = (tokens - 1.0, now)
+            return 0.0
+        
+        self._buckets[key] = (tokens, now)
+        return (1.0 - tokens) / rate
+    
+    def retry_after(
+        self,
+        chat_id: int
+    ) -> int:
+        # 0 when the message may be sent, otherwise whole seconds, like Telegram
+        now = time.monotonic()
+        wait = self._take(chat_id, self.chat_rate, self.chat_burst, now)
+        
+        if not wait:
+            wait = self._take(None, self.global_rate, self.global_burst, now)
+            if wait:
+                tokens, updated_at = self._buckets[chat_id]
+                self._buckets[chat_id] = (tokens + 1.0, updated_at)
+        
+        return math.ceil(wait)
+
+
+@dataclass
+class TelegramCall:
+    method: str
+    params: Dict[str, Any]
+    at: float
+
+
+class FakeServer:
+    
+    def __init__(self):
+        self.app = web.Application(
+            client_max_size=64 * 1024 * 1024
+        )
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+    
+    async def start(
+        self,
+        port: int
+    ) -> None:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(
+            runner=self._runner,
+            host="127.0.0.1",
+            port=port
+        ).start()
+        self.port = port
+    
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+
+class FakeTelegramServer(FakeServer):
+    
+    def __init__(
+        self,
+        latency: LatencyModel,
+        voice_bytes: int = 32 * 1024,
+        flood_limits: Optional[FloodLimits] = None
+    ):
+        super().__init__()
+        self.latency = latency
+        self.flood_limits = flood_limits
+        self.flood_rejections = 0
+        self.voice = bytes(random.getrandbits(8) for _ in range(voice_bytes))
+        self.calls_by_method: Dict[str, int] = {}
+        self.injected_errors = 0
+        
+        self._updates: Deque[Dict[str, Any]] = deque()
+        self._update_id = 0
+        self._new_updates = asyncio.Event()
+        self._message_id = 0
+        self._calls: Dict[int, List[TelegramCall]] = {}
+        self._conditions: Dict[int, asyncio.Condition] = {}
+        
+        self.app.router.add_post(
+            path="/bot{token}/{method}",
+            handler=self._handle_method
+        )
+        self.app.router.add_get(
+            path="/file/bot{token}/{path:.+}",
+            handler=self._handle_file
+        )
+    
+    def push_update(
+        self,
+        update: Dict[str, Any]
+    ) -> None:
+        self._update_id += 1
+        self._updates.append({"update_id": self._update_id, **update})
+        self._new_updates.set()
+    
+    def mark(
+        self,
+        chat_id: int
+    ) -> int:
+        return len(self._calls.get(chat_id, []))
+    
+    async def wait_for(
+        self,
+        chat_id: int,
+        predicate: Callable[[TelegramCall], bool],
+        after: int,
+        timeout: float
+    ) -> TelegramCall:
+        condition = self._conditions.setdefault(chat_id, asyncio.Condition())
+        
+        def find() -> Optional[TelegramCall]:
+            for call in self._calls.get(chat_id, [])[after:]:
+                if predicate(call):
+                    return call
+            return None
+        
+        async with condition:
+            await asyncio.wait_for(
+                condition.wait_for(lambda: find() is not None),
+                timeout=timeout
+            )
+        
+        return find()
+    
+    async def _record(
+        self,
+        chat_id: int,
+        call: TelegramCall
+    ) -> None:
+        self._calls.setdefault(chat_id, []).append(call)
+        condition = self._conditions.setdefault(chat_id, asyncio.Condition())
+        
+        async with condition:
+            condition.notify_all()
+    
+    def _message(
+        self,
+        chat_id: int,
+        params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        self._message_id += 1
+        message = {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {
+                "id": chat_id,
+                "type": "private"
+            },
+            "text": params.get("text") or params.get("caption") or ""
+        }
+        
+        if "photo" in params:
+            message["photo"] = [
+                {
+                    "file_id": f"photo-{self._message_id}",
+                    "file_unique_id": f"photo-{self._message_id}",
+                    "width": 1024,
+                    "height": 768
+                }
+            ]
+        
+        return message
+    
+    async def _get_updates(
+        self,
+        params: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        limit = int(params.get("limit") or 100)
+        
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        
+        if not self._updates and timeout:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(
+                    self._new_updates.wait(),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+        
+        return list(self._updates)[:limit]
+    
+    async def _handle_method(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        self.calls_by_method[method] = self.calls_by_method.get(method, 0) + 1
+        
+        if method == "getUpdates":
+            return web.json_response(
+                data={"ok": True, "result": await self._get_updates(params=params)}
+            )
+        
+        await self.latency.delay()
+        
+        if self.latency.should_fail():
+            self.injected_errors += 1
+            return web.json_response(
+                data={"ok": False, "error_code": 500, "description": "Internal Server Error: injected"},
+                status=500
+            )
+        
+        if method == "getMe":
+            result: Any = {
+                "id": 123456,
+                "is_bot": True,
+                "first_name": "LoadTestBot",
+                "username": "load_test_bot"
+            }
+        elif method == "getFile":
+            result = {
+                "file_id": params["file_id"],
+                "file_unique_id": params["file_id"],
+                "file_size": len(self.voice),
+                "file_path": f"voice/{params['file_id']}.oga"
+            }
+        elif method.startswith("send") or method.startswith("edit"):
+            chat_id = int(params.get("chat_id") or 0)
+            
+            retry_after = self.flood_limits.retry_after(chat_id=chat_id) if self.flood_limits else 0
+            if retry_after:
+                self.flood_rejections += 1
+                return web.json_response(
+                    data={
+                        "ok": False,
+                        "error_code": 429,
+                        "description": f"Too Many Requests: retry after {retry_after}",
+                        "parameters": {"retry_after": retry_after}
+                    }
+                )
+            
+            result = self._message(
+                chat_id=chat_id,
+                params=params
+            )
+        else:
+            result = True
+        
+        if method == "answerCallbackQuery":
+            chat_id = int(params["callback_query_id"].split(":")[0])
+        else:
+            chat_id = int(params.get("chat_id") or 0)
+        
+        if chat_id:
+            await self._record(
+                chat_id=chat_id,
+                call=TelegramCall(
+                    method=method,
+                    params=params,
+                    at=time.perf_counter()
+                )
+            )
+        
+        return web.json_response(
+            data={"ok": True, "result": result}
+        )
+    
+    async def _handle_file(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        await self.latency.delay()
+        
+        return web.Response(
+            body=self.voice,
+            content_type="audio/ogg"
+        )
+
+
+class FakeOpenAIServer(FakeServer):
+    
+    def __init__(
+        self,
+        latency: LatencyModel,
+        transcription_latency: LatencyModel,
+        analysis: Dict[str, str]
+    ):
+        super().__init__()
+        self.latency = latency
+        self.transcription_latency = transcription_latency
+        self.analysis = analysis
+        self.requests: Dict[str, int] = {}
+        self.injected_errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        
+        self.app.router.add_post(
+            path="/v1/chat/completions",
+            handler=self._handle_chat
+        )
+        self.app.router.add_post(
+            path="/v1/audio/transcriptions",
+            handler=self._handle_transcription
+        )
+    
+    def _error(self) -> web.Response:
+        self.injected_errors += 1
+        
+        return web.json_response(
+            data={"error": {"message": "injected", "type": "server_error"}},
+            status=500
+        )
+    
+    async def _handle_chat(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        await request.read()
+        self.requests["chat"] = self.requests.get("chat", 0) + 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        
+        try:
+            await self.latency.delay()
+        finally:
+            self.in_flight -= 1
+        
+        if self.latency.should_fail():
+            return self._error()
+        
+        return web.json_response(
+            data={
+                "id": "chatcmpl-load",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": json.dumps(self.analysis)
+                        }
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 1100,
+                    "completion_tokens": 60,
+                    "total_tokens": 1160
+                }
+            }
+        )
+    
+    async def _handle_transcription(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        await request.read()
+        self.requests["transcription"] = self.requests.get("transcription", 0) + 1
+        await self.transcription_latency.delay()
+        
+        if self.transcription_latency.should_fail():
+            return self._error()
+        
+        return web.json_response(
+            data={
+                "text": "There is a deep pothole on the road outside my house."
+            }
+        )
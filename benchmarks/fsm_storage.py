@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.config.settings import FSMStorageConfig
+from src.services.fsm_storage import SQLiteStorage
+from src.bot.handlers.start import ReportStates
+
+
+async def report_flow(
+    state: FSMContext
+) -> int:
+    # Mirrors the FSM calls the start handlers make for one report
+    await state.clear()
+    await state.set_state(ReportStates.waiting_for_location)
+    await state.update_data(latitude=35.126412, longitude=33.429954)
+    await state.set_state(ReportStates.waiting_for_media)
+    await state.get_data()
+    await state.update_data(media_type="photo")
+    await state.update_data(
+        category="Damage",
+        subcategory="Road",
+        description="A deep pothole in the middle of the lane."
+    )
+    await state.set_state(ReportStates.reviewing_report)
+    await state.update_data(latitude=35.126412, longitude=33.429954)
+    await state.update_data(category="Damage")
+    await state.get_data()
+    await state.update_data(subcategory="Pavement, footpath")
+    await state.get_data()
+    await state.clear()
+    
+    return 14
+
+
+async def run_backend(
+    storage: BaseStorage,
+    users: int,
+    rounds: int
+) -> Dict[str, Any]:
+    async def user(
+        user_id: int
+    ) -> int:
+        state = FSMContext(
+            storage=storage,
+            key=StorageKey(
+                bot_id=1,
+                chat_id=user_id,
+                user_id=user_id
+            )
+        )
+        operations = 0
+        
+        for _ in range(rounds):
+            operations += await report_flow(
+                state=state
+            )
+            await asyncio.sleep(0)
+        
+        return operations
+    
+    started = time.perf_counter()
+    operations = sum(
+        await asyncio.gather(*(user(user_id) for user_id in range(users)))
+    )
+    elapsed = time.perf_counter() - started
+    
+    close_started = time.perf_counter()
+    await storage.close()
+    close_elapsed = time.perf_counter() - close_started
+    
+    result = {
+        "operations": operations,
+        "seconds": round(elapsed, 3),
+        "us_per_operation": round(elapsed / operations * 1_000_000, 2),
+        "flows_per_second": round(users * rounds / elapsed, 1),
+        "close_seconds": round(close_elapsed, 3)
+    }
+    
+    if isinstance(storage, SQLiteStorage):
+        result["storage"] = storage.stats.to_dict()
+    
+    return result
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        backends: Dict[str, Callable[[], BaseStorage]] = {
+            "memory": MemoryStorage,
+            "sqlite_write_behind": lambda: SQLiteStorage(
+                config=FSMStorageConfig(
+                    path=os.path.join(directory, "write_behind.sqlite3"),
+                    flush_interval=args.flush_interval
+                )
+            ),
+            "sqlite_write_through": lambda: SQLiteStorage(
+                config=FSMStorageConfig(
+                    path=os.path.join(directory, "write_through.sqlite3"),
+                    flush_interval=0.0
+                )
+            )
+        }
+        
+        return {
+            "benchmark": "fsm_storage",
+            "params": vars(args),
+            "backends": {
+                name: asyncio.run(
+                    run_backend(
+                        storage=factory(),
+                        users=args.users,
+                        rounds=args.rounds
+                    )
+                )
+                for name, factory in backends.items()
+            }
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="FSM round trips per report flow: MemoryStorage vs SQLite storage"
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
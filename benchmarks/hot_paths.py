@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("WEBAPP_URL", "https://example.com/webapp/map.html")
+
+from aiogram.types import CallbackQuery, User
+
+from src.config.settings import ThrottleConfig, TracingConfig
+from src.models.taxonomy import get_taxonomy
+from src.services.ai_vision_service import AIVisionService
+from src.services.metrics import DEPENDENCY_DURATION, REGISTRY
+from src.services.throttle import Throttle
+from src.services.tracing import OTLPFileExporter, Tracer
+from src.bot.handlers.start import router as start_router
+from src.bot.keyboards.inline import create_report_review_keyboard
+from src.bot.middleware.error import ErrorHandlerMiddleware
+from src.bot.middleware.logging import LoggingMiddleware
+from src.bot.middleware.metrics import MetricsMiddleware
+from src.bot.middleware.throttling import ThrottlingMiddleware
+from src.bot.utils.formatting import build_report_text
+from benchmarks.servers import git_commit
+
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "hot_paths.json"
+
+Benchmark = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+def calibration() -> int:
+    # Fixed pure-Python workload; results are also reported as multiples of
+    # it so a baseline recorded on one machine can be checked on another.
+    total = 0
+    for i in range(200):
+        total += len(f"{i}:{i * 31 % 7}")
+    return total
+
+
+def callback_query(
+    data: str
+) -> CallbackQuery:
+    return CallbackQuery(
+        id="1",
+        from_user=User(
+            id=42,
+            is_bot=False,
+            first_name="Bench",
+            username="bench"
+        ),
+        chat_instance="1",
+        data=data
+    )
+
+
+async def _noop_handler(
+    event: Any,
+    data: Dict[str, Any]
+) -> None:
+    return None
+
+
+async def match_callback(
+    event: CallbackQuery
+) -> Optional[str]:
+    for handler in start_router.callback_query.handlers:
+        matched, _ = await handler.check(event)
+        if matched:
+            return handler.callback.__name__
+    return None
+
+
+def build_benchmarks() -> Dict[str, Benchmark]:
+    taxonomy = get_taxonomy()
+    category = taxonomy.find_category("Damage")
+    service = AIVisionService()
+    logging_middleware = LoggingMiddleware()
+    error_middleware = ErrorHandlerMiddleware()
+    metrics_middleware = MetricsMiddleware(
+        update_type="callback_query"
+    )
+    # Budgets large enough that every update passes: the cost of admitting one
+    throttling_middleware = ThrottlingMiddleware(
+        throttle=Throttle(
+            config=ThrottleConfig(user_rate=1e9, user_burst=10 ** 9, global_rate=1e9, global_burst=10 ** 9)
+        )
+    )
+    metrics_data = {
+        "handler": start_router.callback_query.handlers[0]
+    }
+    
+    first_callback = callback_query(
+        data="chcat|35.1264|33.4299"
+    )
+    subcategory_callback = callback_query(
+        data=f"subcat_{category.subcategories[0].id}"
+    )
+    last_callback = callback_query(
+        data="media_audio|35.1264|33.4299"
+    )
+    
+    tracers = {
+        rate: Tracer(
+            config=TracingConfig(sample_rate=rate),
+            exporter=OTLPFileExporter(
+                path=os.devnull,
+                service_name="benchmark"
+            )
+        )
+        for rate in (0.0, 1.0)
+    }
+    disabled_tracer = Tracer(
+        config=TracingConfig()
+    )
+    
+    def traced_call(
+        tracer: Tracer
+    ) -> None:
+        with tracer.span(name="bot.handle_photo"):
+            with tracer.span(name="openai.vision", attributes={"openai.model": "gpt-4o"}):
+                pass
+    
+    def cold_system_prompt() -> str:
+        service._prompt = None
+        return service._system_prompt()[0]
+    
+    return {
+        "middleware.none": lambda: _noop_handler(first_callback, {}),
+        "middleware.logging": lambda: logging_middleware(_noop_handler, first_callback, {}),
+        "middleware.error": lambda: error_middleware(_noop_handler, first_callback, {}),
+        "middleware.metrics": lambda: metrics_middleware(_noop_handler, first_callback, metrics_data),
+        "middleware.throttling": lambda: throttling_middleware(_noop_handler, first_callback, {}),
+        "metrics.dependency_observe": lambda: DEPENDENCY_DURATION.labels("telegram", "sendMessage", "ok").observe(0.042),
+        "metrics.render": REGISTRY.render,
+        "tracing.disabled": lambda: traced_call(tracer=disabled_tracer),
+        "tracing.unsampled": lambda: traced_call(tracer=tracers[0.0]),
+        "tracing.sampled": lambda: traced_call(tracer=tracers[1.0]),
+        "router.callback_first": lambda: match_callback(
+            event=first_callback
+        ),
+        "router.callback_subcategory": lambda: match_callback(
+            event=subcategory_callback
+        ),
+        "router.callback_last": lambda: match_callback(
+            event=last_callback
+        ),
+        "keyboard.report_review": lambda: create_report_review_keyboard(
+            category=category.name,
+            subcategory=category.subcategories[0].name,
+            latitude=35.1264,
+            longitude=33.4299,
+            description="A deep pothole in the middle of the lane, about 40 cm wide.",
+            webapp_url=os.environ["WEBAPP_URL"]
+        ),
+        "ai.system_prompt": lambda: service._system_prompt(),
+        "ai.system_prompt_render": cold_system_prompt,
+        "ai.validate_response": lambda: service._validate_response(
+            category="damage",
+            subcategory="traffic  LIGHTS"
+        ),
+        "ai.validate_response_fallback": lambda: service._validate_response(
+            category="Meteor",
+            subcategory="Crater"
+        ),
+        "report.text": lambda: build_report_text(
+            title="Report Details",
+            latitude=35.126412345,
+            longitude=33.429954321,
+            category=category.name,
+            subcategory=category.subcategories[0].name,
+            description="A deep pothole in the middle of the lane, about 40 cm wide.",
+            footer="Review your report and submit or change category."
+        )
+    }
+
+
+def measure(
+    func: Benchmark,
+    loop: asyncio.AbstractEventLoop,
+    number: int,
+    repeat: int
+) -> Dict[str, float]:
+    if asyncio.iscoroutine(probe := func()):
+        loop.run_until_complete(probe)
+        
+        async def batch() -> float:
+            started = time.perf_counter()
+            for _ in range(number):
+                await func()
+            return time.perf_counter() - started
+        
+        timings = [loop.run_until_complete(batch()) for _ in range(repeat)]
+    else:
+        timings = timeit.repeat(
+            stmt=func,
+            number=number,
+            repeat=repeat
+        )
+    
+    best = min(timings) / number
+    
+    return {
+        "us_per_call": round(best * 1_000_000, 3)
+    }
+
+
+def measure_all(
+    benchmarks: Dict[str, Benchmark],
+    names: List[str],
+    number: int,
+    repeat: int
+) -> Dict[str, Dict[str, float]]:
+    loop = asyncio.new_event_loop()
+    results: Dict[str, Dict[str, float]] = {}
+    
+    try:
+        for name in names:
+            # Calibrate next to every benchmark so drift in machine load over
+            # the run cancels out of the relative figure.
+            unit = measure(
+                func=calibration,
+                loop=loop,
+                number=max(number // 10, 1),
+                repeat=repeat
+            )["us_per_call"]
+            result = measure(
+                func=benchmarks[name],
+                loop=loop,
+                number=number,
+                repeat=repeat
+            )
+            result["relative"] = round(result["us_per_call"] / unit, 5) if unit else 0.0
+            results[name] = result
+    finally:
+        loop.close()
+    
+    return results
+
+
+def compare(
+    baseline: Dict[str, Any],
+    report: Dict[str, Any],
+    threshold: float,
+    min_us: float = 0.0
+) -> List[Dict[str, Any]]:
+    regressions = []
+    
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if not reference or reference["us_per_call"] < min_us:
+            continue
+        
+        ratio = result["relative"] / reference["relative"]
+        result["vs_baseline"] = round(ratio, 3)
+        
+        if ratio > threshold:
+            regressions.append({
+                "name": name,
+                "baseline_relative": reference["relative"],
+                "relative": result["relative"],
+                "ratio": round(ratio, 3)
+            })
+    
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-update CPU cost of handler and rendering hot paths"
+    )
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--filter", type=str, default="")
+    parser.add_argument("--baseline", type=str, default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--threshold", type=float, default=1.75)
+    parser.add_argument("--min-us", type=float, default=1.0)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    # Keep log records flowing through the real handlers so middleware
+    # overhead includes formatting, but write them nowhere.
+    devnull = open(os.devnull, "w")
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        for handler in getattr(logger, "handlers", []):
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(devnull)
+    logging.lastResort = logging.StreamHandler(devnull)
+    
+    benchmarks = build_benchmarks()
+    report = {
+        "benchmark": "hot_paths",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": {
+            "number": args.number,
+            "repeat": args.repeat
+        },
+        "results": measure_all(
+            benchmarks=benchmarks,
+            names=[name for name in benchmarks if args.filter in name],
+            number=args.number,
+            repeat=args.repeat
+        )
+    }
+    regressions: List[Dict[str, Any]] = []
+    
+    if args.check:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        
+        for attempt in range(args.retries + 1):
+            if attempt:
+                # Re-measure only the suspects and keep their best figure, so
+                # a noisy neighbour does not fail the gate on its own.
+                retried = measure_all(
+                    benchmarks=benchmarks,
+                    names=[regression["name"] for regression in regressions],
+                    number=args.number,
+                    repeat=args.repeat
+                )
+                for name, result in retried.items():
+                    if result["relative"] < report["results"][name]["relative"]:
+                        report["results"][name] = result
+            
+            regressions = compare(
+                baseline=baseline,
+                report=report,
+                threshold=args.threshold,
+                min_us=args.min_us
+            )
+            if not regressions:
+                break
+        
+        report["baseline"] = {
+            "commit": baseline.get("commit", ""),
+            "threshold": args.threshold,
+            "regressions": regressions
+        }
+    
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+    
+    if args.save_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w") as baseline_file:
+            baseline_file.write(text)
+    
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
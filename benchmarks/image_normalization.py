@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import io
+import json
+import logging
+import math
+import os
+import time
+from typing import Dict, Tuple
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from PIL import Image
+
+from src.config.settings import ImageConfig
+from src.services.image_service import ImageNormalizer
+
+
+def vision_tokens(
+    width: int,
+    height: int
+) -> int:
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    
+    return 85 + 170 * tiles
+
+
+def synthetic_photo(
+    width: int,
+    height: int,
+    quality: int
+) -> Tuple[bytes, Tuple[int, int]]:
+    noise = Image.effect_noise(
+        size=(width, height),
+        sigma=64
+    )
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge(
+        mode="RGB",
+        bands=(noise, gradient, noise.transpose(Image.FLIP_LEFT_RIGHT))
+    )
+    
+    output = io.BytesIO()
+    image.save(
+        output,
+        format="JPEG",
+        quality=quality
+    )
+    
+    return output.getvalue(), image.size
+
+
+async def run(
+    args: argparse.Namespace
+) -> Dict:
+    data, (width, height) = synthetic_photo(
+        width=args.width,
+        height=args.height,
+        quality=args.source_quality
+    )
+    
+    normalizer = ImageNormalizer(
+        config=ImageConfig(
+            max_edge=args.max_edge,
+            jpeg_quality=args.quality,
+            workers=args.workers
+        )
+    )
+    normalizer.start()
+    
+    try:
+        await normalizer.normalize(data=data)
+        normalizer.stats.images = 0
+        normalizer.stats.input_bytes = 0
+        normalizer.stats.output_bytes = 0
+        normalizer.stats.total_time = 0.0
+        
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(normalizer.normalize(data=data) for _ in range(args.images))
+        )
+        wall = time.perf_counter() - started
+    finally:
+        normalizer.close()
+    
+    result = results[0]
+    
+    return {
+        "benchmark": "image_normalization",
+        "params": vars(args),
+        "input": {
+            "width": width,
+            "height": height,
+            "bytes": len(data),
+            "base64_bytes": math.ceil(len(data) / 3) * 4,
+            "vision_tokens_high_detail": vision_tokens(width, height)
+        },
+        "output": {
+            "width": result.width,
+            "height": result.height,
+            "bytes": result.output_bytes,
+            "base64_bytes": math.ceil(result.output_bytes / 3) * 4,
+            "vision_tokens_high_detail": vision_tokens(result.width, result.height)
+        },
+        "normalization": {
+            **normalizer.stats.to_dict(),
+            "images_per_second": round(args.images / wall, 2)
+        }
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Upload size, vision tokens and time per image before/after normalization"
+    )
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--source-quality", type=int, default=92)
+    parser.add_argument("--max-edge", type=int, default=1536)
+    parser.add_argument("--quality", type=int, default=85)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    report = asyncio.run(run(args=args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import logging
+import os
+import timeit
+from typing import Callable, Dict
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.models.taxonomy import get_taxonomy
+from src.bot.keyboards.inline import (
+    create_categories_keyboard,
+    create_subcategories_keyboard,
+    create_report_review_keyboard
+)
+from src.bot.keyboards.registry import get_keyboard_registry
+
+
+def measure(
+    func: Callable[[], object],
+    number: int,
+    repeat: int
+) -> Dict[str, float]:
+    best = min(
+        timeit.repeat(
+            stmt=func,
+            number=number,
+            repeat=repeat
+        )
+    ) / number
+    
+    return {
+        "us_per_call": round(best * 1_000_000, 3),
+        "calls_per_second": round(1 / best) if best else 0
+    }
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict:
+    taxonomy = get_taxonomy()
+    category = taxonomy.find_category("Damage")
+    registry = get_keyboard_registry()
+    
+    return {
+        "benchmark": "keyboards",
+        "params": vars(args),
+        "categories": {
+            "build": measure(
+                func=lambda: create_categories_keyboard(
+                    taxonomy=taxonomy
+                ),
+                number=args.number,
+                repeat=args.repeat
+            ),
+            "registry": measure(
+                func=lambda: get_keyboard_registry().categories(),
+                number=args.number,
+                repeat=args.repeat
+            )
+        },
+        "subcategories": {
+            "build": measure(
+                func=lambda: create_subcategories_keyboard(
+                    category=category
+                ),
+                number=args.number,
+                repeat=args.repeat
+            ),
+            "registry": measure(
+                func=lambda: get_keyboard_registry().subcategories(
+                    category=category.name
+                ),
+                number=args.number,
+                repeat=args.repeat
+            )
+        },
+        "report_review": {
+            "build": measure(
+                func=lambda: create_report_review_keyboard(
+                    category=category.name,
+                    subcategory="Road",
+                    latitude=35.1264,
+                    longitude=33.4299,
+                    description="A deep pothole in the middle of the lane.",
+                    webapp_url="https://example.com/webapp/map.html"
+                ),
+                number=args.number,
+                repeat=args.repeat
+            )
+        },
+        "registry_build": measure(
+            func=lambda: type(registry)(
+                taxonomy=taxonomy
+            ),
+            number=max(args.number // 100, 1),
+            repeat=args.repeat
+        )
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Inline keyboard construction cost: built per tap vs prebuilt registry"
+    )
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
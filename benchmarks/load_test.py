@@ -0,0 +1,627 @@
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from benchmarks.servers import free_port, percentile
+
+# Spawned children (image pool, bot workers) re-import this module and must
+# see the same fake servers as the parent
+os.environ.setdefault("LOAD_TEST_PORTS", f"{free_port()},{free_port()}")
+TELEGRAM_PORT, OPENAI_PORT = (int(port) for port in os.environ["LOAD_TEST_PORTS"].split(","))
+
+os.environ.setdefault("BOT_TOKEN", "123456:LOADTEST")
+os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+os.environ.setdefault("WEBAPP_URL", "https://example.com/webapp/map.html")
+# Measures capacity, not the rate limits, the pacing of outgoing messages or
+# the OpenAI concurrency limit and circuit breaker
+os.environ.setdefault("THROTTLE_ENABLED", "false")
+os.environ.setdefault("TELEGRAM_SEND_SCHEDULER", "false")
+os.environ.setdefault("OPENAI_LIMITER", "false")
+os.environ.setdefault("REPORT_STORE_PATH", os.path.join(tempfile.gettempdir(), f"load_test_reports_{TELEGRAM_PORT}.sqlite3"))
+os.environ["TELEGRAM_API_URL"] = f"http://127.0.0.1:{TELEGRAM_PORT}"
+os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{OPENAI_PORT}/v1"
+
+import aiohttp
+from PIL import Image
+
+from src.models.taxonomy import get_taxonomy
+from src.config.settings import ShardingConfig
+from src.services.bot_service import BotService
+from src.services.sharding import ShardedBotService
+from benchmarks.fakes import FakeOpenAIServer, FakeTelegramServer, LatencyModel
+from benchmarks.servers import git_commit, start_async, start_flask
+
+
+ANALYSIS_RESULT = {
+    "category": "Damage",
+    "subcategory": "Road",
+    "description": "A deep pothole in the middle of the lane."
+}
+
+
+class StepFailed(Exception):
+    pass
+
+
+@dataclass
+class LoadResults:
+    steps: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    flows_completed: int = 0
+    flows_failed: int = 0
+    
+    def record(
+        self,
+        step: str,
+        duration: float
+    ) -> None:
+        self.steps.setdefault(step, []).append(duration)
+    
+    def fail(
+        self,
+        step: str
+    ) -> None:
+        self.errors[step] = self.errors.get(step, 0) + 1
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        names = list(self.steps) + [name for name in self.errors if name not in self.steps]
+        
+        return {
+            name: {
+                "count": len(self.steps.get(name, [])),
+                "errors": self.errors.get(name, 0),
+                **latency_summary(self.steps.get(name, []))
+            }
+            for name in names
+        }
+
+
+def latency_summary(
+    values: List[float]
+) -> Dict[str, float]:
+    if not values:
+        return {}
+    
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2)
+    }
+
+
+async def sample_loop_lag(
+    samples: List[float],
+    interval: float,
+    stop: threading.Event
+) -> None:
+    loop = asyncio.get_running_loop()
+    
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - started - interval))
+
+
+def make_photo(
+    rng: random.Random,
+    width: int,
+    height: int
+) -> bytes:
+    image = Image.new(
+        mode="RGB",
+        size=(width, height),
+        color=(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+    )
+    image.paste(
+        Image.effect_noise(size=(width // 4, height // 4), sigma=48).convert("RGB"),
+        box=(rng.randrange(width // 2), rng.randrange(height // 2))
+    )
+    
+    output = io.BytesIO()
+    image.save(
+        output,
+        format="JPEG",
+        quality=85
+    )
+    
+    return output.getvalue()
+
+
+class SimulatedUser:
+    
+    def __init__(
+        self,
+        user_id: int,
+        telegram: FakeTelegramServer,
+        session: aiohttp.ClientSession,
+        webapp_url: str,
+        results: LoadResults,
+        args: argparse.Namespace,
+        rng: random.Random
+    ):
+        self.user_id = user_id
+        self.telegram = telegram
+        self.session = session
+        self.webapp_url = webapp_url
+        self.results = results
+        self.args = args
+        self.rng = rng
+        self.latitude = round(35.1 + rng.random() / 10, 6)
+        self.longitude = round(33.3 + rng.random() / 10, 6)
+        self._callback_seq = 0
+        self._last_message: Dict[str, Any] = {}
+    
+    @property
+    def _user(self) -> Dict[str, Any]:
+        return {
+            "id": self.user_id,
+            "is_bot": False,
+            "first_name": "Load",
+            "last_name": str(self.user_id)
+        }
+    
+    def _message(
+        self,
+        **content: Any
+    ) -> Dict[str, Any]:
+        return {
+            "message_id": self.rng.randrange(1, 2 ** 31),
+            "date": int(time.time()),
+            "chat": {
+                "id": self.user_id,
+                "type": "private"
+            },
+            "from": self._user,
+            **content
+        }
+    
+    async def _step(
+        self,
+        name: str,
+        action
+    ) -> Any:
+        started = time.perf_counter()
+        
+        try:
+            result = await action()
+        except Exception as e:
+            self.results.fail(name)
+            raise StepFailed(f"{name}: {type(e).__name__}: {e}") from e
+        
+        self.results.record(name, time.perf_counter() - started)
+        
+        return result
+    
+    async def _wait_message(
+        self,
+        after: int,
+        contains: str = ""
+    ) -> Any:
+        call = await self.telegram.wait_for(
+            chat_id=self.user_id,
+            predicate=lambda c: c.method.startswith("send") and contains in c.params.get("text", ""),
+            after=after,
+            timeout=self.args.step_timeout
+        )
+        self._last_message = call.params
+        
+        return call
+    
+    async def _callback(
+        self,
+        data: str
+    ) -> None:
+        self._callback_seq += 1
+        callback_id = f"{self.user_id}:{self._callback_seq}"
+        mark = self.telegram.mark(self.user_id)
+        
+        self.telegram.push_update({
+            "callback_query": {
+                "id": callback_id,
+                "from": self._user,
+                "chat_instance": str(self.user_id),
+                "data": data,
+                "message": self._message(
+                    text=self._last_message.get("text", "")
+                )
+            }
+        })
+        
+        await self.telegram.wait_for(
+            chat_id=self.user_id,
+            predicate=lambda c: c.method == "answerCallbackQuery" and c.params.get("callback_query_id") == callback_id,
+            after=mark,
+            timeout=self.args.step_timeout
+        )
+    
+    async def _start(self) -> None:
+        mark = self.telegram.mark(self.user_id)
+        self.telegram.push_update({
+            "message": self._message(
+                text="/start",
+                entities=[{"type": "bot_command", "offset": 0, "length": 6}]
+            )
+        })
+        await self._wait_message(
+            after=mark
+        )
+    
+    async def _location(self) -> None:
+        mark = self.telegram.mark(self.user_id)
+        
+        async with self.session.post(
+            f"{self.webapp_url}/location",
+            json={
+                "user_id": self.user_id,
+                "latitude": self.latitude,
+                "longitude": self.longitude
+            }
+        ) as response:
+            await response.read()
+            response.raise_for_status()
+        
+        await self._wait_message(
+            after=mark,
+            contains="Choose media type"
+        )
+    
+    async def _upload_photo(self) -> None:
+        mark = self.telegram.mark(self.user_id)
+        form = aiohttp.FormData()
+        form.add_field("user_id", str(self.user_id))
+        form.add_field("latitude", str(self.latitude))
+        form.add_field("longitude", str(self.longitude))
+        form.add_field(
+            "photo",
+            make_photo(
+                rng=self.rng,
+                width=self.args.photo_width,
+                height=self.args.photo_height
+            ),
+            filename="photo.jpg",
+            content_type="image/jpeg"
+        )
+        
+        started = time.perf_counter()
+        async with self.session.post(f"{self.webapp_url}/upload-photo", data=form) as response:
+            await response.read()
+            response.raise_for_status()
+        self.results.record("upload_accepted", time.perf_counter() - started)
+        
+        await self._wait_message(
+            after=mark,
+            contains="Report Details"
+        )
+    
+    async def _voice_note(self) -> None:
+        mark = self.telegram.mark(self.user_id)
+        file_id = f"voice-{self.user_id}-{self.rng.randrange(2 ** 31)}"
+        
+        self.telegram.push_update({
+            "message": self._message(
+                voice={
+                    "file_id": file_id,
+                    "file_unique_id": file_id,
+                    "duration": 8,
+                    "mime_type": "audio/ogg",
+                    "file_size": len(self.telegram.voice)
+                }
+            )
+        })
+        
+        await self._wait_message(
+            after=mark,
+            contains="Report Details"
+        )
+    
+    async def run_flow(self) -> None:
+        taxonomy = get_taxonomy()
+        category = taxonomy.find_category(ANALYSIS_RESULT["category"])
+        subcategory = category.find_subcategory(ANALYSIS_RESULT["subcategory"])
+        voice = self.rng.random() < self.args.voice_ratio
+        media = "media_audio" if voice else "media_photo"
+        
+        await self._step("start", self._start)
+        await self._step("location", self._location)
+        await self._step(media, lambda: self._callback(f"{media}|{self.latitude}|{self.longitude}"))
+        
+        if voice:
+            await self._step("voice_note", self._voice_note)
+        else:
+            await self._step("upload_photo", self._upload_photo)
+        
+        await self._step("change_category", lambda: self._callback(f"chcat|{self.latitude}|{self.longitude}"))
+        await self._step("select_category", lambda: self._callback(f"cat_{category.id}"))
+        await self._step("select_subcategory", lambda: self._callback(f"subcat_{subcategory.id}"))
+        await self._step("submit_report", lambda: self._callback("submit_report"))
+    
+    async def run(
+        self,
+        iterations: int,
+        start_delay: float
+    ) -> None:
+        await asyncio.sleep(start_delay)
+        
+        for _ in range(iterations):
+            try:
+                await self.run_flow()
+                self.results.flows_completed += 1
+            except StepFailed as e:
+                self.results.flows_failed += 1
+                logging.getLogger(__name__).warning(f"User {self.user_id} flow failed at {e}")
+
+
+class BotRunner:
+    
+    def __init__(
+        self,
+        workers: int
+    ):
+        if workers > 1:
+            self.service = ShardedBotService(
+                token=os.environ["BOT_TOKEN"],
+                config=ShardingConfig(
+                    workers=workers,
+                    base_port=free_port()
+                ),
+                polling_timeout=1
+            )
+        else:
+            self.service = BotService(
+                token=os.environ["BOT_TOKEN"]
+            )
+        self.loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def sharded(self) -> bool:
+        return isinstance(self.service, ShardedBotService)
+    
+    def start(self) -> None:
+        if self.sharded:
+            self.service.build()
+            main = self.service.start()
+        else:
+            bot, dispatcher = self.service.build()
+            main = dispatcher.start_polling(
+                bot,
+                handle_signals=False,
+                polling_timeout=1
+            )
+        
+        def serve() -> None:
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(main)
+            
+            if not self.sharded:
+                self.loop.run_until_complete(self.service.stop())
+        
+        self._thread = threading.Thread(
+            target=serve,
+            name="bot-event-loop",
+            daemon=True
+        )
+        self._thread.start()
+        
+        while self.sharded and not self.service.ready.is_set():
+            if not self._thread.is_alive():
+                raise RuntimeError("Sharded bot failed to start")
+            time.sleep(0.1)
+    
+    def stats(self) -> Optional[Dict[str, Any]]:
+        if not self.sharded:
+            return None
+        
+        return asyncio.run_coroutine_threadsafe(
+            coro=self.service.collect_stats(),
+            loop=self.loop
+        ).result(
+            timeout=10
+        )
+    
+    def stop(self) -> None:
+        stopping = self.service.stop() if self.sharded else self.service.dispatcher.stop_polling()
+        
+        asyncio.run_coroutine_threadsafe(
+            coro=stopping,
+            loop=self.loop
+        ).result(
+            timeout=60
+        )
+        self._thread.join(
+            timeout=10
+        )
+
+
+async def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    
+    telegram = FakeTelegramServer(
+        latency=LatencyModel(
+            mean=args.telegram_latency,
+            jitter=args.telegram_jitter,
+            error_rate=args.telegram_error_rate,
+            rng=random.Random(rng.random())
+        )
+    )
+    openai = FakeOpenAIServer(
+        latency=LatencyModel(
+            mean=args.openai_latency,
+            jitter=args.openai_jitter,
+            error_rate=args.openai_error_rate,
+            rng=random.Random(rng.random())
+        ),
+        transcription_latency=LatencyModel(
+            mean=args.whisper_latency,
+            jitter=args.openai_jitter,
+            error_rate=args.openai_error_rate,
+            rng=random.Random(rng.random())
+        ),
+        analysis=ANALYSIS_RESULT
+    )
+    await telegram.start(port=TELEGRAM_PORT)
+    await openai.start(port=OPENAI_PORT)
+    
+    webapp_port = free_port()
+    stop_sampling = threading.Event()
+    lag_samples: Dict[str, List[float]] = {"harness": [], "bot": [], "webapp": []}
+    
+    if args.webapp_mode == "flask":
+        from webapp_server import background
+        
+        flask_server = start_flask(
+            port=webapp_port,
+            threads=args.flask_threads
+        )
+        webapp_loop = background.loop
+    else:
+        flask_server = None
+        webapp_loop = start_async(
+            port=webapp_port
+        )
+    
+    bot_runner = BotRunner(
+        workers=args.bot_workers
+    )
+    bot_runner.start()
+    
+    samplers = [
+        asyncio.create_task(sample_loop_lag(lag_samples["harness"], args.lag_interval, stop_sampling)),
+        asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+            sample_loop_lag(lag_samples["bot"], args.lag_interval, stop_sampling),
+            bot_runner.loop
+        )),
+        asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+            sample_loop_lag(lag_samples["webapp"], args.lag_interval, stop_sampling),
+            webapp_loop
+        ))
+    ]
+    
+    results = LoadResults()
+    connector = aiohttp.TCPConnector(
+        limit=args.users
+    )
+    
+    async with aiohttp.ClientSession(connector=connector) as session:
+        users = [
+            SimulatedUser(
+                user_id=100000 + index,
+                telegram=telegram,
+                session=session,
+                webapp_url=f"http://127.0.0.1:{webapp_port}",
+                results=results,
+                args=args,
+                rng=random.Random(rng.random())
+            )
+            for index in range(args.users)
+        ]
+        
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                user.run(
+                    iterations=args.iterations,
+                    start_delay=args.ramp_up * index / args.users
+                )
+                for index, user in enumerate(users)
+            )
+        )
+        wall = time.perf_counter() - started
+        
+        async with session.get(f"http://127.0.0.1:{webapp_port}/stats") as response:
+            webapp_stats = await response.json()
+    
+    stop_sampling.set()
+    await asyncio.gather(*samplers, return_exceptions=True)
+    
+    bot_stats = bot_runner.stats()
+    bot_runner.stop()
+    
+    if flask_server:
+        flask_server.shutdown()
+        background.stop()
+    else:
+        webapp_loop.call_soon_threadsafe(webapp_loop.stop)
+    
+    await telegram.close()
+    await openai.close()
+    
+    steps_total = sum(len(values) for values in results.steps.values())
+    
+    return {
+        "benchmark": "load_test",
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "params": vars(args),
+        "wall_seconds": round(wall, 3),
+        "flows_completed": results.flows_completed,
+        "flows_failed": results.flows_failed,
+        "reports_per_minute": round(results.flows_completed / wall * 60, 2),
+        "steps_per_second": round(steps_total / wall, 2),
+        "steps": results.summary(),
+        "event_loop_lag": {
+            name: latency_summary(samples)
+            for name, samples in lag_samples.items()
+        },
+        "upstream": {
+            "telegram_calls": telegram.calls_by_method,
+            "telegram_injected_errors": telegram.injected_errors,
+            "openai_requests": openai.requests,
+            "openai_injected_errors": openai.injected_errors
+        },
+        "webapp": webapp_stats,
+        "bot": bot_stats
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="End-to-end report flow against BotService and the web app with fake Telegram/OpenAI servers"
+    )
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--ramp-up", type=float, default=2.0)
+    parser.add_argument("--voice-ratio", type=float, default=0.3)
+    parser.add_argument("--webapp-mode", choices=("flask", "async"), default="async")
+    parser.add_argument("--flask-threads", type=int, default=8)
+    parser.add_argument("--bot-workers", type=int, default=1)
+    parser.add_argument("--telegram-latency", type=float, default=0.03)
+    parser.add_argument("--telegram-jitter", type=float, default=0.01)
+    parser.add_argument("--telegram-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-latency", type=float, default=1.5)
+    parser.add_argument("--openai-jitter", type=float, default=0.3)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--whisper-latency", type=float, default=1.0)
+    parser.add_argument("--photo-width", type=int, default=1600)
+    parser.add_argument("--photo-height", type=int, default=1200)
+    parser.add_argument("--step-timeout", type=float, default=30.0)
+    parser.add_argument("--lag-interval", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    report = asyncio.run(run(args=args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
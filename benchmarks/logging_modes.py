@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.config.settings import LoggingConfig
+from src.bot.middleware import logging as logging_middleware_module
+from src.bot.middleware.logging import LoggingMiddleware
+from src.bot.utils.logger import BackgroundQueueHandler, Sampler, create_stream_handler
+from benchmarks.hot_paths import callback_query, _noop_handler
+from benchmarks.servers import git_commit, percentile
+
+
+MODES = {
+    "sync_text": LoggingConfig(format="text"),
+    "sync_json": LoggingConfig(format="json"),
+    "queue_json": LoggingConfig(format="json", queue=True),
+    "queue_json_sampled": LoggingConfig(format="json", queue=True, sample_rates={"src.bot.middleware.logging": 0.1})
+}
+
+
+class SlowSink(io.TextIOBase):
+    # Stands in for a stdout pipe whose reader (a terminal, a log shipper)
+    # is slower than the bot; each write blocks for `latency` seconds.
+    
+    def __init__(
+        self,
+        latency: float
+    ):
+        self.latency = latency
+    
+    def write(
+        self,
+        text: str
+    ) -> int:
+        time.sleep(self.latency)
+        return len(text)
+
+
+async def run_mode(
+    config: LoggingConfig,
+    sink: Any,
+    updates: int,
+    gap: float
+) -> Dict[str, Any]:
+    logger = logging_middleware_module.logger
+    handler = create_stream_handler(
+        config=config,
+        stream=sink
+    )
+    listener = None
+    
+    # Same wiring as setup_logger, on the middleware's own logger, without
+    # the process-wide queue so every mode gets a fresh one
+    if config.queue:
+        queue_handler = BackgroundQueueHandler(
+            records=queue.Queue(maxsize=config.queue_size)
+        )
+        listener = logging.handlers.QueueListener(queue_handler.queue, handler)
+        listener.start()
+        handler = queue_handler
+    
+    logger.handlers = [handler]
+    logger.sampler = Sampler(rate=config.sample_rates["src.bot.middleware.logging"]) if config.sample_rates else None
+    
+    middleware = LoggingMiddleware()
+    event = callback_query(
+        data="chcat|35.1264|33.4299"
+    )
+    durations: List[float] = []
+    
+    try:
+        for _ in range(updates):
+            started = time.perf_counter()
+            await middleware(_noop_handler, event, {})
+            durations.append(time.perf_counter() - started)
+            
+            # Idle time between updates, when a listener thread can write
+            await asyncio.sleep(gap)
+    finally:
+        if listener:
+            listener.stop()
+    
+    return {
+        "mean_us": round(sum(durations) / len(durations) * 1_000_000, 1),
+        "p50_us": round(percentile(durations, 50) * 1_000_000, 1),
+        "p99_us": round(percentile(durations, 99) * 1_000_000, 1),
+        "dropped": handler.dropped if isinstance(handler, BackgroundQueueHandler) else 0
+    }
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    sinks = {
+        "devnull": lambda: open(os.devnull, "w"),
+        "slow_pipe": lambda: SlowSink(latency=args.sink_latency_us / 1_000_000)
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    
+    for sink_name, make_sink in sinks.items():
+        results[sink_name] = {
+            mode: asyncio.run(
+                run_mode(
+                    config=config,
+                    sink=make_sink(),
+                    updates=args.updates,
+                    gap=args.gap_us / 1_000_000
+                )
+            )
+            for mode, config in MODES.items()
+        }
+    
+    return {
+        "benchmark": "logging_modes",
+        "commit": git_commit(),
+        "params": vars(args),
+        "per_update_logging": results
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-update latency of LoggingMiddleware with synchronous, queued and sampled logging"
+    )
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--gap-us", type=float, default=500.0)
+    parser.add_argument("--sink-latency-us", type=float, default=200.0)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.config.settings import OpenAIConfig
+from src.services.ai_vision_service import AIVisionService
+from benchmarks.fakes import FakeOpenAIServer, LatencyModel
+from benchmarks.servers import free_port, git_commit, percentile
+
+
+ANALYSIS_RESULT = {
+    "category": "Damage",
+    "subcategory": "Road",
+    "description": "Benchmark pothole"
+}
+
+PHASES = ("healthy", "brownout", "recovered")
+
+
+async def run_mode(
+    guarded: bool,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    # Photos arrive at a steady rate while OpenAI is healthy, then hangs for
+    # --brownout-latency-s per request, then recovers
+    openai = FakeOpenAIServer(
+        latency=LatencyModel(mean=args.latency_ms / 1000),
+        transcription_latency=LatencyModel(),
+        analysis=ANALYSIS_RESULT
+    )
+    await openai.start(port=free_port())
+    service = AIVisionService(
+        config=OpenAIConfig(
+            api_key=os.environ["OPENAI_API_KEY"],
+            base_url=f"{openai.url}/v1",
+            limiter=guarded,
+            deadline=args.deadline_s if guarded else 0.0,
+            slow_call=args.deadline_s / 2,
+            breaker_window=args.phase_s / 2,
+            breaker_cooldown=args.phase_s / 4
+        )
+    )
+    results: Dict[str, List[Tuple[float, bool]]] = {phase: [] for phase in PHASES}
+    
+    async def analyze(
+        phase: str
+    ) -> None:
+        started = time.perf_counter()
+        result = await service.analyze_problem_photo(
+            photo_url="data:image/jpeg;base64,AAAA"
+        )
+        results[phase].append((time.perf_counter() - started, result["category"] == "Damage"))
+    
+    tasks: List[asyncio.Task] = []
+    started = time.perf_counter()
+    
+    try:
+        for phase in PHASES:
+            openai.latency.mean = args.brownout_latency_s if phase == "brownout" else args.latency_ms / 1000
+            
+            for _ in range(int(args.phase_s * args.arrival_rate)):
+                tasks.append(asyncio.create_task(analyze(phase=phase)))
+                await asyncio.sleep(1 / args.arrival_rate)
+        
+        await asyncio.gather(*tasks)
+    finally:
+        await service.close()
+        await openai.close()
+    
+    report: Dict[str, Any] = {
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "openai_peak_in_flight": openai.peak_in_flight,
+        "guard": service.guard.to_dict()
+    }
+    
+    for phase, outcomes in results.items():
+        durations = [duration for duration, _ in outcomes]
+        report[phase] = {
+            "requests": len(outcomes),
+            "analyzed": sum(1 for _, analyzed in outcomes if analyzed),
+            "answer_p50_s": round(percentile(durations, 50), 3),
+            "answer_p99_s": round(percentile(durations, 99), 3)
+        }
+    
+    return report
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    return {
+        "benchmark": "openai_overload",
+        "commit": git_commit(),
+        "params": vars(args),
+        "unguarded": asyncio.run(run_mode(guarded=False, args=args)),
+        "guarded": asyncio.run(run_mode(guarded=True, args=args))
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time to answer a photo while OpenAI browns out, with and without the limiter and breaker"
+    )
+    parser.add_argument("--arrival-rate", type=float, default=20.0)
+    parser.add_argument("--phase-s", type=float, default=8.0)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--brownout-latency-s", type=float, default=20.0)
+    parser.add_argument("--deadline-s", type=float, default=4.0)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    # Every fallback logs a traceback or a warning
+    logging.getLogger("src.services.ai_vision_service").setLevel(logging.CRITICAL)
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
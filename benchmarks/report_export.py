@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("WEBAPP_EXPORT_TOKEN", "benchmark")
+
+import aiohttp
+from aiohttp import web
+
+from src.config.settings import settings, ReportStoreConfig
+from src.services.report_repository import ReportRepository
+from src.webapp.app import CONTEXT_KEY, handle_report_export
+from src.webapp.context import WebAppContext
+from src.webapp.export import export_chunks, parse_export_query
+from benchmarks.servers import free_port, git_commit
+
+
+CATEGORIES = ["Damage", "Waste", "Lighting", "Traffic", "Greenery"]
+
+
+def rss_mb() -> float:
+    # Current resident set size (Linux); sampled per chunk to catch growth
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1_000_000
+
+
+def synthetic_rows(
+    count: int,
+    seed: int,
+    chunk_size: int = 50000
+) -> Iterator[List[Tuple[Any, ...]]]:
+    generator = random.Random(seed)
+    started = time.time() - 90 * 86400
+    
+    for offset in range(0, count, chunk_size):
+        yield [
+            (
+                1000 + generator.randrange(20000),
+                35.0 + generator.random() * 0.3,
+                33.0 + generator.random() * 0.6,
+                CATEGORIES[index % len(CATEGORIES)],
+                "Road",
+                "A deep pothole in the middle of the lane, about half a metre wide.",
+                f"AgACAgQAAxkBAAI{index:010d}",
+                None,
+                started + index * 90 * 86400 / count,
+                None
+            )
+            for index in range(offset, min(offset + chunk_size, count))
+        ]
+
+
+async def run_generator(
+    repository: ReportRepository,
+    params: Dict[str, str]
+) -> Dict[str, Any]:
+    query = parse_export_query(
+        params=params
+    )
+    rss_before = rss_mb()
+    rss_peak = rss_before
+    started = time.perf_counter()
+    size = 0
+    chunks = 0
+    
+    async for chunk in export_chunks(repository=repository, query=query):
+        size += len(chunk)
+        chunks += 1
+        rss_peak = max(rss_peak, rss_mb())
+    
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "seconds": round(elapsed, 2),
+        "megabytes": round(size / 1_000_000, 1),
+        "chunks": chunks,
+        "rss_growth_mb": round(rss_peak - rss_before, 1)
+    }
+
+
+async def run_http(
+    url: str,
+    params: Dict[str, str],
+    gzip: bool,
+    rows: int
+) -> Dict[str, Any]:
+    headers = {
+        "Authorization": f"Bearer {settings.webapp.export_token}",
+        "Accept-Encoding": "gzip" if gzip else "identity"
+    }
+    rss_before = rss_mb()
+    rss_peak = rss_before
+    
+    async with aiohttp.ClientSession(auto_decompress=False) as session:
+        started = time.perf_counter()
+        
+        async with session.get(url, params=params, headers=headers) as response:
+            response.raise_for_status()
+            first_byte = None
+            size = 0
+            
+            async for chunk in response.content.iter_any():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                size += len(chunk)
+                rss_peak = max(rss_peak, rss_mb())
+        
+        elapsed = time.perf_counter() - started
+    
+    return {
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed),
+        "first_byte_ms": round(first_byte * 1000, 1),
+        "wire_megabytes": round(size / 1_000_000, 1),
+        "content_encoding": response.headers.get("Content-Encoding", "identity"),
+        "rss_growth_mb": round(rss_peak - rss_before, 1)
+    }
+
+
+async def run_async(
+    args: argparse.Namespace,
+    directory: str
+) -> Dict[str, Any]:
+    repository = ReportRepository(
+        config=ReportStoreConfig(
+            path=os.path.join(directory, "reports.sqlite3")
+        )
+    )
+    
+    # Seeded straight through the batch insert, bypassing the add() queue
+    seed_started = time.perf_counter()
+    for rows in synthetic_rows(count=args.reports, seed=args.seed):
+        await asyncio.to_thread(repository._insert, rows)
+    seed_seconds = time.perf_counter() - seed_started
+    
+    context = WebAppContext()
+    context.report_repository = repository
+    app = web.Application()
+    app[CONTEXT_KEY] = context
+    app.router.add_get(
+        path="/reports/export",
+        handler=handle_report_export
+    )
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(
+        runner=runner,
+        host="127.0.0.1",
+        port=port
+    ).start()
+    url = f"http://127.0.0.1:{port}/reports/export"
+    
+    try:
+        result: Dict[str, Any] = {
+            "seed_seconds": round(seed_seconds, 2),
+            "rss_after_seed_mb": round(rss_mb(), 1),
+            "generator": {},
+            "http": {}
+        }
+        
+        for export_format in ("ndjson", "csv"):
+            generated = await run_generator(
+                repository=repository,
+                params={"format": export_format}
+            )
+            generated["rows_per_second"] = round(args.reports / generated["seconds"])
+            result["generator"][export_format] = generated
+            
+            for gzip in (False, True):
+                result["http"][f"{export_format}{'_gzip' if gzip else ''}"] = await run_http(
+                    url=url,
+                    params={"format": export_format},
+                    gzip=gzip,
+                    rows=args.reports
+                )
+        
+        result["generator"]["filtered_ndjson"] = await run_generator(
+            repository=repository,
+            params={"category": "Waste", "bbox": "35.0,33.0,35.1,33.2"}
+        )
+    finally:
+        await runner.cleanup()
+        await repository.close()
+    
+    return result
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        return {
+            "benchmark": "report_export",
+            "commit": git_commit(),
+            "params": vars(args),
+            "page_size": settings.webapp.export_page_size,
+            "gzip_level": settings.webapp.export_gzip_level,
+            **asyncio.run(
+                run_async(
+                    args=args,
+                    directory=directory
+                )
+            )
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stream a synthetic report store out as NDJSON and CSV, with and without gzip"
+    )
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.config.settings import ReportStoreConfig
+from src.models.report import Report
+from src.services.report_repository import ReportRepository
+from benchmarks.servers import git_commit, percentile
+
+
+CATEGORIES = ["Damage", "Waste", "Lighting", "Traffic", "Greenery"]
+
+
+def make_report(
+    index: int
+) -> Report:
+    return Report(
+        user_id=1000 + index % 500,
+        latitude=35.126412 + random.random() / 100,
+        longitude=33.429954 + random.random() / 100,
+        category=CATEGORIES[index % len(CATEGORIES)],
+        subcategory="Road",
+        description="A deep pothole in the middle of the lane.",
+        photo_file_id=f"photo-{index}"
+    )
+
+
+async def run_rate(
+    repository: ReportRepository,
+    rate: float,
+    seconds: float
+) -> Dict[str, Any]:
+    # Open loop: report i is due at start + i / rate whether or not earlier
+    # ones have committed, and its latency counts from when it was due.
+    total = int(rate * seconds)
+    latencies: List[float] = []
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    
+    async def submit(
+        index: int
+    ) -> None:
+        due = started + index / rate
+        await asyncio.sleep(max(0.0, due - loop.time()))
+        await repository.add(
+            report=make_report(index)
+        )
+        latencies.append(loop.time() - due)
+    
+    await asyncio.gather(*(submit(index) for index in range(total)))
+    elapsed = loop.time() - started
+    
+    return {
+        "reports": total,
+        "seconds": round(elapsed, 3),
+        "reports_per_second": round(total / elapsed, 1),
+        "commit_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "commit_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "commit_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "commit_max_ms": round(max(latencies) * 1000, 2)
+    }
+
+
+async def run_burst(
+    repository: ReportRepository,
+    count: int
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    await asyncio.gather(*(repository.add(report=make_report(index)) for index in range(count)))
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "reports": count,
+        "seconds": round(elapsed, 3),
+        "reports_per_second": round(count / elapsed, 1)
+    }
+
+
+async def run_bulk_read(
+    repository: ReportRepository
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    read = 0
+    
+    async for reports in repository.iter_reports(batch_size=1000):
+        read += len(reports)
+    
+    elapsed = time.perf_counter() - started
+    
+    by_user_started = time.perf_counter()
+    await repository.list_reports(
+        user_id=1000
+    )
+    by_user_elapsed = time.perf_counter() - by_user_started
+    
+    return {
+        "reports": read,
+        "seconds": round(elapsed, 3),
+        "reports_per_second": round(read / elapsed, 1) if elapsed else 0.0,
+        "list_by_user_ms": round(by_user_elapsed * 1000, 2)
+    }
+
+
+async def run_store(
+    config: ReportStoreConfig,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    repository = ReportRepository(
+        config=config
+    )
+    
+    try:
+        result = {
+            "rate": await run_rate(
+                repository=repository,
+                rate=args.rate,
+                seconds=args.seconds
+            ),
+            "burst": await run_burst(
+                repository=repository,
+                count=args.burst
+            ),
+            "bulk_read": await run_bulk_read(
+                repository=repository
+            )
+        }
+    finally:
+        await repository.close()
+    
+    result["store"] = repository.stats.to_dict()
+    
+    return result
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {
+            "batched": ReportStoreConfig(
+                path=os.path.join(directory, "batched.sqlite3"),
+                batch_interval=args.batch_interval,
+                max_batch=args.max_batch
+            ),
+            "one_per_commit": ReportStoreConfig(
+                path=os.path.join(directory, "one_per_commit.sqlite3"),
+                batch_interval=0.0,
+                max_batch=1
+            )
+        }
+        
+        return {
+            "benchmark": "report_store",
+            "commit": git_commit(),
+            "params": vars(args),
+            "stores": {
+                name: asyncio.run(
+                    run_store(
+                        config=config,
+                        args=args
+                    )
+                )
+                for name, config in stores.items()
+            }
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Report store insert throughput and commit latency at a fixed arrival rate"
+    )
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--burst", type=int, default=10000)
+    parser.add_argument("--batch-interval", type=float, default=0.005)
+    parser.add_argument("--max-batch", type=int, default=500)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from src.config.settings import TelegramClientConfig
+from src.services.telegram_session import create_pooled_bot
+from benchmarks.fakes import FakeTelegramServer, FloodLimits, LatencyModel
+from benchmarks.servers import free_port, git_commit, percentile
+
+
+async def run_mode(
+    scheduler: bool,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    # A peak of users each getting the upload path's back-to-back replies,
+    # against a fake Telegram that enforces flood limits with 429s
+    telegram = FakeTelegramServer(
+        latency=LatencyModel(mean=args.latency_ms / 1000),
+        flood_limits=FloodLimits()
+    )
+    await telegram.start(port=free_port())
+    bot = create_pooled_bot(
+        token=os.environ["BOT_TOKEN"],
+        config=TelegramClientConfig(
+            api_base_url=telegram.url,
+            send_scheduler=scheduler
+        )
+    )
+    
+    async def user_flow(
+        chat_id: int
+    ) -> Tuple[int, float]:
+        started = time.perf_counter()
+        delivered = 0
+        
+        for index in range(args.messages_per_user):
+            try:
+                await bot.send_message(
+                    chat_id=chat_id,
+                    text=f"Message {index}"
+                )
+                delivered += 1
+            except TelegramRetryAfter:
+                pass
+        
+        return delivered, time.perf_counter() - started
+    
+    started = time.perf_counter()
+    tasks: List[asyncio.Task] = []
+    
+    try:
+        for chat_id in range(1, args.users + 1):
+            tasks.append(asyncio.create_task(user_flow(chat_id=chat_id)))
+            await asyncio.sleep(1 / args.arrival_rate)
+        
+        results = await asyncio.gather(*tasks)
+    finally:
+        await bot.session.close()
+        await telegram.close()
+    
+    sent = args.users * args.messages_per_user
+    delivered = sum(count for count, _ in results)
+    durations = [duration for _, duration in results]
+    
+    return {
+        "messages": sent,
+        "delivered": delivered,
+        "lost": sent - delivered,
+        "telegram_429s": telegram.flood_rejections,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "user_flow_p50_s": round(percentile(durations, 50), 2),
+        "user_flow_p99_s": round(percentile(durations, 99), 2),
+        "scheduler": bot.session.scheduler.stats.to_dict() if bot.session.scheduler else {}
+    }
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    return {
+        "benchmark": "send_scheduler",
+        "commit": git_commit(),
+        "params": vars(args),
+        "unscheduled": asyncio.run(run_mode(scheduler=False, args=args)),
+        "scheduled": asyncio.run(run_mode(scheduler=True, args=args))
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Messages lost to Telegram flood limits with and without the send scheduler"
+    )
+    parser.add_argument("--users", type=int, default=150)
+    parser.add_argument("--arrival-rate", type=float, default=30.0)
+    parser.add_argument("--messages-per-user", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    # The scheduled run logs every 429 it retries
+    logging.getLogger("src.services.telegram_session").setLevel(logging.ERROR)
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import asyncio
+import socket
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from aiohttp import web
+from werkzeug.serving import BaseWSGIServer
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    
+    def __init__(
+        self,
+        threads: int,
+        host: str,
+        port: int,
+        app
+    ):
+        super().__init__(
+            host=host,
+            port=port,
+            app=app
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads
+        )
+    
+    def process_request(
+        self,
+        request,
+        client_address
+    ) -> None:
+        self.executor.submit(
+            self._process,
+            request,
+            client_address
+        )
+    
+    def _process(
+        self,
+        request,
+        client_address
+    ) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def percentile(
+    values: List[float],
+    pct: float
+) -> float:
+    ordered = sorted(values)
+    index = min(
+        len(ordered) - 1,
+        int(round(pct / 100 * (len(ordered) - 1)))
+    )
+    
+    return ordered[index]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        
+        return sock.getsockname()[1]
+
+
+def start_flask(
+    port: int,
+    threads: int
+) -> PooledWSGIServer:
+    from webapp_server import app
+    
+    server = PooledWSGIServer(
+        threads=threads,
+        host="127.0.0.1",
+        port=port,
+        app=app
+    )
+    threading.Thread(
+        target=server.serve_forever,
+        daemon=True
+    ).start()
+    
+    return server
+
+
+def start_async(
+    port: int
+) -> asyncio.AbstractEventLoop:
+    from src.webapp.app import create_app
+    
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    
+    def serve() -> None:
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(create_app())
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(
+            runner=runner,
+            host="127.0.0.1",
+            port=port
+        )
+        loop.run_until_complete(site.start())
+        ready.set()
+        loop.run_forever()
+        loop.run_until_complete(runner.cleanup())
+    
+    threading.Thread(
+        target=serve,
+        daemon=True
+    ).start()
+    ready.wait()
+    
+    return loop
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
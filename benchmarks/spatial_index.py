@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import numpy as np
+
+from src.models.report import Report
+from src.models.taxonomy import get_taxonomy
+from src.services.spatial_index import SpatialIndex, haversine_meters, EARTH_RADIUS_METERS
+from benchmarks.servers import git_commit, percentile
+
+
+# Reports cluster around a few hot spots in a city-sized area
+CENTER = (35.1856, 33.3823)
+SPREAD_DEGREES = 0.05
+
+
+def make_reports(
+    count: int,
+    hot_spots: int,
+    seed: int
+) -> List[Report]:
+    generator = random.Random(seed)
+    pairs = [
+        (category.name, subcategory.name)
+        for category in get_taxonomy().categories
+        for subcategory in category.subcategories
+    ]
+    spots = [
+        (
+            CENTER[0] + generator.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            CENTER[1] + generator.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            generator.choice(pairs)
+        )
+        for _ in range(hot_spots)
+    ]
+    reports = []
+    
+    for index in range(count):
+        latitude, longitude, (category, subcategory) = generator.choice(spots)
+        reports.append(
+            Report(
+                report_id=index + 1,
+                user_id=index % 1000,
+                latitude=latitude + generator.gauss(0, 0.0005),
+                longitude=longitude + generator.gauss(0, 0.0005),
+                category=category,
+                subcategory=subcategory,
+                description="",
+                created_at=time.time() - generator.uniform(0, 30 * 86400)
+            )
+        )
+    
+    return reports
+
+
+def python_haversine(
+    latitude: float,
+    longitude: float,
+    other_latitude: float,
+    other_longitude: float
+) -> float:
+    half_dlat = math.radians(other_latitude - latitude) / 2
+    half_dlon = math.radians(other_longitude - longitude) / 2
+    a = math.sin(half_dlat) ** 2 + math.cos(math.radians(latitude)) * math.cos(math.radians(other_latitude)) * math.sin(half_dlon) ** 2
+    
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def time_queries(
+    query: Callable[[Report], int],
+    probes: List[Report]
+) -> Dict[str, Any]:
+    durations = []
+    found = 0
+    
+    for probe in probes:
+        started = time.perf_counter()
+        found += query(probe)
+        durations.append(time.perf_counter() - started)
+    
+    return {
+        "queries": len(probes),
+        "found_per_query": round(found / len(probes), 2),
+        "p50_us": round(percentile(durations, 50) * 1_000_000, 1),
+        "p99_us": round(percentile(durations, 99) * 1_000_000, 1),
+        "max_us": round(max(durations) * 1_000_000, 1)
+    }
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    reports = make_reports(
+        count=args.reports,
+        hot_spots=args.hot_spots,
+        seed=args.seed
+    )
+    probes = random.Random(args.seed + 1).sample(reports, args.queries)
+    
+    index = SpatialIndex()
+    started = time.perf_counter()
+    index.extend(reports)
+    build_seconds = time.perf_counter() - started
+    
+    latitudes = np.array([report.latitude for report in reports])
+    longitudes = np.array([report.longitude for report in reports])
+    categories = np.array([f"{report.category}/{report.subcategory}" for report in reports])
+    
+    def indexed(probe: Report) -> int:
+        return len(
+            index.nearby(
+                latitude=probe.latitude,
+                longitude=probe.longitude,
+                radius=args.radius,
+                category=probe.category,
+                subcategory=probe.subcategory,
+                limit=len(reports)
+            )
+        )
+    
+    def vectorized_scan(probe: Report) -> int:
+        distances = haversine_meters(
+            latitude=probe.latitude,
+            longitude=probe.longitude,
+            latitudes=latitudes,
+            longitudes=longitudes
+        )
+        mask = (distances <= args.radius) & (categories == f"{probe.category}/{probe.subcategory}")
+        
+        return int(mask.sum())
+    
+    def python_scan(probe: Report) -> int:
+        return sum(
+            1
+            for report in reports
+            if report.category == probe.category
+            and report.subcategory == probe.subcategory
+            and python_haversine(probe.latitude, probe.longitude, report.latitude, report.longitude) <= args.radius
+        )
+    
+    return {
+        "benchmark": "spatial_index",
+        "commit": git_commit(),
+        "params": vars(args),
+        "index_build_seconds": round(build_seconds, 3),
+        "strategies": {
+            "grid_index": time_queries(indexed, probes),
+            "vectorized_scan": time_queries(vectorized_scan, probes),
+            "python_scan": time_queries(python_scan, probes[:args.python_queries])
+        }
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Nearby same-category report lookups: grid index vs full scans"
+    )
+    parser.add_argument("--reports", type=int, default=100000)
+    parser.add_argument("--hot-spots", type=int, default=2000)
+    parser.add_argument("--radius", type=float, default=75.0)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--python-queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.config.settings import OpenAIConfig
+from src.services.ai_vision_service import AIVisionService
+from benchmarks.fakes import FakeOpenAIServer, LatencyModel
+from benchmarks.servers import free_port, git_commit, percentile
+
+
+ANALYSIS_RESULT = {
+    "category": "Damage",
+    "subcategory": "Road",
+    "description": "Benchmark pothole"
+}
+
+
+async def run_mode(
+    hedge: bool,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    # Photos arrive at a steady rate; most vision calls take --latency-ms,
+    # --tail-rate of them take --tail-s
+    openai = FakeOpenAIServer(
+        latency=LatencyModel(
+            mean=args.latency_ms / 1000,
+            jitter=args.latency_ms / 4000,
+            tail_rate=args.tail_rate,
+            tail=args.tail_s,
+            rng=random.Random(args.seed)
+        ),
+        transcription_latency=LatencyModel(),
+        analysis=ANALYSIS_RESULT
+    )
+    await openai.start(port=free_port())
+    service = AIVisionService(
+        config=OpenAIConfig(
+            api_key=os.environ["OPENAI_API_KEY"],
+            base_url=f"{openai.url}/v1",
+            hedge=hedge,
+            hedge_percentile=args.percentile,
+            hedge_budget=args.budget
+        )
+    )
+    durations: List[float] = []
+    
+    async def analyze() -> None:
+        started = time.perf_counter()
+        await service.analyze_problem_photo(
+            photo_url="data:image/jpeg;base64,AAAA"
+        )
+        durations.append(time.perf_counter() - started)
+    
+    tasks: List[asyncio.Task] = []
+    
+    try:
+        for _ in range(args.requests):
+            tasks.append(asyncio.create_task(analyze()))
+            await asyncio.sleep(1 / args.arrival_rate)
+        
+        await asyncio.gather(*tasks)
+    finally:
+        await service.close()
+        await openai.close()
+    
+    return {
+        "p50_s": round(percentile(durations, 50), 3),
+        "p90_s": round(percentile(durations, 90), 3),
+        "p99_s": round(percentile(durations, 99), 3),
+        "max_s": round(max(durations), 3),
+        "openai_requests": openai.requests.get("chat", 0),
+        "hedging": service.hedger.stats.to_dict() if hedge else {}
+    }
+
+
+def run(
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    return {
+        "benchmark": "vision_hedging",
+        "commit": git_commit(),
+        "params": vars(args),
+        "single": asyncio.run(run_mode(hedge=False, args=args)),
+        "hedged": asyncio.run(run_mode(hedge=True, args=args))
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Vision analysis tail latency with and without hedged requests"
+    )
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--arrival-rate", type=float, default=30.0)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--tail-s", type=float, default=3.0)
+    parser.add_argument("--percentile", type=float, default=95.0)
+    parser.add_argument("--budget", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    report = run(args=args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from typing import Dict, List
+from unittest.mock import patch
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("WEBAPP_UPLOAD_WORKERS", "200")
+os.environ.setdefault("WEBAPP_UPLOAD_QUEUE_SIZE", "2000")
+# Measures capacity, not the rate limits or the pacing of outgoing messages
+os.environ.setdefault("THROTTLE_ENABLED", "false")
+os.environ.setdefault("TELEGRAM_SEND_SCHEDULER", "false")
+
+import aiohttp
+from aiogram import Bot
+
+from src.services.ai_vision_service import AIVisionService
+from benchmarks.servers import percentile, start_async, start_flask
+
+
+ANALYSIS_RESULT = {
+    "category": "Damage",
+    "subcategory": "Road",
+    "description": "Benchmark pothole"
+}
+
+
+async def _wait_for_drain(
+    session: aiohttp.ClientSession,
+    stats_url: str
+) -> None:
+    while True:
+        async with session.get(stats_url) as response:
+            queue = (await response.json())["upload_queue"]
+        if queue["depth"] == 0 and queue["busy_workers"] == 0:
+            return
+        await asyncio.sleep(0.02)
+
+
+async def _drive(
+    url: str,
+    stats_url: str,
+    requests_total: int,
+    concurrency: int,
+    payload: Dict
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        force_close=True
+    )
+    
+    async with aiohttp.ClientSession(connector=connector) as session:
+        
+        async def one() -> None:
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                async with session.post(url, json=payload) as response:
+                    await response.read()
+                    if response.status >= 400:
+                        failures += 1
+                latencies.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests_total)))
+        wall = time.perf_counter() - started
+        await _wait_for_drain(
+            session=session,
+            stats_url=stats_url
+        )
+        drained = time.perf_counter() - started
+    
+    return {
+        "requests": requests_total,
+        "failures": failures,
+        "wall_seconds": round(drained, 3),
+        "accept_rps": round(requests_total / wall, 2),
+        "processed_rps": round(requests_total / drained, 2),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Concurrent /upload-photo requests per worker: Flask vs async mode"
+    )
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--flask-threads", type=int, default=8)
+    parser.add_argument("--ai-latency", type=float, default=0.5)
+    parser.add_argument("--telegram-latency", type=float, default=0.05)
+    parser.add_argument("--photo-kb", type=int, default=64)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    in_flight = {"current": 0, "peak": 0}
+    in_flight_lock = threading.Lock()
+    
+    async def fake_analysis(
+        self,
+        image: bytes,
+        content_type: str = "image/jpeg"
+    ) -> Dict[str, str]:
+        with in_flight_lock:
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+        try:
+            await asyncio.sleep(args.ai_latency)
+        finally:
+            with in_flight_lock:
+                in_flight["current"] -= 1
+        return dict(ANALYSIS_RESULT)
+    
+    async def fake_bot_call(
+        self,
+        method,
+        request_timeout=None
+    ) -> None:
+        await asyncio.sleep(args.telegram_latency)
+    
+    payload = {
+        "user_id": 1,
+        "photo": base64.b64encode(os.urandom(args.photo_kb * 1024)).decode(),
+        "latitude": 35.1,
+        "longitude": 33.3
+    }
+    
+    results: Dict[str, Dict[str, float]] = {}
+    
+    with patch.object(AIVisionService, "analyze_problem_image", fake_analysis), \
+            patch.object(Bot, "__call__", fake_bot_call):
+        flask_server = start_flask(
+            port=18001,
+            threads=args.flask_threads
+        )
+        results["flask"] = asyncio.run(
+            _drive(
+                url="http://127.0.0.1:18001/upload-photo",
+                stats_url="http://127.0.0.1:18001/stats",
+                requests_total=args.requests,
+                concurrency=args.concurrency,
+                payload=payload
+            )
+        )
+        flask_server.shutdown()
+        results["flask"]["peak_requests_in_flight"] = in_flight["peak"]
+        in_flight["peak"] = 0
+        
+        async_loop = start_async(
+            port=18002
+        )
+        results["async"] = asyncio.run(
+            _drive(
+                url="http://127.0.0.1:18002/upload-photo",
+                stats_url="http://127.0.0.1:18002/stats",
+                requests_total=args.requests,
+                concurrency=args.concurrency,
+                payload=payload
+            )
+        )
+        async_loop.call_soon_threadsafe(async_loop.stop)
+        results["async"]["peak_requests_in_flight"] = in_flight["peak"]
+    
+    report = {
+        "benchmark": "webapp_concurrency",
+        "params": vars(args),
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ import signal
 import sys
 
 from src.config.settings import settings
+from src.models.taxonomy import reload_taxonomy
 from src.services.bot_service import BotService
+from src.services.sharding import ShardedBotService
 from src.bot.utils.logger import setup_logger
 
 
@@ -14,9 +16,14 @@ logger = setup_logger(
 
 
 async def main() -> None:
-    bot_service = BotService(
-        token=settings.bot.token
-    )
+    if settings.sharding.workers > 1:
+        bot_service = ShardedBotService(
+            token=settings.bot.token
+        )
+    else:
+        bot_service = BotService(
+            token=settings.bot.token
+        )
     
     bot_service.build()
     
@@ -38,6 +45,33 @@ async def main() -> None:
         handler=signal_handler
     )
     
+    def reload_handler(
+        sig,
+        frame
+    ):
+        try:
+            taxonomy = reload_taxonomy()
+        except Exception as e:
+            logger.error(
+                msg=f"Taxonomy reload failed, keeping the current one: {e}"
+            )
+            return
+        
+        logger.info(
+            msg=f"Reloaded category taxonomy {taxonomy.version}"
+        )
+        
+        if isinstance(bot_service, ShardedBotService):
+            bot_service.signal_workers(
+                signum=signal.SIGHUP
+            )
+    
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(
+            signalnum=signal.SIGHUP,
+            handler=reload_handler
+        )
+    
     try:
         logger.info(
             msg="Bot started successfully! Press Ctrl+C to stop."
@@ -1,12 +1,29 @@
+import mimetypes
+from typing import Union
+
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove
+from aiogram.types import Audio, Message, CallbackQuery, ReplyKeyboardRemove, Voice
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from src.models.user import User
+from src.models.report import Report
+from src.models.taxonomy import get_taxonomy
 from src.config.settings import settings
-from src.bot.keyboards.inline import create_location_request_keyboard, create_media_type_keyboard
+from src.services.ai_vision_service import AIVisionService
+from src.services.report_repository import ReportRepository
+from src.services.spatial_index import SpatialIndex
+from src.services.tracing import TRACER, SPAN_KIND_CLIENT
+from src.bot.keyboards.inline import (
+    create_location_request_keyboard,
+    create_media_type_keyboard,
+    create_camera_keyboard,
+    create_nearby_reports_keyboard,
+    create_report_review_keyboard
+)
+from src.bot.keyboards.registry import get_keyboard_registry
+from src.bot.utils.formatting import build_report_text
 from src.bot.utils.logger import setup_logger
 
 
@@ -24,6 +41,115 @@ class ReportStates(StatesGroup):
     waiting_for_description = State()
 
 
+# Draft fields filled in by an analysis or a duplicate confirmation
+REVIEW_FIELDS = (
+    "category",
+    "subcategory",
+    "description",
+    "photo_file_id",
+    "audio_file_id",
+    "duplicate_of"
+)
+
+
+async def clear_review(
+    state: FSMContext
+) -> None:
+    # Keeps the location but drops what the previous review analysed, so a
+    # stale value never ends up in the next report
+    data = await state.get_data()
+    
+    await state.set_data(
+        data={key: value for key, value in data.items() if key not in REVIEW_FIELDS}
+    )
+
+
+async def save_review_draft(
+    state: FSMContext,
+    report_repository: ReportRepository,
+    user_id: int
+) -> int:
+    # Snapshot of the report a review message shows; its buttons refer to
+    # it by id, so Submit stores what the user saw even if the conversation
+    # has moved on or the review came from the web app
+    data = await state.get_data()
+    
+    return await report_repository.save_draft(
+        report=Report(
+            user_id=user_id,
+            latitude=data.get("latitude", 35.0),
+            longitude=data.get("longitude", 33.0),
+            category=data.get("category", ""),
+            subcategory=data.get("subcategory", ""),
+            description=data.get("description", "Problem reported"),
+            photo_file_id=data.get("photo_file_id"),
+            audio_file_id=data.get("audio_file_id"),
+            duplicate_of=data.get("duplicate_of")
+        )
+    )
+
+
+def duplicate_footer(
+    spatial_index: SpatialIndex,
+    latitude: float,
+    longitude: float,
+    category: str,
+    subcategory: str,
+    footer: str
+) -> str:
+    duplicates = spatial_index.duplicates(
+        latitude=latitude,
+        longitude=longitude,
+        category=category,
+        subcategory=subcategory,
+        limit=1
+    )
+    
+    if not duplicates:
+        return footer
+    
+    return (
+        f"⚠️ Possibly already reported as #{duplicates[0].report_id} "
+        f"({round(duplicates[0].distance)} m away).\n\n"
+        f"{footer}"
+    )
+
+
+async def offer_nearby_reports(
+    callback: CallbackQuery,
+    spatial_index: SpatialIndex,
+    report_repository: ReportRepository,
+    latitude: float,
+    longitude: float
+) -> None:
+    await spatial_index.refresh(
+        repository=report_repository
+    )
+    nearby = spatial_index.duplicates(
+        latitude=latitude,
+        longitude=longitude
+    )
+    
+    if not nearby:
+        return
+    
+    logger.info(
+        msg=f"User {callback.from_user.id} is near {len(nearby)} recent reports: {[report.report_id for report in nearby]}"
+    )
+    
+    await callback.message.answer(
+        text=(
+            f"👀 <b>Already reported nearby</b>\n\n"
+            f"If your problem is one of these, tap it to confirm it "
+            f"instead of sending a new photo or voice message."
+        ),
+        parse_mode="HTML",
+        reply_markup=create_nearby_reports_keyboard(
+            reports=nearby
+        )
+    )
+
+
 @router.message(Command("help"))
 async def help_command(
     message: Message
@@ -199,7 +325,13 @@ async def handle_webapp_data(
     data = message.web_app_data.data
     
     logger.info(
-        msg=f"WEB APP DATA RECEIVED: '{data}'"
+        "Web app data received from user %s (%d chars)",
+        user.id,
+        len(data)
+    )
+    logger.debug(
+        "Web app data: %r",
+        data
     )
     
     if data.startswith("location:"):
@@ -281,7 +413,8 @@ async def handle_location(
 @router.callback_query(F.data.startswith("chcat|"))
 async def handle_change_category(
     callback: CallbackQuery,
-    state: FSMContext
+    state: FSMContext,
+    report_repository: ReportRepository
 ) -> None:
     user = callback.from_user
     
@@ -292,28 +425,40 @@ async def handle_change_category(
         msg=f"User {user.id} wants to change category, data: {callback.data}"
     )
     
-    # Save coordinates from callback data
     parts = callback.data.split("|")
-    if len(parts) == 3:
+    
+    if len(parts) == 2:
+        # Continue from the draft this review showed
+        draft = await report_repository.get_draft(
+            draft_id=int(parts[1]),
+            user_id=user.id
+        )
+        
+        if not draft:
+            await callback.answer(
+                text="This review has expired, please start a new report.",
+                show_alert=True
+            )
+            return
+        
+        await state.update_data(
+            latitude=draft.latitude,
+            longitude=draft.longitude,
+            category=draft.category,
+            subcategory=draft.subcategory,
+            description=draft.description,
+            photo_file_id=draft.photo_file_id,
+            audio_file_id=draft.audio_file_id,
+            duplicate_of=None
+        )
+    elif len(parts) == 3:
+        # Reviews sent before drafts only carry the coordinates
         latitude = float(parts[1])
         longitude = float(parts[2])
         await state.update_data(latitude=latitude, longitude=longitude)
         logger.info(f"Saved coordinates: lat={latitude}, lng={longitude}")
     
-    # Also try to extract and save description from message text if available
-    if callback.message and callback.message.text:
-        import re
-        desc_match = re.search(r'📝 \*\*Description:\*\*\s*(.+?)(?:\n\n|$)', callback.message.text, re.DOTALL)
-        if not desc_match:
-            desc_match = re.search(r'📝 <b>Description:</b>\s*(.+?)(?:\n\n|$)', callback.message.text, re.DOTALL)
-        if desc_match:
-            description = desc_match.group(1).strip()
-            await state.update_data(description=description)
-            logger.info(f"Extracted and saved description from message")
-    
-    from src.bot.keyboards.inline import create_categories_keyboard
-    
-    categories_keyboard = create_categories_keyboard()
+    categories_keyboard = get_keyboard_registry().categories()
     
     await callback.message.edit_text(
         text="🏷 Select a category:",
@@ -323,6 +468,24 @@ async def handle_change_category(
     await callback.answer()
 
 
+async def show_outdated_categories(
+    callback: CallbackQuery
+) -> None:
+    logger.warning(
+        msg=f"Outdated category callback from user {callback.from_user.id}: {callback.data}"
+    )
+    
+    await callback.message.edit_text(
+        text="🏷 Select a category:",
+        reply_markup=get_keyboard_registry().categories()
+    )
+    
+    await callback.answer(
+        text="The category list has changed, please choose again.",
+        show_alert=True
+    )
+
+
 @router.callback_query(F.data.startswith("cat_"))
 async def handle_category_selection(
     callback: CallbackQuery,
@@ -333,11 +496,17 @@ async def handle_category_selection(
     if not user or not callback.data:
         return
     
-    from src.models.categories import get_all_categories
+    matched_category = get_taxonomy().category_by_id(
+        category_id=callback.data.replace("cat_", "", 1)
+    )
+    
+    if not matched_category:
+        await show_outdated_categories(
+            callback=callback
+        )
+        return
     
-    category_idx = int(callback.data.replace("cat_", ""))
-    categories = get_all_categories()
-    category = categories[category_idx]
+    category = matched_category.name
     
     logger.info(
         msg=f"User {user.id} selected category: {category}"
@@ -347,9 +516,7 @@ async def handle_category_selection(
         category=category
     )
     
-    from src.bot.keyboards.inline import create_subcategories_keyboard
-    
-    subcategories_keyboard = create_subcategories_keyboard(
+    subcategories_keyboard = get_keyboard_registry().subcategories(
         category=category
     )
     
@@ -364,46 +531,65 @@ async def handle_category_selection(
 @router.callback_query(F.data.startswith("subcat_"))
 async def handle_subcategory_selection(
     callback: CallbackQuery,
-    state: FSMContext
+    state: FSMContext,
+    spatial_index: SpatialIndex,
+    report_repository: ReportRepository
 ) -> None:
     user = callback.from_user
     
     if not user or not callback.data:
         return
     
-    from src.models.categories import get_subcategories_for_category
-    
     data = await state.get_data()
-    category = data.get("category", "Unknown")
+    matched_category = get_taxonomy().find_category(
+        name=data.get("category", "")
+    )
+    matched_subcategory = matched_category.subcategory_by_id(
+        subcategory_id=callback.data.replace("subcat_", "", 1)
+    ) if matched_category else None
+    
+    if not matched_subcategory:
+        await show_outdated_categories(
+            callback=callback
+        )
+        return
     
-    subcat_idx = int(callback.data.replace("subcat_", ""))
-    subcategories = get_subcategories_for_category(category)
-    subcategory = subcategories[subcat_idx]
+    category = matched_category.name
+    subcategory = matched_subcategory.name
     
     logger.info(
         msg=f"User {user.id} selected subcategory: {subcategory}"
     )
     
     await state.update_data(
-        subcategory=subcategory
+        subcategory=subcategory,
+        duplicate_of=None
+    )
+    draft_id = await save_review_draft(
+        state=state,
+        report_repository=report_repository,
+        user_id=user.id
     )
     
     latitude = data.get("latitude", 35.0)
     longitude = data.get("longitude", 33.0)
     description = data.get("description", "Problem reported")
     
-    from src.bot.keyboards.inline import create_report_review_keyboard
-    
-    lat_display = f"{int(latitude)}.{str(latitude).split('.')[1][:6] if '.' in str(latitude) else 'xxxxxx'}"
-    lng_display = f"{int(longitude)}.{str(longitude).split('.')[1][:6] if '.' in str(longitude) else 'xxxxxx'}"
-    
-    message_text = (
-        f"📋 <b>Report Updated</b>\n\n"
-        f"📍 <b>Location:</b> {lat_display}, {lng_display}\n\n"
-        f"🏷 <b>Category:</b> {category}\n"
-        f"🔖 <b>Subcategory:</b> {subcategory}\n"
-        f"📝 <b>Description:</b> {description}\n\n"
-        f"Review your report and submit."
+    message_text = build_report_text(
+        title="Report Updated",
+        latitude=latitude,
+        longitude=longitude,
+        category=category,
+        subcategory=subcategory,
+        description=description,
+        footer=duplicate_footer(
+            spatial_index=spatial_index,
+            latitude=latitude,
+            longitude=longitude,
+            category=category,
+            subcategory=subcategory,
+            footer="Review your report and submit."
+        )
     )
     
     review_keyboard = create_report_review_keyboard(
@@ -412,7 +598,8 @@ async def handle_subcategory_selection(
         latitude=latitude,
         longitude=longitude,
         description=description,
-        webapp_url=settings.bot.webapp_url
+        webapp_url=settings.bot.webapp_url,
+        draft_id=draft_id
     )
     
     await callback.message.answer(
@@ -433,9 +620,7 @@ async def handle_back_to_categories(
     if not user:
         return
     
-    from src.bot.keyboards.inline import create_categories_keyboard
-    
-    categories_keyboard = create_categories_keyboard()
+    categories_keyboard = get_keyboard_registry().categories()
     
     await callback.message.edit_text(
         text="🏷 Select a category:",
@@ -445,10 +630,12 @@ async def handle_back_to_categories(
     await callback.answer()
 
 
-@router.callback_query(F.data == "submit_report")
+@router.callback_query(F.data.startswith("submit_report"))
 async def handle_submit_report(
     callback: CallbackQuery,
-    state: FSMContext
+    state: FSMContext,
+    report_repository: ReportRepository,
+    spatial_index: SpatialIndex
 ) -> None:
     user = callback.from_user
     
@@ -459,13 +646,82 @@ async def handle_submit_report(
         msg=f"User {user.id} submitted report"
     )
     
+    # The Submit button names the draft its review showed, so the report is
+    # exactly what the user confirmed, whichever review they submit
+    parts = callback.data.split("|")
+    
+    if len(parts) == 2:
+        draft = await report_repository.get_draft(
+            draft_id=int(parts[1]),
+            user_id=user.id
+        )
+        
+        if not draft:
+            await callback.answer(
+                text="This review has expired, please start a new report.",
+                show_alert=True
+            )
+            return
+    else:
+        # Reviews sent before drafts: the conversation state is the draft
+        data = await state.get_data()
+        draft = Report(
+            user_id=user.id,
+            latitude=data.get("latitude", 35.0),
+            longitude=data.get("longitude", 33.0),
+            category=data.get("category", ""),
+            subcategory=data.get("subcategory", ""),
+            description=data.get("description", "Problem reported"),
+            photo_file_id=data.get("photo_file_id"),
+            audio_file_id=data.get("audio_file_id"),
+            duplicate_of=data.get("duplicate_of")
+        )
+    
+    report = Report(
+        user_id=user.id,
+        latitude=draft.latitude,
+        longitude=draft.longitude,
+        category=draft.category,
+        subcategory=draft.subcategory,
+        description=draft.description,
+        photo_file_id=draft.photo_file_id,
+        audio_file_id=draft.audio_file_id,
+        duplicate_of=draft.duplicate_of
+    )
+    
     # Remove buttons from previous message
     await callback.message.edit_reply_markup(reply_markup=None)
     
+    try:
+        report = await report_repository.add(
+            report=report
+        )
+    except Exception as e:
+        logger.error(
+            msg=f"Failed to store report of user {user.id}: {e}"
+        )
+        
+        await callback.message.edit_reply_markup(
+            reply_markup=callback.message.reply_markup
+        )
+        await callback.answer(
+            text="❌ Could not submit the report, please try again.",
+            show_alert=True
+        )
+        return
+    
+    spatial_index.add(
+        report=report
+    )
+    
+    logger.info(
+        msg=f"Report {report.report_id} of user {user.id} stored"
+    )
+    
     # Send success message
     final_message = (
         f"✅ <b>Report Submitted Successfully!</b>\n\n"
-        f"Your report has been sent to the municipality.\n"
+        f"Your report #{report.report_id} has been sent to the municipality.\n"
         f"You will be notified when it's reviewed.\n\n"
         f"Thank you for helping improve our city! 🏙️\n\n"
         f"——————\n"
@@ -486,10 +742,82 @@ async def handle_submit_report(
     await state.clear()
 
 
+@router.callback_query(F.data.startswith("dup|"))
+async def handle_duplicate_selection(
+    callback: CallbackQuery,
+    state: FSMContext,
+    report_repository: ReportRepository
+) -> None:
+    user = callback.from_user
+    
+    if not user or not callback.data:
+        return
+    
+    report_id = int(callback.data.split("|")[1])
+    existing = await report_repository.get(
+        report_id=report_id
+    )
+    
+    if not existing:
+        await callback.answer(
+            text="This report is no longer available."
+        )
+        return
+    
+    logger.info(
+        msg=f"User {user.id} confirmed existing report {report_id}"
+    )
+    
+    # Confirming an existing report needs no photo and no AI analysis
+    data = await state.update_data(
+        category=existing.category,
+        subcategory=existing.subcategory,
+        description=existing.description,
+        duplicate_of=existing.duplicate_of or existing.report_id
+    )
+    latitude = data.get("latitude", existing.latitude)
+    longitude = data.get("longitude", existing.longitude)
+    draft_id = await save_review_draft(
+        state=state,
+        report_repository=report_repository,
+        user_id=user.id
+    )
+    
+    message_text = build_report_text(
+        title="Report Details",
+        latitude=latitude,
+        longitude=longitude,
+        category=existing.category,
+        subcategory=existing.subcategory,
+        description=existing.description,
+        footer=f"Same problem as report #{report_id}. Submit to confirm it."
+    )
+    
+    review_keyboard = create_report_review_keyboard(
+        category=existing.category,
+        subcategory=existing.subcategory,
+        latitude=latitude,
+        longitude=longitude,
+        description=existing.description,
+        webapp_url=settings.bot.webapp_url,
+        draft_id=draft_id
+    )
+    
+    await callback.message.answer(
+        text=message_text,
+        parse_mode="HTML",
+        reply_markup=review_keyboard
+    )
+    
+    await callback.answer()
+
+
 @router.callback_query(F.data.startswith("media_photo"))
 async def handle_photo_button_click(
     callback: CallbackQuery,
-    state: FSMContext
+    state: FSMContext,
+    spatial_index: SpatialIndex,
+    report_repository: ReportRepository
 ) -> None:
     user = callback.from_user
     
@@ -500,6 +828,11 @@ async def handle_photo_button_click(
         msg=f"User {user.id} clicked Photo button, data: {callback.data}"
     )
     
+    # A new media report starts a fresh review
+    await clear_review(
+        state=state
+    )
+    
     # Extract and save location from callback_data
     parts = callback.data.split("|")
     if len(parts) == 3:
@@ -510,8 +843,6 @@ async def handle_photo_button_click(
     
     camera_url = settings.bot.webapp_url.replace("map.html", "camera.html") if settings.bot.webapp_url else ""
     
-    from src.bot.keyboards.inline import create_camera_keyboard
-    
     camera_keyboard = create_camera_keyboard(
         camera_webapp_url=camera_url
     )
@@ -533,13 +864,24 @@ async def handle_photo_button_click(
         reply_markup=camera_keyboard
     )
     
+    if len(parts) == 3:
+        await offer_nearby_reports(
+            callback=callback,
+            spatial_index=spatial_index,
+            report_repository=report_repository,
+            latitude=latitude,
+            longitude=longitude
+        )
+    
     await callback.answer()
 
 
 @router.callback_query(F.data.startswith("media_audio"))
 async def handle_audio_button_click(
     callback: CallbackQuery,
-    state: FSMContext
+    state: FSMContext,
+    spatial_index: SpatialIndex,
+    report_repository: ReportRepository
 ) -> None:
     user = callback.from_user
     
@@ -550,6 +892,11 @@ async def handle_audio_button_click(
         msg=f"User {user.id} clicked Audio button, data: {callback.data}"
     )
     
+    # A new media report starts a fresh review
+    await clear_review(
+        state=state
+    )
+    
     # Extract and save location from callback_data
     parts = callback.data.split("|")
     if len(parts) == 3:
@@ -573,19 +920,33 @@ async def handle_audio_button_click(
         parse_mode="HTML"
     )
     
+    if len(parts) == 3:
+        await offer_nearby_reports(
+            callback=callback,
+            spatial_index=spatial_index,
+            report_repository=report_repository,
+            latitude=latitude,
+            longitude=longitude
+        )
+    
     await callback.answer()
 
 
 @router.message(F.photo)
+@TRACER.traced(name="bot.handle_photo")
 async def handle_photo(
     message: Message,
-    state: FSMContext
+    state: FSMContext,
+    ai_service: AIVisionService,
+    spatial_index: SpatialIndex,
+    report_repository: ReportRepository
 ) -> None:
     user = message.from_user
     
     if not user or not message.photo:
         return
     
+    TRACER.current_span().set_attribute("user.id", user.id)
     logger.info(
         msg=f"User {user.id} sent photo directly"
     )
@@ -594,10 +955,6 @@ async def handle_photo(
     latitude = data.get("latitude", 35.0)
     longitude = data.get("longitude", 33.0)
     
-    from src.services.ai_vision_service import AIVisionService
-    from src.bot.keyboards.inline import create_report_review_keyboard
-    
-    ai_service = AIVisionService()
     analysis = await ai_service.analyze_problem_photo(
         photo_url=""
     )
@@ -606,16 +963,37 @@ async def handle_photo(
         text="📸 Photo received"
     )
     
-    lat_display = f"{int(latitude)}.{str(latitude).split('.')[1][:6] if '.' in str(latitude) else 'xxxxxx'}"
-    lng_display = f"{int(longitude)}.{str(longitude).split('.')[1][:6] if '.' in str(longitude) else 'xxxxxx'}"
+    message_text = build_report_text(
+        title="Report Details",
+        latitude=latitude,
+        longitude=longitude,
+        category=analysis['category'],
+        subcategory=analysis['subcategory'],
+        description=analysis['description'],
+        footer=duplicate_footer(
+            spatial_index=spatial_index,
+            latitude=latitude,
+            longitude=longitude,
+            category=analysis['category'],
+            subcategory=analysis['subcategory'],
+            footer="Review your report and submit or change category."
+        )
+    )
+    
+    await clear_review(
+        state=state
+    )
     
-    message_text = (
-        f"📋 <b>Report Details</b>\n\n"
-        f"📍 <b>Location:</b> {lat_display}, {lng_display}\n\n"
-        f"🏷 <b>Category:</b> {analysis['category']}\n"
-        f"🔖 <b>Subcategory:</b> {analysis['subcategory']}\n"
-        f"📝 <b>Description:</b> {analysis['description']}\n\n"
-        f"Review your report and submit or change category."
+    await state.update_data(
+        category=analysis['category'],
+        subcategory=analysis['subcategory'],
+        description=analysis['description'],
+        photo_file_id=message.photo[-1].file_id
+    )
+    draft_id = await save_review_draft(
+        state=state,
+        report_repository=report_repository,
+        user_id=user.id
     )
     
     review_keyboard = create_report_review_keyboard(
@@ -624,7 +1002,8 @@ async def handle_photo(
         latitude=latitude,
         longitude=longitude,
         description=analysis['description'],
-        webapp_url=settings.bot.webapp_url
+        webapp_url=settings.bot.webapp_url,
+        draft_id=draft_id
     )
     
     await message.answer(
@@ -632,24 +1011,34 @@ async def handle_photo(
         parse_mode="HTML",
         reply_markup=review_keyboard
     )
+
+
+def audio_filename(
+    audio: Union[Audio, Voice]
+) -> str:
+    if isinstance(audio, Audio) and audio.file_name:
+        return audio.file_name
     
-    await state.update_data(
-        category=analysis['category'],
-        subcategory=analysis['subcategory'],
-        description=analysis['description']
-    )
+    extension = mimetypes.guess_extension(audio.mime_type or "") or ".ogg"
+    
+    return f"voice{extension}"
 
 
 @router.message(F.voice | F.audio)
+@TRACER.traced(name="bot.handle_audio")
 async def handle_audio(
     message: Message,
-    state: FSMContext
+    state: FSMContext,
+    ai_service: AIVisionService,
+    spatial_index: SpatialIndex,
+    report_repository: ReportRepository
 ) -> None:
     user = message.from_user
     
     if not user:
         return
     
+    TRACER.current_span().set_attribute("user.id", user.id)
     logger.info(
         msg=f"User {user.id} sent audio/voice"
     )
@@ -664,58 +1053,81 @@ async def handle_audio(
     latitude = data.get("latitude", 35.0)
     longitude = data.get("longitude", 33.0)
     
-    from src.services.ai_vision_service import AIVisionService
-    from src.bot.keyboards.inline import create_report_review_keyboard
-    import tempfile
-    import os
-    
     # Get audio file
     audio = message.audio or message.voice
     if not audio:
         await message.answer("❌ No audio file found")
         return
     
-    # Download audio file
-    bot = message.bot
-    audio_file = await bot.download(
-        file=audio.file_id
-    )
+    if (audio.file_size or 0) > settings.audio.max_bytes or (audio.duration or 0) > settings.audio.max_duration:
+        logger.info(
+            msg=f"Rejected audio from user {user.id}: {audio.file_size} bytes, {audio.duration} s"
+        )
+        await message.answer(
+            text=f"❌ Voice message is too long. Please keep it under {settings.audio.max_duration // 60} minutes."
+        )
+        return
     
-    # Save to temporary file
-    with tempfile.NamedTemporaryFile(
-        delete=False,
-        suffix=".ogg"
-    ) as temp_audio:
-        if audio_file:
-            temp_audio.write(audio_file.read())
-            temp_audio_path = temp_audio.name
+    # Download audio into memory and hand the bytes straight to Whisper
+    with TRACER.span(
+        name="telegram.download",
+        kind=SPAN_KIND_CLIENT
+    ) as span:
+        audio_file = await message.bot.download(
+            file=audio.file_id
+        )
+        audio_bytes = audio_file.getvalue() if audio_file else b""
+        span.set_attribute("file.size", len(audio_bytes))
     
-    try:
-        # Analyze audio with OpenAI Whisper + GPT
-        ai_service = AIVisionService()
-        analysis = await ai_service.analyze_problem_audio(
-            audio_file_path=temp_audio_path
+    if not audio_bytes or len(audio_bytes) > settings.audio.max_bytes:
+        await message.answer(
+            text="❌ Could not process this audio file"
         )
-        
-        logger.info(
-            msg=f"Audio analysis complete: {analysis['category']} -> {analysis['subcategory']}"
+        return
+    
+    # Analyze audio with OpenAI Whisper + GPT
+    analysis = await ai_service.analyze_problem_audio(
+        audio=audio_bytes,
+        filename=audio_filename(
+            audio=audio
         )
-        
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_audio_path):
-            os.remove(temp_audio_path)
+    )
+    
+    logger.info(
+        msg=f"Audio analysis complete: {analysis['category']} -> {analysis['subcategory']}"
+    )
+    
+    message_text = build_report_text(
+        title="Report Details",
+        latitude=latitude,
+        longitude=longitude,
+        category=analysis['category'],
+        subcategory=analysis['subcategory'],
+        description=analysis['description'],
+        footer=duplicate_footer(
+            spatial_index=spatial_index,
+            latitude=latitude,
+            longitude=longitude,
+            category=analysis['category'],
+            subcategory=analysis['subcategory'],
+            footer="Review your report and submit or change category."
+        )
+    )
     
-    lat_display = f"{int(latitude)}.{str(latitude).split('.')[1][:6] if '.' in str(latitude) else 'xxxxxx'}"
-    lng_display = f"{int(longitude)}.{str(longitude).split('.')[1][:6] if '.' in str(longitude) else 'xxxxxx'}"
+    await clear_review(
+        state=state
+    )
     
-    message_text = (
-        f"📋 <b>Report Details</b>\n\n"
-        f"📍 <b>Location:</b> {lat_display}, {lng_display}\n\n"
-        f"🏷 <b>Category:</b> {analysis['category']}\n"
-        f"🔖 <b>Subcategory:</b> {analysis['subcategory']}\n"
-        f"📝 <b>Description:</b> {analysis['description']}\n\n"
-        f"Review your report and submit or change category."
+    await state.update_data(
+        category=analysis['category'],
+        subcategory=analysis['subcategory'],
+        description=analysis['description'],
+        audio_file_id=audio.file_id
+    )
+    draft_id = await save_review_draft(
+        state=state,
+        report_repository=report_repository,
+        user_id=user.id
     )
     
     review_keyboard = create_report_review_keyboard(
@@ -724,7 +1136,8 @@ async def handle_audio(
         latitude=latitude,
         longitude=longitude,
         description=analysis['description'],
-        webapp_url=settings.bot.webapp_url
+        webapp_url=settings.bot.webapp_url,
+        draft_id=draft_id
     )
     
     await message.answer(
@@ -732,20 +1145,17 @@ async def handle_audio(
         parse_mode="HTML",
         reply_markup=review_keyboard
     )
-    
-    await state.update_data(
-        category=analysis['category'],
-        subcategory=analysis['subcategory'],
-        description=analysis['description']
-    )
 
 
 @router.message()
 async def debug_all_messages(
     message: Message
 ) -> None:
-    logger.info(
-        msg=f"DEBUG ALL: content_type={message.content_type}, web_app_data={message.web_app_data}, text={message.text}"
+    logger.debug(
+        "Unmatched message: content_type=%s, web_app_data=%s, text=%s",
+        message.content_type,
+        message.web_app_data,
+        message.text
     )
     
     if message.web_app_data:
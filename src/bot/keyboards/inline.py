@@ -1,6 +1,9 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+from src.models.taxonomy import Taxonomy, TaxonomyCategory
+from src.services.spatial_index import NearbyReport
 
 
 def create_location_request_keyboard(
@@ -68,7 +71,8 @@ def create_report_review_keyboard(
     latitude: float = 0.0,
     longitude: float = 0.0,
     description: str = "",
-    webapp_url: str = ""
+    webapp_url: str = "",
+    draft_id: Optional[int] = None
 ) -> InlineKeyboardMarkup:
     from urllib.parse import quote
     import logging
@@ -79,7 +83,9 @@ def create_report_review_keyboard(
     if webapp_url:
         base_url = webapp_url.rsplit('/', 1)[0]  # Remove map.html
         edit_url = f"{base_url}/edit_description.html?desc={quote(description)}&cat={quote(category)}&subcat={quote(subcategory)}&lat={latitude}&lng={longitude}"
-        logger.info(f"Edit URL: {edit_url}")
+        if draft_id is not None:
+            edit_url += f"&draft={draft_id}"
+        logger.debug("Edit URL: %s", edit_url)
     else:
         edit_url = ""
         logger.warning("No webapp_url provided!")
@@ -90,7 +96,7 @@ def create_report_review_keyboard(
     keyboard.append([
         InlineKeyboardButton(
             text="🔄 Change Category",
-            callback_data=f"chcat|{latitude}|{longitude}"
+            callback_data=f"chcat|{draft_id}" if draft_id is not None else f"chcat|{latitude}|{longitude}"
         )
     ])
     
@@ -107,7 +113,7 @@ def create_report_review_keyboard(
     keyboard.append([
         InlineKeyboardButton(
             text="✅ Submit",
-            callback_data="submit_report"
+            callback_data=f"submit_report|{draft_id}" if draft_id is not None else "submit_report"
         )
     ])
     
@@ -116,18 +122,35 @@ def create_report_review_keyboard(
     )
 
 
-def create_categories_keyboard() -> InlineKeyboardMarkup:
-    from src.models.categories import get_all_categories
+def create_nearby_reports_keyboard(
+    reports: List[NearbyReport]
+) -> InlineKeyboardMarkup:
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                text=f"#{report.report_id} {report.category} / {report.subcategory} ({round(report.distance)} m)",
+                callback_data=f"dup|{report.report_id}"
+            )
+        ]
+        for report in reports
+    ]
     
-    categories = get_all_categories()
+    return InlineKeyboardMarkup(
+        inline_keyboard=keyboard
+    )
+
+
+def create_categories_keyboard(
+    taxonomy: Taxonomy
+) -> InlineKeyboardMarkup:
     keyboard = []
     
-    for idx, category in enumerate(categories):
+    for category in taxonomy.categories:
         keyboard.append(
             [
                 InlineKeyboardButton(
-                    text=category,
-                    callback_data=f"cat_{idx}"
+                    text=category.name,
+                    callback_data=f"cat_{category.id}"
                 )
             ]
         )
@@ -138,22 +161,16 @@ def create_categories_keyboard() -> InlineKeyboardMarkup:
 
 
 def create_subcategories_keyboard(
-    category: str
+    category: TaxonomyCategory
 ) -> InlineKeyboardMarkup:
-    from src.models.categories import get_subcategories_for_category
-    
-    subcategories = get_subcategories_for_category(
-        category=category
-    )
-    
     keyboard = []
     
-    for idx, subcat in enumerate(subcategories):
+    for subcategory in category.subcategories:
         keyboard.append(
             [
                 InlineKeyboardButton(
-                    text=subcat,
-                    callback_data=f"subcat_{idx}"
+                    text=subcategory.name,
+                    callback_data=f"subcat_{subcategory.id}"
                 )
             ]
         )
@@ -0,0 +1,55 @@
+from typing import Dict, Optional
+
+from aiogram.types import InlineKeyboardMarkup
+
+from src.models.taxonomy import Taxonomy, get_taxonomy
+from src.bot.keyboards.inline import create_categories_keyboard, create_subcategories_keyboard
+
+
+class KeyboardRegistry:
+    
+    def __init__(
+        self,
+        taxonomy: Taxonomy
+    ):
+        self.taxonomy = taxonomy
+        self._categories = create_categories_keyboard(
+            taxonomy=taxonomy
+        )
+        self._subcategories: Dict[str, InlineKeyboardMarkup] = {
+            category.id: create_subcategories_keyboard(
+                category=category
+            )
+            for category in taxonomy.categories
+        }
+    
+    def categories(
+        self
+    ) -> InlineKeyboardMarkup:
+        return self._categories
+    
+    def subcategories(
+        self,
+        category: str
+    ) -> InlineKeyboardMarkup:
+        matched_category = self.taxonomy.find_category(category) or self.taxonomy.fallback
+        
+        return self._subcategories[matched_category.id]
+
+
+_registry: Optional[KeyboardRegistry] = None
+
+
+def get_keyboard_registry() -> KeyboardRegistry:
+    global _registry
+    
+    taxonomy = get_taxonomy()
+    registry = _registry
+    
+    if registry is None or registry.taxonomy is not taxonomy:
+        registry = KeyboardRegistry(
+            taxonomy=taxonomy
+        )
+        _registry = registry
+    
+    return registry
@@ -18,31 +18,35 @@ class LoggingMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
-        user = None
-        log_message = "Unknown event"
+        # Lazy %-style arguments: nothing is formatted unless the record is
+        # kept (level and sampling) and then only by the writing handler
+        log_format = "Unknown event"
+        args: tuple = ()
         
         if isinstance(event, Message):
             user = event.from_user
             if user:
-                user_info = f"User {user.id} (@{user.username})"
+                args = (user.id, user.username)
                 
                 if event.web_app_data:
-                    log_message = f"{user_info} sent web_app_data"
+                    log_format = "User %s (@%s) sent web_app_data"
                 elif event.text:
-                    log_message = f"{user_info} sent message: {event.text}"
+                    log_format = "User %s (@%s) sent message: %s"
+                    args += (event.text,)
                 elif event.location:
-                    log_message = f"{user_info} sent location"
+                    log_format = "User %s (@%s) sent location"
                 else:
-                    log_message = f"{user_info} sent message (unknown type)"
+                    log_format = "User %s (@%s) sent message (unknown type)"
             
         elif isinstance(event, CallbackQuery):
             user = event.from_user
             if user:
-                user_info = f"User {user.id} (@{user.username})"
-                log_message = f"{user_info} clicked button: {event.data}"
+                log_format = "User %s (@%s) clicked button: %s"
+                args = (user.id, user.username, event.data)
         
         logger.info(
-            msg=log_message
+            log_format,
+            *args
         )
         
         return await handler(
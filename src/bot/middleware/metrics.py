@@ -0,0 +1,42 @@
+import time
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import SkipHandler
+from aiogram.types import TelegramObject
+
+from src.services.metrics import HANDLER_DURATION
+
+
+class MetricsMiddleware(BaseMiddleware):
+    
+    def __init__(
+        self,
+        update_type: str
+    ):
+        self.update_type = update_type
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        # Registered as an inner middleware, so the matched handler is known
+        handler_object = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object else "unknown"
+        outcome = "error"
+        started = time.perf_counter()
+        
+        try:
+            result = await handler(
+                event,
+                data
+            )
+            outcome = "ok"
+            
+            return result
+        except SkipHandler:
+            outcome = "skipped"
+            raise
+        finally:
+            HANDLER_DURATION.labels(name, self.update_type, outcome).observe(time.perf_counter() - started)
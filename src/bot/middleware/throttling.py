@@ -0,0 +1,71 @@
+import math
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Message, CallbackQuery
+
+from src.services.throttle import AI, CHEAP, Throttle
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__
+)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    
+    def __init__(
+        self,
+        throttle: Throttle
+    ):
+        self.throttle = throttle
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = getattr(event, "from_user", None)
+        
+        if not user:
+            return await handler(
+                event,
+                data
+            )
+        
+        # Photos and voice notes go to OpenAI, so they draw on their own budget
+        is_ai = isinstance(event, Message) and bool(event.photo or event.voice or event.audio)
+        verdict = self.throttle.acquire(
+            user_id=user.id,
+            kind=AI if is_ai else CHEAP
+        )
+        
+        if verdict.allowed:
+            return await handler(
+                event,
+                data
+            )
+        
+        logger.debug(
+            "Throttled user %s for %.1f s",
+            user.id,
+            verdict.retry_after
+        )
+        wait = math.ceil(verdict.retry_after)
+        
+        if isinstance(event, CallbackQuery):
+            # Always answered, or the button keeps its loading spinner
+            await event.answer(
+                text=f"⏳ Too many taps. Please wait {wait} s."
+            )
+        elif verdict.notify and is_ai:
+            await event.answer(
+                text=f"⏳ You are sending photos and voice messages too quickly. Please wait {wait} s before sending another."
+            )
+        elif verdict.notify:
+            await event.answer(
+                text=f"⏳ Too many messages. Please wait {wait} s and try again."
+            )
+        
+        return None
@@ -0,0 +1,26 @@
+def format_coordinate(
+    value: float
+) -> str:
+    fraction = str(value).split('.')[1][:6] if '.' in str(value) else 'xxxxxx'
+    
+    return f"{int(value)}.{fraction}"
+
+
+def build_report_text(
+    title: str,
+    latitude: float,
+    longitude: float,
+    category: str,
+    subcategory: str,
+    description: str,
+    footer: str
+) -> str:
+    return (
+        f"📋 <b>{title}</b>\n\n"
+        f"📍 <b>Location:</b> {format_coordinate(latitude)}, {format_coordinate(longitude)}\n\n"
+        f"🏷 <b>Category:</b> {category}\n"
+        f"🔖 <b>Subcategory:</b> {subcategory}\n"
+        f"📝 <b>Description:</b> {description}\n\n"
+        f"{footer}"
+    )
+
@@ -1,12 +1,233 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+import threading
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings, LoggingConfig
+
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+RESERVED_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class JsonFormatter(logging.Formatter):
+    
+    def format(
+        self,
+        record: logging.LogRecord
+    ) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRIBUTES:
+                entry[key] = value
+        
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class Sampler:
+    __slots__ = ("rate", "_credit")
+    
+    def __init__(
+        self,
+        rate: float
+    ):
+        self.rate = rate
+        self._credit = 0.0
+    
+    def keep(self) -> bool:
+        # Deterministic: a rate of 0.1 keeps every tenth record
+        self._credit += self.rate
+        if self._credit < 1.0:
+            return False
+        
+        self._credit -= 1.0
+        return True
+
+
+class SampledLogger(logging.Logger):
+    sampler: Optional[Sampler] = None
+    
+    def _log(
+        self,
+        level: int,
+        msg: object,
+        args: Any,
+        exc_info: Any = None,
+        extra: Optional[Dict[str, Any]] = None,
+        stack_info: bool = False,
+        stacklevel: int = 1
+    ) -> None:
+        # Sampled before the LogRecord is built, so a dropped INFO line costs
+        # a float add rather than record creation. Warnings and errors always pass.
+        if self.sampler is not None and level < logging.WARNING and not self.sampler.keep():
+            return
+        
+        super()._log(level, msg, args, exc_info, extra, stack_info, stacklevel + 1)
+
+
+class SamplingFilter(logging.Filter):
+    
+    def __init__(
+        self,
+        rate: float
+    ):
+        super().__init__()
+        self.sampler = Sampler(
+            rate=rate
+        )
+    
+    def filter(
+        self,
+        record: logging.LogRecord
+    ) -> bool:
+        # For loggers of another Logger subclass, which cannot switch class
+        return record.levelno >= logging.WARNING or self.sampler.keep()
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    
+    def __init__(
+        self,
+        records: queue.Queue
+    ):
+        super().__init__(records)
+        self.dropped = 0
+    
+    def prepare(
+        self,
+        record: logging.LogRecord
+    ) -> logging.LogRecord:
+        # The queue never leaves the process, so the record is passed as is and
+        # the message (lazy %-args included) is rendered on the listener thread.
+        return record
+    
+    def enqueue(
+        self,
+        record: logging.LogRecord
+    ) -> None:
+        # Never block the event loop on a slow sink: drop when the queue is full
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler: Optional[BackgroundQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+def create_formatter(
+    log_format: str
+) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    
+    return logging.Formatter(
+        fmt=TEXT_FORMAT,
+        datefmt=DATE_FORMAT
+    )
+
+
+def create_stream_handler(
+    config: LoggingConfig,
+    stream: Any = None
+) -> logging.Handler:
+    handler = logging.StreamHandler(
+        stream=stream or sys.stdout
+    )
+    handler.setFormatter(
+        fmt=create_formatter(
+            log_format=config.format
+        )
+    )
+    
+    return handler
+
+
+def get_queue_handler(
+    config: LoggingConfig,
+    stream: Any = None
+) -> BackgroundQueueHandler:
+    # One queue and one writer thread per process, shared by every logger
+    global _queue_handler, _listener
+    
+    with _lock:
+        if _queue_handler is None:
+            # Neither format prints them, and looking them up is a third of
+            # the cost of building a record
+            logging.logThreads = False
+            logging.logProcesses = False
+            logging.logMultiprocessing = False
+            
+            _queue_handler = BackgroundQueueHandler(
+                records=queue.Queue(maxsize=config.queue_size)
+            )
+            _listener = logging.handlers.QueueListener(
+                _queue_handler.queue,
+                create_stream_handler(
+                    config=config,
+                    stream=stream
+                )
+            )
+            _listener.start()
+            atexit.register(stop_queue_logging)
+    
+    return _queue_handler
+
+
+def stop_queue_logging() -> None:
+    # Flushes what is queued; safe to call more than once
+    global _queue_handler, _listener
+    
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        
+        _queue_handler = None
+        _listener = None
+
+
+def sample_rate(
+    name: str,
+    config: LoggingConfig
+) -> float:
+    # The most specific configured prefix wins
+    rates = config.sample_rates or {}
+    parts = name.split(".")
+    
+    for end in range(len(parts), 0, -1):
+        prefix = ".".join(parts[:end])
+        if prefix in rates:
+            return rates[prefix]
+    
+    return 1.0
 
 
 def setup_logger(
     name: str,
-    level: str = "INFO"
+    level: str = "INFO",
+    config: Optional[LoggingConfig] = None
 ) -> logging.Logger:
+    config = config or settings.logging
     logger = logging.getLogger(
         name=name
     )
@@ -21,23 +242,38 @@ def setup_logger(
     )
     
     if not logger.handlers:
-        handler = logging.StreamHandler(
-            stream=sys.stdout
-        )
-        handler.setLevel(
-            level=log_level
-        )
-        
-        formatter = logging.Formatter(
-            fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        handler.setFormatter(
-            fmt=formatter
-        )
+        if config.queue:
+            handler = get_queue_handler(
+                config=config
+            )
+        else:
+            handler = create_stream_handler(
+                config=config
+            )
+            handler.setLevel(
+                level=log_level
+            )
         
         logger.addHandler(
             hdlr=handler
         )
+        
+        rate = sample_rate(
+            name=name,
+            config=config
+        )
+        if rate < 1.0 and type(logger) in (logging.Logger, SampledLogger):
+            # Only sampled loggers become SampledLogger; setLoggerClass would
+            # change the class of every logger created from then on
+            logger.__class__ = SampledLogger
+            logger.sampler = Sampler(
+                rate=rate
+            )
+        elif rate < 1.0:
+            logger.addFilter(
+                SamplingFilter(
+                    rate=rate
+                )
+            )
     
     return logger
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 import os
 from pathlib import Path
 
@@ -17,6 +17,8 @@ class BotConfig:
     token: str
     log_level: str = "INFO"
     webapp_url: str = ""
+    taxonomy_path: str = ""
+    update_mode: str = "polling"
     
     @classmethod
     def from_env(cls) -> "BotConfig":
@@ -36,10 +38,64 @@ class BotConfig:
             default=""
         )
         
+        taxonomy_path = os.getenv(
+            key="TAXONOMY_PATH",
+            default=""
+        )
+        
+        update_mode = os.getenv(
+            key="BOT_UPDATE_MODE",
+            default="polling"
+        ).lower()
+        
         return cls(
             token=token,
             log_level=log_level,
-            webapp_url=webapp_url
+            webapp_url=webapp_url,
+            taxonomy_path=taxonomy_path,
+            update_mode=update_mode
+        )
+
+
+@dataclass
+class LoggingConfig:
+    format: str = "text"
+    queue: bool = False
+    queue_size: int = 10000
+    sample_rates: Optional[Dict[str, float]] = None
+    
+    @classmethod
+    def from_env(cls) -> "LoggingConfig":
+        log_format = os.getenv(
+            key="LOG_FORMAT",
+            default="text"
+        ).lower()
+        
+        queue = os.getenv(
+            key="LOG_QUEUE",
+            default="false"
+        ).lower() in ("1", "true", "yes")
+        
+        queue_size = int(
+            os.getenv(
+                key="LOG_QUEUE_SIZE",
+                default="10000"
+            )
+        )
+        
+        # "src.bot.middleware.logging=0.1,src.webapp=0.5": share of INFO and
+        # DEBUG records kept per logger (and its children)
+        sample_rates = {}
+        for entry in os.getenv(key="LOG_SAMPLE_RATES", default="").split(","):
+            if "=" in entry:
+                name, rate = entry.split("=", 1)
+                sample_rates[name.strip()] = float(rate)
+        
+        return cls(
+            format=log_format,
+            queue=queue,
+            queue_size=queue_size,
+            sample_rates=sample_rates
         )
 
 
@@ -49,6 +105,27 @@ class OpenAIConfig:
     model: str = "gpt-4o"
     max_tokens: int = 500
     temperature: float = 0.7
+    vision_detail: str = "high"
+    base_url: str = ""
+    timeout: float = 60.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    limiter: bool = True
+    concurrency: int = 8
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    max_queue: int = 100
+    deadline: float = 30.0
+    slow_call: float = 15.0
+    breaker_error_rate: float = 0.5
+    breaker_min_calls: int = 10
+    breaker_window: float = 30.0
+    breaker_cooldown: float = 30.0
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    hedge_budget: float = 0.05
     
     @classmethod
     def from_env(cls) -> "OpenAIConfig":
@@ -77,11 +154,181 @@ class OpenAIConfig:
             )
         )
         
+        vision_detail = os.getenv(
+            key="OPENAI_VISION_DETAIL",
+            default="high"
+        )
+        
+        base_url = os.getenv(
+            key="OPENAI_BASE_URL",
+            default=""
+        )
+        
+        timeout = float(
+            os.getenv(
+                key="OPENAI_TIMEOUT",
+                default="60"
+            )
+        )
+        
+        max_connections = int(
+            os.getenv(
+                key="OPENAI_MAX_CONNECTIONS",
+                default="100"
+            )
+        )
+        
+        max_keepalive_connections = int(
+            os.getenv(
+                key="OPENAI_MAX_KEEPALIVE_CONNECTIONS",
+                default="20"
+            )
+        )
+        
+        keepalive_expiry = float(
+            os.getenv(
+                key="OPENAI_KEEPALIVE_EXPIRY",
+                default="30"
+            )
+        )
+        
+        http2 = os.getenv(
+            key="OPENAI_HTTP2",
+            default="false"
+        ).lower() in ("1", "true", "yes")
+        
+        # Adaptive concurrency limit shared by all OpenAI calls: it starts at
+        # OPENAI_CONCURRENCY and moves between the min and max as latency and
+        # errors allow. Calls waiting for a slot beyond OPENAI_MAX_QUEUE are
+        # rejected outright.
+        limiter = os.getenv(
+            key="OPENAI_LIMITER",
+            default="true"
+        ).lower() in ("1", "true", "yes")
+        
+        concurrency = int(
+            os.getenv(
+                key="OPENAI_CONCURRENCY",
+                default="8"
+            )
+        )
+        
+        min_concurrency = int(
+            os.getenv(
+                key="OPENAI_MIN_CONCURRENCY",
+                default="1"
+            )
+        )
+        
+        max_concurrency = int(
+            os.getenv(
+                key="OPENAI_MAX_CONCURRENCY",
+                default="64"
+            )
+        )
+        
+        max_queue = int(
+            os.getenv(
+                key="OPENAI_MAX_QUEUE",
+                default="100"
+            )
+        )
+        
+        # Seconds one call may take, queueing included, before it is abandoned;
+        # calls slower than OPENAI_SLOW_CALL count against the limit and breaker
+        deadline = float(
+            os.getenv(
+                key="OPENAI_DEADLINE",
+                default="30"
+            )
+        )
+        
+        slow_call = float(
+            os.getenv(
+                key="OPENAI_SLOW_CALL",
+                default="15"
+            )
+        )
+        
+        # The breaker opens when at least OPENAI_BREAKER_MIN_CALLS calls in the
+        # last OPENAI_BREAKER_WINDOW seconds failed or were slow at the given
+        # rate, and lets one probe through after OPENAI_BREAKER_COOLDOWN
+        breaker_error_rate = float(
+            os.getenv(
+                key="OPENAI_BREAKER_ERROR_RATE",
+                default="0.5"
+            )
+        )
+        
+        breaker_min_calls = int(
+            os.getenv(
+                key="OPENAI_BREAKER_MIN_CALLS",
+                default="10"
+            )
+        )
+        
+        breaker_window = float(
+            os.getenv(
+                key="OPENAI_BREAKER_WINDOW",
+                default="30"
+            )
+        )
+        
+        breaker_cooldown = float(
+            os.getenv(
+                key="OPENAI_BREAKER_COOLDOWN",
+                default="30"
+            )
+        )
+        
+        # Hedged vision requests: a second identical request goes out when the
+        # first has not answered by the observed OPENAI_HEDGE_PERCENTILE latency,
+        # for at most OPENAI_HEDGE_BUDGET of requests
+        hedge = os.getenv(
+            key="OPENAI_HEDGE",
+            default="false"
+        ).lower() in ("1", "true", "yes")
+        
+        hedge_percentile = float(
+            os.getenv(
+                key="OPENAI_HEDGE_PERCENTILE",
+                default="95"
+            )
+        )
+        
+        hedge_budget = float(
+            os.getenv(
+                key="OPENAI_HEDGE_BUDGET",
+                default="0.05"
+            )
+        )
+        
         return cls(
             api_key=api_key,
             model=model,
             max_tokens=max_tokens,
-            temperature=temperature
+            temperature=temperature,
+            vision_detail=vision_detail,
+            base_url=base_url,
+            timeout=timeout,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            limiter=limiter,
+            concurrency=concurrency,
+            min_concurrency=min_concurrency,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            deadline=deadline,
+            slow_call=slow_call,
+            breaker_error_rate=breaker_error_rate,
+            breaker_min_calls=breaker_min_calls,
+            breaker_window=breaker_window,
+            breaker_cooldown=breaker_cooldown,
+            hedge=hedge,
+            hedge_percentile=hedge_percentile,
+            hedge_budget=hedge_budget
         )
 
 
@@ -90,6 +337,23 @@ class WebhookConfig:
     host: Optional[str] = None
     path: str = "/webhook"
     url: Optional[str] = None
+    listen_host: str = "0.0.0.0"
+    listen_port: int = 8080
+    secret_token: Optional[str] = None
+    max_in_flight: int = 64
+    max_pending_per_chat: int = 8
+    max_connections: int = 40
+    drop_pending_updates: bool = False
+    
+    @property
+    def webhook_url(self) -> str:
+        if self.url:
+            return self.url
+        
+        if not self.host:
+            raise ValueError("WEBHOOK_URL or WEBHOOK_HOST is required in webhook mode")
+        
+        return f"{self.host.rstrip('/')}{self.path}"
     
     @classmethod
     def from_env(cls) -> "WebhookConfig":
@@ -104,29 +368,793 @@ class WebhookConfig:
             key="WEBHOOK_URL"
         )
         
+        listen_host = os.getenv(
+            key="WEBHOOK_LISTEN_HOST",
+            default="0.0.0.0"
+        )
+        
+        listen_port = int(
+            os.getenv(
+                key="WEBHOOK_LISTEN_PORT",
+                default="8080"
+            )
+        )
+        
+        secret_token = os.getenv(
+            key="WEBHOOK_SECRET_TOKEN"
+        )
+        
+        max_in_flight = int(
+            os.getenv(
+                key="WEBHOOK_MAX_IN_FLIGHT",
+                default="64"
+            )
+        )
+        
+        max_pending_per_chat = int(
+            os.getenv(
+                key="WEBHOOK_MAX_PENDING_PER_CHAT",
+                default="8"
+            )
+        )
+        
+        max_connections = int(
+            os.getenv(
+                key="WEBHOOK_MAX_CONNECTIONS",
+                default="40"
+            )
+        )
+        
+        drop_pending_updates = os.getenv(
+            key="WEBHOOK_DROP_PENDING_UPDATES",
+            default="false"
+        ).lower() in ("1", "true", "yes")
+        
         return cls(
             host=host,
             path=path,
-            url=url
+            url=url,
+            listen_host=listen_host,
+            listen_port=listen_port,
+            secret_token=secret_token,
+            max_in_flight=max_in_flight,
+            max_pending_per_chat=max_pending_per_chat,
+            max_connections=max_connections,
+            drop_pending_updates=drop_pending_updates
+        )
+
+
+@dataclass
+class WebAppConfig:
+    host: str = "0.0.0.0"
+    port: int = 8000
+    server_mode: str = "flask"
+    upload_queue_size: int = 100
+    upload_workers: int = 8
+    job_history_size: int = 1000
+    max_upload_bytes: int = 10 * 1024 * 1024
+    upload_spool_bytes: int = 1024 * 1024
+    export_token: str = ""
+    export_page_size: int = 2000
+    export_gzip_level: int = 5
+    
+    @classmethod
+    def from_env(cls) -> "WebAppConfig":
+        host = os.getenv(
+            key="WEBAPP_HOST",
+            default="0.0.0.0"
+        )
+        
+        port = int(
+            os.getenv(
+                key="WEBAPP_PORT",
+                default="8000"
+            )
+        )
+        
+        server_mode = os.getenv(
+            key="WEBAPP_SERVER_MODE",
+            default="flask"
+        ).lower()
+        if server_mode not in ("flask", "async"):
+            raise ValueError("WEBAPP_SERVER_MODE must be 'flask' or 'async'")
+        
+        upload_queue_size = int(
+            os.getenv(
+                key="WEBAPP_UPLOAD_QUEUE_SIZE",
+                default="100"
+            )
+        )
+        
+        upload_workers = int(
+            os.getenv(
+                key="WEBAPP_UPLOAD_WORKERS",
+                default="8"
+            )
+        )
+        
+        job_history_size = int(
+            os.getenv(
+                key="WEBAPP_JOB_HISTORY_SIZE",
+                default="1000"
+            )
+        )
+        
+        max_upload_bytes = int(
+            os.getenv(
+                key="WEBAPP_MAX_UPLOAD_BYTES",
+                default=str(10 * 1024 * 1024)
+            )
+        )
+        
+        upload_spool_bytes = int(
+            os.getenv(
+                key="WEBAPP_UPLOAD_SPOOL_BYTES",
+                default=str(1024 * 1024)
+            )
+        )
+        
+        export_token = os.getenv(
+            key="WEBAPP_EXPORT_TOKEN",
+            default=""
+        )
+        
+        export_page_size = int(
+            os.getenv(
+                key="WEBAPP_EXPORT_PAGE_SIZE",
+                default="2000"
+            )
+        )
+        
+        export_gzip_level = int(
+            os.getenv(
+                key="WEBAPP_EXPORT_GZIP_LEVEL",
+                default="5"
+            )
+        )
+        
+        return cls(
+            host=host,
+            port=port,
+            server_mode=server_mode,
+            upload_queue_size=upload_queue_size,
+            upload_workers=upload_workers,
+            job_history_size=job_history_size,
+            max_upload_bytes=max_upload_bytes,
+            upload_spool_bytes=upload_spool_bytes,
+            export_token=export_token,
+            export_page_size=export_page_size,
+            export_gzip_level=export_gzip_level
+        )
+
+
+@dataclass
+class TelegramClientConfig:
+    api_base_url: str = ""
+    pool_limit: int = 100
+    pool_limit_per_host: int = 0
+    keepalive_timeout: float = 30.0
+    connect_timeout: float = 5.0
+    request_timeout: int = 30
+    send_scheduler: bool = True
+    global_rate: float = 30.0
+    global_burst: int = 30
+    chat_rate: float = 1.0
+    chat_burst: int = 3
+    max_retries: int = 3
+    max_retry_after: float = 60.0
+    
+    @classmethod
+    def from_env(cls) -> "TelegramClientConfig":
+        api_base_url = os.getenv(
+            key="TELEGRAM_API_URL",
+            default=""
+        )
+        
+        pool_limit = int(
+            os.getenv(
+                key="TELEGRAM_POOL_LIMIT",
+                default="100"
+            )
+        )
+        
+        pool_limit_per_host = int(
+            os.getenv(
+                key="TELEGRAM_POOL_LIMIT_PER_HOST",
+                default="0"
+            )
+        )
+        
+        keepalive_timeout = float(
+            os.getenv(
+                key="TELEGRAM_KEEPALIVE_TIMEOUT",
+                default="30"
+            )
+        )
+        
+        connect_timeout = float(
+            os.getenv(
+                key="TELEGRAM_CONNECT_TIMEOUT",
+                default="5"
+            )
+        )
+        
+        request_timeout = int(
+            os.getenv(
+                key="TELEGRAM_REQUEST_TIMEOUT",
+                default="30"
+            )
+        )
+        
+        # Outgoing messages are paced to Telegram's flood limits: about 30 per
+        # second overall and about one per second per chat, with short bursts
+        send_scheduler = os.getenv(
+            key="TELEGRAM_SEND_SCHEDULER",
+            default="true"
+        ).lower() in ("1", "true", "yes")
+        
+        global_rate = float(
+            os.getenv(
+                key="TELEGRAM_GLOBAL_RATE",
+                default="30"
+            )
+        )
+        
+        global_burst = int(
+            os.getenv(
+                key="TELEGRAM_GLOBAL_BURST",
+                default="30"
+            )
+        )
+        
+        chat_rate = float(
+            os.getenv(
+                key="TELEGRAM_CHAT_RATE",
+                default="1.0"
+            )
+        )
+        
+        chat_burst = int(
+            os.getenv(
+                key="TELEGRAM_CHAT_BURST",
+                default="3"
+            )
+        )
+        
+        # A send that gets 429 waits out retry_after and is retried, unless
+        # Telegram asks for longer than max_retry_after
+        max_retries = int(
+            os.getenv(
+                key="TELEGRAM_MAX_RETRIES",
+                default="3"
+            )
+        )
+        
+        max_retry_after = float(
+            os.getenv(
+                key="TELEGRAM_MAX_RETRY_AFTER",
+                default="60"
+            )
+        )
+        
+        return cls(
+            api_base_url=api_base_url,
+            pool_limit=pool_limit,
+            pool_limit_per_host=pool_limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            connect_timeout=connect_timeout,
+            request_timeout=request_timeout,
+            send_scheduler=send_scheduler,
+            global_rate=global_rate,
+            global_burst=global_burst,
+            chat_rate=chat_rate,
+            chat_burst=chat_burst,
+            max_retries=max_retries,
+            max_retry_after=max_retry_after
+        )
+
+
+@dataclass
+class ImageConfig:
+    normalize: bool = True
+    max_edge: int = 1536
+    jpeg_quality: int = 85
+    workers: int = 2
+    
+    @classmethod
+    def from_env(cls) -> "ImageConfig":
+        normalize = os.getenv(
+            key="IMAGE_NORMALIZE",
+            default="true"
+        ).lower() in ("1", "true", "yes")
+        
+        max_edge = int(
+            os.getenv(
+                key="IMAGE_MAX_EDGE",
+                default="1536"
+            )
+        )
+        
+        jpeg_quality = int(
+            os.getenv(
+                key="IMAGE_JPEG_QUALITY",
+                default="85"
+            )
+        )
+        
+        workers = int(
+            os.getenv(
+                key="IMAGE_WORKERS",
+                default="2"
+            )
+        )
+        
+        return cls(
+            normalize=normalize,
+            max_edge=max_edge,
+            jpeg_quality=jpeg_quality,
+            workers=workers
+        )
+
+
+@dataclass
+class VisionCacheConfig:
+    enabled: bool = True
+    max_entries: int = 1024
+    ttl: float = 86400.0
+    path: str = ""
+    
+    @classmethod
+    def from_env(cls) -> "VisionCacheConfig":
+        enabled = os.getenv(
+            key="VISION_CACHE_ENABLED",
+            default="true"
+        ).lower() in ("1", "true", "yes")
+        
+        max_entries = int(
+            os.getenv(
+                key="VISION_CACHE_MAX_ENTRIES",
+                default="1024"
+            )
+        )
+        
+        ttl = float(
+            os.getenv(
+                key="VISION_CACHE_TTL",
+                default="86400"
+            )
+        )
+        
+        path = os.getenv(
+            key="VISION_CACHE_PATH",
+            default=""
+        )
+        
+        return cls(
+            enabled=enabled,
+            max_entries=max_entries,
+            ttl=ttl,
+            path=path
+        )
+
+
+@dataclass
+class AudioConfig:
+    max_bytes: int = 20 * 1024 * 1024
+    max_duration: int = 600
+    
+    @classmethod
+    def from_env(cls) -> "AudioConfig":
+        max_bytes = int(
+            os.getenv(
+                key="AUDIO_MAX_BYTES",
+                default=str(20 * 1024 * 1024)
+            )
+        )
+        
+        max_duration = int(
+            os.getenv(
+                key="AUDIO_MAX_DURATION",
+                default="600"
+            )
+        )
+        
+        return cls(
+            max_bytes=max_bytes,
+            max_duration=max_duration
+        )
+
+
+@dataclass
+class FSMStorageConfig:
+    path: str = ""
+    flush_interval: float = 0.5
+    max_pending: int = 500
+    cache_max_entries: int = 10000
+    
+    @classmethod
+    def from_env(cls) -> "FSMStorageConfig":
+        path = os.getenv(
+            key="FSM_STORAGE_PATH",
+            default=""
+        )
+        
+        flush_interval = float(
+            os.getenv(
+                key="FSM_FLUSH_INTERVAL",
+                default="0.5"
+            )
+        )
+        
+        max_pending = int(
+            os.getenv(
+                key="FSM_FLUSH_MAX_PENDING",
+                default="500"
+            )
+        )
+        
+        cache_max_entries = int(
+            os.getenv(
+                key="FSM_CACHE_MAX_ENTRIES",
+                default="10000"
+            )
+        )
+        
+        return cls(
+            path=path,
+            flush_interval=flush_interval,
+            max_pending=max_pending,
+            cache_max_entries=cache_max_entries
+        )
+
+
+@dataclass
+class ShardingConfig:
+    workers: int = 1
+    base_port: int = 8100
+    queue_size: int = 1000
+    
+    @classmethod
+    def from_env(cls) -> "ShardingConfig":
+        workers = int(
+            os.getenv(
+                key="BOT_WORKERS",
+                default="1"
+            )
+        )
+        
+        base_port = int(
+            os.getenv(
+                key="BOT_WORKER_BASE_PORT",
+                default="8100"
+            )
+        )
+        
+        queue_size = int(
+            os.getenv(
+                key="BOT_WORKER_QUEUE_SIZE",
+                default="1000"
+            )
+        )
+        
+        return cls(
+            workers=workers,
+            base_port=base_port,
+            queue_size=queue_size
+        )
+
+
+@dataclass
+class ReportStoreConfig:
+    path: str = str(BASE_DIR / "reports.sqlite3")
+    batch_interval: float = 0.005
+    max_batch: int = 500
+    draft_ttl: float = 604800.0
+    
+    @classmethod
+    def from_env(cls) -> "ReportStoreConfig":
+        path = os.getenv(
+            key="REPORT_STORE_PATH",
+            default=str(BASE_DIR / "reports.sqlite3")
+        )
+        
+        batch_interval = float(
+            os.getenv(
+                key="REPORT_STORE_BATCH_INTERVAL",
+                default="0.005"
+            )
+        )
+        
+        max_batch = int(
+            os.getenv(
+                key="REPORT_STORE_MAX_BATCH",
+                default="500"
+            )
+        )
+        
+        draft_ttl = float(
+            os.getenv(
+                key="REPORT_DRAFT_TTL",
+                default="604800"
+            )
+        )
+        
+        return cls(
+            path=path,
+            batch_interval=batch_interval,
+            max_batch=max_batch,
+            draft_ttl=draft_ttl
+        )
+
+
+@dataclass
+class SpatialIndexConfig:
+    cell_meters: float = 250.0
+    duplicate_radius: float = 75.0
+    duplicate_max_age: int = 604800
+    refresh_interval: float = 5.0
+    
+    @classmethod
+    def from_env(cls) -> "SpatialIndexConfig":
+        cell_meters = float(
+            os.getenv(
+                key="SPATIAL_CELL_METERS",
+                default="250"
+            )
+        )
+        
+        duplicate_radius = float(
+            os.getenv(
+                key="DUPLICATE_RADIUS_METERS",
+                default="75"
+            )
+        )
+        
+        duplicate_max_age = int(
+            os.getenv(
+                key="DUPLICATE_MAX_AGE",
+                default="604800"
+            )
+        )
+        
+        refresh_interval = float(
+            os.getenv(
+                key="SPATIAL_REFRESH_INTERVAL",
+                default="5"
+            )
+        )
+        
+        return cls(
+            cell_meters=cell_meters,
+            duplicate_radius=duplicate_radius,
+            duplicate_max_age=duplicate_max_age,
+            refresh_interval=refresh_interval
+        )
+
+
+@dataclass
+class MetricsConfig:
+    listen_host: str = "0.0.0.0"
+    listen_port: int = 0
+    
+    @classmethod
+    def from_env(cls) -> "MetricsConfig":
+        listen_host = os.getenv(
+            key="METRICS_HOST",
+            default="0.0.0.0"
+        )
+        
+        # 0 serves /metrics only from the HTTP servers the process already runs
+        listen_port = int(
+            os.getenv(
+                key="METRICS_PORT",
+                default="0"
+            )
+        )
+        
+        return cls(
+            listen_host=listen_host,
+            listen_port=listen_port
+        )
+
+
+@dataclass
+class TracingConfig:
+    export_path: str = ""
+    sample_rate: float = 1.0
+    service_name: str = "helpcy"
+    flush_interval: float = 1.0
+    max_pending: int = 4096
+    
+    @classmethod
+    def from_env(cls) -> "TracingConfig":
+        # Tracing is off unless spans have somewhere to go
+        export_path = os.getenv(
+            key="TRACE_EXPORT_PATH",
+            default=""
+        )
+        
+        sample_rate = float(
+            os.getenv(
+                key="TRACE_SAMPLE_RATE",
+                default="1.0"
+            )
+        )
+        
+        service_name = os.getenv(
+            key="TRACE_SERVICE_NAME",
+            default="helpcy"
+        )
+        
+        flush_interval = float(
+            os.getenv(
+                key="TRACE_FLUSH_INTERVAL",
+                default="1.0"
+            )
+        )
+        
+        max_pending = int(
+            os.getenv(
+                key="TRACE_MAX_PENDING",
+                default="4096"
+            )
+        )
+        
+        return cls(
+            export_path=export_path,
+            sample_rate=sample_rate,
+            service_name=service_name,
+            flush_interval=flush_interval,
+            max_pending=max_pending
+        )
+
+
+@dataclass
+class ThrottleConfig:
+    enabled: bool = True
+    user_rate: float = 2.0
+    user_burst: int = 10
+    ai_user_rate: float = 0.1
+    ai_user_burst: int = 3
+    global_rate: float = 50.0
+    global_burst: int = 100
+    ai_global_rate: float = 5.0
+    ai_global_burst: int = 20
+    
+    @classmethod
+    def from_env(cls) -> "ThrottleConfig":
+        enabled = os.getenv(
+            key="THROTTLE_ENABLED",
+            default="true"
+        ).lower() in ("1", "true", "yes")
+        
+        # Rates are tokens per second, bursts the bucket size; a rate of 0
+        # turns that bucket off. "AI" budgets cover photos and voice notes,
+        # which each cost an OpenAI call.
+        user_rate = float(
+            os.getenv(
+                key="THROTTLE_USER_RATE",
+                default="2.0"
+            )
+        )
+        
+        user_burst = int(
+            os.getenv(
+                key="THROTTLE_USER_BURST",
+                default="10"
+            )
+        )
+        
+        ai_user_rate = float(
+            os.getenv(
+                key="THROTTLE_AI_USER_RATE",
+                default="0.1"
+            )
+        )
+        
+        ai_user_burst = int(
+            os.getenv(
+                key="THROTTLE_AI_USER_BURST",
+                default="3"
+            )
+        )
+        
+        global_rate = float(
+            os.getenv(
+                key="THROTTLE_GLOBAL_RATE",
+                default="50.0"
+            )
+        )
+        
+        global_burst = int(
+            os.getenv(
+                key="THROTTLE_GLOBAL_BURST",
+                default="100"
+            )
+        )
+        
+        ai_global_rate = float(
+            os.getenv(
+                key="THROTTLE_AI_GLOBAL_RATE",
+                default="5.0"
+            )
+        )
+        
+        ai_global_burst = int(
+            os.getenv(
+                key="THROTTLE_AI_GLOBAL_BURST",
+                default="20"
+            )
+        )
+        
+        return cls(
+            enabled=enabled,
+            user_rate=user_rate,
+            user_burst=user_burst,
+            ai_user_rate=ai_user_rate,
+            ai_user_burst=ai_user_burst,
+            global_rate=global_rate,
+            global_burst=global_burst,
+            ai_global_rate=ai_global_rate,
+            ai_global_burst=ai_global_burst
         )
 
 
 @dataclass
 class Settings:
     bot: BotConfig
+    logging: LoggingConfig
     webhook: WebhookConfig
     openai: OpenAIConfig
+    webapp: WebAppConfig
+    telegram: TelegramClientConfig
+    image: ImageConfig
+    vision_cache: VisionCacheConfig
+    audio: AudioConfig
+    fsm: FSMStorageConfig
+    sharding: ShardingConfig
+    reports: ReportStoreConfig
+    spatial: SpatialIndexConfig
+    metrics: MetricsConfig
+    tracing: TracingConfig
+    throttle: ThrottleConfig
     
     @classmethod
     def load(cls) -> "Settings":
         bot_config = BotConfig.from_env()
+        logging_config = LoggingConfig.from_env()
         webhook_config = WebhookConfig.from_env()
         openai_config = OpenAIConfig.from_env()
+        webapp_config = WebAppConfig.from_env()
+        telegram_config = TelegramClientConfig.from_env()
+        image_config = ImageConfig.from_env()
+        vision_cache_config = VisionCacheConfig.from_env()
+        audio_config = AudioConfig.from_env()
+        fsm_config = FSMStorageConfig.from_env()
+        sharding_config = ShardingConfig.from_env()
+        report_store_config = ReportStoreConfig.from_env()
+        spatial_config = SpatialIndexConfig.from_env()
+        metrics_config = MetricsConfig.from_env()
+        tracing_config = TracingConfig.from_env()
+        throttle_config = ThrottleConfig.from_env()
         
         return cls(
             bot=bot_config,
+            logging=logging_config,
             webhook=webhook_config,
-            openai=openai_config
+            openai=openai_config,
+            webapp=webapp_config,
+            telegram=telegram_config,
+            image=image_config,
+            vision_cache=vision_cache_config,
+            audio=audio_config,
+            fsm=fsm_config,
+            sharding=sharding_config,
+            reports=report_store_config,
+            spatial=spatial_config,
+            metrics=metrics_config,
+            tracing=tracing_config,
+            throttle=throttle_config
         )
 
 
@@ -114,13 +114,16 @@ CATEGORIES: Dict[str, List[str]] = {
 
 
 def get_all_categories() -> List[str]:
-    return list(CATEGORIES.keys())
+    from src.models.taxonomy import get_taxonomy
+    
+    return get_taxonomy().category_names
 
 
 def get_subcategories_for_category(
     category: str
 ) -> List[str]:
-    return CATEGORIES.get(
-        category,
-        CATEGORIES["Other"]
+    from src.models.taxonomy import get_taxonomy
+    
+    return get_taxonomy().subcategories_for(
+        category=category
     )
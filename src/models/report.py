@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -12,3 +13,6 @@ class Report:
     description: str
     photo_file_id: Optional[str] = None
     audio_file_id: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    report_id: Optional[int] = None
+    duplicate_of: Optional[int] = None
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from src.models.categories import CATEGORIES
+
+
+FALLBACK_NAME = "Other"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_name(
+    name: str
+) -> str:
+    return _WHITESPACE.sub(" ", name).strip().casefold()
+
+
+def make_id(
+    name: str
+) -> str:
+    return hashlib.blake2s(
+        normalize_name(name).encode("utf-8"),
+        digest_size=4
+    ).hexdigest()
+
+
+@dataclass(frozen=True)
+class Subcategory:
+    id: str
+    name: str
+
+
+@dataclass(frozen=True)
+class TaxonomyCategory:
+    id: str
+    name: str
+    subcategories: Tuple[Subcategory, ...]
+    _by_id: Mapping[str, Subcategory] = field(repr=False, compare=False)
+    _by_key: Mapping[str, Subcategory] = field(repr=False, compare=False)
+    
+    @property
+    def subcategory_names(self) -> List[str]:
+        return [subcategory.name for subcategory in self.subcategories]
+    
+    @property
+    def fallback(self) -> Subcategory:
+        return self._by_key.get(normalize_name(FALLBACK_NAME), self.subcategories[0])
+    
+    def subcategory_by_id(
+        self,
+        subcategory_id: str
+    ) -> Optional[Subcategory]:
+        return self._by_id.get(subcategory_id)
+    
+    def find_subcategory(
+        self,
+        name: str
+    ) -> Optional[Subcategory]:
+        return self._by_key.get(normalize_name(name))
+
+
+@dataclass(frozen=True)
+class Taxonomy:
+    version: str
+    categories: Tuple[TaxonomyCategory, ...]
+    prompt_block: str
+    _by_id: Mapping[str, TaxonomyCategory] = field(repr=False, compare=False)
+    _by_key: Mapping[str, TaxonomyCategory] = field(repr=False, compare=False)
+    
+    @property
+    def category_names(self) -> List[str]:
+        return [category.name for category in self.categories]
+    
+    @property
+    def fallback(self) -> TaxonomyCategory:
+        return self._by_key.get(normalize_name(FALLBACK_NAME), self.categories[-1])
+    
+    def category_by_id(
+        self,
+        category_id: str
+    ) -> Optional[TaxonomyCategory]:
+        return self._by_id.get(category_id)
+    
+    def find_category(
+        self,
+        name: str
+    ) -> Optional[TaxonomyCategory]:
+        return self._by_key.get(normalize_name(name))
+    
+    def subcategories_for(
+        self,
+        category: str
+    ) -> List[str]:
+        return (self.find_category(category) or self.fallback).subcategory_names
+
+
+TaxonomySource = Mapping[str, Any]
+
+
+def _entry(
+    entry: Union[str, Mapping[str, Any]]
+) -> Tuple[str, str]:
+    if isinstance(entry, str):
+        return make_id(entry), entry
+    
+    return str(entry.get("id") or make_id(entry["name"])), entry["name"]
+
+
+def _compile_category(
+    name: str,
+    category_id: str,
+    entries: List[Union[str, Mapping[str, Any]]]
+) -> TaxonomyCategory:
+    subcategories = []
+    by_id: Dict[str, Subcategory] = {}
+    by_key: Dict[str, Subcategory] = {}
+    
+    for entry in entries:
+        subcategory_id, subcategory_name = _entry(entry)
+        subcategory = Subcategory(
+            id=subcategory_id,
+            name=subcategory_name
+        )
+        
+        if subcategory_id in by_id or normalize_name(subcategory_name) in by_key:
+            raise ValueError(f"Duplicate subcategory '{subcategory_name}' in category '{name}'")
+        
+        subcategories.append(subcategory)
+        by_id[subcategory_id] = subcategory
+        by_key[normalize_name(subcategory_name)] = subcategory
+    
+    if not subcategories:
+        raise ValueError(f"Category '{name}' has no subcategories")
+    
+    return TaxonomyCategory(
+        id=category_id,
+        name=name,
+        subcategories=tuple(subcategories),
+        _by_id=MappingProxyType(by_id),
+        _by_key=MappingProxyType(by_key)
+    )
+
+
+def compile_taxonomy(
+    source: TaxonomySource
+) -> Taxonomy:
+    categories = []
+    by_id: Dict[str, TaxonomyCategory] = {}
+    by_key: Dict[str, TaxonomyCategory] = {}
+    
+    for key, value in source.items():
+        if isinstance(value, Mapping):
+            category_id, name = str(value.get("id") or make_id(key)), key
+            entries = value["subcategories"]
+        else:
+            category_id, name = make_id(key), key
+            entries = value
+        
+        category = _compile_category(
+            name=name,
+            category_id=category_id,
+            entries=entries
+        )
+        
+        if category.id in by_id or normalize_name(name) in by_key:
+            raise ValueError(f"Duplicate category '{name}'")
+        
+        categories.append(category)
+        by_id[category.id] = category
+        by_key[normalize_name(name)] = category
+    
+    if not categories:
+        raise ValueError("Taxonomy has no categories")
+    
+    if normalize_name(FALLBACK_NAME) not in by_key:
+        # Failed analyses are filed under "Other / Other"; without it they would
+        # land in a real category and look like a classification
+        category = _compile_category(
+            name=FALLBACK_NAME,
+            category_id=make_id(FALLBACK_NAME),
+            entries=[FALLBACK_NAME]
+        )
+        categories.append(category)
+        by_id[category.id] = category
+        by_key[normalize_name(FALLBACK_NAME)] = category
+    
+    prompt_block = "\n".join(
+        f"- {category.name}: [{', '.join(category.subcategory_names)}]"
+        for category in categories
+    )
+    version = hashlib.sha256(
+        json.dumps(
+            [[category.id, category.name, [[s.id, s.name] for s in category.subcategories]] for category in categories]
+        ).encode("utf-8")
+    ).hexdigest()[:12]
+    
+    return Taxonomy(
+        version=version,
+        categories=tuple(categories),
+        prompt_block=prompt_block,
+        _by_id=MappingProxyType(by_id),
+        _by_key=MappingProxyType(by_key)
+    )
+
+
+def load_taxonomy_source(
+    path: Union[str, Path]
+) -> TaxonomySource:
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError("PyYAML is required to load a YAML taxonomy") from e
+        
+        return yaml.safe_load(text)
+    
+    return json.loads(text)
+
+
+_current: Optional[Taxonomy] = None
+
+
+def get_taxonomy() -> Taxonomy:
+    taxonomy = _current
+    
+    if taxonomy is None:
+        taxonomy = reload_taxonomy()
+    
+    return taxonomy
+
+
+def reload_taxonomy(
+    path: Optional[Union[str, Path]] = None
+) -> Taxonomy:
+    global _current
+    
+    if path is None:
+        from src.config.settings import settings
+        
+        path = settings.bot.taxonomy_path
+    
+    source = load_taxonomy_source(path) if path else CATEGORIES
+    taxonomy = compile_taxonomy(source)
+    _current = taxonomy
+    
+    return taxonomy
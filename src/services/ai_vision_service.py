@@ -1,38 +1,28 @@
+import base64
+import hashlib
 import json
 import logging
-from typing import Dict, Optional
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from openai import AsyncOpenAI
 
-from src.models.categories import CATEGORIES, get_all_categories, get_subcategories_for_category
-from src.config.settings import settings
+from src.models.taxonomy import Taxonomy, get_taxonomy
+from src.config.settings import settings, OpenAIConfig
+from src.services.hedging import Hedger
+from src.services.metrics import OPENAI_TOKENS, observe_dependency
+from src.services.openai_guard import OpenAIGuard, OpenAIUnavailable
+from src.services.openai_pool import OpenAIConnectionPool
+from src.services.tracing import TRACER, SPAN_KIND_CLIENT
+from src.services.vision_cache import VisionCache
 
 
 logger = logging.getLogger(__name__)
 
 
-class AIVisionService:
-    
-    def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=settings.openai.api_key
-        )
-        self.model = settings.openai.model
-        self.max_tokens = settings.openai.max_tokens
-        self.temperature = settings.openai.temperature
-        self.whisper_model = "whisper-1"
-    
-    def _build_system_prompt(self) -> str:
-        categories_info = []
-        for category, subcategories in CATEGORIES.items():
-            subcats_str = ", ".join(subcategories)
-            categories_info.append(
-                f"- {category}: [{subcats_str}]"
-            )
-        
-        categories_list = "\n".join(categories_info)
-        
-        system_prompt = f"""You are an AI assistant that analyzes photos of municipal infrastructure problems.
+SYSTEM_PROMPT_TEMPLATE = """You are an AI assistant that analyzes photos of municipal infrastructure problems.
 
 Your task is to:
 1. Analyze the photo and identify the main problem
@@ -50,141 +40,365 @@ You must respond with a JSON object containing:
 
 If you're unsure, use "Other" as the category or subcategory.
 Focus on infrastructure, roads, utilities, and public facilities issues."""
+
+
+# Appended to fallback descriptions so the user knows to pick the category
+FAILED_NOTE = "AI analysis failed, please review manually."
+UNAVAILABLE_NOTE = "AI analysis is unavailable right now, please choose the category manually."
+
+
+@dataclass
+class VisionUsageStats:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    
+    def record(
+        self,
+        usage: Any
+    ) -> None:
+        self.requests += 1
+        
+        if usage:
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_tokens_avg": round(self.prompt_tokens / self.requests, 1) if self.requests else 0.0
+        }
+
+
+class AIVisionService:
+    
+    def __init__(
+        self,
+        cache: Optional[VisionCache] = None,
+        config: Optional[OpenAIConfig] = None
+    ):
+        config = config or settings.openai
         
-        return system_prompt
+        self.pool = OpenAIConnectionPool(
+            config=config
+        )
+        self.client = AsyncOpenAI(
+            api_key=config.api_key,
+            base_url=config.base_url or None,
+            timeout=config.timeout,
+            http_client=self.pool.create_http_client()
+        )
+        self.model = config.model
+        self.max_tokens = config.max_tokens
+        self.temperature = config.temperature
+        self.whisper_model = "whisper-1"
+        self.vision_detail = config.vision_detail
+        self.usage = VisionUsageStats()
+        self.guard = OpenAIGuard(
+            config=config
+        )
+        self.hedger = Hedger(
+            config=config
+        )
+        self.cache = cache
+        self._prompt: Optional[Tuple[Taxonomy, str, str]] = None
+    
+    async def close(
+        self
+    ) -> None:
+        await self.client.close()
+        
+        logger.info(
+            msg=f"OpenAI client closed after {self.pool.stats.requests} requests"
+        )
+    
+    @asynccontextmanager
+    async def _openai_call(
+        self,
+        operation: str,
+        model: str
+    ) -> AsyncIterator[None]:
+        # Client span for one OpenAI request, queueing included; the latency
+        # histogram only covers the request itself
+        with TRACER.span(
+            name=f"openai.{operation}",
+            kind=SPAN_KIND_CLIENT,
+            attributes={"openai.model": model}
+        ):
+            async with self.guard.call():
+                with observe_dependency(
+                    dependency="openai",
+                    operation=operation
+                ):
+                    yield
+    
+    def _system_prompt(self) -> Tuple[str, str]:
+        taxonomy = get_taxonomy()
+        
+        if self._prompt is None or self._prompt[0] is not taxonomy:
+            prompt = SYSTEM_PROMPT_TEMPLATE.format(
+                categories_list=taxonomy.prompt_block
+            )
+            version = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+            self._prompt = (taxonomy, prompt, version)
+        
+        return self._prompt[1], self._prompt[2]
+    
+    @property
+    def prompt_version(self) -> str:
+        return self._system_prompt()[1]
     
     def _validate_response(
         self,
         category: str,
         subcategory: str
     ) -> tuple[str, str]:
-        if category not in CATEGORIES:
+        taxonomy = get_taxonomy()
+        
+        matched_category = taxonomy.find_category(str(category))
+        if not matched_category:
             logger.warning(
-                msg=f"Invalid category '{category}', defaulting to 'Other'"
+                msg=f"Invalid category '{category}', defaulting to '{taxonomy.fallback.name}'"
             )
-            category = "Other"
+            matched_category = taxonomy.fallback
         
-        valid_subcategories = CATEGORIES[category]
-        if subcategory not in valid_subcategories:
+        matched_subcategory = matched_category.find_subcategory(str(subcategory))
+        if not matched_subcategory:
             logger.warning(
-                msg=f"Invalid subcategory '{subcategory}' for category '{category}', defaulting to 'Other'"
+                msg=f"Invalid subcategory '{subcategory}' for category '{matched_category.name}', defaulting to '{matched_category.fallback.name}'"
             )
-            subcategory = "Other" if "Other" in valid_subcategories else valid_subcategories[0]
+            matched_subcategory = matched_category.fallback
         
-        return category, subcategory
+        return matched_category.name, matched_subcategory.name
     
-    async def analyze_problem_photo(
+    async def _vision_completion(
         self,
-        photo_url: str
-    ) -> Dict[str, str]:
-        try:
-            system_prompt = self._build_system_prompt()
-            
-            logger.info(
-                msg=f"Analyzing photo with OpenAI Vision: {photo_url}"
-            )
-            
-            response = await self.client.chat.completions.create(
+        messages: List[Dict[str, Any]]
+    ) -> Any:
+        async with self._openai_call(
+            operation="vision",
+            model=self.model
+        ):
+            return await self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Analyze this photo and identify the municipal problem. Respond with JSON containing category, subcategory, and description."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": photo_url,
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
+                messages=messages,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
                 response_format={
                     "type": "json_object"
                 }
             )
+    
+    async def _request_photo_analysis(
+        self,
+        photo_url: str
+    ) -> Tuple[Dict[str, str], int]:
+        system_prompt, _ = self._system_prompt()
+        
+        logger.info(
+            msg=f"Analyzing photo with OpenAI Vision: {photo_url[:64]}"
+        )
+        
+        messages = [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": "Analyze this photo and identify the municipal problem. Respond with JSON containing category, subcategory, and description."
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": photo_url,
+                            "detail": self.vision_detail
+                        }
+                    }
+                ]
+            }
+        ]
+        
+        # Identical requests, so a hedge can stand in for a slow first attempt
+        response = await self.hedger.run(
+            call=lambda: self._vision_completion(
+                messages=messages
+            )
+        )
+        
+        self.usage.record(
+            usage=response.usage
+        )
+        self._count_tokens(
+            usage=response.usage
+        )
+        tokens = response.usage.total_tokens if response.usage else 0
+        
+        content = response.choices[0].message.content
+        
+        if not content:
+            raise ValueError("Empty response from OpenAI")
+        
+        logger.debug(
+            msg=f"OpenAI response: {content}"
+        )
+        
+        result = json.loads(content)
+        
+        category = result.get(
+            "category",
+            "Other"
+        )
+        subcategory = result.get(
+            "subcategory",
+            "Other"
+        )
+        description = result.get(
+            "description",
+            "Infrastructure issue detected"
+        )
+        
+        category, subcategory = self._validate_response(
+            category=category,
+            subcategory=subcategory
+        )
+        
+        logger.info(
+            msg=f"AI analysis result: {category} -> {subcategory}"
+        )
+        
+        return {
+            "category": category,
+            "subcategory": subcategory,
+            "description": description
+        }, tokens
+    
+    def _count_tokens(
+        self,
+        usage: Any
+    ) -> None:
+        if usage:
+            OPENAI_TOKENS.labels(self.model, "prompt").inc(usage.prompt_tokens)
+            OPENAI_TOKENS.labels(self.model, "completion").inc(usage.completion_tokens)
+    
+    def _photo_fallback(
+        self,
+        note: str = FAILED_NOTE
+    ) -> Dict[str, str]:
+        fallback = get_taxonomy().fallback
+        
+        return {
+            "category": fallback.name,
+            "subcategory": fallback.fallback.name,
+            "description": f"Infrastructure issue detected. {note}"
+        }
+    
+    async def analyze_problem_photo(
+        self,
+        photo_url: str
+    ) -> Dict[str, str]:
+        try:
+            result, _ = await self._request_photo_analysis(
+                photo_url=photo_url
+            )
             
-            content = response.choices[0].message.content
-            
-            if not content:
-                raise ValueError("Empty response from OpenAI")
+            return result
             
-            logger.debug(
-                msg=f"OpenAI response: {content}"
+        except OpenAIUnavailable as e:
+            logger.warning(
+                msg=f"Skipping photo analysis: {e}"
             )
             
-            result = json.loads(content)
+            return self._photo_fallback(
+                note=UNAVAILABLE_NOTE
+            )
+        except Exception as e:
+            logger.error(
+                msg=f"Error analyzing photo with OpenAI: {e}",
+                exc_info=True
+            )
             
-            category = result.get(
-                "category",
-                "Other"
+            return self._photo_fallback()
+    
+    async def analyze_problem_image(
+        self,
+        image: bytes,
+        content_type: str = "image/jpeg"
+    ) -> Dict[str, str]:
+        cache_key = None
+        
+        if self.cache:
+            cache_key = self.cache.make_key(
+                image=image,
+                model=self.model,
+                prompt_version=self.prompt_version
             )
-            subcategory = result.get(
-                "subcategory",
-                "Other"
+            cached = await self.cache.get(
+                key=cache_key
             )
-            description = result.get(
-                "description",
-                "Infrastructure issue detected"
+            if cached:
+                TRACER.current_span().set_attribute("vision.cache_hit", True)
+                logger.info(
+                    msg=f"Vision cache hit: {cached['category']} -> {cached['subcategory']}"
+                )
+                return cached
+        
+        encoded = base64.b64encode(image).decode("ascii")
+        started = time.perf_counter()
+        
+        try:
+            result, tokens = await self._request_photo_analysis(
+                photo_url=f"data:{content_type};base64,{encoded}"
             )
-            
-            category, subcategory = self._validate_response(
-                category=category,
-                subcategory=subcategory
+        except OpenAIUnavailable as e:
+            logger.warning(
+                msg=f"Skipping photo analysis: {e}"
             )
             
-            logger.info(
-                msg=f"AI analysis result: {category} -> {subcategory}"
+            return self._photo_fallback(
+                note=UNAVAILABLE_NOTE
             )
-            
-            return {
-                "category": category,
-                "subcategory": subcategory,
-                "description": description
-            }
-            
         except Exception as e:
             logger.error(
                 msg=f"Error analyzing photo with OpenAI: {e}",
                 exc_info=True
             )
             
-            fallback_category = "Other"
-            fallback_subcategories = get_subcategories_for_category(
-                category=fallback_category
+            return self._photo_fallback()
+        
+        if cache_key:
+            await self.cache.put(
+                key=cache_key,
+                result=result,
+                latency=time.perf_counter() - started,
+                tokens=tokens
             )
-            
-            return {
-                "category": fallback_category,
-                "subcategory": fallback_subcategories[0],
-                "description": "Infrastructure issue detected. AI analysis failed, please review manually."
-            }
+        
+        return result
     
     async def analyze_problem_audio(
         self,
-        audio_file_path: str
+        audio: bytes,
+        filename: str = "voice.ogg"
     ) -> Dict[str, str]:
         try:
             logger.info(
-                msg=f"Transcribing audio with OpenAI Whisper: {audio_file_path}"
+                msg=f"Transcribing audio with OpenAI Whisper: {filename} ({len(audio)} bytes)"
             )
             
-            # Transcribe audio using Whisper
-            with open(audio_file_path, "rb") as audio_file:
+            # Transcribe audio using Whisper, uploading the in-memory bytes as a named file
+            async with self._openai_call(
+                operation="transcription",
+                model=self.whisper_model
+            ):
                 transcript = await self.client.audio.transcriptions.create(
                     model=self.whisper_model,
-                    file=audio_file,
+                    file=(filename, audio),
                     language="en"
                 )
             
@@ -198,29 +412,37 @@ Focus on infrastructure, roads, utilities, and public facilities issues."""
             )
             
             # Analyze the transcribed text to determine category/subcategory
-            system_prompt = self._build_system_prompt()
+            system_prompt, _ = self._system_prompt()
             
             logger.info(
                 msg="Analyzing transcribed text with GPT"
             )
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": f"A person reported the following problem via voice message:\n\n\"{transcribed_text}\"\n\nAnalyze this report and respond with JSON containing category, subcategory, and a clear description of the problem."
+            async with self._openai_call(
+                operation="classify_transcript",
+                model=self.model
+            ):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": system_prompt
+                        },
+                        {
+                            "role": "user",
+                            "content": f"A person reported the following problem via voice message:\n\n\"{transcribed_text}\"\n\nAnalyze this report and respond with JSON containing category, subcategory, and a clear description of the problem."
+                        }
+                    ],
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    response_format={
+                        "type": "json_object"
                     }
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                response_format={
-                    "type": "json_object"
-                }
+                )
+            
+            self._count_tokens(
+                usage=response.usage
             )
             
             content = response.choices[0].message.content
@@ -263,20 +485,31 @@ Focus on infrastructure, roads, utilities, and public facilities issues."""
                 "transcription": transcribed_text
             }
             
+        except OpenAIUnavailable as e:
+            logger.warning(
+                msg=f"Skipping audio analysis: {e}"
+            )
+            
+            return self._audio_fallback(
+                note=UNAVAILABLE_NOTE
+            )
         except Exception as e:
             logger.error(
                 msg=f"Error analyzing audio with OpenAI: {e}",
                 exc_info=True
             )
             
-            fallback_category = "Other"
-            fallback_subcategories = get_subcategories_for_category(
-                category=fallback_category
-            )
-            
-            return {
-                "category": fallback_category,
-                "subcategory": fallback_subcategories[0],
-                "description": "Audio issue reported. AI analysis failed, please review manually.",
-                "transcription": ""
-            }
\ No newline at end of file
+            return self._audio_fallback()
+    
+    def _audio_fallback(
+        self,
+        note: str = FAILED_NOTE
+    ) -> Dict[str, str]:
+        fallback = get_taxonomy().fallback
+        
+        return {
+            "category": fallback.name,
+            "subcategory": fallback.fallback.name,
+            "description": f"Audio issue reported. {note}",
+            "transcription": ""
+        }
\ No newline at end of file
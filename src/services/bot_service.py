@@ -1,11 +1,28 @@
+import asyncio
+from typing import Optional
+
+from aiohttp import web
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.webhook.aiohttp_server import setup_application
 
 from src.config.settings import settings
+from src.models.taxonomy import reload_taxonomy
+from src.services.ai_vision_service import AIVisionService
+from src.services.fsm_storage import create_fsm_storage
+from src.services.metrics import handle_metrics, start_metrics_server
+from src.services.report_repository import ReportRepository
+from src.services.spatial_index import SpatialIndex
+from src.services.telegram_session import PooledTelegramSession
+from src.services.throttle import Throttle
+from src.services.tracing import TRACER
+from src.services.webhook import BoundedRequestHandler
 from src.bot.handlers import start
 from src.bot.middleware.logging import LoggingMiddleware
 from src.bot.middleware.error import ErrorHandlerMiddleware
+from src.bot.middleware.metrics import MetricsMiddleware
+from src.bot.middleware.throttling import ThrottlingMiddleware
 from src.bot.utils.logger import setup_logger
 
 
@@ -24,12 +41,24 @@ class BotService:
         self.token = token
         self.bot = None
         self.dispatcher = None
+        self.ai_service = None
+        self.report_repository: Optional[ReportRepository] = None
+        self.spatial_index: Optional[SpatialIndex] = None
+        self.throttle: Optional[Throttle] = None
+        self.webhook_handler: Optional[BoundedRequestHandler] = None
+        
+        self._webhook_runner: Optional[web.AppRunner] = None
+        self._metrics_runner: Optional[web.AppRunner] = None
+        self._stopped: Optional[asyncio.Event] = None
     
     def _create_bot(
         self
     ) -> Bot:
         bot = Bot(
             token=self.token,
+            session=PooledTelegramSession(
+                config=settings.telegram
+            ),
             default=DefaultBotProperties(
                 parse_mode=ParseMode.HTML
             )
@@ -44,11 +73,30 @@ class BotService:
     def _create_dispatcher(
         self
     ) -> Dispatcher:
-        from aiogram.fsm.storage.memory import MemoryStorage
-        
-        storage = MemoryStorage()
+        storage = create_fsm_storage(
+            config=settings.fsm
+        )
         dispatcher = Dispatcher(
-            storage=storage
+            storage=storage,
+            ai_service=self.ai_service,
+            report_repository=self.report_repository,
+            spatial_index=self.spatial_index
+        )
+        dispatcher.startup.register(
+            callback=self._load_spatial_index
+        )
+        
+        # Outermost, so handler time includes the other middlewares and
+        # errors are counted before ErrorHandlerMiddleware re-raises them
+        dispatcher.message.middleware(
+            middleware=MetricsMiddleware(
+                update_type="message"
+            )
+        )
+        dispatcher.callback_query.middleware(
+            middleware=MetricsMiddleware(
+                update_type="callback_query"
+            )
         )
         
         dispatcher.message.middleware(
@@ -65,6 +113,22 @@ class BotService:
             middleware=LoggingMiddleware()
         )
         
+        # After logging, so rejected updates still show up in the log; one
+        # Throttle for both, so a user's budget covers messages and taps
+        self.throttle = Throttle(
+            config=settings.throttle
+        )
+        dispatcher.message.middleware(
+            middleware=ThrottlingMiddleware(
+                throttle=self.throttle
+            )
+        )
+        dispatcher.callback_query.middleware(
+            middleware=ThrottlingMiddleware(
+                throttle=self.throttle
+            )
+        )
+        
         dispatcher.include_router(
             router=start.router
         )
@@ -75,6 +139,18 @@ class BotService:
         
         return dispatcher
     
+    async def _load_spatial_index(
+        self
+    ) -> None:
+        loaded = await self.spatial_index.refresh(
+            repository=self.report_repository,
+            force=True
+        )
+        
+        logger.info(
+            msg=f"Spatial index loaded with {loaded} reports"
+        )
+    
     def build(
         self
     ) -> tuple[Bot, Dispatcher]:
@@ -82,7 +158,20 @@ class BotService:
             msg="Building bot application..."
         )
         
+        taxonomy = reload_taxonomy()
+        
+        logger.info(
+            msg=f"Category taxonomy {taxonomy.version} compiled ({len(taxonomy.categories)} categories)"
+        )
+        
         self.bot = self._create_bot()
+        self.ai_service = AIVisionService()
+        self.report_repository = ReportRepository(
+            config=settings.reports
+        )
+        self.spatial_index = SpatialIndex(
+            config=settings.spatial
+        )
         self.dispatcher = self._create_dispatcher()
         
         logger.info(
@@ -97,13 +186,108 @@ class BotService:
         if not self.bot or not self.dispatcher:
             self.build()
         
+        allowed_updates = self.dispatcher.resolve_used_update_types()
+        
+        if settings.bot.update_mode == "webhook":
+            await self._start_webhook(
+                allowed_updates=allowed_updates
+            )
+            return
+        
+        if settings.metrics.listen_port:
+            self._metrics_runner = await start_metrics_server(
+                host=settings.metrics.listen_host,
+                port=settings.metrics.listen_port
+            )
+        
         logger.info(
-            msg="Starting bot..."
+            msg=f"Starting bot with long polling for {allowed_updates}..."
         )
         
         await self.dispatcher.start_polling(
-            self.bot
+            self.bot,
+            allowed_updates=allowed_updates
+        )
+    
+    async def serve_updates(
+        self,
+        host: str,
+        port: int,
+        path: str,
+        secret_token: Optional[str] = None
+    ) -> None:
+        if not self.bot or not self.dispatcher:
+            self.build()
+        
+        self.webhook_handler = BoundedRequestHandler(
+            dispatcher=self.dispatcher,
+            bot=self.bot,
+            max_in_flight=settings.webhook.max_in_flight,
+            max_pending_per_chat=settings.webhook.max_pending_per_chat,
+            secret_token=secret_token
+        )
+        
+        app = web.Application()
+        self.webhook_handler.register(
+            app,
+            path=path
+        )
+        app.router.add_get(
+            path="/stats",
+            handler=self.webhook_handler.handle_stats
+        )
+        app.router.add_get(
+            path="/metrics",
+            handler=handle_metrics
+        )
+        setup_application(
+            app,
+            self.dispatcher,
+            bot=self.bot
+        )
+        
+        self._webhook_runner = web.AppRunner(app)
+        await self._webhook_runner.setup()
+        await web.TCPSite(
+            runner=self._webhook_runner,
+            host=host,
+            port=port
+        ).start()
+        
+        self._stopped = asyncio.Event()
+    
+    async def wait_stopped(
+        self
+    ) -> None:
+        if self._stopped:
+            await self._stopped.wait()
+    
+    async def _start_webhook(
+        self,
+        allowed_updates: list[str]
+    ) -> None:
+        config = settings.webhook
+        
+        await self.serve_updates(
+            host=config.listen_host,
+            port=config.listen_port,
+            path=config.path,
+            secret_token=config.secret_token
+        )
+        
+        await self.bot.set_webhook(
+            url=config.webhook_url,
+            secret_token=config.secret_token,
+            allowed_updates=allowed_updates,
+            max_connections=config.max_connections,
+            drop_pending_updates=config.drop_pending_updates
+        )
+        
+        logger.info(
+            msg=f"Webhook {config.webhook_url} registered for {allowed_updates}, listening on {config.listen_host}:{config.listen_port}{config.path} with at most {config.max_in_flight} updates in flight"
         )
+        
+        await self.wait_stopped()
     
     async def stop(
         self
@@ -115,8 +299,27 @@ class BotService:
             msg="Stopping bot..."
         )
         
+        if self._stopped:
+            self._stopped.set()
+        
+        if self._webhook_runner:
+            await self._webhook_runner.cleanup()
+            self._webhook_runner = None
+        
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+            self._metrics_runner = None
+        
         await self.bot.session.close()
         
+        if self.ai_service:
+            await self.ai_service.close()
+        
+        if self.report_repository:
+            await self.report_repository.close()
+        
+        TRACER.flush()
+        
         logger.info(
             msg="Bot stopped successfully"
         )
@@ -0,0 +1,364 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.config.settings import settings, FSMStorageConfig
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+@dataclass
+class FSMRecord:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FSMStorageStats:
+    reads: int = 0
+    cache_misses: int = 0
+    writes: int = 0
+    flushes: int = 0
+    rows_flushed: int = 0
+    flush_errors: int = 0
+    total_flush: float = 0.0
+    max_flush: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reads": self.reads,
+            "cache_hits": self.reads - self.cache_misses,
+            "cache_misses": self.cache_misses,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "writes_per_row": round(self.writes / self.rows_flushed, 2) if self.rows_flushed else 0.0,
+            "flush_errors": self.flush_errors,
+            "flush_avg_ms": round(self.total_flush / self.flushes * 1000, 2) if self.flushes else 0.0,
+            "flush_max_ms": round(self.max_flush * 1000, 2)
+        }
+
+
+class SQLiteStorage(BaseStorage):
+    
+    def __init__(
+        self,
+        config: Optional[FSMStorageConfig] = None
+    ):
+        self.config = config or settings.fsm
+        self.stats = FSMStorageStats()
+        
+        self._records: "OrderedDict[str, FSMRecord]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._flushing: Set[str] = set()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        
+        self._db: Optional[sqlite3.Connection] = sqlite3.connect(
+            database=self.config.path,
+            check_same_thread=False
+        )
+        self._db_lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fsm_state ("
+            "key TEXT PRIMARY KEY, state TEXT, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        
+        logger.info(
+            msg=f"FSM storage at {self.config.path}, flushing every {self.config.flush_interval}s"
+        )
+    
+    @staticmethod
+    def make_key(
+        key: StorageKey
+    ) -> str:
+        return ":".join(
+            str(part) if part is not None else ""
+            for part in (key.bot_id, key.chat_id, key.user_id, key.thread_id, key.business_connection_id, key.destiny)
+        )
+    
+    async def _record(
+        self,
+        key: StorageKey
+    ) -> Tuple[str, FSMRecord]:
+        storage_key = self.make_key(key)
+        record = self._records.get(storage_key)
+        self.stats.reads += 1
+        
+        if record is None:
+            self.stats.cache_misses += 1
+            loaded = await asyncio.to_thread(self._load, storage_key)
+            
+            # Another coroutine may have cached (and changed) it meanwhile
+            record = self._records.setdefault(storage_key, loaded)
+            self._evict()
+        
+        self._records.move_to_end(storage_key)
+        
+        return storage_key, record
+    
+    async def _changed(
+        self,
+        storage_key: str
+    ) -> None:
+        self.stats.writes += 1
+        self._dirty.add(storage_key)
+        
+        if self.config.flush_interval <= 0:
+            await self.flush()
+            return
+        
+        if self._flush_task is None:
+            self._wake = asyncio.Event()
+            self._flush_task = asyncio.create_task(
+                self._flush_loop(),
+                name="fsm-storage-flush"
+            )
+        
+        if len(self._dirty) >= self.config.max_pending:
+            self._wake.set()
+    
+    async def set_state(
+        self,
+        key: StorageKey,
+        state: StateType = None
+    ) -> None:
+        storage_key, record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        
+        await self._changed(storage_key)
+    
+    async def get_state(
+        self,
+        key: StorageKey
+    ) -> Optional[str]:
+        _, record = await self._record(key)
+        
+        return record.state
+    
+    async def set_data(
+        self,
+        key: StorageKey,
+        data: Dict[str, Any]
+    ) -> None:
+        storage_key, record = await self._record(key)
+        record.data = data.copy()
+        
+        await self._changed(storage_key)
+    
+    async def get_data(
+        self,
+        key: StorageKey
+    ) -> Dict[str, Any]:
+        _, record = await self._record(key)
+        
+        return record.data.copy()
+    
+    async def update_data(
+        self,
+        key: StorageKey,
+        data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        storage_key, record = await self._record(key)
+        record.data.update(data)
+        
+        await self._changed(storage_key)
+        
+        return record.data.copy()
+    
+    async def _flush_loop(
+        self
+    ) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(),
+                    timeout=self.config.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            
+            self._wake.clear()
+            await self.flush()
+    
+    async def flush(
+        self
+    ) -> None:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            
+            keys, self._dirty = self._dirty, set()
+            self._flushing = keys
+            now = time.time()
+            rows: List[Tuple[str, Optional[str], str, float]] = []
+            deleted: List[Tuple[str]] = []
+            unserializable: Set[str] = set()
+            
+            for storage_key in keys:
+                record = self._records[storage_key]
+                
+                if record.state is None and not record.data:
+                    deleted.append((storage_key,))
+                    continue
+                
+                try:
+                    data = json.dumps(record.data)
+                except (TypeError, ValueError) as e:
+                    # Stays dirty, so a later set_data can still make it
+                    # writable, and the other records are written regardless
+                    unserializable.add(storage_key)
+                    logger.error(
+                        msg=f"FSM record {storage_key} is not JSON serializable, will retry: {e}"
+                    )
+                    continue
+                
+                rows.append((storage_key, record.state, data, now))
+            
+            if unserializable:
+                self._dirty |= unserializable
+                self.stats.flush_errors += 1
+            
+            started = time.perf_counter()
+            
+            try:
+                await asyncio.to_thread(self._write, rows, deleted)
+            except BaseException as e:
+                # Also on cancellation: the write may not have landed, so the
+                # keys go back to the next flush
+                self._dirty |= keys
+                self._flushing = set()
+                
+                if not isinstance(e, Exception):
+                    raise
+                
+                self.stats.flush_errors += 1
+                
+                logger.error(
+                    msg=f"FSM storage flush of {len(keys)} records failed, will retry: {e}"
+                )
+                return
+            
+            elapsed = time.perf_counter() - started
+            self._flushing = set()
+            self.stats.flushes += 1
+            self.stats.rows_flushed += len(rows) + len(deleted)
+            self.stats.total_flush += elapsed
+            self.stats.max_flush = max(self.stats.max_flush, elapsed)
+            
+            self._evict()
+    
+    def _evict(
+        self
+    ) -> None:
+        # Records not yet on disk stay cached, or a reload would be stale
+        excess = len(self._records) - self.config.cache_max_entries
+        
+        if excess <= 0:
+            return
+        
+        for storage_key in list(self._records):
+            if storage_key not in self._dirty and storage_key not in self._flushing:
+                del self._records[storage_key]
+                excess -= 1
+                
+                if not excess:
+                    break
+    
+    def _load(
+        self,
+        storage_key: str
+    ) -> FSMRecord:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT state, data FROM fsm_state WHERE key = ?",
+                (storage_key,)
+            ).fetchone()
+        
+        if not row:
+            return FSMRecord()
+        
+        return FSMRecord(
+            state=row[0],
+            data=json.loads(row[1])
+        )
+    
+    def _write(
+        self,
+        rows: List[Tuple[str, Optional[str], str, float]],
+        deleted: List[Tuple[str]]
+    ) -> None:
+        with self._db_lock:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO fsm_state (key, state, data, updated_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._db.executemany(
+                    "DELETE FROM fsm_state WHERE key = ?",
+                    deleted
+                )
+    
+    async def close(
+        self
+    ) -> None:
+        if self._db is None:
+            return
+        
+        if self._flush_task:
+            if self._flush_lock is None:
+                self._flush_lock = asyncio.Lock()
+            
+            # Let a flush that is already writing finish instead of cancelling it
+            async with self._flush_lock:
+                self._flush_task.cancel()
+            
+            await asyncio.gather(
+                self._flush_task,
+                return_exceptions=True
+            )
+            self._flush_task = None
+        
+        await self.flush()
+        
+        with self._db_lock:
+            self._db.close()
+        self._db = None
+        
+        logger.info(
+            msg=f"FSM storage closed: {self.stats.to_dict()}"
+        )
+
+
+def create_fsm_storage(
+    config: Optional[FSMStorageConfig] = None
+) -> BaseStorage:
+    config = config or settings.fsm
+    
+    if not config.path:
+        return MemoryStorage()
+    
+    return SQLiteStorage(
+        config=config
+    )
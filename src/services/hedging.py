@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from src.config.settings import OpenAIConfig
+from src.services.metrics import OPENAI_HEDGES
+
+
+T = TypeVar("T")
+
+# Recent latencies the hedge delay is read from; no hedging until there are
+# enough of them for the percentile to mean something
+LATENCY_SAMPLES = 200
+MIN_SAMPLES = 20
+
+# Unused budget carried over, so a quiet spell allows a short run of hedges
+MAX_CREDIT = 10.0
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    fired: int = 0
+    won: int = 0
+    skipped: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "fired": self.fired,
+            "won": self.won,
+            "skipped": self.skipped,
+            "fire_rate": round(self.fired / self.requests, 4) if self.requests else 0.0,
+            "win_rate": round(self.won / self.fired, 4) if self.fired else 0.0
+        }
+
+
+class Hedger:
+    
+    def __init__(
+        self,
+        config: OpenAIConfig
+    ):
+        self.enabled = config.hedge
+        self.percentile = config.hedge_percentile
+        self.budget = config.hedge_budget
+        self.stats = HedgeStats()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._credit = 0.0
+    
+    def delay(self) -> Optional[float]:
+        # Observed latency at the configured percentile, or None while warming up
+        if len(self._latencies) < MIN_SAMPLES:
+            return None
+        
+        ordered = sorted(self._latencies)
+        
+        return ordered[min(len(ordered) - 1, int(self.percentile / 100 * len(ordered)))]
+    
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]]
+    ) -> T:
+        # Starts `call`; if it has not answered after delay(), starts it again
+        # and returns whichever succeeds first, cancelling the other
+        if not self.enabled:
+            return await call()
+        
+        self.stats.requests += 1
+        self._credit = min(self._credit + self.budget, MAX_CREDIT)
+        delay = self.delay()
+        primary = asyncio.ensure_future(self._timed(call=call, primary=True))
+        hedge: Optional[asyncio.Future] = None
+        
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                
+                if not done:
+                    if self._credit >= 1.0:
+                        self._credit -= 1.0
+                        self.stats.fired += 1
+                        OPENAI_HEDGES.labels("fired").inc()
+                        hedge = asyncio.ensure_future(self._timed(call=call, primary=False))
+                    else:
+                        self.stats.skipped += 1
+                        OPENAI_HEDGES.labels("skipped").inc()
+            
+            if hedge is None:
+                return await primary
+            
+            pending = {primary, hedge}
+            
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self.stats.won += 1
+                            OPENAI_HEDGES.labels("won").inc()
+                        return future.result()
+                
+                if not pending:
+                    # Both failed; report the original request's error
+                    return primary.result()
+        finally:
+            for future in (primary, hedge):
+                if future is not None and not future.done():
+                    future.cancel()
+    
+    async def _timed(
+        self,
+        call: Callable[[], Awaitable[T]],
+        primary: bool
+    ) -> T:
+        # Every attempt is recorded, failed ones included, or the percentile
+        # would only see the calls fast enough to finish. A cancelled primary
+        # ran at least this long, so its elapsed time stands in as a lower
+        # bound; a cancelled hedge only shows how late it started, so it is
+        # left out.
+        started = time.monotonic()
+        record = True
+        
+        try:
+            return await call()
+        except asyncio.CancelledError:
+            record = primary
+            raise
+        finally:
+            if record:
+                self._latencies.append(time.monotonic() - started)
@@ -0,0 +1,158 @@
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from src.config.settings import settings, ImageConfig
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+def normalize_image(
+    data: bytes,
+    max_edge: int,
+    quality: int
+) -> Tuple[bytes, int, int]:
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        
+        image.thumbnail(
+            size=(max_edge, max_edge),
+            resample=Image.LANCZOS
+        )
+        
+        output = io.BytesIO()
+        image.save(
+            output,
+            format="JPEG",
+            quality=quality,
+            optimize=True
+        )
+        
+        return output.getvalue(), image.width, image.height
+
+
+def warm_up() -> None:
+    # Runs as each worker starts; unpickling it imports this module and
+    # Pillow there
+    pass
+
+
+@dataclass
+class NormalizedImage:
+    data: bytes
+    width: int
+    height: int
+    input_bytes: int
+    output_bytes: int
+    duration: float
+    content_type: str = "image/jpeg"
+
+
+@dataclass
+class NormalizationStats:
+    images: int = 0
+    failures: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    total_time: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "images": self.images,
+            "failures": self.failures,
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "size_ratio": round(self.output_bytes / self.input_bytes, 4) if self.input_bytes else 0.0,
+            "time_avg_ms": round(self.total_time / self.images * 1000, 1) if self.images else 0.0
+        }
+
+
+class ImageNormalizer:
+    
+    def __init__(
+        self,
+        config: Optional[ImageConfig] = None
+    ):
+        self.config = config or settings.image
+        self.stats = NormalizationStats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def start(
+        self
+    ) -> None:
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.config.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_up
+        )
+        
+        # Spawned workers start on the first submit and import on their
+        # first task, so the first upload would wait for both otherwise
+        for _ in range(self.config.workers):
+            self._executor.submit(warm_up)
+        
+        logger.info(
+            msg=f"Image normalizer started with {self.config.workers} processes (max edge {self.config.max_edge}px)"
+        )
+    
+    def close(
+        self
+    ) -> None:
+        if self._executor:
+            self._executor.shutdown(
+                wait=False,
+                cancel_futures=True
+            )
+            self._executor = None
+    
+    async def normalize(
+        self,
+        data: bytes
+    ) -> NormalizedImage:
+        started = time.perf_counter()
+        
+        try:
+            output, width, height = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                normalize_image,
+                data,
+                self.config.max_edge,
+                self.config.jpeg_quality
+            )
+        except Exception:
+            self.stats.failures += 1
+            raise
+        
+        duration = time.perf_counter() - started
+        
+        self.stats.images += 1
+        self.stats.input_bytes += len(data)
+        self.stats.output_bytes += len(output)
+        self.stats.total_time += duration
+        
+        logger.info(
+            msg=f"Normalized image {len(data)} -> {len(output)} bytes ({width}x{height}) in {duration * 1000:.0f} ms"
+        )
+        
+        return NormalizedImage(
+            data=output,
+            width=width,
+            height=height,
+            input_bytes=len(data),
+            output_bytes=len(output),
+            duration=duration
+        )
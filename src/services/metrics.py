@@ -0,0 +1,416 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached handler (~1 ms) up to a slow Whisper upload
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(
+    value: float
+) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(
+    value: str
+) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace("\"", "\\\"")
+
+
+def _format_labels(
+    names: Sequence[str],
+    values: Sequence[str]
+) -> str:
+    if not names:
+        return ""
+    
+    return "{" + ",".join(f"{name}=\"{_escape(str(value))}\"" for name, value in zip(names, values)) + "}"
+
+
+class CounterChild:
+    __slots__ = ("lock", "value")
+    
+    def __init__(
+        self,
+        lock: threading.Lock
+    ):
+        self.lock = lock
+        self.value = 0.0
+    
+    def inc(
+        self,
+        amount: float = 1.0
+    ) -> None:
+        with self.lock:
+            self.value += amount
+
+
+class GaugeChild:
+    __slots__ = ("lock", "value")
+    
+    def __init__(
+        self,
+        lock: threading.Lock
+    ):
+        self.lock = lock
+        self.value = 0.0
+    
+    def set(
+        self,
+        value: float
+    ) -> None:
+        with self.lock:
+            self.value = value
+
+
+class HistogramChild:
+    __slots__ = ("lock", "buckets", "counts", "sum")
+    
+    def __init__(
+        self,
+        lock: threading.Lock,
+        buckets: Tuple[float, ...]
+    ):
+        self.lock = lock
+        self.buckets = buckets
+        # Per-bucket (not cumulative) counts; the last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+    
+    def observe(
+        self,
+        value: float
+    ) -> None:
+        index = bisect_left(self.buckets, value)
+        
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Metric:
+    kind = ""
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        # Shared with the children: guards their creation, updates and the
+        # snapshot taken for rendering
+        self._lock = threading.Lock()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(
+        self,
+        *values: str
+    ):
+        child = self._children.get(values)
+        
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        
+        return child
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+    
+    def _values(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            return [(values, child.value) for values, child in self._children.items()]
+    
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples()
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+    
+    def _new_child(self) -> CounterChild:
+        return CounterChild(
+            lock=self._lock
+        )
+    
+    def samples(self) -> Iterator[str]:
+        for values, value in self._values():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+    
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild(
+            lock=self._lock
+        )
+    
+    def samples(self) -> Iterator[str]:
+        for values, value in self._values():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(
+            name=name,
+            documentation=documentation,
+            labelnames=labelnames
+        )
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(
+            lock=self._lock,
+            buckets=self.buckets
+        )
+    
+    def samples(self) -> Iterator[str]:
+        names = self.labelnames + ("le",)
+        
+        # Counts and sum are copied together so _count always matches _sum
+        with self._lock:
+            snapshot = [(values, list(child.counts), child.sum) for values, child in self._children.items()]
+        
+        for values, counts, total in snapshot:
+            cumulative = 0
+            
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, values + (_format_value(bound),))} {cumulative}"
+            
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+    
+    def register(
+        self,
+        metric: Metric
+    ) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        
+        self._metrics[metric.name] = metric
+        
+        return metric
+    
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+    
+    def render(self) -> str:
+        lines = []
+        
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        
+        return "\n".join(lines) + "\n"
+
+
+# Metrics are recorded on the event loop thread and, in the Flask web app,
+# from Werkzeug request threads (the rate limiter), which also render
+# /metrics; every metric therefore guards its children with a lock.
+REGISTRY = MetricsRegistry()
+
+HANDLER_DURATION = REGISTRY.register(
+    Histogram(
+        name="bot_handler_duration_seconds",
+        documentation="Time spent in a bot handler, middlewares included.",
+        labelnames=("handler", "update_type", "outcome")
+    )
+)
+
+DEPENDENCY_DURATION = REGISTRY.register(
+    Histogram(
+        name="dependency_request_duration_seconds",
+        documentation="Latency of calls to external services.",
+        labelnames=("dependency", "operation", "outcome")
+    )
+)
+
+OPENAI_TOKENS = REGISTRY.register(
+    Counter(
+        name="openai_tokens_total",
+        documentation="Tokens billed by OpenAI.",
+        labelnames=("model", "kind")
+    )
+)
+
+THROTTLED_REQUESTS = REGISTRY.register(
+    Counter(
+        name="throttled_requests_total",
+        documentation="Updates and web app requests rejected by the rate limiter.",
+        labelnames=("kind", "scope")
+    )
+)
+
+OPENAI_CONCURRENCY_LIMIT = REGISTRY.register(
+    Gauge(
+        name="openai_concurrency_limit",
+        documentation="Current adaptive limit on concurrent OpenAI requests."
+    )
+)
+
+OPENAI_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        name="openai_requests_in_flight",
+        documentation="OpenAI requests running or waiting for a slot.",
+        labelnames=("state",)
+    )
+)
+
+OPENAI_CIRCUIT_STATE = REGISTRY.register(
+    Gauge(
+        name="openai_circuit_state",
+        documentation="OpenAI circuit breaker state: 0 closed, 1 half-open, 2 open."
+    )
+)
+
+OPENAI_REJECTED = REGISTRY.register(
+    Counter(
+        name="openai_requests_rejected_total",
+        documentation="OpenAI requests failed fast or abandoned by the limiter and circuit breaker.",
+        labelnames=("reason",)
+    )
+)
+
+OPENAI_HEDGES = REGISTRY.register(
+    Counter(
+        name="openai_hedged_requests_total",
+        documentation="Hedged vision requests: fired after the latency percentile, won by the hedge, or skipped for lack of budget.",
+        labelnames=("event",)
+    )
+)
+
+
+@contextmanager
+def observe_dependency(
+    dependency: str,
+    operation: str
+) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    
+    try:
+        yield
+        outcome = "ok"
+    except asyncio.CancelledError:
+        # Abandoned by the caller: a lost hedge or a missed deadline
+        outcome = "cancelled"
+        raise
+    finally:
+        DEPENDENCY_DURATION.labels(dependency, operation, outcome).observe(time.perf_counter() - started)
+
+
+def merge_expositions(
+    expositions: Dict[str, str],
+    label: str
+) -> str:
+    # Joins the text of several processes into one exposition, tagging every
+    # sample with `label` and keeping each metric family in one block.
+    families: Dict[str, List[str]] = {}
+    
+    for value, text in expositions.items():
+        family: Optional[List[str]] = None
+        extra = f"{label}=\"{_escape(value)}\""
+        
+        for line in text.splitlines():
+            if line.startswith("# HELP "):
+                name = line.split(" ", 3)[2]
+                family = families.get(name)
+                
+                if family is None:
+                    family = families[name] = [line]
+            elif line.startswith("# TYPE "):
+                if family is not None and len(family) == 1:
+                    family.append(line)
+            elif line and family is not None:
+                sample, _, number = line.rpartition(" ")
+                
+                if sample.endswith("}"):
+                    sample = f"{sample[:-1]},{extra}}}"
+                else:
+                    sample = f"{sample}{{{extra}}}"
+                
+                family.append(f"{sample} {number}")
+    
+    return "".join(line + "\n" for family in families.values() for line in family)
+
+
+async def handle_metrics(
+    request: web.Request
+) -> web.Response:
+    return web.Response(
+        text=REGISTRY.render(),
+        headers={
+            "Content-Type": CONTENT_TYPE
+        }
+    )
+
+
+async def start_metrics_server(
+    host: str,
+    port: int,
+    handler=handle_metrics
+) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get(
+        path="/metrics",
+        handler=handler
+    )
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(
+        runner=runner,
+        host=host,
+        port=port
+    ).start()
+    
+    return runner
@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+import openai
+
+from src.config.settings import OpenAIConfig
+from src.services.metrics import OPENAI_CIRCUIT_STATE, OPENAI_CONCURRENCY_LIMIT, OPENAI_IN_FLIGHT, OPENAI_REJECTED
+
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {
+    CLOSED: 0,
+    HALF_OPEN: 1,
+    OPEN: 2
+}
+
+# Multiplicative decrease applied to the limit on a failed or slow call
+BACKOFF_RATIO = 0.75
+
+
+class OpenAIUnavailable(Exception):
+    
+    def __init__(
+        self,
+        reason: str
+    ):
+        super().__init__(f"OpenAI calls are failing fast ({reason})")
+        self.reason = reason
+
+
+def is_overload(
+    error: BaseException
+) -> bool:
+    # Errors that say OpenAI, or the path to it, is struggling; a bad request
+    # fails the same way at any load and says nothing about capacity
+    return isinstance(
+        error,
+        (TimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+    )
+
+
+@dataclass
+class OpenAIGuardStats:
+    calls: int = 0
+    failed: int = 0
+    slow: int = 0
+    queued: int = 0
+    deadline_exceeded: int = 0
+    rejected_open: int = 0
+    rejected_queue: int = 0
+    circuit_opened: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failed": self.failed,
+            "slow": self.slow,
+            "queued": self.queued,
+            "deadline_exceeded": self.deadline_exceeded,
+            "rejected_open": self.rejected_open,
+            "rejected_queue": self.rejected_queue,
+            "circuit_opened": self.circuit_opened
+        }
+
+
+class AdaptiveLimiter:
+    
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        max_queue: int
+    ):
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.max_queue = max_queue
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._decreased_at = 0.0
+    
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+    
+    async def acquire(self) -> bool:
+        # Returns whether the call had to wait for a slot
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return False
+        
+        if len(self._waiters) >= self.max_queue:
+            raise OpenAIUnavailable(
+                reason="queue_full"
+            )
+        
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as the caller gave up; pass it on
+                self.release(
+                    started=time.monotonic(),
+                    healthy=None
+                )
+            else:
+                self._waiters.remove(future)
+            raise
+        
+        return True
+    
+    def release(
+        self,
+        started: float,
+        healthy: Optional[bool]
+    ) -> None:
+        # AIMD: a fast success grows the limit by one per limit's worth of
+        # calls, a failed or slow call cuts it. Calls that started before the
+        # last cut were caused by the old limit and do not cut it again.
+        busy = self.in_flight
+        self.in_flight -= 1
+        
+        if healthy is False:
+            if started >= self._decreased_at:
+                self.limit = max(self.minimum, self.limit * BACKOFF_RATIO)
+                self._decreased_at = time.monotonic()
+        elif healthy and busy * 2 >= self.limit:
+            # Only grow a limit that is actually being used
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+
+class CircuitBreaker:
+    
+    def __init__(
+        self,
+        error_rate: float,
+        min_calls: int,
+        window: float,
+        cooldown: float
+    ):
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+    
+    def allow(
+        self,
+        now: float
+    ) -> bool:
+        if self.state == CLOSED:
+            return True
+        
+        if self.state == OPEN:
+            if now - self._opened_at < self.cooldown:
+                return False
+            self.state = HALF_OPEN
+        
+        # Half-open: a single probe decides whether OpenAI is back
+        if self._probing:
+            return False
+        
+        self._probing = True
+        return True
+    
+    def record(
+        self,
+        now: float,
+        healthy: Optional[bool],
+        probe: bool
+    ) -> bool:
+        # Returns True when this outcome opened the breaker
+        if probe:
+            self._probing = False
+            
+            if healthy:
+                logger.info("OpenAI circuit closed after a successful probe")
+                self.state = CLOSED
+                self._outcomes.clear()
+                self._failures = 0
+            elif healthy is False:
+                return self._open(now)
+            return False
+        
+        if healthy is None or self.state != CLOSED:
+            return False
+        
+        outcomes = self._outcomes
+        outcomes.append((now, healthy))
+        if not healthy:
+            self._failures += 1
+        
+        while outcomes and now - outcomes[0][0] > self.window:
+            _, was_healthy = outcomes.popleft()
+            if not was_healthy:
+                self._failures -= 1
+        
+        if len(outcomes) >= self.min_calls and self._failures >= self.error_rate * len(outcomes):
+            logger.warning(
+                "OpenAI circuit opened: %s of %s calls in %.0f s failed or were slow",
+                self._failures,
+                len(outcomes),
+                self.window
+            )
+            return self._open(now)
+        
+        return False
+    
+    def _open(
+        self,
+        now: float
+    ) -> bool:
+        self.state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._failures = 0
+        
+        return True
+
+
+class OpenAIGuard:
+    
+    def __init__(
+        self,
+        config: OpenAIConfig
+    ):
+        self.enabled = config.limiter
+        self.deadline = config.deadline
+        self.slow_call = config.slow_call
+        self.limiter = AdaptiveLimiter(
+            initial=config.concurrency,
+            minimum=config.min_concurrency,
+            maximum=config.max_concurrency,
+            max_queue=config.max_queue
+        )
+        self.breaker = CircuitBreaker(
+            error_rate=config.breaker_error_rate,
+            min_calls=config.breaker_min_calls,
+            window=config.breaker_window,
+            cooldown=config.breaker_cooldown
+        )
+        self.stats = OpenAIGuardStats()
+        self._publish()
+    
+    @asynccontextmanager
+    async def call(self) -> AsyncIterator[None]:
+        # Wraps one OpenAI request: fails fast while the breaker is open,
+        # waits for a slot under the adaptive limit and enforces the deadline,
+        # queueing included
+        if not self.enabled:
+            async with asyncio.timeout(self.deadline or None):
+                yield
+            return
+        
+        now = time.monotonic()
+        
+        if not self.breaker.allow(now):
+            self._reject(
+                reason="circuit_open"
+            )
+        
+        probe = self.breaker.state == HALF_OPEN
+        deadline = asyncio.timeout(self.deadline or None)
+        acquired: Optional[float] = None
+        healthy: Optional[bool] = None
+        self.stats.calls += 1
+        
+        try:
+            async with deadline:
+                if await self.limiter.acquire():
+                    self.stats.queued += 1
+                acquired = time.monotonic()
+                self._publish()
+                yield
+            
+            healthy = time.monotonic() - acquired <= self.slow_call
+            if not healthy:
+                self.stats.slow += 1
+        except OpenAIUnavailable:
+            self._reject(
+                reason="queue_full"
+            )
+        except Exception as error:
+            healthy = not is_overload(error)
+            if not healthy:
+                self.stats.failed += 1
+            
+            if deadline.expired():
+                self.stats.deadline_exceeded += 1
+                OPENAI_REJECTED.labels("deadline").inc()
+            raise
+        finally:
+            if acquired is not None:
+                self.limiter.release(
+                    started=acquired,
+                    healthy=healthy
+                )
+            
+            if self.breaker.record(now=time.monotonic(), healthy=healthy, probe=probe):
+                self.stats.circuit_opened += 1
+            self._publish()
+    
+    def _reject(
+        self,
+        reason: str
+    ) -> None:
+        if reason == "circuit_open":
+            self.stats.rejected_open += 1
+        else:
+            self.stats.rejected_queue += 1
+        
+        OPENAI_REJECTED.labels(reason).inc()
+        raise OpenAIUnavailable(
+            reason=reason
+        )
+    
+    def _publish(self) -> None:
+        OPENAI_CONCURRENCY_LIMIT.labels().set(int(self.limiter.limit))
+        OPENAI_IN_FLIGHT.labels("running").set(self.limiter.in_flight)
+        OPENAI_IN_FLIGHT.labels("queued").set(self.limiter.waiting)
+        OPENAI_CIRCUIT_STATE.labels().set(_STATE_VALUES[self.breaker.state])
+    
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {}
+        
+        return {
+            **self.stats.to_dict(),
+            "limit": int(self.limiter.limit),
+            "in_flight": self.limiter.in_flight,
+            "waiting": self.limiter.waiting,
+            "circuit": self.breaker.state
+        }
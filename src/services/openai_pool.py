@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import httpx
+from openai import DefaultAsyncHttpxClient
+
+from src.config.settings import OpenAIConfig
+
+
+@dataclass
+class OpenAIPoolStats:
+    requests: int = 0
+    errors: int = 0
+    connections_created: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_created, 0)
+        
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "pool_hits": reused,
+            "pool_misses": self.connections_created,
+            "pool_hit_ratio": round(reused / self.requests, 4) if self.requests else 0.0
+        }
+
+
+class OpenAIConnectionPool:
+    
+    def __init__(
+        self,
+        config: OpenAIConfig
+    ):
+        self.config = config
+        self.stats = OpenAIPoolStats()
+    
+    async def _trace(
+        self,
+        event_name: str,
+        info: Dict[str, Any]
+    ) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.stats.connections_created += 1
+    
+    async def _on_request(
+        self,
+        request: httpx.Request
+    ) -> None:
+        request.extensions["trace"] = self._trace
+        self.stats.requests += 1
+    
+    async def _on_response(
+        self,
+        response: httpx.Response
+    ) -> None:
+        if response.status_code >= 400:
+            self.stats.errors += 1
+    
+    def create_http_client(
+        self
+    ) -> httpx.AsyncClient:
+        return DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry
+            ),
+            http2=self.config.http2,
+            event_hooks={
+                "request": [self._on_request],
+                "response": [self._on_response]
+            }
+        )
@@ -0,0 +1,477 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from src.config.settings import settings, ReportStoreConfig
+from src.models.report import Report
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+REPORT_COLUMNS = (
+    "id, user_id, latitude, longitude, category, subcategory, description, "
+    "photo_file_id, audio_file_id, created_at, duplicate_of"
+)
+
+
+@dataclass
+class ReportStoreStats:
+    submitted: int = 0
+    inserted: int = 0
+    failed: int = 0
+    batches: int = 0
+    peak_batch: int = 0
+    total_commit: float = 0.0
+    max_commit: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch": round(self.inserted / self.batches, 2) if self.batches else 0.0,
+            "peak_batch": self.peak_batch,
+            "commit_avg_ms": round(self.total_commit / self.batches * 1000, 2) if self.batches else 0.0,
+            "commit_max_ms": round(self.max_commit * 1000, 2)
+        }
+
+
+class ReportRepository:
+    
+    def __init__(
+        self,
+        config: Optional[ReportStoreConfig] = None
+    ):
+        self.config = config or settings.reports
+        self.stats = ReportStoreStats()
+        
+        self._pending: List[Tuple[Report, asyncio.Future]] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._closing = False
+        
+        self._db: Optional[sqlite3.Connection] = sqlite3.connect(
+            database=self.config.path,
+            check_same_thread=False
+        )
+        self._db_lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # A report is acknowledged to the user once committed, so commits
+        # are synced; batching keeps that to one fsync per batch.
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            "id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, latitude REAL NOT NULL, longitude REAL NOT NULL, "
+            "category TEXT NOT NULL, subcategory TEXT NOT NULL, description TEXT NOT NULL, "
+            "photo_file_id TEXT, audio_file_id TEXT, created_at REAL NOT NULL, duplicate_of INTEGER)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(reports)")}
+        if "duplicate_of" not in columns:
+            self._db.execute("ALTER TABLE reports ADD COLUMN duplicate_of INTEGER")
+        self._db.execute("CREATE INDEX IF NOT EXISTS reports_user_id ON reports (user_id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS reports_category ON reports (category)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at)")
+        # What each review message shows, so a submit stores exactly that
+        # draft rather than whatever the conversation state holds by then
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS drafts ("
+            "id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, latitude REAL NOT NULL, longitude REAL NOT NULL, "
+            "category TEXT NOT NULL, subcategory TEXT NOT NULL, description TEXT NOT NULL, "
+            "photo_file_id TEXT, audio_file_id TEXT, created_at REAL NOT NULL, duplicate_of INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS drafts_created_at ON drafts (created_at)")
+        self._db.commit()
+        
+        # Bulk reads use their own connection so they never wait on a commit
+        self._reader: Optional[sqlite3.Connection] = sqlite3.connect(
+            database=self.config.path,
+            check_same_thread=False
+        )
+        self._reader_lock = threading.Lock()
+        
+        logger.info(
+            msg=f"Report store at {self.config.path}, batching inserts every {self.config.batch_interval}s or {self.config.max_batch} reports"
+        )
+    
+    async def add(
+        self,
+        report: Report
+    ) -> Report:
+        # Returns once the report is committed, with report_id assigned
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((report, future))
+        self.stats.submitted += 1
+        
+        if self._writer_task is None:
+            self._wake = asyncio.Event()
+            self._full = asyncio.Event()
+            self._writer_task = asyncio.create_task(
+                self._write_loop(),
+                name="report-store-writer"
+            )
+        
+        self._wake.set()
+        
+        if len(self._pending) >= self.config.max_batch:
+            self._full.set()
+        
+        return await future
+    
+    async def _write_loop(
+        self
+    ) -> None:
+        while True:
+            await self._wake.wait()
+            
+            # Linger briefly so concurrent submissions share one commit
+            if len(self._pending) < self.config.max_batch and self.config.batch_interval > 0:
+                try:
+                    await asyncio.wait_for(
+                        self._full.wait(),
+                        timeout=self.config.batch_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            
+            self._wake.clear()
+            self._full.clear()
+            await self.flush()
+            
+            if self._closing:
+                return
+    
+    async def flush(
+        self
+    ) -> None:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.config.max_batch]
+                del self._pending[:self.config.max_batch]
+                
+                rows = [
+                    (
+                        report.user_id,
+                        report.latitude,
+                        report.longitude,
+                        report.category,
+                        report.subcategory,
+                        report.description,
+                        report.photo_file_id,
+                        report.audio_file_id,
+                        report.created_at,
+                        report.duplicate_of
+                    )
+                    for report, _ in batch
+                ]
+                started = time.perf_counter()
+                
+                try:
+                    first_id = await asyncio.to_thread(self._insert, rows)
+                except Exception as e:
+                    self.stats.failed += len(batch)
+                    
+                    logger.error(
+                        msg=f"Report store insert of {len(batch)} reports failed: {e}"
+                    )
+                    
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                elapsed = time.perf_counter() - started
+                self.stats.inserted += len(batch)
+                self.stats.batches += 1
+                self.stats.peak_batch = max(self.stats.peak_batch, len(batch))
+                self.stats.total_commit += elapsed
+                self.stats.max_commit = max(self.stats.max_commit, elapsed)
+                
+                for offset, (report, future) in enumerate(batch):
+                    report.report_id = first_id + offset
+                    
+                    if not future.done():
+                        future.set_result(report)
+    
+    def _insert(
+        self,
+        rows: List[Tuple[Any, ...]]
+    ) -> int:
+        # The transaction holds SQLite's write lock, so the batch gets
+        # consecutive rowids even with several processes writing.
+        with self._db_lock:
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO reports (user_id, latitude, longitude, category, subcategory, description, "
+                    "photo_file_id, audio_file_id, created_at, duplicate_of) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                last_id = self._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        
+        return last_id - len(rows) + 1
+    
+    async def save_draft(
+        self,
+        report: Report
+    ) -> int:
+        # Returns the draft id a review message refers to
+        return await asyncio.to_thread(
+            self._insert_draft,
+            (
+                report.user_id,
+                report.latitude,
+                report.longitude,
+                report.category,
+                report.subcategory,
+                report.description,
+                report.photo_file_id,
+                report.audio_file_id,
+                report.created_at,
+                report.duplicate_of
+            )
+        )
+    
+    def _insert_draft(
+        self,
+        row: Tuple[Any, ...]
+    ) -> int:
+        with self._db_lock:
+            with self._db:
+                self._db.execute(
+                    "DELETE FROM drafts WHERE created_at < ?",
+                    (time.time() - self.config.draft_ttl,)
+                )
+                cursor = self._db.execute(
+                    "INSERT INTO drafts (user_id, latitude, longitude, category, subcategory, description, "
+                    "photo_file_id, audio_file_id, created_at, duplicate_of) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+        
+        return cursor.lastrowid
+    
+    async def get_draft(
+        self,
+        draft_id: int,
+        user_id: int
+    ) -> Optional[Report]:
+        # Only the user the review was sent to can submit it
+        rows = await asyncio.to_thread(
+            self._select,
+            f"SELECT {REPORT_COLUMNS} FROM drafts WHERE id = ? AND user_id = ?",
+            [draft_id, user_id]
+        )
+        
+        if not rows:
+            return None
+        
+        row = rows[0]
+        
+        return Report(
+            user_id=row[1],
+            latitude=row[2],
+            longitude=row[3],
+            category=row[4],
+            subcategory=row[5],
+            description=row[6],
+            photo_file_id=row[7],
+            audio_file_id=row[8],
+            created_at=row[9],
+            duplicate_of=row[10]
+        )
+    
+    @staticmethod
+    def _filters(
+        user_id: Optional[int],
+        category: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+        bbox: Optional[Tuple[float, float, float, float]]
+    ) -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        
+        if bbox is not None:
+            # min_latitude, min_longitude, max_latitude, max_longitude
+            clauses.append("latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?")
+            params.extend((bbox[0], bbox[2], bbox[1], bbox[3]))
+        
+        return clauses, params
+    
+    def _select(
+        self,
+        query: str,
+        params: List[Any]
+    ) -> List[Tuple[Any, ...]]:
+        with self._reader_lock:
+            return self._reader.execute(query, params).fetchall()
+    
+    async def list_reports(
+        self,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        after_id: int = 0,
+        limit: int = 1000
+    ) -> List[Report]:
+        # Keyset pagination: pass the last report_id seen as after_id
+        clauses, params = self._filters(
+            user_id=user_id,
+            category=category,
+            since=since,
+            until=until,
+            bbox=bbox
+        )
+        clauses.append("id > ?")
+        params.extend((after_id, limit))
+        
+        rows = await asyncio.to_thread(
+            self._select,
+            f"SELECT {REPORT_COLUMNS} FROM reports WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?",
+            params
+        )
+        
+        return [
+            Report(
+                report_id=row[0],
+                user_id=row[1],
+                latitude=row[2],
+                longitude=row[3],
+                category=row[4],
+                subcategory=row[5],
+                description=row[6],
+                photo_file_id=row[7],
+                audio_file_id=row[8],
+                created_at=row[9],
+                duplicate_of=row[10]
+            )
+            for row in rows
+        ]
+    
+    async def get(
+        self,
+        report_id: int
+    ) -> Optional[Report]:
+        reports = await self.list_reports(
+            after_id=report_id - 1,
+            limit=1
+        )
+        
+        if reports and reports[0].report_id == report_id:
+            return reports[0]
+        
+        return None
+    
+    async def iter_reports(
+        self,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        after_id: int = 0,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[Report]]:
+        while True:
+            reports = await self.list_reports(
+                user_id=user_id,
+                category=category,
+                since=since,
+                until=until,
+                bbox=bbox,
+                after_id=after_id,
+                limit=batch_size
+            )
+            
+            if not reports:
+                return
+            
+            yield reports
+            
+            if len(reports) < batch_size:
+                return
+            
+            after_id = reports[-1].report_id
+    
+    async def count(
+        self,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None
+    ) -> int:
+        clauses, params = self._filters(
+            user_id=user_id,
+            category=category,
+            since=since,
+            until=until,
+            bbox=bbox
+        )
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        rows = await asyncio.to_thread(
+            self._select,
+            f"SELECT COUNT(*) FROM reports{where}",
+            params
+        )
+        
+        return rows[0][0]
+    
+    async def close(
+        self
+    ) -> None:
+        if self._db is None:
+            return
+        
+        # Let the writer finish its batch rather than cancel it mid-commit
+        if self._writer_task:
+            self._closing = True
+            self._full.set()
+            self._wake.set()
+            
+            await self._writer_task
+            self._writer_task = None
+        
+        await self.flush()
+        
+        with self._db_lock:
+            self._db.close()
+        self._db = None
+        
+        with self._reader_lock:
+            self._reader.close()
+        self._reader = None
+        
+        logger.info(
+            msg=f"Report store closed: {self.stats.to_dict()}"
+        )
@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from src.config.settings import TelegramClientConfig
+from src.services.throttle import TokenBucket
+
+
+# Lower goes first when the global budget is short: replies to a user who is
+# waiting on the bot beat results of background work
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Methods that post into a chat and count against its flood limits
+RATE_LIMITED_METHODS = frozenset({
+    "sendMessage",
+    "sendPhoto",
+    "sendAudio",
+    "sendVoice",
+    "sendVideo",
+    "sendAnimation",
+    "sendDocument",
+    "sendSticker",
+    "sendLocation",
+    "sendVenue",
+    "sendContact",
+    "sendMediaGroup",
+    "copyMessage",
+    "forwardMessage",
+    "editMessageText",
+    "editMessageCaption",
+    "editMessageMedia",
+    "editMessageReplyMarkup"
+})
+
+_send_priority: ContextVar[int] = ContextVar(
+    "send_priority",
+    default=INTERACTIVE
+)
+
+
+@contextmanager
+def send_priority(
+    priority: int
+) -> Iterator[None]:
+    token = _send_priority.set(priority)
+    
+    try:
+        yield
+    finally:
+        _send_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _send_priority.get()
+
+
+@dataclass
+class SendSchedulerStats:
+    sends: int = 0
+    delayed: int = 0
+    total_delay: float = 0.0
+    max_delay: float = 0.0
+    retry_after: int = 0
+    
+    def record(
+        self,
+        delay: float
+    ) -> None:
+        self.sends += 1
+        
+        if delay > 0.001:
+            self.delayed += 1
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sends": self.sends,
+            "delayed": self.delayed,
+            "delay_avg_ms": round(self.total_delay / self.delayed * 1000, 1) if self.delayed else 0.0,
+            "delay_max_ms": round(self.max_delay * 1000, 1),
+            "retry_after": self.retry_after
+        }
+
+
+class ChatQueue:
+    __slots__ = ("bucket", "lock", "pending", "blocked_until")
+    
+    def __init__(
+        self,
+        burst: int,
+        now: float
+    ):
+        self.bucket = TokenBucket(
+            tokens=burst,
+            now=now
+        )
+        # asyncio.Lock wakes waiters in arrival order, which keeps the
+        # messages of one chat in the order they were sent
+        self.lock = asyncio.Lock()
+        self.pending = 0
+        self.blocked_until = 0.0
+
+
+class SendScheduler:
+    
+    def __init__(
+        self,
+        config: TelegramClientConfig
+    ):
+        self.global_rate = config.global_rate
+        self.global_burst = config.global_burst
+        self.chat_rate = config.chat_rate
+        self.chat_burst = config.chat_burst
+        self.stats = SendSchedulerStats()
+        
+        # Same reasoning as the update throttle: an idle chat whose bucket has
+        # refilled carries no state worth keeping
+        self.idle_after = config.chat_burst / config.chat_rate if config.chat_rate > 0 else 0.0
+        
+        self._chats: "OrderedDict[Hashable, ChatQueue]" = OrderedDict()
+        self._global = TokenBucket(
+            tokens=config.global_burst,
+            now=time.monotonic()
+        )
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._pump: Optional[asyncio.Task] = None
+    
+    async def acquire(
+        self,
+        chat_id: Optional[Hashable],
+        priority: int = INTERACTIVE
+    ) -> None:
+        # Returns once this send may go out; per chat first, then globally
+        started = time.monotonic()
+        
+        if chat_id is not None:
+            chat = self._chat(
+                chat_id=chat_id,
+                now=started
+            )
+            chat.pending += 1
+            
+            try:
+                async with chat.lock:
+                    await self._acquire_chat(chat)
+                    await self._acquire_global(priority)
+            finally:
+                chat.pending -= 1
+        else:
+            await self._acquire_global(priority)
+        
+        self.stats.record(
+            delay=time.monotonic() - started
+        )
+    
+    def backoff(
+        self,
+        chat_id: Optional[Hashable],
+        retry_after: float
+    ) -> None:
+        # Called on a 429: hold the chat until retry_after has passed and
+        # spend the global budget, so the whole bot slows down for a moment
+        now = time.monotonic()
+        self.stats.retry_after += 1
+        self._global.tokens = 0.0
+        self._global.updated_at = now
+        
+        if chat_id is None:
+            self._paused_until = max(self._paused_until, now + retry_after)
+            return
+        
+        chat = self._chat(
+            chat_id=chat_id,
+            now=now
+        )
+        chat.blocked_until = max(chat.blocked_until, now + retry_after)
+    
+    def _chat(
+        self,
+        chat_id: Hashable,
+        now: float
+    ) -> ChatQueue:
+        chats = self._chats
+        
+        while chats:
+            oldest_id = next(iter(chats))
+            oldest = chats[oldest_id]
+            if oldest.pending or now - oldest.bucket.updated_at < self.idle_after or oldest.blocked_until > now:
+                break
+            del chats[oldest_id]
+        
+        chat = chats.get(chat_id)
+        
+        if chat is None:
+            chat = ChatQueue(
+                burst=self.chat_burst,
+                now=now
+            )
+            chats[chat_id] = chat
+        else:
+            chats.move_to_end(chat_id)
+        
+        return chat
+    
+    async def _acquire_chat(
+        self,
+        chat: ChatQueue
+    ) -> None:
+        while True:
+            now = time.monotonic()
+            
+            if chat.blocked_until > now:
+                await asyncio.sleep(chat.blocked_until - now)
+                continue
+            
+            if self.chat_rate <= 0:
+                return
+            
+            wait = chat.bucket.take(
+                rate=self.chat_rate,
+                burst=self.chat_burst,
+                now=now
+            )
+            if not wait:
+                return
+            
+            await asyncio.sleep(wait)
+    
+    async def _acquire_global(
+        self,
+        priority: int
+    ) -> None:
+        if self.global_rate <= 0:
+            return
+        
+        now = time.monotonic()
+        
+        # Fast path: budget left and nobody queued ahead
+        if not self._waiters and self._paused_until <= now:
+            if not self._global.take(rate=self.global_rate, burst=self.global_burst, now=now):
+                return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(
+                self._run_pump(),
+                name="telegram-send-scheduler"
+            )
+        
+        await future
+    
+    async def _run_pump(
+        self
+    ) -> None:
+        # Hands out global tokens as they accrue, highest priority first and
+        # in arrival order within a priority
+        while self._waiters:
+            now = time.monotonic()
+            
+            if self._paused_until > now:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            
+            wait = self._global.take(
+                rate=self.global_rate,
+                burst=self.global_burst,
+                now=now
+            )
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+            
+            _, _, future = heapq.heappop(self._waiters)
+            
+            if future.done():
+                # The sender was cancelled while queued; keep its token
+                self._global.tokens += 1.0
+            else:
+                future.set_result(None)
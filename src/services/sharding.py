@@ -0,0 +1,567 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import secrets
+import signal
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.telegram import TelegramAPIServer, PRODUCTION
+
+from src.config.settings import settings, ShardingConfig
+from src.models.taxonomy import reload_taxonomy
+from src.services.bot_service import BotService
+from src.services.metrics import CONTENT_TYPE, REGISTRY, merge_expositions, start_metrics_server
+from src.services.telegram_session import create_pooled_bot
+from src.services.webhook import update_chat_id
+from src.bot.handlers import start
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+WORKER_HOST = "127.0.0.1"
+WORKER_PATH = "/updates"
+
+
+def shard_for(
+    update: Dict[str, Any],
+    workers: int
+) -> int:
+    chat_id = update_chat_id(update)
+    key = chat_id if chat_id is not None else update.get("update_id", 0)
+    
+    return key % workers
+
+
+def run_worker(
+    index: int,
+    port: int,
+    secret_token: str
+) -> None:
+    asyncio.run(
+        _serve_worker(
+            index=index,
+            port=port,
+            secret_token=secret_token
+        )
+    )
+
+
+async def _serve_worker(
+    index: int,
+    port: int,
+    secret_token: str
+) -> None:
+    service = BotService(
+        token=settings.bot.token
+    )
+    await service.serve_updates(
+        host=WORKER_HOST,
+        port=port,
+        path=WORKER_PATH,
+        secret_token=secret_token
+    )
+    
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+    
+    if hasattr(signal, "SIGHUP"):
+        loop.add_signal_handler(signal.SIGHUP, reload_taxonomy)
+    
+    logger.info(
+        msg=f"Bot worker {index} serving updates on {WORKER_HOST}:{port}"
+    )
+    
+    try:
+        await stopping.wait()
+    finally:
+        await service.stop()
+
+
+@dataclass
+class WorkerStats:
+    forwarded: int = 0
+    forward_errors: int = 0
+    dropped: int = 0
+    restarts: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "forwarded": self.forwarded,
+            "forward_errors": self.forward_errors,
+            "dropped": self.dropped,
+            "restarts": self.restarts
+        }
+
+
+class ShardedBotService:
+    
+    def __init__(
+        self,
+        token: str,
+        config: Optional[ShardingConfig] = None,
+        polling_timeout: int = 30,
+        max_forward_delay: float = 5.0
+    ):
+        self.token = token
+        self.config = config or settings.sharding
+        self.polling_timeout = polling_timeout
+        self.max_forward_delay = max_forward_delay
+        # Workers only accept updates carrying this token, like Telegram's
+        # webhook secret, so other local processes cannot inject updates
+        self.worker_secret = settings.webhook.secret_token or secrets.token_urlsafe(32)
+        self.bot: Optional[Bot] = None
+        self.allowed_updates: List[str] = []
+        self.stats = [WorkerStats() for _ in range(self.config.workers)]
+        self.ready = asyncio.Event()
+        
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[BaseProcess]] = [None] * self.config.workers
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ingress_runner: Optional[web.AppRunner] = None
+        self._metrics_runner: Optional[web.AppRunner] = None
+        self._stopped: Optional[asyncio.Event] = None
+    
+    def build(
+        self
+    ) -> None:
+        self.bot = create_pooled_bot(
+            token=self.token
+        )
+        self.allowed_updates = start.router.resolve_used_update_types()
+        
+        logger.info(
+            msg=f"Sharded bot built: {self.config.workers} workers on ports {self.config.base_port}-{self.config.base_port + self.config.workers - 1}"
+        )
+    
+    def _worker_url(
+        self,
+        index: int,
+        path: str = WORKER_PATH
+    ) -> str:
+        return f"http://{WORKER_HOST}:{self.config.base_port + index}{path}"
+    
+    def _spawn(
+        self,
+        index: int
+    ) -> None:
+        process = self._context.Process(
+            target=run_worker,
+            kwargs={
+                "index": index,
+                "port": self.config.base_port + index,
+                "secret_token": self.worker_secret
+            },
+            name=f"bot-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+    
+    async def _wait_ready(
+        self,
+        index: int,
+        timeout: float = 60.0
+    ) -> None:
+        deadline = asyncio.get_running_loop().time() + timeout
+        
+        while True:
+            try:
+                async with self._session.get(self._worker_url(index, "/stats")) as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            
+            if not self._processes[index].is_alive():
+                raise RuntimeError(f"Bot worker {index} exited with code {self._processes[index].exitcode}")
+            
+            if asyncio.get_running_loop().time() > deadline:
+                raise RuntimeError(f"Bot worker {index} did not start within {timeout}s")
+            
+            await asyncio.sleep(0.2)
+    
+    async def start(
+        self
+    ) -> None:
+        if not self.bot:
+            self.build()
+        
+        self._stopped = asyncio.Event()
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=0
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=self.polling_timeout + 10
+            )
+        )
+        
+        for index in range(self.config.workers):
+            self._spawn(index)
+        
+        await asyncio.gather(*(self._wait_ready(index) for index in range(self.config.workers)))
+        
+        self._queues = [
+            asyncio.Queue(maxsize=self.config.queue_size)
+            for _ in range(self.config.workers)
+        ]
+        self._tasks = [
+            asyncio.create_task(
+                self._forward(index),
+                name=f"shard-forwarder-{index}"
+            )
+            for index in range(self.config.workers)
+        ]
+        self._tasks.append(
+            asyncio.create_task(
+                self._monitor(),
+                name="shard-monitor"
+            )
+        )
+        
+        if settings.metrics.listen_port:
+            self._metrics_runner = await start_metrics_server(
+                host=settings.metrics.listen_host,
+                port=settings.metrics.listen_port,
+                handler=self._handle_metrics
+            )
+        
+        if settings.bot.update_mode == "webhook":
+            await self._start_webhook()
+        else:
+            self._tasks.append(
+                asyncio.create_task(
+                    self._poll(),
+                    name="shard-polling"
+                )
+            )
+            
+            logger.info(
+                msg=f"Long polling for {self.allowed_updates}, sharding updates across {self.config.workers} workers"
+            )
+        
+        self.ready.set()
+        await self._stopped.wait()
+    
+    async def _start_webhook(
+        self
+    ) -> None:
+        config = settings.webhook
+        
+        app = web.Application()
+        app.router.add_post(
+            path=config.path,
+            handler=self._handle_webhook
+        )
+        app.router.add_get(
+            path="/stats",
+            handler=self._handle_stats
+        )
+        app.router.add_get(
+            path="/metrics",
+            handler=self._handle_metrics
+        )
+        
+        self._ingress_runner = web.AppRunner(app)
+        await self._ingress_runner.setup()
+        await web.TCPSite(
+            runner=self._ingress_runner,
+            host=config.listen_host,
+            port=config.listen_port
+        ).start()
+        
+        await self.bot.set_webhook(
+            url=config.webhook_url,
+            secret_token=config.secret_token,
+            allowed_updates=self.allowed_updates,
+            max_connections=config.max_connections,
+            drop_pending_updates=config.drop_pending_updates
+        )
+        
+        logger.info(
+            msg=f"Webhook {config.webhook_url} registered, sharding updates across {self.config.workers} workers"
+        )
+    
+    async def _handle_webhook(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        secret_token = settings.webhook.secret_token
+        
+        if secret_token and not secrets.compare_digest(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), secret_token):
+            return web.Response(
+                body="Unauthorized",
+                status=401
+            )
+        
+        await self.dispatch(
+            update=await request.json()
+        )
+        
+        return web.json_response({})
+    
+    async def _handle_stats(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        return web.json_response(
+            data=await self.collect_stats()
+        )
+    
+    async def _handle_metrics(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        return web.Response(
+            text=await self.collect_metrics(),
+            headers={
+                "Content-Type": CONTENT_TYPE
+            }
+        )
+    
+    async def dispatch(
+        self,
+        update: Dict[str, Any]
+    ) -> None:
+        # A full queue holds the caller back rather than dropping updates
+        await self._queues[shard_for(update, self.config.workers)].put(update)
+    
+    async def _poll(
+        self
+    ) -> None:
+        api = TelegramAPIServer.from_base(settings.telegram.api_base_url) if settings.telegram.api_base_url else PRODUCTION
+        url = api.api_url(
+            token=self.token,
+            method="getUpdates"
+        )
+        offset: Optional[int] = None
+        
+        while True:
+            params = {
+                "timeout": str(self.polling_timeout),
+                "allowed_updates": json.dumps(self.allowed_updates)
+            }
+            if offset is not None:
+                params["offset"] = str(offset)
+            
+            try:
+                async with self._session.post(url, data=params) as response:
+                    payload = await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.error(
+                    msg=f"getUpdates failed: {e}"
+                )
+                await asyncio.sleep(1)
+                continue
+            
+            if not payload.get("ok"):
+                logger.error(
+                    msg=f"getUpdates failed: {payload.get('description')}"
+                )
+                await asyncio.sleep(1)
+                continue
+            
+            for update in payload["result"]:
+                offset = update["update_id"] + 1
+                await self.dispatch(
+                    update=update
+                )
+    
+    async def _forward(
+        self,
+        index: int
+    ) -> None:
+        # One sequential sender per worker keeps each chat's updates in order
+        queue = self._queues[index]
+        stats = self.stats[index]
+        url = self._worker_url(index)
+        headers = {
+            "X-Telegram-Bot-Api-Secret-Token": self.worker_secret
+        }
+        
+        while True:
+            update = await queue.get()
+            
+            try:
+                # Telegram already has its acknowledgement, so the update is
+                # retried for as long as the worker takes to come back;
+                # meanwhile the bounded queue fills and holds dispatch back
+                attempt = 0
+                while True:
+                    attempt += 1
+                    try:
+                        async with self._session.post(url, json=update, headers=headers) as response:
+                            if 400 <= response.status < 500:
+                                # The worker refused this update, sending it again won't help
+                                stats.dropped += 1
+                                logger.error(
+                                    msg=f"Worker {index} rejected update {update.get('update_id')} with status {response.status}"
+                                )
+                                break
+                            
+                            response.raise_for_status()
+                        stats.forwarded += 1
+                        break
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        stats.forward_errors += 1
+                        
+                        if attempt == 1:
+                            logger.warning(
+                                msg=f"Worker {index} unreachable, retrying update {update.get('update_id')}: {e}"
+                            )
+                        
+                        await asyncio.sleep(min(0.2 * 2 ** attempt, self.max_forward_delay))
+            except asyncio.CancelledError:
+                # Only stop() cancels a forwarder with an update still in hand
+                stats.dropped += 1 + queue.qsize()
+                logger.error(
+                    msg=f"Dropping {1 + queue.qsize()} updates queued for worker {index} on shutdown"
+                )
+                raise
+            finally:
+                queue.task_done()
+    
+    async def _monitor(
+        self
+    ) -> None:
+        while True:
+            await asyncio.sleep(1)
+            
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    logger.error(
+                        msg=f"Bot worker {index} exited with code {process.exitcode}, restarting"
+                    )
+                    self.stats[index].restarts += 1
+                    self._spawn(index)
+    
+    def signal_workers(
+        self,
+        signum: int
+    ) -> None:
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                os.kill(process.pid, signum)
+    
+    async def collect_stats(
+        self
+    ) -> Dict[str, Any]:
+        workers = []
+        
+        for index, stats in enumerate(self.stats):
+            entry = {
+                "queue_depth": self._queues[index].qsize() if self._queues else 0,
+                **stats.to_dict()
+            }
+            
+            try:
+                async with self._session.get(self._worker_url(index, "/stats")) as response:
+                    entry["worker"] = await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                entry["worker"] = None
+            
+            workers.append(entry)
+        
+        return {
+            "workers": workers
+        }
+    
+    async def collect_metrics(
+        self
+    ) -> str:
+        # Each worker keeps its own registry; samples are tagged by process
+        expositions = {
+            "supervisor": REGISTRY.render()
+        }
+        
+        for index in range(self.config.workers):
+            try:
+                async with self._session.get(self._worker_url(index, "/metrics")) as response:
+                    expositions[str(index)] = await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                continue
+        
+        return merge_expositions(
+            expositions=expositions,
+            label="worker"
+        )
+    
+    async def stop(
+        self
+    ) -> None:
+        logger.info(
+            msg="Stopping sharded bot..."
+        )
+        
+        if self._ingress_runner:
+            await self._ingress_runner.cleanup()
+            self._ingress_runner = None
+        
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+            self._metrics_runner = None
+        
+        # Stop receiving, then let the forwarders hand over what is queued
+        for task in self._tasks:
+            if task.get_name() in ("shard-polling", "shard-monitor"):
+                task.cancel()
+        
+        if self._queues:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(queue.join() for queue in self._queues)),
+                    timeout=10
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    msg="Timed out handing queued updates to workers"
+                )
+        
+        for task in self._tasks:
+            task.cancel()
+        
+        await asyncio.gather(
+            *self._tasks,
+            return_exceptions=True
+        )
+        self._tasks = []
+        
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        
+        for process in self._processes:
+            if process is not None:
+                await asyncio.to_thread(process.join, 15)
+                
+                if process.is_alive():
+                    process.kill()
+        
+        if self._session:
+            await self._session.close()
+        
+        if self.bot:
+            await self.bot.session.close()
+        
+        if self._stopped:
+            self._stopped.set()
+        
+        logger.info(
+            msg="Sharded bot stopped"
+        )
@@ -0,0 +1,246 @@
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.config.settings import settings, SpatialIndexConfig
+from src.models.report import Report
+from src.services.report_repository import ReportRepository
+
+
+EARTH_RADIUS_METERS = 6371008.8
+METERS_PER_DEGREE = 111320.0
+
+
+def haversine_meters(
+    latitude: float,
+    longitude: float,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray
+) -> np.ndarray:
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(latitudes)
+    half_dlat = (lat2 - lat1) / 2
+    half_dlon = np.radians(longitudes - longitude) / 2
+    
+    a = np.sin(half_dlat) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(half_dlon) ** 2
+    
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+@dataclass
+class NearbyReport:
+    report_id: int
+    category: str
+    subcategory: str
+    distance: float
+    created_at: float
+
+
+@dataclass
+class _Group:
+    # Columnar storage for one category/subcategory; rows only grow
+    latitudes: np.ndarray = field(default_factory=lambda: np.empty(64))
+    longitudes: np.ndarray = field(default_factory=lambda: np.empty(64))
+    created_at: np.ndarray = field(default_factory=lambda: np.empty(64))
+    report_ids: np.ndarray = field(default_factory=lambda: np.empty(64, dtype=np.int64))
+    size: int = 0
+    cells: Dict[Tuple[int, int], List[int]] = field(default_factory=dict)
+    
+    def append(
+        self,
+        report: Report,
+        cell: Tuple[int, int]
+    ) -> None:
+        if self.size == len(self.report_ids):
+            capacity = self.size * 2
+            self.latitudes = np.resize(self.latitudes, capacity)
+            self.longitudes = np.resize(self.longitudes, capacity)
+            self.created_at = np.resize(self.created_at, capacity)
+            self.report_ids = np.resize(self.report_ids, capacity)
+        
+        row = self.size
+        self.latitudes[row] = report.latitude
+        self.longitudes[row] = report.longitude
+        self.created_at[row] = report.created_at
+        self.report_ids[row] = report.report_id
+        self.size += 1
+        
+        self.cells.setdefault(cell, []).append(row)
+
+
+class SpatialIndex:
+    
+    def __init__(
+        self,
+        config: Optional[SpatialIndexConfig] = None
+    ):
+        self.config = config or settings.spatial
+        
+        self._cell_degrees = self.config.cell_meters / METERS_PER_DEGREE
+        self._groups: Dict[Tuple[str, str], _Group] = {}
+        self._report_ids: Set[int] = set()
+        self._synced_id = 0
+        self._synced_at = 0.0
+    
+    def __len__(self) -> int:
+        return len(self._report_ids)
+    
+    def _cell(
+        self,
+        latitude: float,
+        longitude: float
+    ) -> Tuple[int, int]:
+        return (
+            math.floor(latitude / self._cell_degrees),
+            math.floor(longitude / self._cell_degrees)
+        )
+    
+    def add(
+        self,
+        report: Report
+    ) -> None:
+        if report.report_id is None or report.report_id in self._report_ids:
+            return
+        
+        self._report_ids.add(report.report_id)
+        self._groups.setdefault((report.category, report.subcategory), _Group()).append(
+            report=report,
+            cell=self._cell(report.latitude, report.longitude)
+        )
+    
+    def extend(
+        self,
+        reports: Iterable[Report]
+    ) -> None:
+        for report in reports:
+            self.add(report)
+    
+    async def refresh(
+        self,
+        repository: ReportRepository,
+        force: bool = False
+    ) -> int:
+        # Picks up reports stored since the last refresh, including those
+        # submitted through other bot processes
+        now = time.monotonic()
+        
+        if not force and now - self._synced_at < self.config.refresh_interval:
+            return 0
+        
+        self._synced_at = now
+        loaded = 0
+        
+        while True:
+            reports = await repository.list_reports(
+                after_id=self._synced_id,
+                limit=5000
+            )
+            
+            if not reports:
+                break
+            
+            self.extend(reports)
+            self._synced_id = reports[-1].report_id
+            loaded += len(reports)
+        
+        return loaded
+    
+    def _candidate_rows(
+        self,
+        group: _Group,
+        cell: Tuple[int, int],
+        lat_span: int,
+        lon_span: int
+    ) -> List[int]:
+        rows: List[int] = []
+        
+        if (2 * lat_span + 1) * (2 * lon_span + 1) <= len(group.cells):
+            for lat_cell in range(cell[0] - lat_span, cell[0] + lat_span + 1):
+                for lon_cell in range(cell[1] - lon_span, cell[1] + lon_span + 1):
+                    rows.extend(group.cells.get((lat_cell, lon_cell), ()))
+        else:
+            # A wide radius over a sparse group: scanning its cells is cheaper
+            for (lat_cell, lon_cell), cell_rows in group.cells.items():
+                if abs(lat_cell - cell[0]) <= lat_span and abs(lon_cell - cell[1]) <= lon_span:
+                    rows.extend(cell_rows)
+        
+        return rows
+    
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        category: Optional[str] = None,
+        subcategory: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 10
+    ) -> List[NearbyReport]:
+        cell = self._cell(latitude, longitude)
+        lat_span = math.ceil(radius / self.config.cell_meters)
+        lon_span = math.ceil(radius / (self.config.cell_meters * max(math.cos(math.radians(latitude)), 0.01)))
+        found: List[NearbyReport] = []
+        
+        for (group_category, group_subcategory), group in self._groups.items():
+            if category is not None and group_category != category:
+                continue
+            if subcategory is not None and group_subcategory != subcategory:
+                continue
+            
+            rows = self._candidate_rows(
+                group=group,
+                cell=cell,
+                lat_span=lat_span,
+                lon_span=lon_span
+            )
+            
+            if not rows:
+                continue
+            
+            rows = np.fromiter(rows, dtype=np.intp, count=len(rows))
+            distances = haversine_meters(
+                latitude=latitude,
+                longitude=longitude,
+                latitudes=group.latitudes[rows],
+                longitudes=group.longitudes[rows]
+            )
+            mask = distances <= radius
+            
+            if since is not None:
+                mask &= group.created_at[rows] >= since
+            
+            for row, distance in zip(rows[mask].tolist(), distances[mask].tolist()):
+                found.append(
+                    NearbyReport(
+                        report_id=int(group.report_ids[row]),
+                        category=group_category,
+                        subcategory=group_subcategory,
+                        distance=distance,
+                        created_at=float(group.created_at[row])
+                    )
+                )
+        
+        found.sort(key=lambda nearby_report: nearby_report.distance)
+        
+        return found[:limit]
+    
+    def duplicates(
+        self,
+        latitude: float,
+        longitude: float,
+        category: Optional[str] = None,
+        subcategory: Optional[str] = None,
+        limit: int = 3
+    ) -> List[NearbyReport]:
+        return self.nearby(
+            latitude=latitude,
+            longitude=longitude,
+            radius=self.config.duplicate_radius,
+            category=category,
+            subcategory=subcategory,
+            since=time.time() - self.config.duplicate_max_age,
+            limit=limit
+        )
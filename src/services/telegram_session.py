@@ -0,0 +1,227 @@
+import asyncio
+import ssl
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import certifi
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+from aiogram import Bot, __version__ as aiogram_version
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer, PRODUCTION
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+
+from src.config.settings import settings, TelegramClientConfig
+from src.services.metrics import DEPENDENCY_DURATION
+from src.services.send_scheduler import RATE_LIMITED_METHODS, SendScheduler, current_priority
+from src.services.tracing import TRACER, SPAN_KIND_CLIENT
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+@dataclass
+class TelegramPoolStats:
+    requests: int = 0
+    errors: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        connections = self.connections_created + self.connections_reused
+        
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "pool_hits": self.connections_reused,
+            "pool_misses": self.connections_created,
+            "pool_hit_ratio": round(self.connections_reused / connections, 4) if connections else 0.0,
+            "latency_avg_ms": round(self.total_latency / self.requests * 1000, 2) if self.requests else 0.0,
+            "latency_max_ms": round(self.max_latency * 1000, 2)
+        }
+
+
+class PooledTelegramSession(AiohttpSession):
+
+    def __init__(
+        self,
+        config: TelegramClientConfig
+    ):
+        api = TelegramAPIServer.from_base(config.api_base_url) if config.api_base_url else PRODUCTION
+        
+        super().__init__(
+            limit=config.pool_limit,
+            api=api,
+            timeout=config.request_timeout
+        )
+        
+        self.pool_limit = config.pool_limit
+        self.pool_limit_per_host = config.pool_limit_per_host
+        self.keepalive_timeout = config.keepalive_timeout
+        self.connect_timeout = config.connect_timeout
+        self.stats = TelegramPoolStats()
+        self.max_retries = config.max_retries
+        self.max_retry_after = config.max_retry_after
+        self.scheduler = SendScheduler(config=config) if config.send_scheduler else None
+        
+        self._trace_config = TraceConfig()
+        self._trace_config.on_connection_create_end.append(self._on_connection_created)
+        self._trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        
+        # Our own pool rather than AiohttpSession's: its connector settings
+        # beyond `limit` are private attributes that may change in any release
+        self._pool: Optional[ClientSession] = None
+    
+    async def _on_connection_created(
+        self,
+        session: ClientSession,
+        context: Any,
+        params: Any
+    ) -> None:
+        self.stats.connections_created += 1
+    
+    async def _on_connection_reused(
+        self,
+        session: ClientSession,
+        context: Any,
+        params: Any
+    ) -> None:
+        self.stats.connections_reused += 1
+    
+    async def create_session(
+        self
+    ) -> ClientSession:
+        if self._pool is None or self._pool.closed:
+            self._pool = ClientSession(
+                connector=TCPConnector(
+                    ssl=ssl.create_default_context(cafile=certifi.where()),
+                    limit=self.pool_limit,
+                    limit_per_host=self.pool_limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=3600
+                ),
+                headers={
+                    "User-Agent": f"aiogram/{aiogram_version}"
+                },
+                timeout=ClientTimeout(
+                    total=self.timeout,
+                    connect=self.connect_timeout
+                ),
+                trace_configs=[self._trace_config]
+            )
+            
+            logger.info(
+                msg=f"Telegram connection pool opened (limit={self.pool_limit})"
+            )
+        
+        return self._pool
+    
+    async def close(
+        self
+    ) -> None:
+        if self._pool is not None and not self._pool.closed:
+            await self._pool.close()
+            
+            # Let the SSL connections close, as AiohttpSession.close does
+            await asyncio.sleep(0.25)
+    
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod,
+        timeout: Optional[int] = None
+    ) -> Any:
+        if not self.scheduler or method.__api_method__ not in RATE_LIMITED_METHODS:
+            return await self._request(
+                bot=bot,
+                method=method,
+                timeout=timeout
+            )
+        
+        # Inline message edits carry no chat_id and are paced globally only
+        chat_id = getattr(method, "chat_id", None)
+        priority = current_priority()
+        
+        for attempt in range(self.max_retries + 1):
+            await self.scheduler.acquire(
+                chat_id=chat_id,
+                priority=priority
+            )
+            
+            try:
+                return await self._request(
+                    bot=bot,
+                    method=method,
+                    timeout=timeout
+                )
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries or e.retry_after > self.max_retry_after:
+                    raise
+                
+                logger.warning(
+                    msg=f"Telegram flood limit on {method.__api_method__} to chat {chat_id}, retrying in {e.retry_after} s"
+                )
+                # The next acquire() waits the chat out
+                self.scheduler.backoff(
+                    chat_id=chat_id,
+                    retry_after=e.retry_after
+                )
+    
+    async def _request(
+        self,
+        bot: Bot,
+        method: TelegramMethod,
+        timeout: Optional[int] = None
+    ) -> Any:
+        started = time.perf_counter()
+        outcome = "error"
+        
+        try:
+            # Only inside an existing trace: a polling getUpdates is not worth one
+            with TRACER.span(
+                name=f"telegram.{method.__api_method__}",
+                kind=SPAN_KIND_CLIENT,
+                require_parent=True
+            ):
+                result = await super().make_request(
+                    bot=bot,
+                    method=method,
+                    timeout=timeout
+                )
+            outcome = "ok"
+            
+            return result
+        except TelegramRetryAfter:
+            outcome = "retry_after"
+            self.stats.errors += 1
+            raise
+        except Exception:
+            self.stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.requests += 1
+            self.stats.total_latency += elapsed
+            self.stats.max_latency = max(self.stats.max_latency, elapsed)
+            DEPENDENCY_DURATION.labels("telegram", method.__api_method__, outcome).observe(elapsed)
+
+
+def create_pooled_bot(
+    token: str,
+    config: Optional[TelegramClientConfig] = None
+) -> Bot:
+    session = PooledTelegramSession(
+        config=config or settings.telegram
+    )
+    
+    return Bot(
+        token=token,
+        session=session
+    )
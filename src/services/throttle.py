@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+
+from src.config.settings import settings, ThrottleConfig
+from src.services.metrics import THROTTLED_REQUESTS
+
+
+# Budgets: photos and voice notes each cost an OpenAI call, everything else is cheap
+CHEAP = "cheap"
+AI = "ai"
+
+
+class Verdict(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0
+    # True for the first rejection after an allowed request, so the user is
+    # told once per burst rather than once per update
+    notify: bool = False
+
+
+ALLOWED = Verdict(
+    allowed=True
+)
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at", "warned")
+    
+    def __init__(
+        self,
+        tokens: float,
+        now: float
+    ):
+        self.tokens = tokens
+        self.updated_at = now
+        self.warned = False
+    
+    def take(
+        self,
+        rate: float,
+        burst: int,
+        now: float
+    ) -> float:
+        # Returns 0 when a token was taken, otherwise seconds until one is due
+        tokens = min(burst, self.tokens + max(now - self.updated_at, 0.0) * rate)
+        self.updated_at = now
+        
+        if tokens >= 1.0:
+            self.tokens = tokens - 1.0
+            return 0.0
+        
+        self.tokens = tokens
+        return (1.0 - tokens) / rate
+
+
+@dataclass
+class ThrottleStats:
+    allowed: int = 0
+    rejected_user: int = 0
+    rejected_global: int = 0
+    evicted: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "rejected_user": self.rejected_user,
+            "rejected_global": self.rejected_global,
+            "evicted": self.evicted
+        }
+
+
+class RateLimiter:
+    # One bucket per user plus one shared by everybody, for a single budget
+    
+    def __init__(
+        self,
+        kind: str,
+        user_rate: float,
+        user_burst: int,
+        global_rate: float,
+        global_burst: int
+    ):
+        self.kind = kind
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.stats = ThrottleStats()
+        
+        # A bucket left alone this long has refilled, so forgetting it changes
+        # nothing; users are kept in last-seen order and evicted from the front.
+        self.idle_after = user_burst / user_rate if user_rate > 0 else 0.0
+        
+        self._users: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._global = TokenBucket(
+            tokens=global_burst,
+            now=time.monotonic()
+        )
+        # Flask calls in from request threads; uncontended on the event loop
+        self._lock = threading.Lock()
+    
+    @property
+    def active_users(self) -> int:
+        return len(self._users)
+    
+    def acquire(
+        self,
+        user_id: Hashable,
+        now: Optional[float] = None
+    ) -> Verdict:
+        now = time.monotonic() if now is None else now
+        
+        with self._lock:
+            self._evict(now)
+            
+            bucket = self._users.get(user_id)
+            if bucket is None:
+                bucket = TokenBucket(
+                    tokens=self.user_burst,
+                    now=now
+                )
+                self._users[user_id] = bucket
+            else:
+                self._users.move_to_end(user_id)
+            
+            if self.user_rate > 0:
+                wait = bucket.take(
+                    rate=self.user_rate,
+                    burst=self.user_burst,
+                    now=now
+                )
+                if wait:
+                    self.stats.rejected_user += 1
+                    return self._reject(bucket=bucket, scope="user", wait=wait)
+            
+            if self.global_rate > 0:
+                wait = self._global.take(
+                    rate=self.global_rate,
+                    burst=self.global_burst,
+                    now=now
+                )
+                if wait:
+                    # Not this user's fault: give their token back
+                    if self.user_rate > 0:
+                        bucket.tokens += 1.0
+                    self.stats.rejected_global += 1
+                    return self._reject(bucket=bucket, scope="global", wait=wait)
+            
+            bucket.warned = False
+            self.stats.allowed += 1
+            
+            return ALLOWED
+    
+    def _reject(
+        self,
+        bucket: TokenBucket,
+        scope: str,
+        wait: float
+    ) -> Verdict:
+        THROTTLED_REQUESTS.labels(self.kind, scope).inc()
+        notify = not bucket.warned
+        bucket.warned = True
+        
+        return Verdict(
+            allowed=False,
+            retry_after=wait,
+            notify=notify
+        )
+    
+    def _evict(
+        self,
+        now: float
+    ) -> None:
+        users = self._users
+        
+        while users:
+            user_id = next(iter(users))
+            if now - users[user_id].updated_at < self.idle_after:
+                break
+            
+            del users[user_id]
+            self.stats.evicted += 1
+
+
+class Throttle:
+    
+    def __init__(
+        self,
+        config: Optional[ThrottleConfig] = None
+    ):
+        config = config or settings.throttle
+        self.enabled = config.enabled
+        self.limiters = {
+            CHEAP: RateLimiter(
+                kind=CHEAP,
+                user_rate=config.user_rate,
+                user_burst=config.user_burst,
+                global_rate=config.global_rate,
+                global_burst=config.global_burst
+            ),
+            AI: RateLimiter(
+                kind=AI,
+                user_rate=config.ai_user_rate,
+                user_burst=config.ai_user_burst,
+                global_rate=config.ai_global_rate,
+                global_burst=config.ai_global_burst
+            )
+        }
+    
+    def acquire(
+        self,
+        user_id: Hashable,
+        kind: str
+    ) -> Verdict:
+        if not self.enabled:
+            return ALLOWED
+        
+        return self.limiters[kind].acquire(
+            user_id=user_id
+        )
+    
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {}
+        
+        return {
+            kind: {**limiter.stats.to_dict(), "active_users": limiter.active_users}
+            for kind, limiter in self.limiters.items()
+        }
@@ -0,0 +1,498 @@
+import atexit
+import functools
+import json
+import random
+import threading
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from src.config.settings import settings, TracingConfig
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+# OTLP enum values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(
+    header: Optional[str]
+) -> Optional[SpanContext]:
+    # W3C Trace Context: version-trace_id-parent_id-flags
+    if not header:
+        return None
+    
+    parts = header.strip().lower().split("-")
+    
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff" or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    
+    try:
+        flags = int(parts[3][:2], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    
+    return SpanContext(
+        trace_id=parts[1],
+        span_id=parts[2],
+        sampled=bool(flags & 1)
+    )
+
+
+def format_traceparent(
+    context: SpanContext
+) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class Span:
+    __slots__ = ("name", "context", "parent_span_id", "kind", "start_ns", "end_ns", "attributes", "status", "status_message", "_tracer", "_token")
+    
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_span_id: Optional[str],
+        kind: int,
+        tracer: "Tracer",
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self._tracer = tracer
+        self._token: Optional[Token] = None
+    
+    def __enter__(self) -> "Span":
+        return self
+    
+    def __exit__(
+        self,
+        exc_type: Any,
+        exc: Optional[BaseException],
+        traceback: Any
+    ) -> None:
+        self._tracer.end_span(
+            span=self,
+            error=exc
+        )
+    
+    @property
+    def recording(self) -> bool:
+        return True
+    
+    def set_attribute(
+        self,
+        key: str,
+        value: Any
+    ) -> None:
+        self.attributes[key] = value
+    
+    def record_error(
+        self,
+        error: BaseException
+    ) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+
+class NonRecordingSpan:
+    # Stands in when tracing is off or the trace was not sampled; it still
+    # carries the ids so the decision propagates to child spans.
+    __slots__ = ("context", "_token")
+    
+    def __init__(
+        self,
+        context: Optional[SpanContext]
+    ):
+        self.context = context
+        self._token: Optional[Token] = None
+    
+    def __enter__(self) -> "NonRecordingSpan":
+        return self
+    
+    def __exit__(
+        self,
+        exc_type: Any,
+        exc: Optional[BaseException],
+        traceback: Any
+    ) -> None:
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+    
+    @property
+    def recording(self) -> bool:
+        return False
+    
+    def set_attribute(
+        self,
+        key: str,
+        value: Any
+    ) -> None:
+        pass
+    
+    def record_error(
+        self,
+        error: BaseException
+    ) -> None:
+        pass
+
+
+AnySpan = Union[Span, NonRecordingSpan]
+
+INVALID_SPAN = NonRecordingSpan(
+    context=None
+)
+
+_current_span: ContextVar[AnySpan] = ContextVar(
+    "current_span",
+    default=INVALID_SPAN
+)
+
+
+def _attribute_value(
+    value: Any
+) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def span_to_otlp(
+    span: Span
+) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "traceId": span.context.trace_id,
+        "spanId": span.context.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": _attribute_value(value)}
+            for key, value in span.attributes.items()
+        ],
+        "status": {"code": span.status}
+    }
+    
+    if span.parent_span_id:
+        entry["parentSpanId"] = span.parent_span_id
+    
+    if span.status_message:
+        entry["status"]["message"] = span.status_message
+    
+    return entry
+
+
+class OTLPFileExporter:
+    # Appends one OTLP/JSON ExportTraceServiceRequest per line, the layout the
+    # OpenTelemetry Collector's file exporter writes and its otlpjsonfile
+    # receiver reads. Spans are batched and written from a daemon thread.
+    
+    def __init__(
+        self,
+        path: str,
+        service_name: str,
+        flush_interval: float = 1.0,
+        max_pending: int = 4096
+    ):
+        self.path = path
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.exported = 0
+        self.dropped = 0
+        
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+    
+    def export(
+        self,
+        span: Span
+    ) -> None:
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            
+            self._pending.append(span)
+            
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="trace-exporter",
+                    daemon=True
+                )
+                self._thread.start()
+    
+    def _run(
+        self
+    ) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(
+                    msg=f"Writing spans to {self.path} failed: {e}"
+                )
+    
+    def flush(
+        self
+    ) -> int:
+        with self._lock:
+            spans, self._pending = self._pending, []
+        
+        if not spans:
+            return 0
+        
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": self.service_name}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [span_to_otlp(span) for span in spans]
+                        }
+                    ]
+                }
+            ]
+        }
+        
+        # One write per batch, so processes sharing the file do not interleave
+        with open(self.path, "a", encoding="utf-8") as export_file:
+            export_file.write(json.dumps(request, separators=(",", ":")) + "\n")
+        
+        self.exported += len(spans)
+        
+        return len(spans)
+    
+    def close(
+        self
+    ) -> None:
+        self._closed = True
+        self._wake.set()
+        
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        
+        self.flush()
+
+
+class Tracer:
+    
+    def __init__(
+        self,
+        config: Optional[TracingConfig] = None,
+        exporter: Optional[OTLPFileExporter] = None
+    ):
+        config = config or settings.tracing
+        
+        if exporter is None and config.export_path:
+            exporter = OTLPFileExporter(
+                path=config.export_path,
+                service_name=config.service_name,
+                flush_interval=config.flush_interval,
+                max_pending=config.max_pending
+            )
+            atexit.register(exporter.close)
+        
+        self.exporter = exporter
+        self.sample_rate = config.sample_rate
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+    
+    def current_span(self) -> AnySpan:
+        return _current_span.get()
+    
+    def current_context(self) -> Optional[SpanContext]:
+        return _current_span.get().context
+    
+    def extract(
+        self,
+        header: Optional[str]
+    ) -> Optional[SpanContext]:
+        # Keeps the trace id the Mini App sent but makes the sampling decision
+        # here: the flag comes from a public client and would bypass the rate
+        parent = parse_traceparent(
+            header=header
+        )
+        
+        if parent is None:
+            return None
+        
+        return SpanContext(
+            trace_id=parent.trace_id,
+            span_id=parent.span_id,
+            sampled=random.random() < self.sample_rate
+        )
+    
+    def start_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None,
+        require_parent: bool = False
+    ) -> AnySpan:
+        # Makes the span current; end_span() must be called in the same context
+        if not self.enabled:
+            return INVALID_SPAN
+        
+        parent = parent or _current_span.get().context
+        
+        if parent is None:
+            if require_parent:
+                return INVALID_SPAN
+            
+            # Head sampling: decided once per trace, inherited by every child
+            context = SpanContext(
+                trace_id=f"{random.getrandbits(128):032x}",
+                span_id=f"{random.getrandbits(64):016x}",
+                sampled=random.random() < self.sample_rate
+            )
+        else:
+            context = SpanContext(
+                trace_id=parent.trace_id,
+                span_id=f"{random.getrandbits(64):016x}",
+                sampled=parent.sampled
+            )
+        
+        if context.sampled:
+            span: AnySpan = Span(
+                name=name,
+                context=context,
+                parent_span_id=parent.span_id if parent else None,
+                kind=kind,
+                tracer=self,
+                attributes=attributes
+            )
+        else:
+            span = NonRecordingSpan(
+                context=context
+            )
+        
+        span._token = _current_span.set(span)
+        
+        return span
+    
+    def end_span(
+        self,
+        span: AnySpan,
+        error: Optional[BaseException] = None
+    ) -> None:
+        if span._token is not None:
+            _current_span.reset(span._token)
+            span._token = None
+        
+        if not span.recording:
+            return
+        
+        if error is not None:
+            span.record_error(error)
+        elif span.status == STATUS_UNSET:
+            span.status = STATUS_OK
+        
+        span.end_ns = time.time_ns()
+        self.exporter.export(span)
+    
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None,
+        require_parent: bool = False
+    ) -> AnySpan:
+        # Spans are their own context managers; a generator-based one costs
+        # more than the whole disabled path
+        return self.start_span(
+            name=name,
+            kind=kind,
+            attributes=attributes,
+            parent=parent,
+            require_parent=require_parent
+        )
+    
+    def traced(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_SERVER
+    ) -> Callable:
+        # For bot handlers: functools.wraps keeps the signature aiogram
+        # inspects to pick the keyword arguments it passes
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name=name, kind=kind):
+                    return await func(*args, **kwargs)
+            
+            return wrapper
+        
+        return decorate
+    
+    def flush(self) -> None:
+        if self.exporter:
+            self.exporter.flush()
+    
+    def stats(self) -> Dict[str, Any]:
+        if not self.exporter:
+            return {}
+        
+        return {
+            "sample_rate": self.sample_rate,
+            "exported": self.exporter.exported,
+            "dropped": self.exporter.dropped
+        }
+
+
+TRACER = Tracer()
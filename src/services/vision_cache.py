@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings, VisionCacheConfig
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+@dataclass
+class CacheEntry:
+    result: Dict[str, str]
+    created_at: float
+    latency: float
+    tokens: int
+
+
+@dataclass
+class VisionCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    saved_latency: float = 0.0
+    saved_tokens: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "saved_latency_seconds": round(self.saved_latency, 3),
+            "saved_tokens": self.saved_tokens
+        }
+
+
+class VisionCache:
+    
+    def __init__(
+        self,
+        config: Optional[VisionCacheConfig] = None
+    ):
+        self.config = config or settings.vision_cache
+        self.stats = VisionCacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        
+        if self.config.path:
+            self._db = sqlite3.connect(
+                database=self.config.path,
+                check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS vision_cache ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL, "
+                "latency REAL NOT NULL, tokens INTEGER NOT NULL)"
+            )
+            # Every put prunes expired rows by created_at
+            self._db.execute("CREATE INDEX IF NOT EXISTS vision_cache_created_at ON vision_cache (created_at)")
+            self._db.commit()
+            
+            logger.info(
+                msg=f"Vision cache disk tier at {self.config.path}"
+            )
+    
+    @staticmethod
+    def make_key(
+        image: bytes,
+        model: str,
+        prompt_version: str
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{model}\0{prompt_version}\0".encode("utf-8"))
+        digest.update(image)
+        
+        return digest.hexdigest()
+    
+    def _is_expired(
+        self,
+        entry: CacheEntry
+    ) -> bool:
+        return time.time() - entry.created_at > self.config.ttl
+    
+    def _remember(
+        self,
+        key: str,
+        entry: CacheEntry
+    ) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+    
+    def _hit(
+        self,
+        entry: CacheEntry
+    ) -> Dict[str, str]:
+        self.stats.saved_latency += entry.latency
+        self.stats.saved_tokens += entry.tokens
+        
+        return dict(entry.result)
+    
+    async def get(
+        self,
+        key: str
+    ) -> Optional[Dict[str, str]]:
+        entry = self._entries.get(key)
+        
+        if entry and self._is_expired(entry):
+            del self._entries[key]
+            self.stats.expirations += 1
+            entry = None
+        
+        if entry:
+            self._entries.move_to_end(key)
+            self.stats.memory_hits += 1
+            return self._hit(entry)
+        
+        if self._db:
+            entry = await asyncio.to_thread(self._load, key)
+            
+            if entry and self._is_expired(entry):
+                self.stats.expirations += 1
+                entry = None
+            
+            if entry:
+                self._remember(key, entry)
+                self.stats.disk_hits += 1
+                return self._hit(entry)
+        
+        self.stats.misses += 1
+        
+        return None
+    
+    async def put(
+        self,
+        key: str,
+        result: Dict[str, str],
+        latency: float,
+        tokens: int
+    ) -> None:
+        entry = CacheEntry(
+            result=dict(result),
+            created_at=time.time(),
+            latency=latency,
+            tokens=tokens
+        )
+        self._remember(key, entry)
+        
+        if self._db:
+            await asyncio.to_thread(self._store, key, entry)
+    
+    def _load(
+        self,
+        key: str
+    ) -> Optional[CacheEntry]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT result, created_at, latency, tokens FROM vision_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+        
+        if not row:
+            return None
+        
+        return CacheEntry(
+            result=json.loads(row[0]),
+            created_at=row[1],
+            latency=row[2],
+            tokens=row[3]
+        )
+    
+    def _store(
+        self,
+        key: str,
+        entry: CacheEntry
+    ) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO vision_cache (key, result, created_at, latency, tokens) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(entry.result), entry.created_at, entry.latency, entry.tokens)
+            )
+            self._db.execute(
+                "DELETE FROM vision_cache WHERE created_at < ?",
+                (time.time() - self.config.ttl,)
+            )
+            self._db.commit()
+    
+    def close(
+        self
+    ) -> None:
+        if self._db:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,249 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+from src.config.settings import settings
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+def update_chat_id(
+    update: Dict[str, Any]
+) -> Optional[int]:
+    for name, event in update.items():
+        if name == "update_id" or not isinstance(event, dict):
+            continue
+        
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+        
+        user = event.get("from") or event.get("user")
+        if user:
+            return user["id"]
+    
+    return None
+
+
+@dataclass
+class WebhookStats:
+    received: int = 0
+    processed: int = 0
+    failed: int = 0
+    unauthorized: int = 0
+    throttled: int = 0
+    chat_throttled: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    total_handling: float = 0.0
+    max_handling: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        finished = self.processed + self.failed
+        
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "failed": self.failed,
+            "unauthorized": self.unauthorized,
+            "throttled": self.throttled,
+            "chat_throttled": self.chat_throttled,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "handling_avg_ms": round(self.total_handling / finished * 1000, 2) if finished else 0.0,
+            "handling_max_ms": round(self.max_handling * 1000, 2)
+        }
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        max_in_flight: int,
+        max_pending_per_chat: int = 8,
+        secret_token: Optional[str] = None,
+        **data: Any
+    ):
+        super().__init__(
+            dispatcher=dispatcher,
+            bot=bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data
+        )
+        self.max_in_flight = max_in_flight
+        self.max_pending_per_chat = max_pending_per_chat
+        self.stats = WebhookStats()
+        
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._admission = asyncio.Condition()
+        self._chat_locks: Dict[Optional[int], asyncio.Lock] = {}
+        self._chat_pending: Dict[Optional[int], int] = {}
+        self._chat_queues: Dict[Optional[int], Deque[object]] = {}
+    
+    def verify_secret(
+        self,
+        telegram_secret_token: str,
+        bot: Bot
+    ) -> bool:
+        verified = super().verify_secret(telegram_secret_token, bot)
+        
+        if not verified:
+            self.stats.unauthorized += 1
+        
+        return verified
+    
+    async def _handle_request_background(
+        self,
+        bot: Bot,
+        request: web.Request
+    ) -> web.Response:
+        update = await request.json(loads=bot.session.json_loads)
+        chat_id = update_chat_id(update)
+        self.stats.received += 1
+        
+        # The response waits while max_in_flight chats already have updates
+        # pending, so Telegram backs off instead of updates piling up as
+        # unbounded tasks, and while this chat has max_pending_per_chat
+        # updates queued, so a bursting chat only delays itself. Waiting
+        # updates of one chat are admitted in arrival order.
+        if chat_id in self._chat_queues or not self._admits(chat_id):
+            if chat_id in self._chat_pending:
+                self.stats.chat_throttled += 1
+            else:
+                self.stats.throttled += 1
+            
+            ticket = object()
+            queue = self._chat_queues.setdefault(chat_id, deque())
+            queue.append(ticket)
+            
+            async with self._admission:
+                try:
+                    await self._admission.wait_for(lambda: queue[0] is ticket and self._admits(chat_id))
+                finally:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._chat_queues[chat_id]
+                    
+                    # The next update of this chat may fit as well
+                    self._admission.notify_all()
+        
+        self._chat_pending[chat_id] = self._chat_pending.get(chat_id, 0) + 1
+        
+        task = asyncio.create_task(
+            self._background_feed_update(
+                bot=bot,
+                update=update,
+                chat_id=chat_id
+            )
+        )
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        
+        return web.json_response({}, dumps=bot.session.json_dumps)
+    
+    def _admits(
+        self,
+        chat_id: Optional[int]
+    ) -> bool:
+        pending = self._chat_pending.get(chat_id, 0)
+        
+        if pending:
+            return pending < self.max_pending_per_chat
+        
+        return len(self._chat_pending) < self.max_in_flight
+    
+    async def _background_feed_update(
+        self,
+        bot: Bot,
+        update: Dict[str, Any],
+        chat_id: Optional[int] = None
+    ) -> None:
+        # Updates of one chat run one at a time, in arrival order (asyncio
+        # locks wake waiters FIFO); different chats run concurrently. The
+        # slot is only taken once the chat's turn has come, so queued
+        # updates of a busy chat never hold one.
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        started = time.perf_counter()
+        
+        try:
+            async with lock:
+                async with self._slots:
+                    self.stats.in_flight += 1
+                    self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+                    
+                    try:
+                        await super()._background_feed_update(
+                            bot=bot,
+                            update=update
+                        )
+                    finally:
+                        self.stats.in_flight -= 1
+            self.stats.processed += 1
+        except Exception as e:
+            self.stats.failed += 1
+            
+            logger.error(
+                msg=f"Webhook update {update.get('update_id')} failed: {e}",
+                exc_info=True
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.total_handling += elapsed
+            self.stats.max_handling = max(self.stats.max_handling, elapsed)
+            
+            self._chat_pending[chat_id] -= 1
+            if not self._chat_pending[chat_id]:
+                del self._chat_pending[chat_id]
+                del self._chat_locks[chat_id]
+            
+            async with self._admission:
+                self._admission.notify_all()
+    
+    async def close(
+        self,
+        timeout: float = 10.0
+    ) -> None:
+        # The bot session belongs to BotService; only drain the updates
+        # that were already acknowledged to Telegram.
+        tasks = list(self._background_feed_update_tasks)
+        
+        if not tasks:
+            return
+        
+        logger.info(
+            msg=f"Waiting for {len(tasks)} in-flight webhook updates"
+        )
+        
+        _, pending = await asyncio.wait(
+            tasks,
+            timeout=timeout
+        )
+        
+        for task in pending:
+            task.cancel()
+    
+    async def handle_stats(
+        self,
+        request: web.Request
+    ) -> web.Response:
+        return web.json_response(
+            data={
+                "max_in_flight": self.max_in_flight,
+                "max_pending_per_chat": self.max_pending_per_chat,
+                **self.stats.to_dict()
+            }
+        )
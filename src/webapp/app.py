@@ -0,0 +1,509 @@
+import asyncio
+import math
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from aiohttp import web
+
+from src.config.settings import settings, BASE_DIR
+from src.services.metrics import handle_metrics
+from src.services.throttle import AI, CHEAP
+from src.services.tracing import TRACER, TRACEPARENT_HEADER, SPAN_KIND_SERVER
+from src.webapp.auth import INIT_DATA_HEADER, parse_user_id, throttle_key
+from src.webapp.context import WebAppContext
+from src.webapp.export import (
+    GzipStream,
+    InvalidExportQuery,
+    accepts_gzip,
+    export_authorized,
+    export_chunks,
+    parse_export_query
+)
+from src.webapp.jobs import QueueFullError
+from src.webapp.reports import send_edited_review, send_location_prompt
+from src.webapp.uploads import PhotoUpload, UploadTooLargeError, InvalidUploadError
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+WEBAPP_DIR: Path = BASE_DIR / "webapp"
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+CONTEXT_KEY = web.AppKey(
+    "context",
+    WebAppContext
+)
+
+
+@web.middleware
+async def cors_middleware(
+    request: web.Request,
+    handler
+) -> web.StreamResponse:
+    if request.method == "OPTIONS":
+        response = web.Response()
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+        response.headers["Access-Control-Allow-Headers"] = request.headers.get(
+            "Access-Control-Request-Headers",
+            "*"
+        )
+    else:
+        response = await handler(request)
+    
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    
+    return response
+
+
+@web.middleware
+async def tracing_middleware(
+    request: web.Request,
+    handler
+) -> web.StreamResponse:
+    # Mini App writes only; page loads, job polling and scrapes are not traced
+    if request.method != "POST" or not TRACER.enabled:
+        return await handler(request)
+    
+    with TRACER.span(
+        name=f"POST {request.path}",
+        kind=SPAN_KIND_SERVER,
+        parent=TRACER.extract(
+            header=request.headers.get(TRACEPARENT_HEADER)
+        )
+    ) as span:
+        response = await handler(request)
+        span.set_attribute("http.status_code", response.status)
+        
+        return response
+
+
+def _serve_page(
+    filename: str
+):
+    async def handler(
+        request: web.Request
+    ) -> web.FileResponse:
+        return web.FileResponse(
+            path=WEBAPP_DIR / filename
+        )
+    
+    return handler
+
+
+def _throttled(
+    request: web.Request,
+    kind: str
+) -> Optional[web.Response]:
+    # Keyed by the verified Telegram user, or the client address, from the
+    # headers alone, so it runs before the body is read
+    verdict = request.app[CONTEXT_KEY].throttle.acquire(
+        user_id=throttle_key(
+            init_data=request.headers.get(INIT_DATA_HEADER),
+            remote=request.remote
+        ),
+        kind=kind
+    )
+    
+    if verdict.allowed:
+        return None
+    
+    return web.json_response(
+        data={"ok": False, "error": "Too many requests, please retry shortly"},
+        status=429,
+        headers={"Retry-After": str(math.ceil(verdict.retry_after))}
+    )
+
+
+async def handle_location(
+    request: web.Request
+) -> web.Response:
+    throttled = _throttled(
+        request=request,
+        kind=CHEAP
+    )
+    if throttled:
+        return throttled
+    
+    data = await request.json()
+    user_id = data.get("user_id")
+    latitude = data.get("latitude")
+    longitude = data.get("longitude")
+    
+    logger.info(
+        msg=f"Received location from user {user_id}: {latitude}, {longitude}"
+    )
+    
+    await send_location_prompt(
+        bot=request.app[CONTEXT_KEY].bot,
+        user_id=user_id,
+        latitude=latitude,
+        longitude=longitude
+    )
+    
+    return web.json_response(
+        data={"ok": True}
+    )
+
+
+async def _read_photo_request(
+    request: web.Request
+) -> Tuple[Dict[str, Any], Optional[PhotoUpload]]:
+    if request.content_type == "multipart/form-data":
+        fields: Dict[str, Any] = {}
+        upload = None
+        reader = await request.multipart()
+        
+        async for part in reader:
+            if part.name == "photo":
+                upload = PhotoUpload(
+                    content_type=part.headers.get("Content-Type", "image/jpeg")
+                )
+                
+                while chunk := await part.read_chunk():
+                    upload.write(chunk)
+            else:
+                fields[part.name] = await part.text()
+        
+        return fields, upload
+    
+    if request.content_type.startswith("image/"):
+        upload = PhotoUpload(
+            content_type=request.content_type
+        )
+        await upload.write_stream(
+            chunks=request.content.iter_chunked(UPLOAD_CHUNK_SIZE)
+        )
+        
+        return dict(request.query), upload
+    
+    data = await request.json()
+    photo_base64 = data.get("photo")
+    
+    logger.info(
+        msg=f"Received base64 photo, size: {len(photo_base64) if photo_base64 else 0}"
+    )
+    
+    upload = PhotoUpload.from_base64(photo_base64=photo_base64) if photo_base64 else None
+    
+    return data, upload
+
+
+async def handle_photo_upload(
+    request: web.Request
+) -> web.Response:
+    upload = None
+    
+    throttled = _throttled(
+        request=request,
+        kind=AI
+    )
+    if throttled:
+        return throttled
+    
+    try:
+        with TRACER.span(name="webapp.read_upload"):
+            fields, upload = await _read_photo_request(
+                request=request
+            )
+        user_id = parse_user_id(fields.get("user_id"))
+        latitude = float(fields.get("latitude", 35.0))
+        longitude = float(fields.get("longitude", 33.0))
+        
+        if user_id is None:
+            return web.json_response(
+                data={"ok": False, "error": "Missing or invalid user_id"},
+                status=400
+            )
+        
+        if not upload or not upload.size:
+            logger.error(
+                msg="No photo data received!"
+            )
+            return web.json_response(
+                data={"ok": False, "error": "No photo data"},
+                status=400
+            )
+        
+        logger.info(
+            msg=f"Received photo from user {user_id}, photo size: {upload.size} bytes"
+        )
+        
+        job = await request.app[CONTEXT_KEY].photo_jobs.submit(
+            user_id=user_id,
+            payload={
+                "photo": upload,
+                "latitude": latitude,
+                "longitude": longitude
+            }
+        )
+        upload = None
+        
+        logger.info(
+            msg=f"Queued photo job {job.job_id} for user {user_id}"
+        )
+        
+        return web.json_response(
+            data={"ok": True, "job_id": job.job_id, "status_url": f"/jobs/{job.job_id}"},
+            status=202
+        )
+    
+    except UploadTooLargeError as e:
+        return web.json_response(
+            data={"ok": False, "error": str(e)},
+            status=413
+        )
+    
+    except InvalidUploadError as e:
+        return web.json_response(
+            data={"ok": False, "error": str(e)},
+            status=400
+        )
+    
+    except QueueFullError as e:
+        logger.warning(
+            msg=f"Rejecting photo upload: {e}"
+        )
+        return web.json_response(
+            data={"ok": False, "error": "Server is busy, please retry shortly"},
+            status=503,
+            headers={"Retry-After": "5"}
+        )
+    
+    except Exception as e:
+        logger.error(
+            msg=f"Error in handle_photo_upload: {e}",
+            exc_info=True
+        )
+        return web.json_response(
+            data={"ok": False, "error": str(e)},
+            status=500
+        )
+    
+    finally:
+        if upload:
+            upload.close()
+
+
+async def handle_job_status(
+    request: web.Request
+) -> web.Response:
+    job = request.app[CONTEXT_KEY].photo_jobs.get(
+        job_id=request.match_info["job_id"]
+    )
+    
+    if not job:
+        return web.json_response(
+            data={"ok": False, "error": "Unknown job"},
+            status=404
+        )
+    
+    return web.json_response(
+        data={"ok": True, **job.to_dict()}
+    )
+
+
+async def handle_update_description(
+    request: web.Request
+) -> web.Response:
+    throttled = _throttled(
+        request=request,
+        kind=CHEAP
+    )
+    if throttled:
+        return throttled
+    
+    try:
+        data = await request.json()
+        user_id = data.get("user_id")
+        description = data.get("description")
+        draft_id = data.get("draft_id")
+        category = data.get("category")
+        subcategory = data.get("subcategory")
+        latitude = data.get("latitude", 0.0)
+        longitude = data.get("longitude", 0.0)
+        
+        logger.info(
+            msg=f"User {user_id} updating description: {description[:50]}..."
+        )
+        
+        await send_edited_review(
+            bot=request.app[CONTEXT_KEY].bot,
+            report_repository=request.app[CONTEXT_KEY].report_repository,
+            user_id=user_id,
+            draft_id=int(draft_id) if draft_id else None,
+            description=description,
+            category=category,
+            subcategory=subcategory,
+            latitude=latitude,
+            longitude=longitude
+        )
+        
+        return web.json_response(
+            data={"ok": True}
+        )
+    
+    except Exception as e:
+        logger.error(
+            msg=f"Error updating description: {e}",
+            exc_info=True
+        )
+        return web.json_response(
+            data={"ok": False, "error": str(e)},
+            status=500
+        )
+
+
+async def handle_report_export(
+    request: web.Request
+) -> web.StreamResponse:
+    if not settings.webapp.export_token:
+        return web.json_response(
+            data={"ok": False, "error": "Export is not enabled"},
+            status=404
+        )
+    
+    if not export_authorized(request.headers.get("Authorization")):
+        return web.json_response(
+            data={"ok": False, "error": "Unauthorized"},
+            status=401
+        )
+    
+    try:
+        query = parse_export_query(
+            params=request.query
+        )
+    except InvalidExportQuery as e:
+        return web.json_response(
+            data={"ok": False, "error": str(e)},
+            status=400
+        )
+    
+    gzip = GzipStream() if accepts_gzip(request.headers.get("Accept-Encoding")) else None
+    response = web.StreamResponse(
+        headers={
+            "Content-Type": query.content_type,
+            "Vary": "Accept-Encoding"
+        }
+    )
+    if gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    
+    await response.prepare(request)
+    
+    chunks = export_chunks(
+        repository=request.app[CONTEXT_KEY].report_repository,
+        query=query
+    )
+    
+    try:
+        async for chunk in chunks:
+            if gzip:
+                chunk = await asyncio.to_thread(gzip.compress, chunk)
+            
+            await response.write(chunk)
+    finally:
+        await chunks.aclose()
+    
+    if gzip:
+        await response.write(gzip.finish())
+    
+    await response.write_eof()
+    
+    return response
+
+
+async def handle_stats(
+    request: web.Request
+) -> web.Response:
+    return web.json_response(
+        data=request.app[CONTEXT_KEY].stats()
+    )
+
+
+async def _on_startup(
+    app: web.Application
+) -> None:
+    context = WebAppContext()
+    await context.start()
+    app[CONTEXT_KEY] = context
+    
+    logger.info(
+        msg="Async web app server started"
+    )
+
+
+async def _on_cleanup(
+    app: web.Application
+) -> None:
+    await app[CONTEXT_KEY].close()
+    
+    logger.info(
+        msg="Async web app server stopped"
+    )
+
+
+def create_app() -> web.Application:
+    app = web.Application(
+        middlewares=[cors_middleware, tracing_middleware],
+        client_max_size=settings.webapp.max_upload_bytes * 4 // 3 + UPLOAD_CHUNK_SIZE
+    )
+    
+    app.router.add_get(
+        path="/map.html",
+        handler=_serve_page(filename="map.html")
+    )
+    app.router.add_get(
+        path="/camera.html",
+        handler=_serve_page(filename="camera.html")
+    )
+    app.router.add_get(
+        path="/edit_description.html",
+        handler=_serve_page(filename="edit_description.html")
+    )
+    
+    app.router.add_post(
+        path="/location",
+        handler=handle_location
+    )
+    app.router.add_post(
+        path="/upload-photo",
+        handler=handle_photo_upload
+    )
+    app.router.add_post(
+        path="/update-description",
+        handler=handle_update_description
+    )
+    app.router.add_get(
+        path="/jobs/{job_id}",
+        handler=handle_job_status
+    )
+    app.router.add_get(
+        path="/reports/export",
+        handler=handle_report_export
+    )
+    app.router.add_get(
+        path="/stats",
+        handler=handle_stats
+    )
+    app.router.add_get(
+        path="/metrics",
+        handler=handle_metrics
+    )
+    
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    
+    return app
+
+
+def run_app() -> None:
+    web.run_app(
+        app=create_app(),
+        host=settings.webapp.host,
+        port=settings.webapp.port
+    )
@@ -0,0 +1,79 @@
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Optional
+from urllib.parse import parse_qsl
+
+from src.config.settings import settings
+
+
+# The Mini App pages send Telegram.WebApp.initData in this header, so the
+# caller is known before the request body is read
+INIT_DATA_HEADER = "X-Telegram-Init-Data"
+
+# Telegram signs initData once, when the Mini App is opened
+INIT_DATA_MAX_AGE = 24 * 3600
+
+
+def init_data_user_id(
+    init_data: Optional[str],
+    bot_token: Optional[str] = None,
+    now: Optional[float] = None
+) -> Optional[int]:
+    # Returns the Telegram user id from initData signed for this bot, or
+    # None when it is missing, forged or expired
+    # (https://core.telegram.org/bots/webapps#validating-data-received-via-the-mini-app)
+    if not init_data:
+        return None
+    
+    fields = dict(parse_qsl(init_data, keep_blank_values=True))
+    received_hash = fields.pop("hash", "")
+    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", (bot_token or settings.bot.token).encode(), hashlib.sha256).digest()
+    expected_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    
+    if not hmac.compare_digest(received_hash, expected_hash):
+        return None
+    
+    try:
+        auth_date = int(fields.get("auth_date", "0"))
+        user = json.loads(fields.get("user", "{}"))
+        user_id = int(user["id"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    
+    if (now or time.time()) - auth_date > INIT_DATA_MAX_AGE:
+        return None
+    
+    return user_id
+
+
+def parse_user_id(
+    value: Any
+) -> Optional[int]:
+    # Telegram user ids are positive integers; outside Telegram the Mini App
+    # has no user and posts the string "null"
+    try:
+        user_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    
+    return user_id if user_id > 0 else None
+
+
+def throttle_key(
+    init_data: Optional[str],
+    remote: Optional[str]
+) -> str:
+    # The per-user budget follows the verified Telegram user; anything else
+    # shares its client address's budget, so neither leaving user_id out
+    # nor rotating it buys more requests
+    user_id = init_data_user_id(
+        init_data=init_data
+    )
+    
+    if user_id is not None:
+        return f"user:{user_id}"
+    
+    return f"addr:{remote or 'unknown'}"
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+from src.webapp.context import WebAppContext
+
+
+class BackgroundLoop:
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._context: Optional[WebAppContext] = None
+        self._lock = threading.Lock()
+    
+    def _start(
+        self
+    ) -> None:
+        loop = asyncio.new_event_loop()
+        
+        threading.Thread(
+            target=loop.run_forever,
+            name="webapp-event-loop",
+            daemon=True
+        ).start()
+        
+        context = WebAppContext()
+        asyncio.run_coroutine_threadsafe(
+            coro=context.start(),
+            loop=loop
+        ).result()
+        
+        self._loop = loop
+        self._context = context
+    
+    @property
+    def context(
+        self
+    ) -> WebAppContext:
+        if self._context is None:
+            with self._lock:
+                if self._context is None:
+                    self._start()
+        
+        return self._context
+    
+    @property
+    def loop(
+        self
+    ) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self.context
+        
+        return self._loop
+    
+    def run(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        timeout: Optional[float] = None
+    ) -> Any:
+        return asyncio.run_coroutine_threadsafe(
+            coro=coro,
+            loop=self.loop
+        ).result(
+            timeout=timeout
+        )
+    
+    def iterate(
+        self,
+        iterator: AsyncIterator[Any]
+    ) -> Iterator[Any]:
+        # Steps an async iterator on the loop one item at a time, so a
+        # Flask response can stream it
+        try:
+            while True:
+                try:
+                    yield self.run(
+                        coro=iterator.__anext__()
+                    )
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(
+                coro=iterator.aclose()
+            )
+    
+    def stop(
+        self
+    ) -> None:
+        if self._loop is None:
+            return
+        
+        self.run(
+            coro=self._context.close()
+        )
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._context = None
@@ -0,0 +1,151 @@
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+
+from src.config.settings import settings
+from src.models.taxonomy import reload_taxonomy
+from src.services.ai_vision_service import AIVisionService
+from src.services.image_service import ImageNormalizer
+from src.services.report_repository import ReportRepository
+from src.services.send_scheduler import BACKGROUND, send_priority
+from src.services.vision_cache import VisionCache
+from src.services.telegram_session import create_pooled_bot
+from src.services.throttle import Throttle
+from src.services.tracing import TRACER
+from src.webapp.jobs import PhotoJob, PhotoJobQueue
+from src.webapp.reports import process_photo_upload, send_upload_failure
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+class WebAppContext:
+
+    def __init__(self):
+        self.bot: Optional[Bot] = None
+        self.ai_service: Optional[AIVisionService] = None
+        self.photo_jobs: Optional[PhotoJobQueue] = None
+        self.normalizer: Optional[ImageNormalizer] = None
+        self.vision_cache: Optional[VisionCache] = None
+        self.report_repository: Optional[ReportRepository] = None
+        self.throttle = Throttle(
+            config=settings.throttle
+        )
+    
+    async def start(
+        self
+    ) -> None:
+        reload_taxonomy()
+        
+        self.bot = create_pooled_bot(
+            token=settings.bot.token
+        )
+        
+        if settings.vision_cache.enabled:
+            self.vision_cache = VisionCache()
+        
+        self.ai_service = AIVisionService(
+            cache=self.vision_cache
+        )
+        
+        self.report_repository = ReportRepository(
+            config=settings.reports
+        )
+        
+        if settings.image.normalize:
+            self.normalizer = ImageNormalizer()
+            self.normalizer.start()
+        
+        self.photo_jobs = PhotoJobQueue(
+            handler=self._process_photo_job,
+            max_size=settings.webapp.upload_queue_size,
+            workers=settings.webapp.upload_workers,
+            history_size=settings.webapp.job_history_size,
+            on_failure=self._notify_photo_failure
+        )
+        await self.photo_jobs.start()
+        
+        logger.info(
+            msg="Web app context started"
+        )
+    
+    async def _process_photo_job(
+        self,
+        job: PhotoJob
+    ) -> Dict[str, str]:
+        photo = job.payload["photo"]
+        
+        # The user has already been answered with 202; replies to users
+        # interacting with the bot go out first
+        try:
+            with send_priority(BACKGROUND):
+                return await process_photo_upload(
+                    bot=self.bot,
+                    ai_service=self.ai_service,
+                    report_repository=self.report_repository,
+                    user_id=job.user_id,
+                    photo=photo,
+                    latitude=job.payload["latitude"],
+                    longitude=job.payload["longitude"],
+                    normalizer=self.normalizer,
+                    stages=job.stages
+                )
+        finally:
+            photo.close()
+    
+    async def _notify_photo_failure(
+        self,
+        job: PhotoJob
+    ) -> None:
+        await send_upload_failure(
+            bot=self.bot,
+            user_id=job.user_id
+        )
+    
+    async def close(
+        self
+    ) -> None:
+        if self.photo_jobs:
+            await self.photo_jobs.stop()
+        
+        if self.normalizer:
+            self.normalizer.close()
+        
+        if self.vision_cache:
+            self.vision_cache.close()
+        
+        if self.report_repository:
+            await self.report_repository.close()
+        
+        if self.ai_service:
+            await self.ai_service.close()
+        
+        if self.bot:
+            await self.bot.session.close()
+        
+        TRACER.flush()
+        
+        logger.info(
+            msg="Web app context closed"
+        )
+    
+    def stats(
+        self
+    ) -> Dict[str, Any]:
+        return {
+            "telegram": self.bot.session.stats.to_dict() if self.bot else {},
+            "telegram_sends": self.bot.session.scheduler.stats.to_dict() if self.bot and self.bot.session.scheduler else {},
+            "upload_queue": self.photo_jobs.stats() if self.photo_jobs else {},
+            "image_normalization": self.normalizer.stats.to_dict() if self.normalizer else {},
+            "vision": self.ai_service.usage.to_dict() if self.ai_service else {},
+            "openai": self.ai_service.pool.stats.to_dict() if self.ai_service else {},
+            "openai_guard": self.ai_service.guard.to_dict() if self.ai_service else {},
+            "vision_hedging": self.ai_service.hedger.stats.to_dict() if self.ai_service and self.ai_service.hedger.enabled else {},
+            "vision_cache": self.vision_cache.stats.to_dict() if self.vision_cache else {},
+            "tracing": TRACER.stats(),
+            "throttle": self.throttle.stats()
+        }
@@ -0,0 +1,250 @@
+import asyncio
+import csv
+import io
+import json
+import secrets
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from src.config.settings import settings
+from src.models.report import Report
+from src.services.report_repository import ReportRepository
+
+
+EXPORT_FIELDS = (
+    "id",
+    "user_id",
+    "latitude",
+    "longitude",
+    "category",
+    "subcategory",
+    "description",
+    "photo_file_id",
+    "audio_file_id",
+    "created_at",
+    "duplicate_of"
+)
+
+JSON_ENCODER = json.JSONEncoder(
+    ensure_ascii=False
+)
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+
+class InvalidExportQuery(ValueError):
+    pass
+
+
+@dataclass
+class ExportQuery:
+    format: str = "ndjson"
+    category: Optional[str] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    after_id: int = 0
+    limit: Optional[int] = None
+    
+    @property
+    def content_type(self) -> str:
+        return EXPORT_CONTENT_TYPES[self.format]
+
+
+def _parse_time(
+    name: str,
+    value: str
+) -> float:
+    # Unix seconds or ISO 8601; naive times are taken as UTC
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidExportQuery(f"'{name}' must be unix seconds or ISO 8601")
+    
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    
+    return parsed.timestamp()
+
+
+def parse_export_query(
+    params: Mapping[str, str]
+) -> ExportQuery:
+    query = ExportQuery(
+        format=params.get("format", "ndjson").lower(),
+        category=params.get("category") or None
+    )
+    
+    if query.format not in EXPORT_CONTENT_TYPES:
+        raise InvalidExportQuery(f"'format' must be one of {', '.join(EXPORT_CONTENT_TYPES)}")
+    
+    if params.get("since"):
+        query.since = _parse_time("since", params["since"])
+    
+    if params.get("until"):
+        query.until = _parse_time("until", params["until"])
+    
+    if params.get("bbox"):
+        try:
+            min_latitude, min_longitude, max_latitude, max_longitude = (float(part) for part in params["bbox"].split(","))
+        except ValueError:
+            raise InvalidExportQuery("'bbox' must be min_lat,min_lng,max_lat,max_lng")
+        
+        query.bbox = (min_latitude, min_longitude, max_latitude, max_longitude)
+    
+    try:
+        query.after_id = int(params.get("after_id", 0))
+        query.limit = int(params["limit"]) if params.get("limit") else None
+    except ValueError:
+        raise InvalidExportQuery("'after_id' and 'limit' must be integers")
+    
+    if query.limit is not None and query.limit <= 0:
+        raise InvalidExportQuery("'limit' must be positive")
+    
+    return query
+
+
+def export_authorized(
+    authorization: Optional[str]
+) -> bool:
+    token = settings.webapp.export_token
+    
+    if not token or not authorization:
+        return False
+    
+    return secrets.compare_digest(authorization, f"Bearer {token}")
+
+
+def report_values(
+    report: Report
+) -> Tuple:
+    return (
+        report.report_id,
+        report.user_id,
+        report.latitude,
+        report.longitude,
+        report.category,
+        report.subcategory,
+        report.description,
+        report.photo_file_id,
+        report.audio_file_id,
+        report.created_at,
+        report.duplicate_of
+    )
+
+
+def encode_ndjson(
+    reports: List[Report]
+) -> bytes:
+    return "".join(
+        JSON_ENCODER.encode(dict(zip(EXPORT_FIELDS, report_values(report)))) + "\n"
+        for report in reports
+    ).encode()
+
+
+def encode_csv(
+    reports: List[Report],
+    header: bool = False
+) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    
+    writer.writerows(report_values(report) for report in reports)
+    
+    return buffer.getvalue().encode()
+
+
+async def export_chunks(
+    repository: ReportRepository,
+    query: ExportQuery,
+    page_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    # One page of rows is held at a time, whatever the size of the result.
+    # Every row carries its id: pass the last one as after_id to resume.
+    page_size = page_size or settings.webapp.export_page_size
+    remaining = query.limit
+    encode = encode_csv if query.format == "csv" else encode_ndjson
+    
+    if query.format == "csv":
+        yield encode_csv(
+            reports=[],
+            header=True
+        )
+    
+    async for reports in repository.iter_reports(
+        category=query.category,
+        since=query.since,
+        until=query.until,
+        bbox=query.bbox,
+        after_id=query.after_id,
+        batch_size=min(page_size, remaining) if remaining else page_size
+    ):
+        if remaining is not None:
+            reports = reports[:remaining]
+            remaining -= len(reports)
+        
+        # Encoding a page takes milliseconds; keep it off the event loop
+        yield await asyncio.to_thread(encode, reports)
+        
+        if remaining == 0:
+            return
+
+
+def accepts_gzip(
+    accept_encoding: Optional[str]
+) -> bool:
+    return any(
+        coding.split(";")[0].strip() == "gzip"
+        for coding in (accept_encoding or "").split(",")
+    )
+
+
+class GzipStream:
+    
+    def __init__(
+        self,
+        level: Optional[int] = None
+    ):
+        self._compressor = zlib.compressobj(
+            level=settings.webapp.export_gzip_level if level is None else level,
+            wbits=31
+        )
+    
+    def compress(
+        self,
+        chunk: bytes
+    ) -> bytes:
+        # Flushed per chunk so every page reaches the client as it is read
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(
+        self
+    ) -> bytes:
+        return self._compressor.flush()
+
+
+def gzip_chunks(
+    chunks: Iterable[bytes],
+    level: Optional[int] = None
+) -> Iterator[bytes]:
+    stream = GzipStream(
+        level=level
+    )
+    
+    for chunk in chunks:
+        yield stream.compress(chunk)
+    
+    yield stream.finish()
@@ -0,0 +1,273 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.config.settings import settings
+from src.services.tracing import TRACER, SpanContext
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class PhotoJob:
+    job_id: str
+    user_id: int
+    payload: Dict[str, Any]
+    enqueued_at: float
+    status: str = "queued"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+    result: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
+    trace_context: Optional[SpanContext] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        wait = (self.started_at or time.monotonic()) - self.enqueued_at
+        
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "wait_ms": round(wait * 1000, 1),
+            "stages_ms": {
+                name: round(duration * 1000, 1)
+                for name, duration in self.stages.items()
+            },
+            "result": self.result,
+            "error": self.error
+        }
+
+
+JobHandler = Callable[[PhotoJob], Awaitable[Dict[str, str]]]
+
+
+class PhotoJobQueue:
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        max_size: int,
+        workers: int,
+        history_size: int,
+        on_failure: Optional[Callable[[PhotoJob], Awaitable[None]]] = None
+    ):
+        self.handler = handler
+        self.max_size = max_size
+        self.workers = workers
+        self.history_size = history_size
+        self.on_failure = on_failure
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, PhotoJob]" = OrderedDict()
+        self._busy = 0
+        
+        self.submitted = 0
+        self.rejected = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.stage_totals: Dict[str, float] = {}
+    
+    async def start(
+        self
+    ) -> None:
+        self._queue = asyncio.Queue(
+            maxsize=self.max_size
+        )
+        self._tasks = [
+            asyncio.create_task(
+                self._worker(),
+                name=f"photo-job-worker-{index}"
+            )
+            for index in range(self.workers)
+        ]
+        
+        logger.info(
+            msg=f"Photo job queue started with {self.workers} workers, capacity {self.max_size}"
+        )
+    
+    async def stop(
+        self
+    ) -> None:
+        for task in self._tasks:
+            task.cancel()
+        
+        await asyncio.gather(
+            *self._tasks,
+            return_exceptions=True
+        )
+        self._tasks = []
+        
+        # Jobs nobody will run: release their spooled photos (possibly temp
+        # files on disk) and fail them, so pollers do not wait on "queued"
+        discarded = 0
+        
+        while self._queue and not self._queue.empty():
+            job = self._queue.get_nowait()
+            self._fail(
+                job=job,
+                error="Server shut down before the photo was processed"
+            )
+            self._queue.task_done()
+            discarded += 1
+        
+        if discarded:
+            logger.warning(
+                msg=f"Photo job queue stopped with {discarded} jobs still queued"
+            )
+    
+    def _fail(
+        self,
+        job: PhotoJob,
+        error: str
+    ) -> None:
+        photo = job.payload.get("photo")
+        if photo is not None:
+            photo.close()
+        
+        job.status = "failed"
+        job.error = error
+        job.finished_at = time.monotonic()
+        job.payload = {}
+        self.failed += 1
+    
+    async def submit(
+        self,
+        user_id: int,
+        payload: Dict[str, Any]
+    ) -> PhotoJob:
+        job = PhotoJob(
+            job_id=uuid.uuid4().hex,
+            user_id=user_id,
+            payload=payload,
+            enqueued_at=time.monotonic(),
+            # The worker runs outside the request, so the trace is carried on the job
+            trace_context=TRACER.current_context()
+        )
+        
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"Photo queue is full ({self.max_size} jobs waiting)")
+        
+        self.submitted += 1
+        self._remember(job)
+        
+        return job
+    
+    def get(
+        self,
+        job_id: str
+    ) -> Optional[PhotoJob]:
+        return self._jobs.get(job_id)
+    
+    def _remember(
+        self,
+        job: PhotoJob
+    ) -> None:
+        self._jobs[job.job_id] = job
+        
+        while len(self._jobs) > self.history_size:
+            self._jobs.popitem(last=False)
+    
+    async def _worker(
+        self
+    ) -> None:
+        while True:
+            job = await self._queue.get()
+            self._busy += 1
+            
+            try:
+                await self._run(job)
+            finally:
+                self._busy -= 1
+                self._queue.task_done()
+    
+    async def _run(
+        self,
+        job: PhotoJob
+    ) -> None:
+        job.started_at = time.monotonic()
+        job.status = "running"
+        self.started += 1
+        
+        wait = job.started_at - job.enqueued_at
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        
+        try:
+            with TRACER.span(
+                name="photo_job",
+                parent=job.trace_context,
+                attributes={"job.id": job.job_id, "job.wait_ms": round(wait * 1000, 1)}
+            ):
+                job.result = await self.handler(job)
+            job.status = "done"
+            self.completed += 1
+        except asyncio.CancelledError:
+            # Stopped mid-run; the handler releases the photo on its way out
+            job.status = "failed"
+            job.error = "Server shut down while the photo was being processed"
+            self.failed += 1
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            self.failed += 1
+            
+            logger.error(
+                msg=f"Photo job {job.job_id} failed: {e}",
+                exc_info=True
+            )
+            
+            if self.on_failure:
+                try:
+                    await self.on_failure(job)
+                except Exception as notify_error:
+                    logger.error(
+                        msg=f"Failed to notify user {job.user_id} about job {job.job_id}: {notify_error}"
+                    )
+        finally:
+            job.finished_at = time.monotonic()
+            job.payload = {}
+            
+            for name, duration in job.stages.items():
+                self.stage_totals[name] = self.stage_totals.get(name, 0.0) + duration
+    
+    def stats(
+        self
+    ) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        
+        return {
+            "depth": self._queue.qsize() if self._queue else 0,
+            "capacity": self.max_size,
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_avg_ms": round(self.total_wait / self.started * 1000, 1) if self.started else 0.0,
+            "wait_max_ms": round(self.max_wait * 1000, 1),
+            "stage_avg_ms": {
+                name: round(total / finished * 1000, 1)
+                for name, total in self.stage_totals.items()
+            } if finished else {}
+        }
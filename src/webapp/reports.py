@@ -0,0 +1,260 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from src.config.settings import settings
+from src.models.report import Report
+from src.services.ai_vision_service import AIVisionService
+from src.services.image_service import ImageNormalizer
+from src.services.report_repository import ReportRepository
+from src.services.tracing import TRACER
+from src.webapp.uploads import PhotoUpload
+from src.bot.keyboards.inline import create_report_review_keyboard
+from src.bot.utils.formatting import build_report_text
+from src.bot.utils.logger import setup_logger
+
+
+logger = setup_logger(
+    name=__name__,
+    level=settings.bot.log_level
+)
+
+
+@contextmanager
+def timed_stage(
+    stages: Optional[Dict[str, float]],
+    name: str
+) -> Iterator[None]:
+    started = time.perf_counter()
+    
+    try:
+        with TRACER.span(name=f"photo.{name}"):
+            yield
+    finally:
+        if stages is not None:
+            stages[name] = time.perf_counter() - started
+
+
+async def send_location_prompt(
+    bot: Bot,
+    user_id: int,
+    latitude: float,
+    longitude: float
+) -> None:
+    message_text = (
+        f"✅ Location received!\n\n"
+        f"Latitude: {latitude}\n"
+        f"Longitude: {longitude}\n\n"
+        f"What would you like to share?"
+    )
+    
+    await bot.send_message(
+        chat_id=user_id,
+        text=message_text
+    )
+    
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text="📷 Photo",
+                    callback_data=f"media_photo|{latitude}|{longitude}"
+                ),
+                InlineKeyboardButton(
+                    text="🎵 Audio",
+                    callback_data=f"media_audio|{latitude}|{longitude}"
+                )
+            ]
+        ]
+    )
+    
+    await bot.send_message(
+        chat_id=user_id,
+        text="Choose media type:",
+        reply_markup=keyboard
+    )
+
+
+async def process_photo_upload(
+    bot: Bot,
+    ai_service: AIVisionService,
+    report_repository: ReportRepository,
+    user_id: int,
+    photo: PhotoUpload,
+    latitude: float,
+    longitude: float,
+    normalizer: Optional[ImageNormalizer] = None,
+    stages: Optional[Dict[str, float]] = None
+) -> Dict[str, str]:
+    with timed_stage(stages, "processing_message"):
+        await bot.send_message(
+            chat_id=user_id,
+            text="🔄 <b>Processing image...</b>\n\nAI is analyzing your photo. This may take a few moments.",
+            parse_mode="HTML"
+        )
+    
+    if normalizer:
+        with timed_stage(stages, "normalize"):
+            try:
+                normalized = await normalizer.normalize(
+                    data=photo.read()
+                )
+                photo.replace(
+                    data=normalized.data,
+                    content_type=normalized.content_type
+                )
+            except Exception as e:
+                logger.warning(
+                    msg=f"Image normalization failed, using original upload: {e}"
+                )
+    
+    logger.info(
+        msg="Starting AI analysis with OpenAI Vision..."
+    )
+    
+    with timed_stage(stages, "ai_analysis"):
+        analysis = await ai_service.analyze_problem_image(
+            image=photo.read(),
+            content_type=photo.content_type
+        )
+    
+    logger.info(
+        msg=f"Sending photo to Telegram, size: {photo.size} bytes"
+    )
+    
+    with timed_stage(stages, "send_photo"):
+        sent = await bot.send_photo(
+            chat_id=user_id,
+            photo=photo.as_input_file(),
+            caption="📸 Photo received"
+        )
+    
+    with timed_stage(stages, "send_review"):
+        await send_report_review(
+            bot=bot,
+            report_repository=report_repository,
+            user_id=user_id,
+            title="Report Details",
+            footer="Review your report and submit or change category.",
+            category=analysis["category"],
+            subcategory=analysis["subcategory"],
+            description=analysis["description"],
+            latitude=latitude,
+            longitude=longitude,
+            photo_file_id=sent.photo[-1].file_id if sent.photo else None
+        )
+    
+    return analysis
+
+
+async def send_upload_failure(
+    bot: Bot,
+    user_id: int
+) -> None:
+    await bot.send_message(
+        chat_id=user_id,
+        text="❌ Sorry, we could not process your photo. Please try again."
+    )
+
+
+async def send_report_review(
+    bot: Bot,
+    report_repository: ReportRepository,
+    user_id: int,
+    title: str,
+    footer: str,
+    category: str,
+    subcategory: str,
+    description: str,
+    latitude: float,
+    longitude: float,
+    photo_file_id: Optional[str] = None,
+    audio_file_id: Optional[str] = None
+) -> int:
+    # The review is saved as a draft its Submit button refers to; the bot
+    # never reads the report back from the message text
+    draft_id = await report_repository.save_draft(
+        report=Report(
+            user_id=user_id,
+            latitude=latitude,
+            longitude=longitude,
+            category=category,
+            subcategory=subcategory,
+            description=description,
+            photo_file_id=photo_file_id,
+            audio_file_id=audio_file_id
+        )
+    )
+    
+    message_text = build_report_text(
+        title=title,
+        latitude=latitude,
+        longitude=longitude,
+        category=category,
+        subcategory=subcategory,
+        description=description,
+        footer=footer
+    )
+    
+    review_keyboard = create_report_review_keyboard(
+        category=category,
+        subcategory=subcategory,
+        latitude=latitude,
+        longitude=longitude,
+        description=description,
+        webapp_url=settings.bot.webapp_url,
+        draft_id=draft_id
+    )
+    
+    await bot.send_message(
+        chat_id=user_id,
+        text=message_text,
+        parse_mode="HTML",
+        reply_markup=review_keyboard
+    )
+    
+    return draft_id
+
+
+async def send_edited_review(
+    bot: Bot,
+    report_repository: ReportRepository,
+    user_id: int,
+    draft_id: Optional[int],
+    description: str,
+    category: str,
+    subcategory: str,
+    latitude: float,
+    longitude: float
+) -> int:
+    # An edit keeps everything but the description from the draft it was
+    # opened on; the fields the page sends back only cover older reviews
+    # that have no draft
+    draft = await report_repository.get_draft(
+        draft_id=draft_id,
+        user_id=user_id
+    ) if draft_id else None
+    
+    if draft:
+        category = draft.category
+        subcategory = draft.subcategory
+        latitude = draft.latitude
+        longitude = draft.longitude
+    
+    return await send_report_review(
+        bot=bot,
+        report_repository=report_repository,
+        user_id=user_id,
+        title="Report Updated",
+        footer="Review your report and submit.",
+        category=category,
+        subcategory=subcategory,
+        description=description,
+        latitude=latitude,
+        longitude=longitude,
+        photo_file_id=draft.photo_file_id if draft else None,
+        audio_file_id=draft.audio_file_id if draft else None
+    )
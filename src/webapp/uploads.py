@@ -0,0 +1,142 @@
+import base64
+import binascii
+import tempfile
+from typing import AsyncGenerator, AsyncIterable, Iterable, Optional
+
+from aiogram import Bot
+from aiogram.types import InputFile
+
+from src.config.settings import settings
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class InvalidUploadError(Exception):
+    pass
+
+
+class PhotoUpload:
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        spool_bytes: Optional[int] = None,
+        content_type: str = "image/jpeg"
+    ):
+        self.max_bytes = max_bytes or settings.webapp.max_upload_bytes
+        self.content_type = content_type
+        self.size = 0
+        self._buffer = tempfile.SpooledTemporaryFile(
+            max_size=spool_bytes or settings.webapp.upload_spool_bytes
+        )
+    
+    def write(
+        self,
+        chunk: bytes
+    ) -> None:
+        if self.size + len(chunk) > self.max_bytes:
+            raise UploadTooLargeError(f"Photo exceeds the {self.max_bytes} byte upload limit")
+        
+        self._buffer.write(chunk)
+        self.size += len(chunk)
+    
+    async def write_stream(
+        self,
+        chunks: AsyncIterable[bytes]
+    ) -> "PhotoUpload":
+        async for chunk in chunks:
+            self.write(chunk)
+        
+        return self
+    
+    def write_iterable(
+        self,
+        chunks: Iterable[bytes]
+    ) -> "PhotoUpload":
+        for chunk in chunks:
+            self.write(chunk)
+        
+        return self
+    
+    @classmethod
+    def from_base64(
+        cls,
+        photo_base64: str
+    ) -> "PhotoUpload":
+        upload = cls()
+        
+        try:
+            upload.write(
+                base64.b64decode(photo_base64, validate=True)
+            )
+        except (binascii.Error, ValueError) as e:
+            upload.close()
+            raise InvalidUploadError(f"Photo is not valid base64: {e}")
+        except UploadTooLargeError:
+            upload.close()
+            raise
+        
+        return upload
+    
+    def replace(
+        self,
+        data: bytes,
+        content_type: str
+    ) -> None:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffer.write(data)
+        self.size = len(data)
+        self.content_type = content_type
+    
+    def read(
+        self
+    ) -> bytes:
+        self._buffer.seek(0)
+        
+        return self._buffer.read()
+    
+    def iter_chunks(
+        self,
+        chunk_size: int
+    ) -> Iterable[bytes]:
+        self._buffer.seek(0)
+        
+        while chunk := self._buffer.read(chunk_size):
+            yield chunk
+    
+    def as_input_file(
+        self,
+        filename: str = "photo.jpg"
+    ) -> "SpooledInputFile":
+        return SpooledInputFile(
+            upload=self,
+            filename=filename
+        )
+    
+    def close(
+        self
+    ) -> None:
+        self._buffer.close()
+
+
+class SpooledInputFile(InputFile):
+
+    def __init__(
+        self,
+        upload: PhotoUpload,
+        filename: str
+    ):
+        super().__init__(
+            filename=filename
+        )
+        self.upload = upload
+    
+    async def read(
+        self,
+        bot: Bot
+    ) -> AsyncGenerator[bytes, None]:
+        for chunk in self.upload.iter_chunks(chunk_size=self.chunk_size):
+            yield chunk
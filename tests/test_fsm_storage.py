@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.config.settings import FSMStorageConfig
+from src.services.fsm_storage import SQLiteStorage, create_fsm_storage
+from src.bot.handlers.start import ReportStates
+
+
+KEY = StorageKey(
+    bot_id=1,
+    chat_id=42,
+    user_id=42
+)
+
+
+def make_storage(
+    path,
+    **overrides
+) -> SQLiteStorage:
+    return SQLiteStorage(
+        config=FSMStorageConfig(
+            path=str(path),
+            **{"flush_interval": 60.0, **overrides}
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_draft_survives_restart(tmp_path):
+    path = tmp_path / "fsm.sqlite3"
+    storage = make_storage(path)
+    state = FSMContext(storage=storage, key=KEY)
+    
+    await state.set_state(ReportStates.reviewing_report)
+    await state.update_data(latitude=35.1, longitude=33.4)
+    await state.update_data(category="Damage")
+    await state.update_data(subcategory="Road")
+    await storage.close()
+    
+    assert storage.stats.writes == 4
+    assert storage.stats.rows_flushed == 1
+    
+    restarted = make_storage(path)
+    state = FSMContext(storage=restarted, key=KEY)
+    
+    try:
+        assert await state.get_state() == ReportStates.reviewing_report.state
+        assert await state.get_data() == {"latitude": 35.1, "longitude": 33.4, "category": "Damage", "subcategory": "Road"}
+    finally:
+        await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched_in_the_background(tmp_path):
+    storage = make_storage(tmp_path / "fsm.sqlite3", flush_interval=0.05)
+    
+    try:
+        for user_id in range(20):
+            key = StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+            await storage.set_state(key, "ReportStates:waiting_for_media")
+            await storage.update_data(key, {"latitude": 35.0})
+        
+        assert storage.stats.flushes == 0
+        
+        await asyncio.sleep(0.2)
+        
+        assert storage.stats.flushes == 1
+        assert storage.stats.rows_flushed == 20
+    finally:
+        await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_a_running_flush(tmp_path):
+    path = tmp_path / "fsm.sqlite3"
+    storage = make_storage(path, flush_interval=0.01)
+    write = storage._write
+    
+    def slow_write(rows, deleted):
+        time.sleep(0.1)
+        write(rows, deleted)
+    
+    storage._write = slow_write
+    
+    await storage.update_data(KEY, {"latitude": 35.1})
+    await asyncio.sleep(0.05)
+    assert storage._flushing
+    
+    await storage.close()
+    
+    assert not storage._flushing
+    assert storage.stats.flush_errors == 0
+    
+    restarted = make_storage(path)
+    
+    try:
+        assert await restarted.get_data(KEY) == {"latitude": 35.1}
+    finally:
+        await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_clear_deletes_row_and_cache_stays_bounded(tmp_path):
+    path = tmp_path / "fsm.sqlite3"
+    storage = make_storage(path, flush_interval=0.0, cache_max_entries=2)
+    
+    try:
+        for user_id in range(5):
+            key = StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+            await storage.update_data(key, {"n": user_id})
+        
+        assert len(storage._records) == 2
+        assert await storage.get_data(StorageKey(bot_id=1, chat_id=0, user_id=0)) == {"n": 0}
+        
+        await FSMContext(storage=storage, key=StorageKey(bot_id=1, chat_id=0, user_id=0)).clear()
+    finally:
+        await storage.close()
+    
+    restarted = make_storage(path)
+    
+    try:
+        assert await restarted.get_data(StorageKey(bot_id=1, chat_id=0, user_id=0)) == {}
+        assert await restarted.get_data(StorageKey(bot_id=1, chat_id=4, user_id=4)) == {"n": 4}
+    finally:
+        await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_unserializable_record_stays_dirty_without_blocking_others(tmp_path):
+    path = tmp_path / "fsm.sqlite3"
+    storage = make_storage(path, flush_interval=0.0)
+    broken = StorageKey(bot_id=1, chat_id=7, user_id=7)
+    
+    try:
+        await storage.update_data(broken, {"photo": object()})
+        await storage.update_data(KEY, {"category": "Damage"})
+        
+        assert storage.make_key(broken) in storage._dirty
+        assert storage.make_key(KEY) not in storage._dirty
+        assert storage.stats.flush_errors == 2
+        
+        await storage.set_data(broken, {"photo": "file-id"})
+        
+        assert not storage._dirty
+    finally:
+        await storage.close()
+    
+    restarted = make_storage(path)
+    
+    try:
+        assert await restarted.get_data(KEY) == {"category": "Damage"}
+        assert await restarted.get_data(broken) == {"photo": "file-id"}
+    finally:
+        await restarted.close()
+
+
+def test_memory_storage_without_path():
+    assert isinstance(create_fsm_storage(FSMStorageConfig()), MemoryStorage)
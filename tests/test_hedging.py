@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.config.settings import OpenAIConfig
+from src.services.hedging import MIN_SAMPLES, Hedger
+
+
+def warmed_hedger(
+    budget: float
+) -> Hedger:
+    hedger = Hedger(
+        config=OpenAIConfig(api_key="sk-test", hedge=True, hedge_percentile=90.0, hedge_budget=budget)
+    )
+    hedger._latencies.extend([0.01] * MIN_SAMPLES * 5)
+    
+    return hedger
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_the_loser_cancelled():
+    hedger = warmed_hedger(budget=1.0)
+    attempts = []
+    
+    async def call():
+        attempt = len(attempts)
+        attempts.append(asyncio.current_task())
+        await asyncio.sleep(10 if attempt == 0 else 0.01)
+        return attempt
+    
+    assert await hedger.run(call=call) == 1
+    await asyncio.sleep(0)
+    
+    assert attempts[0].cancelled()
+    assert hedger.stats.to_dict() == {
+        "requests": 1,
+        "fired": 1,
+        "won": 1,
+        "skipped": 0,
+        "fire_rate": 1.0,
+        "win_rate": 1.0
+    }
+
+
+@pytest.mark.asyncio
+async def test_hedges_stay_within_budget_and_wait_for_samples():
+    calls = []
+    
+    async def call():
+        calls.append(None)
+        await asyncio.sleep(0.05)
+        return "ok"
+    
+    cold = Hedger(
+        config=OpenAIConfig(api_key="sk-test", hedge=True, hedge_budget=1.0)
+    )
+    assert await cold.run(call=call) == "ok"
+    assert cold.stats.fired == 0
+    
+    hedger = warmed_hedger(budget=0.5)
+    for _ in range(4):
+        assert await hedger.run(call=call) == "ok"
+    
+    assert hedger.stats.fired == 2
+    assert hedger.stats.skipped == 2
+    assert len(calls) == 1 + 4 + 2
+
+
+@pytest.mark.asyncio
+async def test_failed_and_abandoned_calls_count_towards_the_delay():
+    cold = Hedger(
+        config=OpenAIConfig(api_key="sk-test", hedge=True)
+    )
+    
+    async def failing_call():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("overloaded")
+    
+    with pytest.raises(RuntimeError):
+        await cold.run(call=failing_call)
+    
+    assert list(cold._latencies) == [pytest.approx(0.02, abs=0.02)]
+    
+    hedger = warmed_hedger(budget=1.0)
+    warm = len(hedger._latencies)
+    attempts = []
+    
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        await asyncio.sleep(0.05 if attempt == 0 else 10)
+        return attempt
+    
+    assert await hedger.run(call=call) == 0
+    await asyncio.sleep(0)
+    
+    # The cancelled hedge only shows how late it started
+    assert list(hedger._latencies)[warm:] == [pytest.approx(0.05, abs=0.03)]
+    
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.05):
+            await hedger.run(call=call)
+    await asyncio.sleep(0)
+    
+    # An abandoned primary ran at least this long
+    assert len(hedger._latencies) == warm + 2
+    assert hedger._latencies[-1] >= 0.04
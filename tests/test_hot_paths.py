@@ -0,0 +1,55 @@
+from benchmarks.hot_paths import compare
+from src.bot.utils.formatting import build_report_text, format_coordinate
+
+
+def _report(
+    **relative: float
+) -> dict:
+    return {
+        "results": {
+            name: {"us_per_call": value * 100, "relative": value}
+            for name, value in relative.items()
+        }
+    }
+
+
+def test_compare_flags_doubled_cost():
+    baseline = _report(router=1.0, keyboard=0.5, prompt=0.001)
+    report = _report(router=2.1, keyboard=0.6, prompt=0.01)
+    
+    regressions = compare(
+        baseline=baseline,
+        report=report,
+        threshold=1.75,
+        min_us=1.0
+    )
+    
+    assert [regression["name"] for regression in regressions] == ["router"]
+    assert report["results"]["keyboard"]["vs_baseline"] == 1.2
+    assert "vs_baseline" not in report["results"]["prompt"]
+
+
+def test_compare_ignores_benchmarks_missing_from_baseline():
+    assert compare(
+        baseline=_report(router=1.0),
+        report=_report(router=1.0, new_path=5.0),
+        threshold=1.75
+    ) == []
+
+
+def test_report_text_truncates_coordinates():
+    assert format_coordinate(35.126412345) == "35.126412"
+    assert format_coordinate(33) == "33.xxxxxx"
+    
+    text = build_report_text(
+        title="Report Updated",
+        latitude=35.126412345,
+        longitude=33.4299,
+        category="Damage",
+        subcategory="Road",
+        description="Pothole",
+        footer="Review your report and submit."
+    )
+    
+    assert text.startswith("📋 <b>Report Updated</b>\n\n📍 <b>Location:</b> 35.126412, 33.4299\n\n")
+    assert text.endswith("📝 <b>Description:</b> Pothole\n\nReview your report and submit.")
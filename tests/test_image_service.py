@@ -0,0 +1,89 @@
+import io
+
+import pytest
+from PIL import Image
+
+from src.config.settings import ImageConfig
+from src.services.image_service import ImageNormalizer, normalize_image
+
+
+def make_jpeg(
+    width: int,
+    height: int,
+    orientation: int = 1
+) -> bytes:
+    image = Image.new(
+        mode="RGB",
+        size=(width, height),
+        color=(120, 80, 40)
+    )
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "PhoneMaker"
+    
+    output = io.BytesIO()
+    image.save(
+        output,
+        format="JPEG",
+        exif=exif
+    )
+    
+    return output.getvalue()
+
+
+def test_normalize_image_orients_downscales_and_strips_metadata():
+    data = make_jpeg(
+        width=4000,
+        height=3000,
+        orientation=6
+    )
+    
+    output, width, height = normalize_image(
+        data=data,
+        max_edge=1000,
+        quality=80
+    )
+    
+    assert (width, height) == (750, 1000)
+    
+    with Image.open(io.BytesIO(output)) as normalized:
+        assert normalized.format == "JPEG"
+        assert normalized.size == (750, 1000)
+        assert len(normalized.getexif()) == 0
+
+
+@pytest.mark.asyncio
+async def test_image_normalizer_records_stats():
+    normalizer = ImageNormalizer(
+        config=ImageConfig(
+            max_edge=500,
+            workers=1
+        )
+    )
+    normalizer.start()
+    
+    try:
+        result = await normalizer.normalize(
+            data=make_jpeg(width=2000, height=1000)
+        )
+    finally:
+        normalizer.close()
+    
+    assert (result.width, result.height) == (500, 250)
+    assert normalizer.stats.images == 1
+    assert normalizer.stats.output_bytes == result.output_bytes
+    assert normalizer.stats.input_bytes > normalizer.stats.output_bytes
+
+
+def test_image_normalizer_starts_its_workers_up_front():
+    normalizer = ImageNormalizer(
+        config=ImageConfig(
+            workers=2
+        )
+    )
+    normalizer.start()
+    
+    try:
+        assert len(normalizer._executor._processes) == 2
+    finally:
+        normalizer.close()
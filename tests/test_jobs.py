@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.webapp.jobs import PhotoJobQueue, QueueFullError
+
+
+@pytest.mark.asyncio
+async def test_photo_job_queue_runs_jobs_and_records_stages():
+    async def handler(job):
+        job.stages["ai_analysis"] = 0.01
+        return {"category": "Damage"}
+    
+    queue = PhotoJobQueue(
+        handler=handler,
+        max_size=10,
+        workers=2,
+        history_size=10
+    )
+    await queue.start()
+    
+    job = await queue.submit(
+        user_id=1,
+        payload={"photo_base64": "abc"}
+    )
+    await asyncio.wait_for(queue._queue.join(), timeout=1)
+    await queue.stop()
+    
+    assert queue.get(job_id=job.job_id).status == "done"
+    assert job.result == {"category": "Damage"}
+    assert job.payload == {}
+    
+    stats = queue.stats()
+    assert stats["completed"] == 1
+    assert stats["stage_avg_ms"]["ai_analysis"] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_photo_job_queue_rejects_when_saturated():
+    release = asyncio.Event()
+    failures = []
+    
+    async def handler(job):
+        await release.wait()
+        raise RuntimeError("vision down")
+    
+    async def on_failure(job):
+        failures.append(job.job_id)
+    
+    queue = PhotoJobQueue(
+        handler=handler,
+        max_size=1,
+        workers=1,
+        history_size=10,
+        on_failure=on_failure
+    )
+    await queue.start()
+    
+    first = await queue.submit(user_id=1, payload={})
+    await asyncio.sleep(0)
+    await queue.submit(user_id=2, payload={})
+    
+    with pytest.raises(QueueFullError):
+        await queue.submit(user_id=3, payload={})
+    
+    release.set()
+    await asyncio.wait_for(queue._queue.join(), timeout=1)
+    await queue.stop()
+    
+    assert queue.get(job_id=first.job_id).status == "failed"
+    assert len(failures) == 2
+    assert queue.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_photo_job_queue_fails_and_releases_queued_jobs_on_stop():
+    started = asyncio.Event()
+    
+    class Photo:
+        closed = False
+        
+        def close(self):
+            self.closed = True
+    
+    async def handler(job):
+        started.set()
+        await asyncio.sleep(10)
+    
+    queue = PhotoJobQueue(
+        handler=handler,
+        max_size=10,
+        workers=1,
+        history_size=10
+    )
+    await queue.start()
+    
+    running = await queue.submit(user_id=1, payload={})
+    await started.wait()
+    photo = Photo()
+    queued = await queue.submit(user_id=2, payload={"photo": photo})
+    await queue.stop()
+    
+    assert photo.closed
+    assert queued.status == "failed"
+    assert queued.payload == {}
+    assert running.status == "failed"
+    assert queue.stats()["failed"] == 2
@@ -0,0 +1,33 @@
+from src.models.taxonomy import get_taxonomy, reload_taxonomy
+from src.bot.keyboards.registry import get_keyboard_registry
+
+
+def test_registry_hands_out_prebuilt_markups():
+    registry = get_keyboard_registry()
+    
+    assert get_keyboard_registry() is registry
+    assert registry.categories() is registry.categories()
+    assert registry.subcategories(category="Flood") is registry.subcategories(category="flood")
+
+
+def test_buttons_carry_taxonomy_ids():
+    taxonomy = get_taxonomy()
+    flood = taxonomy.find_category("Flood")
+    registry = get_keyboard_registry()
+    
+    category_data = [row[0].callback_data for row in registry.categories().inline_keyboard]
+    subcategory_data = [row[0].callback_data for row in registry.subcategories(category="Flood").inline_keyboard]
+    
+    assert category_data == [f"cat_{category.id}" for category in taxonomy.categories]
+    assert subcategory_data[:-1] == [f"subcat_{subcategory.id}" for subcategory in flood.subcategories]
+    assert subcategory_data[-1] == "back_to_categories"
+    assert all(len(data.encode("utf-8")) <= 64 for data in category_data + subcategory_data)
+
+
+def test_registry_is_rebuilt_after_taxonomy_reload():
+    registry = get_keyboard_registry()
+    
+    reload_taxonomy(path="")
+    
+    assert get_keyboard_registry() is not registry
+    assert get_keyboard_registry().taxonomy is get_taxonomy()
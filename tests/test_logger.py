@@ -0,0 +1,131 @@
+import io
+import json
+import logging
+import queue
+
+from src.config.settings import LoggingConfig
+from src.bot.utils.logger import (
+    BackgroundQueueHandler,
+    JsonFormatter,
+    SampledLogger,
+    get_queue_handler,
+    sample_rate,
+    setup_logger,
+    stop_queue_logging
+)
+
+
+def capture(
+    logger: logging.Logger
+) -> io.StringIO:
+    stream = io.StringIO()
+    logger.handlers[0].setStream(stream)
+    
+    return stream
+
+
+def test_sampling_keeps_a_share_of_info_and_every_warning():
+    config = LoggingConfig(
+        sample_rates={"tests.sampled": 0.25}
+    )
+    logger = setup_logger(
+        name="tests.sampled.child",
+        config=config
+    )
+    stream = capture(logger)
+    
+    for index in range(8):
+        logger.info("update %d", index)
+    logger.warning("slow update")
+    
+    assert stream.getvalue().count(" - INFO - ") == 2
+    assert "slow update" in stream.getvalue()
+    assert sample_rate(name="tests.other", config=config) == 1.0
+
+
+def test_sampled_logger_reports_the_calling_line():
+    logger = setup_logger(
+        name="tests.sampled_caller",
+        config=LoggingConfig(sample_rates={"tests.sampled_caller": 0.5})
+    )
+    records = []
+    logger.handlers[0].emit = records.append
+    
+    logger.info("first")
+    logger.info("second")
+    
+    assert len(records) == 1
+    assert records[0].funcName == "test_sampled_logger_reports_the_calling_line"
+    assert records[0].filename == "test_logger.py"
+
+
+def test_only_sampled_loggers_change_class():
+    sampled = setup_logger(
+        name="tests.class_sampled",
+        config=LoggingConfig(sample_rates={"tests.class_sampled": 0.5})
+    )
+    plain = setup_logger(
+        name="tests.class_plain",
+        config=LoggingConfig(sample_rates={"tests.class_sampled": 0.5})
+    )
+    
+    assert isinstance(sampled, SampledLogger)
+    assert type(plain) is logging.Logger
+    assert type(logging.getLogger("tests.class_other")) is logging.Logger
+
+
+def test_json_formatter_renders_lazy_args_and_extras():
+    record = logging.LogRecord(
+        name="src.bot",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg="User %s clicked %s",
+        args=(42, "chcat"),
+        exc_info=None
+    )
+    record.user_id = 42
+    
+    entry = json.loads(JsonFormatter().format(record))
+    
+    assert entry["message"] == "User 42 clicked chcat"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "src.bot"
+    assert entry["user_id"] == 42
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    handler = BackgroundQueueHandler(
+        records=queue.Queue(maxsize=1)
+    )
+    logger = logging.getLogger("tests.queue_full")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    
+    logger.info("kept %s", "later")
+    logger.info("dropped")
+    
+    record = handler.queue.get_nowait()
+    assert record.args == ("later",)
+    assert handler.dropped == 1
+
+
+def test_queue_listener_writes_json_lines():
+    stream = io.StringIO()
+    handler = get_queue_handler(
+        config=LoggingConfig(format="json", queue=True),
+        stream=stream
+    )
+    logger = logging.getLogger("tests.queued")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    
+    try:
+        logger.info("report %d stored", 7)
+    finally:
+        stop_queue_logging()
+        logger.removeHandler(handler)
+    
+    assert json.loads(stream.getvalue())["message"] == "report 7 stored"
@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+from aiogram.dispatcher.event.handler import HandlerObject
+
+from src.bot.middleware.metrics import MetricsMiddleware
+from src.services.metrics import (
+    DEPENDENCY_DURATION,
+    HANDLER_DURATION,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    merge_expositions,
+    observe_dependency
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram(
+            name="latency_seconds",
+            documentation="Latency.",
+            labelnames=("route",),
+            buckets=(0.1, 1.0)
+        )
+    )
+    counter = registry.register(
+        Counter(
+            name="calls_total",
+            documentation="Calls.",
+            labelnames=("route",)
+        )
+    )
+    
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels("/a\"b").observe(value)
+    counter.labels("/a\"b").inc()
+    
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        "latency_seconds_bucket{route=\"/a\\\"b\",le=\"0.1\"} 2",
+        "latency_seconds_bucket{route=\"/a\\\"b\",le=\"1\"} 3",
+        "latency_seconds_bucket{route=\"/a\\\"b\",le=\"+Inf\"} 4",
+        "latency_seconds_sum{route=\"/a\\\"b\"} 3.65",
+        "latency_seconds_count{route=\"/a\\\"b\"} 4",
+        "# HELP calls_total Calls.",
+        "# TYPE calls_total counter",
+        "calls_total{route=\"/a\\\"b\"} 1"
+    ]
+    
+    with pytest.raises(ValueError):
+        histogram.labels("one", "two")
+
+
+def test_updates_from_threads_are_not_lost():
+    registry = MetricsRegistry()
+    counter = registry.register(
+        Counter(
+            name="throttled_total",
+            documentation="Throttled.",
+            labelnames=("scope",)
+        )
+    )
+    histogram = registry.register(
+        Histogram(
+            name="latency_seconds",
+            documentation="Latency.",
+            buckets=(1.0,)
+        )
+    )
+    
+    def work() -> None:
+        for n in range(5000):
+            counter.labels(str(n % 50)).inc()
+            histogram.labels().observe(0.5)
+            if n % 500 == 0:
+                registry.render()
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sum(counter.labels(str(scope)).value for scope in range(50)) == 8 * 5000
+    assert "latency_seconds_count 40000" in registry.render()
+
+
+async def report_handler(
+    event,
+    data
+):
+    if data.get("fail"):
+        raise RuntimeError("boom")
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_handler_and_outcome():
+    HANDLER_DURATION.clear()
+    middleware = MetricsMiddleware(
+        update_type="message"
+    )
+    handler = HandlerObject(
+        callback=report_handler
+    )
+    
+    await middleware(report_handler, None, {"handler": handler})
+    
+    with pytest.raises(RuntimeError):
+        await middleware(report_handler, None, {"handler": handler, "fail": True})
+    
+    assert HANDLER_DURATION.labels("report_handler", "message", "ok").counts[0] == 1
+    assert sum(HANDLER_DURATION.labels("report_handler", "message", "error").counts) == 1
+
+
+def test_dependency_outcome_follows_exceptions():
+    DEPENDENCY_DURATION.clear()
+    
+    with observe_dependency(dependency="openai", operation="vision"):
+        pass
+    
+    with pytest.raises(TimeoutError):
+        with observe_dependency(dependency="openai", operation="vision"):
+            raise TimeoutError()
+    
+    assert sum(DEPENDENCY_DURATION.labels("openai", "vision", "ok").counts) == 1
+    assert sum(DEPENDENCY_DURATION.labels("openai", "vision", "error").counts) == 1
+
+
+def test_merge_expositions_groups_families_per_process():
+    worker = "# HELP a_total A.\n# TYPE a_total counter\na_total{kind=\"x\"} 1\n# HELP b B.\n# TYPE b gauge\nb 2\n"
+    
+    merged = merge_expositions(
+        expositions={"0": worker, "1": worker},
+        label="worker"
+    )
+    
+    assert merged.splitlines() == [
+        "# HELP a_total A.",
+        "# TYPE a_total counter",
+        "a_total{kind=\"x\",worker=\"0\"} 1",
+        "a_total{kind=\"x\",worker=\"1\"} 1",
+        "# HELP b B.",
+        "# TYPE b gauge",
+        "b{worker=\"0\"} 2",
+        "b{worker=\"1\"} 2"
+    ]
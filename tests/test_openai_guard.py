@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from src.config.settings import OpenAIConfig
+from src.services.ai_vision_service import AIVisionService, UNAVAILABLE_NOTE
+from src.services.openai_guard import CLOSED, HALF_OPEN, OPEN, AdaptiveLimiter, CircuitBreaker
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_beyond_the_limit_and_adapts():
+    limiter = AdaptiveLimiter(
+        initial=2,
+        minimum=1,
+        maximum=4,
+        max_queue=10
+    )
+    
+    assert not await limiter.acquire()
+    assert not await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.waiting == 1
+    
+    # A failure cuts the limit, so the freed slot is not handed on
+    limiter.release(started=1e9, healthy=False)
+    assert limiter.limit == 1.5
+    assert not waiter.done()
+    
+    # A fast success under load grows it by 1 / limit and wakes the waiter
+    limiter.release(started=0.0, healthy=True)
+    assert limiter.limit == pytest.approx(1.5 + 1 / 1.5)
+    assert await waiter
+    
+    # Calls that started before the last cut do not cut it again
+    limiter.release(started=0.0, healthy=False)
+    assert limiter.limit == pytest.approx(1.5 + 1 / 1.5)
+    assert limiter.in_flight == 0
+
+
+def test_breaker_opens_on_errors_and_closes_after_a_probe():
+    breaker = CircuitBreaker(
+        error_rate=0.5,
+        min_calls=4,
+        window=10.0,
+        cooldown=5.0
+    )
+    
+    for now, healthy in ((0.0, True), (1.0, False), (2.0, True), (3.0, False)):
+        assert breaker.allow(now)
+        opened = breaker.record(now=now, healthy=healthy, probe=False)
+    
+    assert opened
+    assert breaker.state == OPEN
+    assert not breaker.allow(7.0)
+    
+    assert breaker.allow(8.0)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(8.1)
+    
+    breaker.record(now=9.0, healthy=True, probe=True)
+    assert breaker.state == CLOSED
+    assert breaker.allow(9.0)
+
+
+@pytest.mark.asyncio
+async def test_service_falls_back_at_the_deadline_then_fails_fast():
+    service = AIVisionService(
+        config=OpenAIConfig(
+            api_key="sk-test",
+            deadline=0.05,
+            breaker_min_calls=2
+        )
+    )
+    calls = []
+    
+    async def hanging_create(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(10)
+    
+    service.client.chat.completions.create = hanging_create
+    
+    try:
+        for _ in range(2):
+            result = await service.analyze_problem_photo(photo_url="data:image/jpeg;base64,AAAA")
+            assert result["category"] == "Other"
+        
+        result = await service.analyze_problem_photo(photo_url="data:image/jpeg;base64,AAAA")
+    finally:
+        await service.close()
+    
+    assert len(calls) == 2
+    assert result["description"].endswith(UNAVAILABLE_NOTE)
+    
+    stats = service.guard.to_dict()
+    assert stats["deadline_exceeded"] == 2
+    assert stats["rejected_open"] == 1
+    assert stats["circuit"] == OPEN
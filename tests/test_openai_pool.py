@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.config.settings import OpenAIConfig
+from src.services.ai_vision_service import AIVisionService
+
+
+async def fake_chat_completion(
+    request: web.Request
+) -> web.Response:
+    return web.json_response(
+        data={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {
+                        "role": "assistant",
+                        "content": json.dumps({
+                            "category": "Other",
+                            "subcategory": "Other",
+                            "description": "Test"
+                        })
+                    }
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 10,
+                "completion_tokens": 5,
+                "total_tokens": 15
+            }
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_shared_service_reuses_openai_connections():
+    app = web.Application()
+    app.router.add_post(
+        path="/v1/chat/completions",
+        handler=fake_chat_completion
+    )
+    server = TestServer(app)
+    await server.start_server()
+    
+    service = AIVisionService(
+        config=OpenAIConfig(
+            api_key="sk-test",
+            base_url=str(server.make_url("/v1"))
+        )
+    )
+    
+    try:
+        for _ in range(3):
+            result = await service.analyze_problem_photo(
+                photo_url="data:image/jpeg;base64,AAAA"
+            )
+            assert result["description"] == "Test"
+    finally:
+        await service.close()
+        await server.close()
+    
+    stats = service.pool.stats.to_dict()
+    
+    assert stats["requests"] == 3
+    assert stats["errors"] == 0
+    assert stats["pool_misses"] == 1
+    assert stats["pool_hits"] == 2
+    assert service.usage.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_audio_is_uploaded_from_memory_as_named_file():
+    uploads = []
+    
+    async def fake_transcription(
+        request: web.Request
+    ) -> web.Response:
+        form = await request.post()
+        uploads.append((form["file"].filename, form["file"].file.read()))
+        
+        return web.json_response(
+            data={
+                "text": "There is a pothole on my street"
+            }
+        )
+    
+    app = web.Application()
+    app.router.add_post(
+        path="/v1/audio/transcriptions",
+        handler=fake_transcription
+    )
+    app.router.add_post(
+        path="/v1/chat/completions",
+        handler=fake_chat_completion
+    )
+    server = TestServer(app)
+    await server.start_server()
+    
+    service = AIVisionService(
+        config=OpenAIConfig(
+            api_key="sk-test",
+            base_url=str(server.make_url("/v1"))
+        )
+    )
+    
+    try:
+        result = await service.analyze_problem_audio(
+            audio=b"OggS-voice-bytes",
+            filename="voice.oga"
+        )
+    finally:
+        await service.close()
+        await server.close()
+    
+    assert uploads == [("voice.oga", b"OggS-voice-bytes")]
+    assert result["transcription"] == "There is a pothole on my street"
+    assert result["description"] == "Test"
+    assert service.pool.stats.to_dict()["pool_hits"] == 1
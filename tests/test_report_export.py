@@ -0,0 +1,142 @@
+import csv
+import gzip
+import io
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.config.settings import settings, ReportStoreConfig
+from src.models.report import Report
+from src.services.report_repository import ReportRepository
+from src.webapp.app import CONTEXT_KEY, handle_report_export
+from src.webapp.context import WebAppContext
+from src.webapp.export import InvalidExportQuery, export_chunks, gzip_chunks, parse_export_query
+
+
+async def seeded_repository(
+    tmp_path
+) -> ReportRepository:
+    repository = ReportRepository(
+        config=ReportStoreConfig(path=str(tmp_path / "reports.sqlite3"))
+    )
+    
+    for index in range(10):
+        await repository.add(
+            report=Report(
+                user_id=index,
+                latitude=35.0 + index / 100,
+                longitude=33.0,
+                category="Waste" if index % 2 else "Damage",
+                subcategory="Road",
+                description=f"Report, \"{index}\"",
+                created_at=1000.0 + index
+            )
+        )
+    
+    return repository
+
+
+async def collect(
+    repository: ReportRepository,
+    **params
+) -> bytes:
+    chunks = export_chunks(
+        repository=repository,
+        query=parse_export_query(params=params),
+        page_size=3
+    )
+    
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_parse_export_query():
+    query = parse_export_query(
+        params={"format": "CSV", "since": "1970-01-01T00:10:00", "until": "1200", "bbox": "35,33,35.5,33.5", "limit": "5"}
+    )
+    
+    assert query.format == "csv"
+    assert query.since == 600.0
+    assert query.until == 1200.0
+    assert query.bbox == (35.0, 33.0, 35.5, 33.5)
+    assert query.limit == 5
+    
+    for params in ({"format": "xml"}, {"since": "yesterday"}, {"bbox": "1,2,3"}, {"limit": "0"}):
+        with pytest.raises(InvalidExportQuery):
+            parse_export_query(params=params)
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_pages_and_resumes(tmp_path):
+    repository = await seeded_repository(tmp_path)
+    
+    try:
+        lines = (await collect(repository, limit="4")).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        
+        assert [row["id"] for row in rows] == [1, 2, 3, 4]
+        assert rows[0]["description"] == "Report, \"0\""
+        
+        resumed = (await collect(repository, after_id=str(rows[-1]["id"]))).decode().splitlines()
+        
+        assert [json.loads(line)["id"] for line in resumed] == [5, 6, 7, 8, 9, 10]
+    finally:
+        await repository.close()
+
+
+@pytest.mark.asyncio
+async def test_csv_export_filters(tmp_path):
+    repository = await seeded_repository(tmp_path)
+    
+    try:
+        text = (await collect(repository, format="csv", category="Waste", bbox="35.0,32.0,35.05,34.0", since="1002")).decode()
+    finally:
+        await repository.close()
+    
+    rows = list(csv.DictReader(io.StringIO(text)))
+    
+    assert [row["id"] for row in rows] == ["4", "6"]
+    assert rows[0]["description"] == "Report, \"3\""
+
+
+def test_gzip_chunks_decompress_to_the_input():
+    chunks = [b"first\n", b"second\n", b""]
+    
+    assert gzip.decompress(b"".join(gzip_chunks(chunks))) == b"first\nsecond\n"
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint_requires_token_and_compresses(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings.webapp, "export_token", "secret")
+    repository = await seeded_repository(tmp_path)
+    context = WebAppContext()
+    context.report_repository = repository
+    app = web.Application()
+    app[CONTEXT_KEY] = context
+    app.router.add_get("/reports/export", handle_report_export)
+    server = TestServer(app)
+    await server.start_server()
+    
+    try:
+        async with aiohttp.ClientSession(auto_decompress=False) as session:
+            async with session.get(server.make_url("/reports/export")) as response:
+                assert response.status == 401
+            
+            headers = {"Authorization": "Bearer secret"}
+            
+            async with session.get(server.make_url("/reports/export"), headers={**headers, "Accept-Encoding": "identity"}) as response:
+                plain = await response.read()
+                assert response.headers["Content-Type"] == "application/x-ndjson"
+                assert "Content-Encoding" not in response.headers
+            
+            async with session.get(server.make_url("/reports/export"), headers={**headers, "Accept-Encoding": "gzip"}) as response:
+                compressed = await response.read()
+                assert response.headers["Content-Encoding"] == "gzip"
+    finally:
+        await server.close()
+        await repository.close()
+    
+    assert len(plain.splitlines()) == 10
+    assert gzip.decompress(compressed) == plain
@@ -0,0 +1,182 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.bot.handlers.start import handle_submit_report
+from src.config.settings import ReportStoreConfig
+from src.models.report import Report
+from src.services.report_repository import ReportRepository
+from src.services.spatial_index import SpatialIndex
+
+
+def make_repository(
+    path,
+    **overrides
+) -> ReportRepository:
+    return ReportRepository(
+        config=ReportStoreConfig(
+            path=str(path),
+            **overrides
+        )
+    )
+
+
+def make_report(
+    user_id: int = 42,
+    category: str = "Damage",
+    created_at: float = 1000.0
+) -> Report:
+    return Report(
+        user_id=user_id,
+        latitude=35.1,
+        longitude=33.4,
+        category=category,
+        subcategory="Road",
+        description="Pothole",
+        created_at=created_at
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_adds_share_one_commit(tmp_path):
+    repository = make_repository(tmp_path / "reports.sqlite3", batch_interval=0.05)
+    
+    try:
+        reports = await asyncio.gather(*(repository.add(report=make_report(user_id=index)) for index in range(20)))
+    finally:
+        await repository.close()
+    
+    assert [report.report_id for report in reports] == list(range(1, 21))
+    assert repository.stats.batches == 1
+    assert repository.stats.inserted == 20
+
+
+@pytest.mark.asyncio
+async def test_max_batch_splits_commits(tmp_path):
+    repository = make_repository(tmp_path / "reports.sqlite3", batch_interval=60.0, max_batch=5)
+    
+    try:
+        reports = await asyncio.wait_for(
+            asyncio.gather(*(repository.add(report=make_report()) for _ in range(12))),
+            timeout=5
+        )
+    finally:
+        await repository.close()
+    
+    assert sorted(report.report_id for report in reports) == list(range(1, 13))
+    assert repository.stats.peak_batch == 5
+
+
+@pytest.mark.asyncio
+async def test_reports_survive_restart_and_filter(tmp_path):
+    path = tmp_path / "reports.sqlite3"
+    repository = make_repository(path)
+    
+    await repository.add(report=make_report(user_id=1, category="Damage", created_at=100.0))
+    await repository.add(report=make_report(user_id=2, category="Waste", created_at=200.0))
+    await repository.add(report=make_report(user_id=1, category="Waste", created_at=300.0))
+    await repository.close()
+    
+    restarted = make_repository(path)
+    
+    try:
+        assert [report.report_id for report in await restarted.list_reports(user_id=1)] == [1, 3]
+        assert [report.report_id for report in await restarted.list_reports(category="Waste")] == [2, 3]
+        assert [report.report_id for report in await restarted.list_reports(since=150.0, until=300.0)] == [2]
+        assert await restarted.count(category="Waste") == 2
+        
+        expected = make_report(user_id=1, category="Waste", created_at=300.0)
+        expected.report_id = 3
+        assert await restarted.list_reports(after_id=2) == [expected]
+    finally:
+        await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_reports_pages_through_everything(tmp_path):
+    repository = make_repository(tmp_path / "reports.sqlite3")
+    
+    try:
+        await asyncio.gather(*(repository.add(report=make_report()) for _ in range(25)))
+        
+        pages = [page async for page in repository.iter_reports(batch_size=10)]
+    finally:
+        await repository.close()
+    
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [report.report_id for page in pages for report in page] == list(range(1, 26))
+
+
+@pytest.mark.asyncio
+async def test_submit_stores_the_draft_the_review_showed(tmp_path):
+    repository = make_repository(tmp_path / "reports.sqlite3")
+    state = FSMContext(
+        storage=MemoryStorage(),
+        key=StorageKey(bot_id=1, chat_id=42, user_id=42)
+    )
+    
+    def submit_callback(
+        draft_id: int,
+        user_id: int = 42
+    ) -> MagicMock:
+        callback = MagicMock()
+        callback.from_user.id = user_id
+        callback.data = f"submit_report|{draft_id}"
+        callback.message.edit_reply_markup = AsyncMock()
+        callback.message.answer = AsyncMock()
+        callback.answer = AsyncMock()
+        
+        return callback
+    
+    try:
+        original = await repository.add(make_report())
+        description = f"Deep pothole\n\nSame problem as report #{original.report_id}"
+        fresh_draft = await repository.save_draft(
+            report=Report(user_id=42, latitude=35.1, longitude=33.4, category="Damage", subcategory="Road", description=description)
+        )
+        confirmation_draft = await repository.save_draft(
+            report=Report(
+                user_id=42,
+                latitude=35.1,
+                longitude=33.4,
+                category="Damage",
+                subcategory="Road",
+                description="Pothole",
+                duplicate_of=original.report_id
+            )
+        )
+        
+        # A stale draft in the conversation state is ignored
+        await state.update_data(category="Lighting", subcategory="Street light", duplicate_of=original.report_id)
+        
+        for draft_id in (fresh_draft, confirmation_draft):
+            await handle_submit_report(
+                callback=submit_callback(draft_id=draft_id),
+                state=state,
+                report_repository=repository,
+                spatial_index=SpatialIndex()
+            )
+        
+        stranger = submit_callback(draft_id=fresh_draft, user_id=7)
+        await handle_submit_report(
+            callback=stranger,
+            state=state,
+            report_repository=repository,
+            spatial_index=SpatialIndex()
+        )
+        
+        fresh = await repository.get(report_id=original.report_id + 1)
+        confirmation = await repository.get(report_id=original.report_id + 2)
+        total = await repository.count()
+    finally:
+        await repository.close()
+    
+    assert (fresh.category, fresh.subcategory, fresh.description) == ("Damage", "Road", description)
+    assert fresh.duplicate_of is None
+    assert confirmation.duplicate_of == original.report_id
+    assert total == 3
+    assert stranger.answer.call_args.kwargs["show_alert"]
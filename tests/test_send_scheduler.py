@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.config.settings import TelegramClientConfig
+from src.services.send_scheduler import BACKGROUND, INTERACTIVE, SendScheduler
+from src.services.telegram_session import create_pooled_bot
+
+
+@pytest.mark.asyncio
+async def test_chat_sends_keep_order_and_are_paced():
+    scheduler = SendScheduler(
+        config=TelegramClientConfig(global_rate=0, chat_rate=20.0, chat_burst=1)
+    )
+    sent = []
+    
+    async def send(index):
+        await scheduler.acquire(chat_id=1)
+        sent.append((index, time.monotonic()))
+    
+    await asyncio.gather(*(send(index) for index in range(3)))
+    await scheduler.acquire(chat_id=2)
+    
+    assert [index for index, _ in sent] == [0, 1, 2]
+    assert sent[2][1] - sent[0][1] >= 0.09
+    assert scheduler.stats.sends == 4
+    assert scheduler.stats.delayed == 2
+
+
+@pytest.mark.asyncio
+async def test_interactive_sends_overtake_background_when_budget_is_short():
+    scheduler = SendScheduler(
+        config=TelegramClientConfig(global_rate=50.0, global_burst=1, chat_rate=0)
+    )
+    await scheduler.acquire(chat_id=None)
+    order = []
+    
+    async def send(name, priority):
+        await scheduler.acquire(chat_id=None, priority=priority)
+        order.append(name)
+    
+    background = asyncio.create_task(send("job result", BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(send("reply", INTERACTIVE))
+    await asyncio.gather(background, interactive)
+    
+    assert order == ["reply", "job result"]
+
+
+@pytest.mark.asyncio
+async def test_send_message_is_retried_after_429():
+    attempts = []
+    
+    async def send_message(request):
+        attempts.append(time.monotonic())
+        
+        if len(attempts) == 1:
+            return web.json_response(
+                data={
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1}
+                }
+            )
+        
+        return web.json_response(
+            data={
+                "ok": True,
+                "result": {
+                    "message_id": 1,
+                    "date": 0,
+                    "chat": {"id": 42, "type": "private"},
+                    "text": "hi"
+                }
+            }
+        )
+    
+    app = web.Application()
+    app.router.add_post(
+        path="/bot{token}/sendMessage",
+        handler=send_message
+    )
+    server = TestServer(app)
+    await server.start_server()
+    
+    bot = create_pooled_bot(
+        token="123456:TEST",
+        config=TelegramClientConfig(
+            api_base_url=str(server.make_url("")).rstrip("/")
+        )
+    )
+    
+    try:
+        message = await bot.send_message(chat_id=42, text="hi")
+    finally:
+        await bot.session.close()
+        await server.close()
+    
+    assert message.message_id == 1
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 1.0
+    assert bot.session.scheduler.stats.retry_after == 1
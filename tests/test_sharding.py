@@ -0,0 +1,115 @@
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.config.settings import ShardingConfig
+from src.services.sharding import ShardedBotService, WORKER_HOST, shard_for
+from src.services.webhook import update_chat_id
+
+
+def message_update(
+    update_id: int,
+    chat_id: int
+) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "User"},
+            "text": "/start"
+        }
+    }
+
+
+def callback_update(
+    update_id: int,
+    chat_id: int
+) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": f"{chat_id}:{update_id}",
+            "from": {"id": chat_id, "is_bot": False, "first_name": "User"},
+            "chat_instance": "1",
+            "data": "submit_report",
+            "message": message_update(update_id - 1, chat_id)["message"]
+        }
+    }
+
+
+def test_updates_of_a_chat_share_a_shard():
+    for chat_id in (7, 100042, -100123456):
+        shards = {
+            shard_for(message_update(1, chat_id), workers=4),
+            shard_for(callback_update(2, chat_id), workers=4)
+        }
+        
+        assert len(shards) == 1
+        assert 0 <= shards.pop() < 4
+
+
+def test_chats_spread_across_shards():
+    shards = [shard_for(message_update(1, chat_id), workers=4) for chat_id in range(1000, 1400)]
+    
+    assert {shards.count(index) for index in range(4)} == {100}
+
+
+def test_updates_without_chat_fall_back_to_user_or_update_id():
+    inline_query = {
+        "update_id": 5,
+        "inline_query": {"id": "1", "from": {"id": 99, "is_bot": False, "first_name": "U"}, "query": "", "offset": ""}
+    }
+    
+    assert update_chat_id(inline_query) == 99
+    assert update_chat_id({"update_id": 6, "poll": {"id": "1", "question": "?"}}) is None
+    assert shard_for({"update_id": 6, "poll": {"id": "1"}}, workers=4) == 2
+
+
+@pytest.mark.asyncio
+async def test_forwarder_waits_for_a_restarting_worker():
+    with socket.socket() as probe:
+        probe.bind((WORKER_HOST, 0))
+        port = probe.getsockname()[1]
+    
+    service = ShardedBotService(
+        token="1:x",
+        config=ShardingConfig(workers=1, base_port=port),
+        max_forward_delay=0.2
+    )
+    service._session = aiohttp.ClientSession()
+    service._queues = [asyncio.Queue(maxsize=10)]
+    forwarder = asyncio.create_task(service._forward(0))
+    
+    received = []
+    
+    async def handle_update(request: web.Request) -> web.Response:
+        received.append((request.headers.get("X-Telegram-Bot-Api-Secret-Token"), await request.json()))
+        return web.json_response({})
+    
+    app = web.Application()
+    app.router.add_post("/updates", handle_update)
+    worker = TestServer(app, host=WORKER_HOST, port=port)
+    
+    try:
+        await service.dispatch(message_update(1, 7))
+        
+        # The worker stays down for several retries
+        await asyncio.sleep(1)
+        await worker.start_server()
+        await asyncio.wait_for(service._queues[0].join(), timeout=5)
+    finally:
+        forwarder.cancel()
+        await asyncio.gather(forwarder, return_exceptions=True)
+        await worker.close()
+        await service._session.close()
+    
+    assert received == [(service.worker_secret, message_update(1, 7))]
+    assert service.stats[0].forward_errors >= 3
+    assert service.stats[0].forwarded == 1
+    assert service.stats[0].dropped == 0
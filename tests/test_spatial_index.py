@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.config.settings import ReportStoreConfig, SpatialIndexConfig
+from src.models.report import Report
+from src.services.report_repository import ReportRepository
+from src.services.spatial_index import SpatialIndex, haversine_meters
+
+
+def make_report(
+    report_id: int,
+    latitude: float,
+    longitude: float,
+    category: str = "Damage",
+    subcategory: str = "Road",
+    created_at: float = None
+) -> Report:
+    return Report(
+        report_id=report_id,
+        user_id=1,
+        latitude=latitude,
+        longitude=longitude,
+        category=category,
+        subcategory=subcategory,
+        description="Pothole",
+        created_at=created_at or time.time()
+    )
+
+
+def test_haversine_matches_known_distance():
+    # One thousandth of a degree of latitude is about 111 m
+    distances = haversine_meters(
+        latitude=35.0,
+        longitude=33.0,
+        latitudes=np.array([35.0, 35.001]),
+        longitudes=np.array([33.0, 33.0])
+    )
+    
+    assert distances[0] == 0.0
+    assert distances[1] == pytest.approx(111.2, abs=0.5)
+
+
+def test_nearby_filters_by_radius_category_and_age():
+    index = SpatialIndex(
+        config=SpatialIndexConfig(cell_meters=50.0, duplicate_radius=75.0)
+    )
+    index.extend([
+        make_report(1, 35.0, 33.0),
+        make_report(2, 35.0004, 33.0),
+        make_report(3, 35.01, 33.0),
+        make_report(4, 35.0002, 33.0, category="Waste", subcategory="Bins"),
+        make_report(5, 35.0001, 33.0, created_at=time.time() - 30 * 86400)
+    ])
+    
+    nearby = index.nearby(latitude=35.0, longitude=33.0, radius=100.0)
+    assert [report.report_id for report in nearby] == [1, 5, 4, 2]
+    
+    same_kind = index.nearby(latitude=35.0, longitude=33.0, radius=100.0, category="Damage", subcategory="Road")
+    assert [report.report_id for report in same_kind] == [1, 5, 2]
+    
+    duplicates = index.duplicates(latitude=35.0, longitude=33.0, category="Damage", subcategory="Road")
+    assert [report.report_id for report in duplicates] == [1, 2]
+
+
+def test_nearby_matches_a_full_scan():
+    generator = np.random.default_rng(3)
+    latitudes = 35.0 + generator.normal(0, 0.002, 2000)
+    longitudes = 33.0 + generator.normal(0, 0.002, 2000)
+    index = SpatialIndex(
+        config=SpatialIndexConfig(cell_meters=40.0)
+    )
+    index.extend(
+        make_report(row + 1, latitude, longitude)
+        for row, (latitude, longitude) in enumerate(zip(latitudes.tolist(), longitudes.tolist()))
+    )
+    
+    for radius in (10.0, 75.0, 500.0):
+        expected = np.flatnonzero(haversine_meters(35.0, 33.0, latitudes, longitudes) <= radius) + 1
+        found = index.nearby(latitude=35.0, longitude=33.0, radius=radius, limit=len(latitudes))
+        
+        assert sorted(report.report_id for report in found) == expected.tolist()
+
+
+@pytest.mark.asyncio
+async def test_refresh_catches_up_with_the_store(tmp_path):
+    repository = ReportRepository(
+        config=ReportStoreConfig(path=str(tmp_path / "reports.sqlite3"))
+    )
+    index = SpatialIndex(
+        config=SpatialIndexConfig(refresh_interval=60.0)
+    )
+    
+    try:
+        first = await repository.add(report=make_report(None, 35.0, 33.0))
+        index.add(first)
+        await repository.add(report=make_report(None, 35.0001, 33.0))
+        
+        assert await index.refresh(repository=repository, force=True) == 2
+        assert len(index) == 2
+        
+        await repository.add(report=make_report(None, 35.0002, 33.0))
+        assert await index.refresh(repository=repository) == 0
+        assert await index.refresh(repository=repository, force=True) == 1
+        assert len(index) == 3
+    finally:
+        await repository.close()
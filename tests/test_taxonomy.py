@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from src.models.categories import CATEGORIES
+from src.models.taxonomy import compile_taxonomy, get_taxonomy, make_id, reload_taxonomy
+from src.services.ai_vision_service import AIVisionService
+
+
+def test_ids_are_stable_across_reordering():
+    taxonomy = compile_taxonomy(CATEGORIES)
+    reordered = compile_taxonomy(dict(reversed(list(CATEGORIES.items()))))
+    
+    damage = taxonomy.find_category("Damage")
+    
+    assert reordered.category_by_id(damage.id).name == "Damage"
+    assert damage.id == make_id("Damage")
+    assert len({category.id for category in taxonomy.categories}) == len(CATEGORIES)
+    assert taxonomy.version != reordered.version
+
+
+def test_matching_ignores_case_and_whitespace():
+    taxonomy = compile_taxonomy(CATEGORIES)
+    
+    category = taxonomy.find_category("  vegetation,   TREE (fall / pruning) ")
+    
+    assert category.name == "Vegetation, tree (fall / pruning)"
+    assert category.find_subcategory("pavement,footpath") is None
+    assert category.find_subcategory("PAVEMENT,  footpath").name == "Pavement, footpath"
+
+
+def test_explicit_ids_and_duplicates(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    path.write_text(
+        json.dumps({
+            "Damage": {
+                "id": "dmg",
+                "subcategories": [{"id": "road", "name": "Road"}, "Other"]
+            },
+            "Other": ["Other"]
+        })
+    )
+    
+    taxonomy = reload_taxonomy(path=path)
+    
+    try:
+        assert get_taxonomy() is taxonomy
+        assert taxonomy.category_by_id("dmg").subcategory_by_id("road").name == "Road"
+        assert taxonomy.subcategories_for("Unknown") == ["Other"]
+    finally:
+        reload_taxonomy(path="")
+    
+    with pytest.raises(ValueError):
+        compile_taxonomy({"Damage": ["Road", " road "]})
+
+
+def test_taxonomy_without_other_gets_a_fallback_category():
+    taxonomy = compile_taxonomy({"Damage": ["Road", "Bridge"]})
+    
+    assert taxonomy.category_names == ["Damage", "Other"]
+    assert taxonomy.fallback.fallback.name == "Other"
+
+
+def test_failed_analysis_is_filed_under_other():
+    fallback = AIVisionService()._photo_fallback()
+    
+    assert (fallback["category"], fallback["subcategory"]) == ("Other", "Other")
+
+
+def test_validate_response_normalizes_model_output():
+    service = AIVisionService()
+    
+    assert service._validate_response("damage", "traffic  LIGHTS") == ("Damage", "Traffic lights")
+    assert service._validate_response("Flood", "Exposed wire") == ("Flood", "Other")
+    assert service._validate_response("Meteor", "Crater") == ("Other", "Other")
+
+
+def test_system_prompt_is_rendered_once_per_taxonomy():
+    service = AIVisionService()
+    
+    prompt, version = service._system_prompt()
+    
+    assert service._system_prompt()[0] is prompt
+    assert "- Blockage: [Sewer, drainage, manhole, Water pipe, Other]" in prompt
+    
+    reload_taxonomy(path="")
+    
+    assert service.prompt_version == version
+    assert service._system_prompt()[0] is not prompt
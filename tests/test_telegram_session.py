@@ -0,0 +1,60 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.config.settings import TelegramClientConfig
+from src.services.telegram_session import create_pooled_bot
+
+
+async def fake_get_me(
+    request: web.Request
+) -> web.Response:
+    return web.json_response(
+        data={
+            "ok": True,
+            "result": {
+                "id": 1,
+                "is_bot": True,
+                "first_name": "HelpCy"
+            }
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_pooled_bot_reuses_connections():
+    app = web.Application()
+    app.router.add_post(
+        path="/bot{token}/getMe",
+        handler=fake_get_me
+    )
+    server = TestServer(app)
+    await server.start_server()
+    
+    bot = create_pooled_bot(
+        token="123456:TEST",
+        config=TelegramClientConfig(
+            api_base_url=str(server.make_url("")).rstrip("/"),
+            pool_limit_per_host=7
+        )
+    )
+    
+    try:
+        await bot.get_me()
+        await bot.get_me()
+        await bot.get_me()
+        
+        connector = (await bot.session.create_session()).connector
+        assert connector.limit_per_host == 7
+    finally:
+        await bot.session.close()
+        await server.close()
+    
+    assert connector.closed
+    
+    stats = bot.session.stats.to_dict()
+    
+    assert stats["requests"] == 3
+    assert stats["errors"] == 0
+    assert stats["pool_misses"] == 1
+    assert stats["pool_hits"] == 2
@@ -0,0 +1,144 @@
+import datetime
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+from aiogram.types import CallbackQuery, Chat, Message, User, Voice
+
+from src.config.settings import settings, ThrottleConfig
+from src.bot.middleware.throttling import ThrottlingMiddleware
+from src.services.throttle import AI, RateLimiter, Throttle
+from src.webapp.auth import init_data_user_id, throttle_key
+
+
+def test_user_bucket_allows_a_burst_then_refills():
+    limiter = RateLimiter(
+        kind=AI,
+        user_rate=0.5,
+        user_burst=2,
+        global_rate=0,
+        global_burst=0
+    )
+    
+    assert limiter.acquire(user_id=1, now=0.0).allowed
+    assert limiter.acquire(user_id=1, now=0.0).allowed
+    
+    rejected = limiter.acquire(user_id=1, now=0.0)
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(2.0)
+    assert rejected.notify
+    assert not limiter.acquire(user_id=1, now=1.0).notify
+    
+    assert limiter.acquire(user_id=1, now=2.0).allowed
+    assert limiter.acquire(user_id=2, now=2.0).allowed
+    assert limiter.stats.rejected_user == 2
+
+
+def test_global_rejection_returns_the_users_token():
+    limiter = RateLimiter(
+        kind=AI,
+        user_rate=1.0,
+        user_burst=1,
+        global_rate=1.0,
+        global_burst=1
+    )
+    
+    assert limiter.acquire(user_id=1, now=0.0).allowed
+    assert not limiter.acquire(user_id=2, now=0.0).allowed
+    assert limiter.stats.rejected_global == 1
+    
+    # User 2 was never charged, so only the global bucket gates them
+    assert limiter.acquire(user_id=2, now=1.0).allowed
+
+
+def test_idle_users_are_evicted_once_their_bucket_is_full():
+    limiter = RateLimiter(
+        kind=AI,
+        user_rate=1.0,
+        user_burst=5,
+        global_rate=0,
+        global_burst=0
+    )
+    
+    for user_id in range(100):
+        limiter.acquire(user_id=user_id, now=0.0)
+    limiter.acquire(user_id=0, now=4.0)
+    
+    limiter.acquire(user_id=1000, now=5.0)
+    
+    assert limiter.active_users == 2
+    assert limiter.stats.evicted == 99
+
+
+def message(
+    **fields
+) -> Message:
+    return Message(
+        message_id=1,
+        date=datetime.datetime.now(),
+        chat=Chat(id=42, type="private"),
+        from_user=User(id=42, is_bot=False, first_name="Test"),
+        **fields
+    )
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_ai_updates_and_answers_once(monkeypatch):
+    replies = []
+    
+    async def answer(self, text, **kwargs):
+        replies.append(text)
+    
+    monkeypatch.setattr(Message, "answer", answer)
+    monkeypatch.setattr(CallbackQuery, "answer", answer)
+    
+    handled = []
+    
+    async def handler(event, data):
+        handled.append(event)
+    
+    middleware = ThrottlingMiddleware(
+        throttle=Throttle(
+            config=ThrottleConfig(ai_user_rate=0.01, ai_user_burst=1)
+        )
+    )
+    voice = message(voice=Voice(file_id="v", file_unique_id="v", duration=3))
+    
+    for _ in range(3):
+        await middleware(handler, voice, {})
+    await middleware(handler, message(text="hello"), {})
+    
+    assert len(handled) == 2
+    assert len(replies) == 1
+    assert "too quickly" in replies[0]
+
+
+def signed_init_data(
+    user_id: int,
+    auth_date: int,
+    token: str = "123456:TEST"
+) -> str:
+    fields = {"auth_date": str(auth_date), "query_id": "q", "user": json.dumps({"id": user_id})}
+    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    
+    return urlencode(fields)
+
+
+def test_web_app_budget_follows_the_verified_user(monkeypatch):
+    monkeypatch.setattr(settings.bot, "token", "123456:TEST")
+    now = int(time.time())
+    
+    assert init_data_user_id(signed_init_data(42, now)) == 42
+    assert init_data_user_id(signed_init_data(42, now, token="654321:OTHER")) is None
+    assert init_data_user_id(signed_init_data(42, now - 2 * 86400)) is None
+    assert init_data_user_id(signed_init_data(42, now).replace("42", "43")) is None
+    
+    assert throttle_key(init_data=signed_init_data(42, now), remote="10.0.0.1") == "user:42"
+    # Unsigned or forged callers share their address's budget
+    assert throttle_key(init_data=None, remote="10.0.0.1") == "addr:10.0.0.1"
+    assert throttle_key(init_data="user=%7B%22id%22%3A7%7D&hash=00", remote="10.0.0.1") == "addr:10.0.0.1"
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+
+from src.config.settings import TracingConfig
+from src.services.tracing import (
+    TRACER,
+    OTLPFileExporter,
+    Tracer,
+    format_traceparent,
+    parse_traceparent
+)
+from src.webapp.jobs import PhotoJobQueue
+from src.webapp.reports import timed_stage
+
+
+def file_tracer(
+    tmp_path,
+    sample_rate: float = 1.0
+) -> Tracer:
+    return Tracer(
+        config=TracingConfig(sample_rate=sample_rate),
+        exporter=OTLPFileExporter(
+            path=str(tmp_path / "spans.jsonl"),
+            service_name="helpcy-test"
+        )
+    )
+
+
+def exported_spans(
+    tmp_path
+) -> list:
+    spans = []
+    
+    with open(tmp_path / "spans.jsonl") as export_file:
+        for line in export_file:
+            request = json.loads(line)
+            for resource in request["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    spans.extend(scope["spans"])
+    
+    return spans
+
+
+def test_traceparent_round_trip_and_rejects_malformed_headers():
+    header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    context = parse_traceparent(header=header)
+    
+    assert context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert context.sampled
+    assert format_traceparent(context=context) == header
+    
+    assert parse_traceparent(header=None) is None
+    assert parse_traceparent(header="00-abc-def-01") is None
+    assert parse_traceparent(header="00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(header="00-4bf92f3577b34da6a3ce929d0e0e473z-00f067aa0ba902b7-01") is None
+
+
+def test_child_spans_share_the_trace_and_export_as_otlp_json(tmp_path):
+    tracer = file_tracer(tmp_path)
+    
+    with tracer.span(name="POST /upload-photo") as root:
+        with tracer.span(name="openai.vision", attributes={"openai.model": "gpt-4o"}):
+            pass
+        with pytest.raises(ValueError):
+            with tracer.span(name="photo.store"):
+                raise ValueError("disk full")
+    
+    assert tracer.current_context() is None
+    assert tracer.exporter.flush() == 3
+    
+    spans = {span["name"]: span for span in exported_spans(tmp_path)}
+    assert {span["traceId"] for span in spans.values()} == {root.context.trace_id}
+    assert "parentSpanId" not in spans["POST /upload-photo"]
+    assert spans["openai.vision"]["parentSpanId"] == root.context.span_id
+    assert spans["openai.vision"]["attributes"] == [{"key": "openai.model", "value": {"stringValue": "gpt-4o"}}]
+    assert spans["photo.store"]["status"] == {"code": 2, "message": "ValueError: disk full"}
+
+
+def test_sampling_is_decided_at_the_root_and_inherited(tmp_path):
+    tracer = file_tracer(tmp_path, sample_rate=0.0)
+    
+    with tracer.span(name="root") as root:
+        with tracer.span(name="child") as child:
+            pass
+    
+    assert not root.recording and not child.recording
+    assert child.context.trace_id == root.context.trace_id
+    assert tracer.exporter.flush() == 0
+    
+    # A sampled flag from the Mini App does not override the local rate
+    remote = tracer.extract(header="00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+    assert remote.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert not remote.sampled
+    
+    # Client spans that need a parent are skipped outside a trace
+    with tracer.span(name="telegram.getUpdates", require_parent=True) as span:
+        assert span.context is None
+
+
+@pytest.mark.asyncio
+async def test_photo_job_continues_the_upload_trace(tmp_path, monkeypatch):
+    tracer = file_tracer(tmp_path)
+    monkeypatch.setattr(TRACER, "exporter", tracer.exporter)
+    monkeypatch.setattr(TRACER, "sample_rate", 1.0)
+    
+    async def handler(job):
+        with timed_stage(job.stages, "ai_analysis"):
+            pass
+        return {"category": "Damage"}
+    
+    queue = PhotoJobQueue(
+        handler=handler,
+        max_size=10,
+        workers=1,
+        history_size=10
+    )
+    await queue.start()
+    
+    with TRACER.span(name="POST /upload-photo") as request_span:
+        await queue.submit(user_id=1, payload={})
+    
+    await asyncio.wait_for(queue._queue.join(), timeout=1)
+    await queue.stop()
+    TRACER.flush()
+    
+    spans = {span["name"]: span for span in exported_spans(tmp_path)}
+    assert spans["photo_job"]["traceId"] == request_span.context.trace_id
+    assert spans["photo_job"]["parentSpanId"] == request_span.context.span_id
+    assert spans["photo.ai_analysis"]["parentSpanId"] == spans["photo_job"]["spanId"]
@@ -0,0 +1,88 @@
+import base64
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import ClientSession, FormData, web
+from aiohttp.test_utils import TestServer
+
+from src.services.throttle import Throttle
+from src.webapp.app import CONTEXT_KEY, handle_photo_upload
+from src.webapp.auth import parse_user_id
+from src.webapp.uploads import PhotoUpload, UploadTooLargeError, InvalidUploadError
+
+
+def test_photo_upload_spools_to_disk_and_enforces_cap():
+    upload = PhotoUpload(
+        max_bytes=1000,
+        spool_bytes=100
+    )
+    
+    upload.write(b"a" * 600)
+    
+    with pytest.raises(UploadTooLargeError):
+        upload.write(b"b" * 600)
+    
+    assert upload.size == 600
+    assert upload.read() == b"a" * 600
+    
+    upload.close()
+
+
+def test_photo_upload_from_base64_round_trip():
+    upload = PhotoUpload.from_base64(
+        photo_base64=base64.b64encode(b"jpeg-bytes").decode()
+    )
+    
+    assert upload.read() == b"jpeg-bytes"
+    assert upload.size == len(b"jpeg-bytes")
+    
+    upload.close()
+
+
+def test_photo_upload_rejects_invalid_base64():
+    with pytest.raises(InvalidUploadError):
+        PhotoUpload.from_base64(
+            photo_base64="not base64!"
+        )
+
+
+@pytest.mark.asyncio
+async def test_spooled_input_file_streams_buffer_in_chunks():
+    upload = PhotoUpload(
+        spool_bytes=10
+    )
+    upload.write(b"x" * 150000)
+    
+    input_file = upload.as_input_file()
+    chunks = [chunk async for chunk in input_file.read(bot=None)]
+    
+    assert input_file.filename == "photo.jpg"
+    assert len(chunks) == 3
+    assert b"".join(chunks) == b"x" * 150000
+    
+    upload.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_without_a_telegram_user_is_a_bad_request():
+    context = SimpleNamespace(throttle=Throttle())
+    app = web.Application()
+    app[CONTEXT_KEY] = context
+    app.router.add_post("/upload-photo", handle_photo_upload)
+    server = TestServer(app)
+    await server.start_server()
+    
+    try:
+        async with ClientSession() as session:
+            for user_id in ("null", "", "-5"):
+                form = FormData()
+                form.add_field("user_id", user_id)
+                form.add_field("photo", b"\xff\xd8jpeg", filename="photo.jpg", content_type="image/jpeg")
+                
+                async with session.post(server.make_url("/upload-photo"), data=form) as response:
+                    assert response.status == 400
+                    assert (await response.json())["error"] == "Missing or invalid user_id"
+    finally:
+        await server.close()
+    
+    assert parse_user_id("42") == 42
@@ -0,0 +1,148 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.config.settings import VisionCacheConfig
+from src.services.ai_vision_service import AIVisionService
+from src.services.vision_cache import VisionCache
+
+
+RESULT = {
+    "category": "Roads",
+    "subcategory": "Pothole",
+    "description": "A deep pothole in the middle of the lane."
+}
+
+
+def test_make_key_depends_on_image_model_and_prompt():
+    key = VisionCache.make_key(
+        image=b"jpeg",
+        model="gpt-4o",
+        prompt_version="abc"
+    )
+    
+    assert key == VisionCache.make_key(image=b"jpeg", model="gpt-4o", prompt_version="abc")
+    assert key != VisionCache.make_key(image=b"jpeg2", model="gpt-4o", prompt_version="abc")
+    assert key != VisionCache.make_key(image=b"jpeg", model="gpt-4o-mini", prompt_version="abc")
+    assert key != VisionCache.make_key(image=b"jpeg", model="gpt-4o", prompt_version="abd")
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_evicts_least_recently_used():
+    cache = VisionCache(
+        config=VisionCacheConfig(
+            max_entries=2
+        )
+    )
+    
+    await cache.put(key="a", result=RESULT, latency=1.0, tokens=100)
+    await cache.put(key="b", result=RESULT, latency=1.0, tokens=100)
+    assert await cache.get(key="a") == RESULT
+    await cache.put(key="c", result=RESULT, latency=1.0, tokens=100)
+    
+    assert await cache.get(key="b") is None
+    assert await cache.get(key="a") == RESULT
+    assert await cache.get(key="c") == RESULT
+    
+    stats = cache.stats.to_dict()
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["saved_tokens"] == 300
+    assert stats["saved_latency_seconds"] == 3.0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    cache = VisionCache(
+        config=VisionCacheConfig(
+            ttl=0.0
+        )
+    )
+    
+    await cache.put(key="a", result=RESULT, latency=1.0, tokens=100)
+    
+    assert await cache.get(key="a") is None
+    assert cache.stats.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_hits_return_copies():
+    cache = VisionCache(
+        config=VisionCacheConfig()
+    )
+    
+    await cache.put(key="a", result=RESULT, latency=1.0, tokens=100)
+    cached = await cache.get(key="a")
+    cached["category"] = "Other"
+    
+    assert (await cache.get(key="a"))["category"] == "Roads"
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    config = VisionCacheConfig(
+        path=str(tmp_path / "vision.sqlite3")
+    )
+    
+    first = VisionCache(config=config)
+    await first.put(key="a", result=RESULT, latency=2.5, tokens=900)
+    first.close()
+    
+    second = VisionCache(config=config)
+    
+    try:
+        assert await second.get(key="a") == RESULT
+        assert await second.get(key="a") == RESULT
+        assert second.stats.disk_hits == 1
+        assert second.stats.memory_hits == 1
+    finally:
+        second.close()
+
+
+def test_disk_tier_prunes_by_index(tmp_path):
+    cache = VisionCache(
+        config=VisionCacheConfig(
+            path=str(tmp_path / "vision.sqlite3")
+        )
+    )
+    
+    try:
+        plan = cache._db.execute("EXPLAIN QUERY PLAN DELETE FROM vision_cache WHERE created_at < 0").fetchall()
+    finally:
+        cache.close()
+    
+    assert "vision_cache_created_at" in plan[0][3]
+
+
+@pytest.mark.asyncio
+async def test_service_answers_repeated_image_from_cache():
+    service = AIVisionService(
+        cache=VisionCache(
+            config=VisionCacheConfig()
+        )
+    )
+    service._request_photo_analysis = AsyncMock(return_value=(RESULT, 1200))
+    
+    first = await service.analyze_problem_image(image=b"same-photo")
+    second = await service.analyze_problem_image(image=b"same-photo")
+    
+    assert first == second == RESULT
+    service._request_photo_analysis.assert_awaited_once()
+    assert service.cache.stats.saved_tokens == 1200
+
+
+@pytest.mark.asyncio
+async def test_service_does_not_cache_failures():
+    service = AIVisionService(
+        cache=VisionCache(
+            config=VisionCacheConfig()
+        )
+    )
+    service._request_photo_analysis = AsyncMock(side_effect=RuntimeError("boom"))
+    
+    result = await service.analyze_problem_image(image=b"photo")
+    
+    assert result["category"] == "Other"
+    assert service.cache.stats.to_dict()["hits"] == 0
+    assert len(service.cache._entries) == 0
@@ -0,0 +1,212 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+
+from src.config.settings import WebhookConfig
+from src.services.webhook import BoundedRequestHandler
+
+
+def make_update(
+    update_id: int,
+    chat_id: int = 1
+) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "text": f"update {update_id}"
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_updates_are_acknowledged_and_bounded():
+    release = asyncio.Event()
+    seen = []
+    
+    router = Router()
+    
+    @router.message()
+    async def slow_handler(
+        message: Message
+    ) -> None:
+        seen.append(message.message_id)
+        await release.wait()
+    
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    bot = Bot(token="123456:TEST")
+    handler = BoundedRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        max_in_flight=2,
+        secret_token="s3cret"
+    )
+    
+    app = web.Application()
+    handler.register(app, path="/webhook")
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("/webhook"))
+    headers = {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+    
+    try:
+        async with ClientSession() as session:
+            for update_id in (1, 2):
+                async with session.post(url, json=make_update(update_id, chat_id=update_id), headers=headers) as response:
+                    assert response.status == 200
+            
+            third = asyncio.ensure_future(session.post(url, json=make_update(3, chat_id=3), headers=headers))
+            await asyncio.sleep(0.2)
+            
+            assert not third.done()
+            assert handler.stats.in_flight == 2
+            
+            release.set()
+            response = await third
+            assert response.status == 200
+            response.release()
+            
+            async with session.post(url, json=make_update(4)) as response:
+                assert response.status == 401
+        
+        await handler.close()
+    finally:
+        await server.close()
+        await bot.session.close()
+    
+    stats = handler.stats.to_dict()
+    
+    assert sorted(seen) == [1, 2, 3]
+    assert stats["processed"] == 3
+    assert stats["throttled"] == 1
+    assert stats["peak_in_flight"] == 2
+    assert stats["unauthorized"] == 1
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_updates_of_one_chat_keep_their_order():
+    handled = []
+    
+    router = Router()
+    
+    @router.message()
+    async def jittery_handler(
+        message: Message
+    ) -> None:
+        await asyncio.sleep(0.05 if message.message_id % 2 else 0)
+        handled.append((message.chat.id, message.message_id))
+    
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    bot = Bot(token="123456:TEST")
+    handler = BoundedRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        max_in_flight=16
+    )
+    
+    app = web.Application()
+    handler.register(app, path="/webhook")
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("/webhook"))
+    
+    try:
+        async with ClientSession() as session:
+            for update_id in range(1, 9):
+                async with session.post(url, json=make_update(update_id, chat_id=10 + update_id % 2)) as response:
+                    assert response.status == 200
+        
+        await handler.close()
+    finally:
+        await server.close()
+        await bot.session.close()
+    
+    assert [message_id for chat_id, message_id in handled if chat_id == 10] == [2, 4, 6, 8]
+    assert [message_id for chat_id, message_id in handled if chat_id == 11] == [1, 3, 5, 7]
+    assert handled[0] == (10, 2)
+    assert handler._chat_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_bursting_chat_only_delays_itself():
+    release = asyncio.Event()
+    handled = []
+    
+    router = Router()
+    
+    @router.message()
+    async def blocking_handler(
+        message: Message
+    ) -> None:
+        if message.chat.id == 1:
+            await release.wait()
+        handled.append(message.message_id)
+    
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    bot = Bot(token="123456:TEST")
+    handler = BoundedRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        max_in_flight=2,
+        max_pending_per_chat=2
+    )
+    
+    app = web.Application()
+    handler.register(app, path="/webhook")
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("/webhook"))
+    
+    try:
+        async with ClientSession() as session:
+            for update_id in (1, 2):
+                async with session.post(url, json=make_update(update_id, chat_id=1)) as response:
+                    assert response.status == 200
+            
+            third = asyncio.ensure_future(session.post(url, json=make_update(3, chat_id=1)))
+            await asyncio.sleep(0.1)
+            assert not third.done()
+            
+            # The burst holds one slot, so another chat is still served
+            async with session.post(url, json=make_update(4, chat_id=2)) as response:
+                assert response.status == 200
+            await asyncio.sleep(0.1)
+            
+            assert handled == [4]
+            assert handler.stats.in_flight == 1
+            
+            release.set()
+            response = await third
+            assert response.status == 200
+            response.release()
+        
+        await handler.close()
+    finally:
+        await server.close()
+        await bot.session.close()
+    
+    stats = handler.stats.to_dict()
+    
+    assert handled == [4, 1, 2, 3]
+    assert stats["chat_throttled"] == 1
+    assert stats["throttled"] == 0
+    assert stats["peak_in_flight"] == 2
+    assert handler._chat_queues == {}
+
+
+def test_webhook_url_falls_back_to_host_and_path():
+    assert WebhookConfig(host="https://bot.example.com/", path="/tg").webhook_url == "https://bot.example.com/tg"
+    assert WebhookConfig(host="https://a", url="https://b/hook").webhook_url == "https://b/hook"
+    
+    with pytest.raises(ValueError):
+        WebhookConfig().webhook_url
@@ -1,19 +1,60 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory
 from flask_cors import CORS
-import asyncio
+from werkzeug.exceptions import RequestEntityTooLarge
+import atexit
 import logging
-import os
-import requests
+import math
+import signal
+import sys
 from dotenv import load_dotenv
 
+from src.config.settings import settings
+from src.services.metrics import CONTENT_TYPE, REGISTRY
+from src.services.throttle import AI, CHEAP
+from src.services.tracing import TRACER, TRACEPARENT_HEADER, SPAN_KIND_SERVER
+from src.webapp.auth import INIT_DATA_HEADER, parse_user_id, throttle_key
+from src.webapp.background import BackgroundLoop
+from src.webapp.export import InvalidExportQuery, accepts_gzip, export_authorized, export_chunks, gzip_chunks, parse_export_query
+from src.webapp.jobs import QueueFullError
+from src.webapp.reports import send_edited_review, send_location_prompt
+from src.webapp.uploads import PhotoUpload, UploadTooLargeError, InvalidUploadError
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 app = Flask(__name__)
+# Werkzeug rejects bodies past this before parsing or spooling them, as
+# client_max_size does in the aiohttp app (base64 JSON needs the extra third)
+app.config['MAX_CONTENT_LENGTH'] = settings.webapp.max_upload_bytes * 4 // 3 + UPLOAD_CHUNK_SIZE
 CORS(app)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
-BOT_TOKEN = os.getenv("BOT_TOKEN")
+
+background = BackgroundLoop()
+# Fails queued photo jobs and closes their uploads, the bot session and the
+# stores when the process exits; the loop thread is a daemon and would
+# otherwise die with accepted jobs still queued
+atexit.register(background.stop)
+
+@app.before_request
+def start_request_span():
+    # Same scope as the aiohttp app: Mini App writes only
+    if request.method == 'POST' and TRACER.enabled:
+        g.trace_span = TRACER.start_span(name=f'POST {request.path}', kind=SPAN_KIND_SERVER, parent=TRACER.extract(request.headers.get(TRACEPARENT_HEADER)))
+
+@app.after_request
+def record_response_status(response):
+    if 'trace_span' in g:
+        g.trace_span.set_attribute('http.status_code', response.status_code)
+    return response
+
+@app.teardown_request
+def end_request_span(error):
+    span = g.pop('trace_span', None)
+    if span is not None:
+        TRACER.end_span(span, error=error)
 
 @app.route('/map.html')
 def serve_map():
@@ -27,8 +68,21 @@ def serve_camera():
 def serve_edit_description():
     return send_from_directory('webapp', 'edit_description.html')
 
+def throttled(kind):
+    # Same per-user and global budgets as the aiohttp app, keyed by the verified
+    # Telegram user (or the client address) from the headers, before any body is read
+    key = throttle_key(init_data=request.headers.get(INIT_DATA_HEADER), remote=request.remote_addr)
+    verdict = background.context.throttle.acquire(user_id=key, kind=kind)
+    if verdict.allowed:
+        return None
+    
+    return jsonify({'ok': False, 'error': 'Too many requests, please retry shortly'}), 429, {'Retry-After': str(math.ceil(verdict.retry_after))}
+
 @app.route('/location', methods=['POST'])
 def handle_location():
+    if rejection := throttled(CHEAP):
+        return rejection
+    
     data = request.json
     user_id = data.get('user_id')
     latitude = data.get('latitude')
@@ -36,187 +90,126 @@ def handle_location():
     
     logger.info(f"Received location from user {user_id}: {latitude}, {longitude}")
     
-    asyncio.run(send_to_telegram(user_id, latitude, longitude))
+    background.run(
+        send_location_prompt(
+            bot=background.context.bot,
+            user_id=user_id,
+            latitude=latitude,
+            longitude=longitude
+        )
+    )
     
     return jsonify({'ok': True})
 
-async def send_to_telegram(user_id, lat, lng):
-    from aiogram import Bot
-    
-    bot = Bot(token=BOT_TOKEN)
-    
-    try:
-        message_text = (
-            f"✅ Location received!\n\n"
-            f"Latitude: {lat}\n"
-            f"Longitude: {lng}\n\n"
-            f"What would you like to share?"
-        )
+def read_photo_request():
+    if request.mimetype == 'multipart/form-data':
+        photo_file = request.files.get('photo')
+        if not photo_file:
+            return request.form, None
         
-        await bot.send_message(
-            chat_id=user_id,
-            text=message_text
-        )
-        
-        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-        
-        # Pass location through callback_data
-        keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(text="📷 Photo", callback_data=f"media_photo|{lat}|{lng}"),
-                    InlineKeyboardButton(text="🎵 Audio", callback_data=f"media_audio|{lat}|{lng}")
-                ]
-            ]
-        )
+        upload = PhotoUpload(content_type=photo_file.mimetype or 'image/jpeg')
+        upload.write_iterable(iter(lambda: photo_file.stream.read(UPLOAD_CHUNK_SIZE), b''))
         
-        await bot.send_message(
-            chat_id=user_id,
-            text="Choose media type:",
-            reply_markup=keyboard
-        )
+        return request.form, upload
+    
+    if request.mimetype.startswith('image/'):
+        upload = PhotoUpload(content_type=request.mimetype)
+        upload.write_iterable(iter(lambda: request.stream.read(UPLOAD_CHUNK_SIZE), b''))
         
-    finally:
-        await bot.session.close()
-
-
-
+        return request.args, upload
+    
+    data = request.json
+    photo_base64 = data.get('photo')
+    
+    logger.info(f"Received base64 photo, size: {len(photo_base64) if photo_base64 else 0}")
+    
+    return data, PhotoUpload.from_base64(photo_base64=photo_base64) if photo_base64 else None
 
 @app.route('/upload-photo', methods=['POST'])
 def handle_photo_upload():
-    import base64
-    import requests
-    import asyncio
+    upload = None
     
     try:
         logger.info(f"Upload photo endpoint hit!")
         
-        data = request.json
-        user_id = data.get('user_id')
-        photo_base64 = data.get('photo')
-        latitude = data.get('latitude', 35.0)
-        longitude = data.get('longitude', 33.0)
+        # Rate-limited clients are turned away before their upload is read and spooled
+        if rejection := throttled(AI):
+            return rejection
         
-        logger.info(f"Received photo from user {user_id}, photo size: {len(photo_base64) if photo_base64 else 0}")
+        with TRACER.span(name='webapp.read_upload'):
+            fields, upload = read_photo_request()
+        user_id = parse_user_id(fields.get('user_id'))
+        latitude = float(fields.get('latitude', 35.0))
+        longitude = float(fields.get('longitude', 33.0))
+        
+        logger.info(f"Received photo from user {user_id}, photo size: {upload.size if upload else 0} bytes")
         logger.info(f"Location: {latitude}, {longitude}")
         
-        if not photo_base64:
+        if user_id is None:
+            return jsonify({'ok': False, 'error': 'Missing or invalid user_id'}), 400
+        
+        if not upload or not upload.size:
             logger.error("No photo data received!")
             return jsonify({'ok': False, 'error': 'No photo data'}), 400
         
-        # Send processing message immediately
-        processing_response = requests.post(
-            f'https://api.telegram.org/bot{BOT_TOKEN}/sendMessage',
-            json={
-                'chat_id': user_id,
-                'text': '🔄 <b>Processing image...</b>\n\nAI is analyzing your photo. This may take a few moments.',
-                'parse_mode': 'HTML'
-            },
-            timeout=5
-        )
-        logger.info(f"Processing message sent: {processing_response.status_code}")
-        
-        # Real AI analysis with OpenAI Vision
-        logger.info("Starting AI analysis with OpenAI Vision...")
-        photo_data_url = f"data:image/jpeg;base64,{photo_base64}"
-        
-        from src.services.ai_vision_service import AIVisionService
-        ai_service = AIVisionService()
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        analysis = loop.run_until_complete(
-            ai_service.analyze_problem_photo(photo_url=photo_data_url)
+        job = background.run(
+            background.context.photo_jobs.submit(
+                user_id=user_id,
+                payload={
+                    'photo': upload,
+                    'latitude': latitude,
+                    'longitude': longitude
+                }
+            )
         )
-        loop.close()
+        upload = None
         
-        category = analysis['category']
-        subcategory = analysis['subcategory']
-        description = analysis['description']
+        logger.info(f"Queued photo job {job.job_id} for user {user_id}")
         
-        logger.info(f"AI analysis: category={category}, subcategory={subcategory}, description={description[:50]}...")
+        return jsonify({'ok': True, 'job_id': job.job_id, 'status_url': f'/jobs/{job.job_id}'}), 202
         
-        # Decode photo
-        photo_bytes = base64.b64decode(photo_base64)
-        logger.info(f"Photo decoded, size: {len(photo_bytes)} bytes")
+    except UploadTooLargeError as e:
+        return jsonify({'ok': False, 'error': str(e)}), 413
         
-        # Send photo to Telegram
-        files = {'photo': ('photo.jpg', photo_bytes, 'image/jpeg')}
-        photo_response = requests.post(
-            f'https://api.telegram.org/bot{BOT_TOKEN}/sendPhoto',
-            data={'chat_id': user_id, 'caption': '📸 Photo received'},
-            files=files,
-            timeout=10
-        )
-        
-        logger.info(f"Photo sent response: {photo_response.status_code}, body: {photo_response.text[:200]}")
-        
-        # Send message with buttons
-        lat_display = f"{int(latitude)}.{str(latitude).split('.')[1][:6] if '.' in str(latitude) else 'xxxxxx'}"
-        lng_display = f"{int(longitude)}.{str(longitude).split('.')[1][:6] if '.' in str(longitude) else 'xxxxxx'}"
-        
-        message_text = (
-            f"📋 <b>Report Details</b>\n\n"
-            f"📍 <b>Location:</b> {lat_display}, {lng_display}\n\n"
-            f"🏷 <b>Category:</b> {category}\n"
-            f"🔖 <b>Subcategory:</b> {subcategory}\n"
-            f"📝 <b>Description:</b> {description}\n\n"
-            f"Review your report and submit or change category."
-        )
-        
-        # Build edit description URL
-        from urllib.parse import quote
-        webapp_url = os.getenv("WEBAPP_URL", "")
-        if webapp_url:
-            base_url = webapp_url.rsplit('/', 1)[0]
-            edit_url = f"{base_url}/edit_description.html?desc={quote(description)}&cat={quote(category)}&subcat={quote(subcategory)}&lat={latitude}&lng={longitude}"
-            logger.info(f"Edit URL for upload-photo: {edit_url}")
-        else:
-            edit_url = ""
-            logger.warning("No WEBAPP_URL in env!")
-        
-        keyboard_buttons = [
-            [{"text": "🔄 Change Category", "callback_data": f"chcat|{latitude}|{longitude}"}],
-            [{"text": "✅ Submit", "callback_data": "submit_report"}]
-        ]
-        
-        # Add Edit Description button only if webapp_url exists
-        if edit_url:
-            keyboard_buttons.insert(1, [{"text": "✏️ Edit Description", "web_app": {"url": edit_url}}])
-        
-        keyboard = {"inline_keyboard": keyboard_buttons}
+    except RequestEntityTooLarge:
+        return jsonify({'ok': False, 'error': f'Photo exceeds the {settings.webapp.max_upload_bytes} byte upload limit'}), 413
         
-        logger.info(f"Sending message with buttons...")
-        message_response = requests.post(
-            f'https://api.telegram.org/bot{BOT_TOKEN}/sendMessage',
-            json={
-                'chat_id': user_id,
-                'text': message_text,
-                'parse_mode': 'HTML',
-                'reply_markup': keyboard
-            },
-            timeout=10
-        )
-        
-        logger.info(f"Message sent response: {message_response.status_code}, body: {message_response.text[:200]}")
-        logger.info(f"Complete! category={category}, subcategory={subcategory}, lat={latitude}, lng={longitude}")
+    except InvalidUploadError as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
         
-        return jsonify({'ok': True})
+    except QueueFullError as e:
+        logger.warning(f"Rejecting photo upload: {e}")
+        return jsonify({'ok': False, 'error': 'Server is busy, please retry shortly'}), 503, {'Retry-After': '5'}
         
     except Exception as e:
         logger.error(f"Error in handle_photo_upload: {e}", exc_info=True)
         return jsonify({'ok': False, 'error': str(e)}), 500
+        
+    finally:
+        if upload:
+            upload.close()
+
+@app.route('/jobs/<job_id>')
+def handle_job_status(job_id):
+    job = background.context.photo_jobs.get(job_id=job_id)
+    
+    if not job:
+        return jsonify({'ok': False, 'error': 'Unknown job'}), 404
+    
+    return jsonify({'ok': True, **job.to_dict()})
 
 @app.route('/update-description', methods=['POST'])
 def handle_update_description():
-    import requests
-    
     try:
         logger.info("Update description endpoint hit!")
         
+        if rejection := throttled(CHEAP):
+            return rejection
+        
         data = request.json
         user_id = data.get('user_id')
         description = data.get('description')
+        draft_id = data.get('draft_id')
         category = data.get('category')
         subcategory = data.get('subcategory')
         latitude = data.get('latitude', 0.0)
@@ -224,52 +217,20 @@ def handle_update_description():
         
         logger.info(f"User {user_id} updating description: {description[:50]}...")
         
-        # Send updated report
-        lat_display = f"{int(latitude)}.{str(latitude).split('.')[1][:6] if '.' in str(latitude) else 'xxxxxx'}"
-        lng_display = f"{int(longitude)}.{str(longitude).split('.')[1][:6] if '.' in str(longitude) else 'xxxxxx'}"
-        
-        message_text = (
-            f"📋 <b>Report Updated</b>\n\n"
-            f"📍 <b>Location:</b> {lat_display}, {lng_display}\n\n"
-            f"🏷 <b>Category:</b> {category}\n"
-            f"🔖 <b>Subcategory:</b> {subcategory}\n"
-            f"📝 <b>Description:</b> {description}\n\n"
-            f"Review your report and submit."
+        background.run(
+            send_edited_review(
+                bot=background.context.bot,
+                report_repository=background.context.report_repository,
+                user_id=user_id,
+                draft_id=int(draft_id) if draft_id else None,
+                description=description,
+                category=category,
+                subcategory=subcategory,
+                latitude=latitude,
+                longitude=longitude
+            )
         )
         
-        # Build edit description URL
-        from urllib.parse import quote
-        webapp_url = os.getenv("WEBAPP_URL", "")
-        if webapp_url:
-            base_url = webapp_url.rsplit('/', 1)[0]
-            edit_url = f"{base_url}/edit_description.html?desc={quote(description)}&cat={quote(category)}&subcat={quote(subcategory)}&lat={latitude}&lng={longitude}"
-            logger.info(f"Edit URL for update-description: {edit_url}")
-        else:
-            edit_url = ""
-            logger.warning("No WEBAPP_URL in env!")
-        
-        keyboard_buttons = [
-            [{"text": "🔄 Change Category", "callback_data": f"chcat|{latitude}|{longitude}"}],
-            [{"text": "✅ Submit", "callback_data": "submit_report"}]
-        ]
-        
-        # Add Edit Description button only if webapp_url exists
-        if edit_url:
-            keyboard_buttons.insert(1, [{"text": "✏️ Edit Description", "web_app": {"url": edit_url}}])
-        
-        keyboard = {"inline_keyboard": keyboard_buttons}
-        
-        response = requests.post(
-            f'https://api.telegram.org/bot{BOT_TOKEN}/sendMessage',
-            json={
-                'chat_id': user_id,
-                'text': message_text,
-                'parse_mode': 'HTML',
-                'reply_markup': keyboard
-            }
-        )
-        
-        logger.info(f"Message sent: {response.status_code}")
         logger.info(f"Updated: category={category}, subcategory={subcategory}, lat={latitude}, lng={longitude}")
         
         return jsonify({'ok': True})
@@ -278,5 +239,47 @@ def handle_update_description():
         logger.error(f"Error updating description: {e}", exc_info=True)
         return jsonify({'ok': False, 'error': str(e)}), 500
 
+@app.route('/reports/export')
+def handle_report_export():
+    if not settings.webapp.export_token:
+        return jsonify({'ok': False, 'error': 'Export is not enabled'}), 404
+    
+    if not export_authorized(request.headers.get('Authorization')):
+        return jsonify({'ok': False, 'error': 'Unauthorized'}), 401
+    
+    try:
+        query = parse_export_query(params=request.args)
+    except InvalidExportQuery as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+    
+    chunks = background.iterate(
+        export_chunks(
+            repository=background.context.report_repository,
+            query=query
+        )
+    )
+    headers = {'Vary': 'Accept-Encoding'}
+    
+    if accepts_gzip(request.headers.get('Accept-Encoding')):
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(chunks, content_type=query.content_type, headers=headers)
+
+@app.route('/stats')
+def handle_stats():
+    return jsonify(background.context.stats())
+
+@app.route('/metrics')
+def handle_metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000)
+    if settings.webapp.server_mode == "async":
+        from src.webapp.app import run_app
+        
+        run_app()
+    else:
+        # SIGTERM would end the process without running atexit hooks
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        app.run(host=settings.webapp.host, port=settings.webapp.port)